@@ -64,11 +64,78 @@ class ElectionSerializer(serializers.ModelSerializer):
             return User.objects.count()
         return eligible_voters
 
+def find_invalid_ballots(items):
+    """
+    Check submitted votes' ciphertexts, batching one validity check per election
+
+    Args:
+        items: Validated vote attribute dicts
+
+    Returns:
+        Dict mapping item position to an error message
+    """
+    from apps.elections.tally import parse_vote_payload
+
+    errors = {}
+    by_election = {}
+    for position, attrs in enumerate(items):
+        try:
+            ciphertext, _ = parse_vote_payload(attrs.get('encrypted_vote_data'))
+        except (ValueError, TypeError, AttributeError):
+            errors[position] = 'Encrypted vote data could not be parsed.'
+            continue
+        if ciphertext is None:
+            errors[position] = 'Encrypted vote data has no ciphertext.'
+            continue
+        by_election.setdefault(attrs['election'], []).append((position, ciphertext, attrs.get('validity_proof')))
+
+    for election, ballots in by_election.items():
+        if not election.uses_paillier:
+            # Raw payloads carry integer ciphertexts; other cryptosystems only accept votes cast through cast_vote
+            errors.update((position, 'Election does not accept integer ciphertexts.') for position, _, _ in ballots)
+            continue
+        if not election.public_key_n:
+            errors.update((position, 'Election has no public key.') for position, _, _ in ballots)
+            continue
+        key_context = election.get_key_context()
+        for index in key_context.validator.invalid_indices(ciphertext for _, ciphertext, _ in ballots):
+            errors[ballots[index][0]] = 'Ciphertext is not a valid encryption under the election key.'
+        if election.require_ballot_proofs:
+            from apps.encryption.proofs import verify_membership_proofs
+            context = election.proof_context
+            invalid = verify_membership_proofs(
+                [(ciphertext, proof, context) for _, ciphertext, proof in ballots],
+                key_context.public_key, election.get_ballot_values(), s=key_context.s
+            )
+            for index in invalid:
+                errors.setdefault(ballots[index][0], 'Ballot validity proof is missing or invalid.')
+    return errors
+
+class VoteListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        # Errors are raised here rather than in validate() so they stay per item
+        items = super().to_internal_value(data)
+        errors = find_invalid_ballots(items)
+        if errors:
+            raise serializers.ValidationError([
+                {'encrypted_vote_data': [errors[i]]} if i in errors else {} for i in range(len(items))
+            ])
+        return items
+
 class VoteSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        # Lists of votes are checked together by VoteListSerializer
+        if not isinstance(self.parent, serializers.ListSerializer):
+            errors = find_invalid_ballots([attrs])
+            if errors:
+                raise serializers.ValidationError({'encrypted_vote_data': [errors[0]]})
+        return attrs
+
     class Meta:
         model = Vote
+        list_serializer_class = VoteListSerializer
         fields = [
-            'id', 'election', 'voter', 'encrypted_vote_data', 'vote_hash',
+            'id', 'election', 'voter', 'encrypted_vote_data', 'validity_proof', 'vote_hash',
             'blockchain_tx_hash', 'is_valid', 'created_at', 'confirmed_at',
             'face_verified', 'fingerprint_verified', 'two_fa_verified'
         ]
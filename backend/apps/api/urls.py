@@ -18,6 +18,7 @@ urlpatterns = [
     path('elections/<int:pk>/results/', views.ElectionResultView.as_view(), name='election-results'),
     path('elections/<int:pk>/decrypt/', views.ElectionDecryptView.as_view(), name='election-decrypt'),
     path('vote/', views.cast_vote, name='cast_vote'),
+    path('vote/status/<str:vote_hash>/', views.vote_submission_status, name='vote_submission_status'),
     path('elections/verify-vote/<str:vote_hash>/', views.verify_vote, name='verify_vote'),
     
     # Authentication endpoints
@@ -2,16 +2,20 @@
 
 from rest_framework import viewsets, generics, status, permissions
 from rest_framework.views import APIView
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
 from apps.elections.models import Election, Candidate, Vote, ElectionResult
 from apps.voters.models import Voter, BiometricData
+from apps.elections import submission
 from apps.elections.blockchain import BlockchainService
-from apps.encryption.paillier import PaillierEncryption, VoteEncryption
+from apps.encryption.keypool import KeyPoolEmpty
 from web3 import Web3
 from .serializers import (
     ElectionSerializer, CandidateSerializer, VoteSerializer, UserSerializer,
@@ -117,11 +121,28 @@ class SignupView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+class KeyPoolExhausted(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'No election key is ready yet; the key pool is being refilled. Try again shortly.'
+    default_code = 'key_pool_exhausted'
+
 # ViewSets for routers
 class ElectionViewSet(viewsets.ModelViewSet):
     queryset = Election.objects.filter(is_public=True)
     serializer_class = ElectionSerializer
-    permission_classes = [permissions.AllowAny]
+    permission_classes = [IsAdminOrReadOnly]
+
+    def perform_create(self, serializer):
+        # Take the election key from the pre-generated pool; a prime search
+        # would pin this worker for seconds, so an empty pool is a 503 and
+        # the refill_key_pools task restocks it
+        try:
+            with transaction.atomic():
+                election = serializer.save(created_by=self.request.user)
+                election.ensure_key_pair(generate_inline=False)
+                election.save()
+        except KeyPoolEmpty:
+            raise KeyPoolExhausted()
 
 class CandidateViewSet(viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
@@ -138,6 +159,12 @@ class VoteViewSet(viewsets.ModelViewSet):
             return Vote.objects.all()
         return Vote.objects.filter(voter=self.request.user)
 
+    def get_serializer(self, *args, **kwargs):
+        # Accept a list of votes so their ciphertexts are validated as one batch
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
@@ -277,7 +304,7 @@ def test_auth(request):
 @permission_classes([permissions.IsAuthenticated])
 def cast_vote(request):
     """
-    Cast a vote in an election using the blockchain with Paillier encryption.
+    Cast a vote in an election using the blockchain, encrypted with the election's cryptosystem.
     
     Expected request data:
     {
@@ -298,7 +325,8 @@ def cast_vote(request):
         # Validate request data
         election_id = request.data.get('election_id')
         candidate_id = request.data.get('candidate_id')
-        vote_value = int(candidate_id)  # Ensure vote_value is defined before use
+        # Per-candidate ballots add one to the chosen candidate's accumulator
+        vote_value = 1
         
         if not election_id or not candidate_id:
             return Response(
@@ -324,24 +352,37 @@ def cast_vote(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Initialize Paillier encryption for vote encryption
-        paillier = PaillierEncryption(key_size=512)
-        vote_encryption = VoteEncryption()
-        
-        # Use the election's stored public key for encryption
+        # Use the election's cryptosystem and stored public key for encryption;
+        # Paillier keys are parsed once per key version and cached for the process
         election_obj = Election.objects.get(id=election_id)
-        public_key = (int(election_obj.public_key_n), int(election_obj.public_key_g))
-        # Encrypt the vote using Paillier
-        encrypted_vote = vote_encryption.encrypt_vote(vote_value, public_key)
-        
-        # Convert encrypted vote to hex for blockchain storage
-        encrypted_vote_hex = hex(encrypted_vote)[2:]  # Remove '0x' prefix
-        
-        # Pad hex string to even length if necessary
-        if len(encrypted_vote_hex) % 2 != 0:
-            encrypted_vote_hex = '0' + encrypted_vote_hex
+        cryptosystem = election_obj.get_encryption()
+        public_key = election_obj.get_public_key()
+        # Packed elections encode the choice as B^slot so the whole ballot box
+        # tallies with a single decryption.
+        if election_obj.uses_packed_ballots:
+            candidate_ids = [str(cid) for cid in election_obj.get_candidates().values_list('id', flat=True)]
+            if str(candidate_id) not in candidate_ids:
+                return Response(
+                    {'error': 'Candidate not found in this election'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            packer = election_obj.get_ballot_packer()
+            vote_value = packer.encode(candidate_ids.index(str(candidate_id)))
+        validity_proof = None
+        if cryptosystem.supports_ballot_proofs and election_obj.require_ballot_proofs:
+            # Prove the ballot encrypts an allowed value so it cannot skew the tally
+            encrypted_vote, validity_proof = election_obj.get_key_context().encrypt_with_proof(
+                vote_value, election_obj.get_ballot_values(), election_obj.proof_context
+            )
+        elif election_obj.uses_paillier:
+            # Takes r^n from the key's obfuscator pool when pooling is on
+            encrypted_vote = election_obj.get_key_context().encrypt(vote_value)
+        else:
+            encrypted_vote = cryptosystem.encrypt(vote_value, public_key)
         
-        encrypted_vote_bytes = bytes.fromhex(encrypted_vote_hex)
+        # Raw ciphertext bytes for blockchain storage
+        encrypted_vote_bytes = cryptosystem.ciphertext_bytes(encrypted_vote, public_key)
+        encrypted_vote_hex = encrypted_vote_bytes.hex()
         
         # Ensure blockchain address is in checksum format
         voter_address = Web3.to_checksum_address(request.user.blockchain_address)
@@ -364,56 +405,59 @@ def cast_vote(request):
         print(f"DEBUG: vote_hash_full = {vote_hash_full} (length: {len(vote_hash_full)})")
         print(f"DEBUG: vote_hash_bytes = {vote_hash_bytes} (length: {len(vote_hash_bytes)})")
         
-        # Cast vote on blockchain
-        # Convert bytes to hex string with 0x prefix for blockchain
-        encrypted_vote_hexstr = '0x' + encrypted_vote_bytes.hex()
-        vote_hash_hexstr = '0x' + vote_hash_bytes.hex()
-        
-        success, tx_hash = blockchain.cast_vote(
-            election_id=election_id,
-            voter_address=voter_address,
-            encrypted_vote=encrypted_vote_hexstr,  # Pass as hex string
-            vote_hash=vote_hash_hexstr             # Pass as hex string
-        )
-
-        if not success:
-            return Response(
-                {'error': f'Failed to cast vote: {tx_hash}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        vote_hash_hexstr = vote_hash_bytes.hex()
 
-        # Save the vote in the database (link to user for now, anonymize after tally)
+        # Store the ballot as pending and hand it to the submission workers;
+        # the castVote transaction is sent and confirmed in the background
         import json
         try:
-            election_obj = Election.objects.get(id=election_id)
-            Vote.objects.create(
-                election=election_obj,
-                voter=request.user,
-                encrypted_vote_data=json.dumps({
-                    "encrypted_vote": encrypted_vote_hexstr,
-                    "candidate_id": candidate_id
-                }),
-                vote_hash=vote_hash_hexstr[2:] if vote_hash_hexstr.startswith('0x') else vote_hash_hexstr,  # Remove 0x prefix
-                blockchain_tx_hash=tx_hash,
-                is_valid=True,
-                validation_errors=[]
-            )
+            # The ciphertext itself is stored as a fixed-width binary record
+            if election_obj.uses_packed_ballots:
+                # The choice lives only inside the ciphertext
+                vote_payload = {"encoding": "packed"}
+            else:
+                vote_payload = {"candidate_id": candidate_id}
+            with transaction.atomic():
+                # Replaces the voter's earlier ballot only if its submission failed for good
+                vote = submission.store_pending_vote(
+                    election_obj,
+                    request.user,
+                    encrypted_vote=cryptosystem.encode_ciphertext(encrypted_vote, public_key),
+                    validity_proof=validity_proof.to_dict() if validity_proof else None,
+                    encrypted_vote_data=json.dumps(vote_payload),
+                    vote_hash=vote_hash_hexstr,
+                )
+            if vote is None:
+                return Response(
+                    {'error': 'User has already voted'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         except Exception as vote_error:
             return Response(
                 {'error': f'Failed to save vote: {vote_error}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        return Response({
-            'message': 'Vote cast successfully with Paillier encryption',
-            'transaction_hash': tx_hash,
-            'vote_hash': vote_hash_bytes.hex(),
-            'encryption_info': {
-                'method': 'Paillier',
+        method = election_obj.get_cryptosystem_display()
+        if election_obj.uses_paillier:
+            encryption_info = {
+                'method': method,
                 'public_key_n': str(public_key[0]),
                 'public_key_g': str(public_key[1])
             }
-        })
+        else:
+            encryption_info = {'method': method, 'public_key_point': election_obj.public_key_point}
+        vote.refresh_from_db()
+        receipt = submission.submission_receipt(vote)
+        receipt['status_url'] = request.build_absolute_uri(
+            reverse('vote_submission_status', args=[vote.vote_hash])
+        )
+        return Response({
+            'message': f'Vote accepted with {method} encryption and queued for the blockchain',
+            'vote_hash': vote_hash_hexstr,
+            'receipt': receipt,
+            'encryption_info': encryption_info
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
         return Response(
@@ -421,15 +465,33 @@ def cast_vote(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def vote_submission_status(request, vote_hash):
+    """
+    Report where a cast vote is in the blockchain submission pipeline.
+
+    Only the voter who cast it and staff can see a vote's receipt.
+    """
+    vote_hash = vote_hash[2:] if vote_hash.startswith('0x') else vote_hash
+    vote = Vote.objects.filter(vote_hash=vote_hash).first()
+    if vote is None or not (request.user.is_staff or vote.voter_id == request.user.id):
+        return Response({'error': 'Vote not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(submission.submission_receipt(vote))
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def verify_vote(request, vote_hash):
     """
     Verify a vote on the blockchain using its hash.
+    
+    Votes of Merkle-anchored elections are checked with their inclusion proof.
     """
     try:
         blockchain = BlockchainService()
-        vote_info = blockchain.verify_vote(vote_hash)
+        vote = Vote.objects.filter(vote_hash=vote_hash[2:] if vote_hash.startswith('0x') else vote_hash).first()
+        inclusion_proof = vote.get_inclusion_proof() if vote is not None else None
+        vote_info = blockchain.verify_vote(vote_hash, inclusion_proof=inclusion_proof)
         
         if not vote_info:
             return Response(
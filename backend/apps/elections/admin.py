@@ -1,9 +1,7 @@
 from django.contrib import admin, messages
-from .models import Election, Candidate, Vote, ElectionResult, ElectionAuditLog
+from .models import Election, Candidate, Vote, ElectionResult, ElectionAuditLog, VoteAnchor
 from .blockchain import BlockchainService
-from apps.encryption.paillier import PaillierEncryption
-from functools import reduce
-import json
+from .tally import ShardedTally, StreamingTally
 
 @admin.action(description="Decrypt and tally votes for selected elections")
 def decrypt_tally(modeladmin, request, queryset):
@@ -13,112 +11,81 @@ def decrypt_tally(modeladmin, request, queryset):
             messages.warning(request, f"No votes for {election.title}")
             continue
 
-        # Use the election's stored key if available, else generate (for demo)
-        if election.public_key_n and election.public_key_g and election.private_key_lambda and election.private_key_mu:
-            public_key = (int(election.public_key_n), int(election.public_key_g))
-            private_key = (int(election.private_key_lambda), int(election.private_key_mu))
-            key_pair = type('KeyPair', (), {})()
-            key_pair.public_key = public_key
-            key_pair.private_key = private_key
-            key_pair.lambda_val = private_key[0]
-            key_pair.mu = private_key[1]
-            # Provide n and g for compatibility
-            key_pair.n = public_key[0]
-            key_pair.g = public_key[1]
-            paillier = PaillierEncryption(key_size=512)
-        else:
-            paillier = PaillierEncryption(key_size=512)
-            key_pair = paillier.generate_key_pair()
+        # Use the election's stored key if available, else generate (for demo).
+        # Keys stored with their prime factors decrypt via the CRT path.
+        paillier = election.get_encryption()
+        key_pair = election.get_key_pair() if election.has_private_key else paillier.generate_key_pair()
 
-        candidate_results = {}
-        total_votes = 0
-        candidates = election.get_candidates()
-        print(f"[DEBUG] Candidates for election '{election.title}': {[c.id for c in candidates]}")
-        for candidate in candidates:
-            print(f"[DEBUG] Processing candidate: {candidate.id} ({candidate.name})")
-            # Collect encrypted votes for this candidate
-            candidate_votes = []
-            for v in votes:
-                try:
-                    enc_data = v.encrypted_vote_data
-                    if enc_data.startswith('{'):
-                        enc_json = json.loads(enc_data)
-                        vote_cid = enc_json.get('candidate_id')
-                        print(f"[DEBUG] Vote {v.id} candidate_id: {vote_cid}")
-                        # Robust comparison: compare as strings and ints
-                        if str(vote_cid) == str(candidate.id) or int(vote_cid) == int(candidate.id):
-                            enc = enc_json.get('encrypted_vote')
-                            if isinstance(enc, str):
-                                if enc.startswith('0x'):
-                                    enc = int(enc, 16)
-                                else:
-                                    enc = int(enc)
-                            candidate_votes.append(enc)
-                    # If not JSON, skip (legacy or invalid)
-                except Exception as e:
-                    print(f"[DEBUG] Error processing vote {v.id}: {e}")
-                    continue
-            print(f"[DEBUG] Found {len(candidate_votes)} votes for candidate {candidate.id}")
-            if candidate_votes:
-                n = key_pair.public_key[0]
-                n_squared = n ** 2
-                aggregated_ciphertext = reduce(lambda x, y: (x * y) % n_squared, candidate_votes)
-                if isinstance(aggregated_ciphertext, str):
-                    if aggregated_ciphertext.startswith('0x'):
-                        aggregated_ciphertext = int(aggregated_ciphertext, 16)
-                    else:
-                        aggregated_ciphertext = int(aggregated_ciphertext)
-                try:
-                    tally = paillier.decrypt(aggregated_ciphertext, key_pair)
-                except Exception as e:
-                    messages.error(request, f"Decryption failed for {candidate.name}: {e}")
-                    tally = 0
+        try:
+            if election.tally_shards.exists():
+                # Running tally: fold the stragglers, combine the shards, decrypt.
+                # publish() stores the encrypted and decrypted results itself.
+                tally = ShardedTally(election)
+                candidate_results, total_votes = tally.publish(key_pair=key_pair, paillier=paillier)
             else:
-                tally = 0
-            candidate_results[str(candidate.id)] = tally
-            total_votes += tally
+                # Single pass over the votes: each ciphertext is parsed once and routed
+                # to its candidate's accumulator, then each accumulator is decrypted once
+                tally = StreamingTally(election, key_pair=key_pair, paillier=paillier)
+                candidate_results, total_votes = tally.run()
+                ElectionResult.objects.update_or_create(
+                    election=election,
+                    defaults={
+                        'encrypted_candidate_votes': tally.stored_totals(),
+                        'candidate_results': candidate_results,
+                        'total_votes': total_votes
+                    }
+                )
+        except Exception as e:
+            messages.error(request, f"Decryption failed for {election.title}: {e}")
+            continue
+        for vote_id, error in tally.errors:
+            print(f"[DEBUG] Error processing vote {vote_id}: {error}")
         print(f"[DEBUG] Final candidate_results: {candidate_results}")
         print(f"[DEBUG] Final total_votes: {total_votes}")
-        # Save to ElectionResult model
-        from apps.elections.models import ElectionResult
-        ElectionResult.objects.update_or_create(
-            election=election,
-            defaults={
-                'candidate_results': candidate_results,
-                'total_votes': total_votes
-            }
-        )
         messages.success(request, f"Tally for {election.title} complete. Total votes: {total_votes}")
 
 @admin.action(description="Deploy selected elections to the blockchain")
 def deploy_on_chain(modeladmin, request, queryset):
     blockchain = BlockchainService()
+    # Send every createElection back-to-back, then wait for the receipts together
+    sent = []
     for election in queryset:
-        # Generate and store Paillier key pair if not already set
-        if not (election.public_key_n and election.public_key_g and election.private_key_lambda and election.private_key_mu):
-            paillier = PaillierEncryption(key_size=512)
-            key_pair = paillier.generate_key_pair()
-            election.public_key_n = key_pair.public_key[0]
-            election.public_key_g = key_pair.public_key[1]
-            election.private_key_lambda = key_pair.lambda_val
-            election.private_key_mu = key_pair.mu
+        # Take a Paillier key pair from the pool if not already set
+        if not election.has_private_key:
+            election.ensure_key_pair()
             election.save()
         success, tx_hash = blockchain.create_election(
             str(election.id),
             election.title,
             election.start_date,
-            election.end_date
+            election.end_date,
+            wait=False
         )
         if success:
-            messages.success(request, f"Election '{election.title}' deployed! TX: {tx_hash}")
+            sent.append((election, tx_hash))
         else:
             messages.error(request, f"Failed to deploy '{election.title}': {tx_hash}")
 
+    try:
+        receipts = blockchain.wait_for_receipts([tx_hash for _, tx_hash in sent])
+    except TimeoutError as e:
+        messages.warning(request, f"Some deployments are still pending: {e}")
+        return
+    for election, tx_hash in sent:
+        receipt = receipts[tx_hash]
+        if receipt['status']:
+            messages.success(request, f"Election '{election.title}' deployed! TX: {receipt['transaction_hash']}")
+        else:
+            messages.error(request, f"Failed to deploy '{election.title}': transaction {receipt['transaction_hash']} reverted")
+
 class ElectionAdmin(admin.ModelAdmin):
     list_display = ('title', 'status', 'start_date', 'end_date', 'is_public')
     actions = [decrypt_tally, deploy_on_chain]
 
     def save_model(self, request, obj, form, change):
+        if not change:
+            # Pooled keys make creation constant time instead of a prime search
+            obj.ensure_key_pair()
         super().save_model(request, obj, form, change)
         if not change:  # Only log creation, not edits
             try:
@@ -220,7 +187,8 @@ class VoteAdmin(admin.ModelAdmin):
     list_filter = ('election', 'is_valid', 'face_verified', 'fingerprint_verified', 'two_fa_verified', 'created_at')
     search_fields = ('election__title', 'voter__username', 'vote_hash', 'blockchain_tx_hash')
     readonly_fields = ('created_at', 'confirmed_at', 'vote_hash', 'encrypted_vote_data', 
-                      'blockchain_tx_hash', 'blockchain_block_number', 'validation_errors', 
+                      'blockchain_tx_hash', 'blockchain_block_number', 'anchor', 'anchor_leaf_index',
+                      'validation_errors', 
                       'face_verified', 'fingerprint_verified', 'two_fa_verified', 
                       'ip_address', 'user_agent', 'audit_data')
     actions = ['view_vote_integrity']
@@ -247,7 +215,7 @@ class VoteAdmin(admin.ModelAdmin):
             'description': '⚠️ CRITICAL: Encrypted vote data is immutable for voting integrity. Admins can view but cannot modify to maintain election security.'
         }),
         ('Blockchain Integration', {
-            'fields': ('blockchain_tx_hash', 'blockchain_block_number'),
+            'fields': ('blockchain_tx_hash', 'blockchain_block_number', 'anchor', 'anchor_leaf_index'),
             'classes': ('collapse',),
             'description': 'Blockchain transaction data (immutable)'
         }),
@@ -347,6 +315,22 @@ class ElectionResultAdmin(admin.ModelAdmin):
             del actions['delete_selected']
         return actions
 
+@admin.register(VoteAnchor)
+class VoteAnchorAdmin(admin.ModelAdmin):
+    list_display = ('election', 'merkle_root', 'leaf_count', 'status', 'blockchain_block_number', 'created_at')
+    list_filter = ('status', 'election')
+    search_fields = ('election__title', 'merkle_root', 'blockchain_tx_hash')
+    readonly_fields = ('election', 'merkle_root', 'leaf_count', 'status', 'blockchain_tx_hash',
+                      'blockchain_block_number', 'error', 'created_at', 'anchored_at')
+    
+    def has_add_permission(self, request):
+        """Anchors are created by the anchoring job only"""
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Prevent deleting anchors, which proofs of their votes depend on"""
+        return False
+
 @admin.register(ElectionAuditLog)
 class ElectionAuditLogAdmin(admin.ModelAdmin):
     form = ElectionAuditLogForm
@@ -0,0 +1,248 @@
+"""
+Merkle-Root Vote Anchoring
+
+This module provides:
+- A periodic job that commits an election's newly accepted ballots on chain
+  by the root of a Merkle tree over their vote hashes, one anchorVoteRoot
+  transaction per batch
+- Confirmation of anchored batches, which confirms every vote in them
+- Inclusion proofs voters can check against an anchored root
+
+Elections with chain_anchoring 'merkle_root' keep their ciphertexts in the
+database only. Instead of one castVote transaction per ballot, each batch
+costs a single transaction with a fixed-size payload (root and vote count),
+so on-chain cost and block space no longer grow with turnout. A voter's
+receipt carries the proof linking their vote hash to the root, and
+BlockchainService.verify_vote checks it locally before asking the chain
+only whether that root was anchored.
+
+Votes reuse the submission statuses of apps.elections.submission: a vote
+stays 'pending' while its batch is claimed but not yet sent, is
+'submitted' while the batch's transaction is unmined and 'confirmed' once
+it is mined. Votes of a batch that fails go back to 'pending' with
+the usual backoff and join a later batch.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .submission import (
+    CONFIRMED, DEFAULT_CONFIRMATION_TIMEOUT, IN_FLIGHT, PENDING, SAVE_FIELDS, SUBMITTED,
+    _schedule_retry, _setting, get_blockchain_service,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_LEAVES = 10000
+ANCHOR_FIELDS = SAVE_FIELDS + ['anchor', 'anchor_leaf_index']
+
+def anchoring_settings() -> dict:
+    """Read VOTE_ANCHORING from settings"""
+    from django.conf import settings
+    return dict(getattr(settings, 'VOTE_ANCHORING', {}) or {})
+
+def claim_pending_votes(election, max_leaves: Optional[int] = None):
+    """
+    Claim an election's due pending votes for a new batch
+
+    The batch's VoteAnchor is stored as 'pending' together with each vote's
+    leaf position before anything is sent, so a root that reaches the chain
+    always has a row, and claimed votes are never put in a second batch.
+
+    Args:
+        election: Election using Merkle-root anchoring
+        max_leaves: Most votes per batch (defaults to VOTE_ANCHORING['MAX_LEAVES'])
+
+    Returns:
+        The pending VoteAnchor, or None if no vote was due
+    """
+    from .merkle import MerkleTree
+    from .models import Vote, VoteAnchor
+
+    max_leaves = max_leaves or anchoring_settings().get('MAX_LEAVES', DEFAULT_MAX_LEAVES)
+    with transaction.atomic():
+        now = timezone.now()
+        votes = list(
+            Vote.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(election=election, submission_status=PENDING, anchor__isnull=True)
+            .filter(Q(next_submission_at__isnull=True) | Q(next_submission_at__lte=now))
+            .order_by('id')[:max_leaves]
+        )
+        if not votes:
+            return None
+        tree = MerkleTree(vote.vote_hash for vote in votes)
+        anchor = VoteAnchor.objects.create(
+            election=election,
+            merkle_root=tree.root.hex(),
+            leaf_count=len(votes),
+            status='pending',
+        )
+        for index, vote in enumerate(votes):
+            vote.anchor = anchor
+            vote.anchor_leaf_index = index
+        Vote.objects.bulk_update(votes, ['anchor', 'anchor_leaf_index'])
+    return anchor
+
+def _record_sent(anchor, tx_hash: str, now):
+    """Store a claimed batch's transaction and mark its votes submitted"""
+    with transaction.atomic():
+        anchor.status = 'submitted'
+        anchor.blockchain_tx_hash = tx_hash
+        anchor.save(update_fields=['status', 'blockchain_tx_hash'])
+        anchor.votes.filter(submission_status=PENDING).update(
+            submission_status=SUBMITTED,
+            submission_error='',
+            blockchain_tx_hash=tx_hash,
+            submitted_at=now,
+            # The anchoring job confirms the whole batch; no per-vote polling
+            next_submission_at=None,
+        )
+
+def anchor_pending_votes(election, service=None, max_leaves: Optional[int] = None):
+    """
+    Commit an election's due pending votes on chain under one Merkle root
+
+    The votes are claimed in one transaction and the root is sent after it
+    commits, so no row lock is held during the RPC. If recording the sent
+    transaction fails, the batch stays claimed as 'pending';
+    confirm_anchors later settles it from the chain instead of anchoring
+    the votes again.
+
+    Args:
+        election: Election using Merkle-root anchoring
+        service: Chain client (defaults to get_blockchain_service())
+        max_leaves: Most votes per batch (defaults to VOTE_ANCHORING['MAX_LEAVES'])
+
+    Returns:
+        VoteAnchor sent, or None if no vote was due or the batch could not be sent or recorded
+    """
+    anchor = claim_pending_votes(election, max_leaves)
+    if anchor is None:
+        return None
+
+    service = service or get_blockchain_service()
+    try:
+        success, result = service.anchor_vote_root(
+            str(election.id), bytes.fromhex(anchor.merkle_root), anchor.leaf_count
+        )
+    except Exception as e:
+        success, result = False, str(e)
+    if not success:
+        logger.warning("Anchoring %s votes of election %s failed: %s", anchor.leaf_count, election.id, result)
+        with transaction.atomic():
+            _fail_anchor(anchor, result, timezone.now())
+        return None
+
+    try:
+        _record_sent(anchor, result, timezone.now())
+    except Exception:
+        logger.exception("Could not record anchoring transaction %s of batch %s; it is settled from the chain "
+                         "once CONFIRMATION_TIMEOUT passes", result, anchor.id)
+        return None
+    return anchor
+
+def _fail_anchor(anchor, error: str, now):
+    """Mark a batch failed and send its votes back to the queue for a later batch"""
+    anchor.status = 'failed'
+    anchor.error = error
+    anchor.save(update_fields=['status', 'error'])
+    for vote in anchor.votes.all():
+        vote.anchor = None
+        vote.anchor_leaf_index = None
+        _schedule_retry(vote, error, now)
+        vote.save(update_fields=ANCHOR_FIELDS)
+
+def _confirm_anchor(anchor, block_number, now):
+    """Mark a batch anchored and confirm its votes"""
+    anchor.status = 'confirmed'
+    anchor.blockchain_block_number = block_number
+    anchor.anchored_at = now
+    anchor.save(update_fields=['status', 'blockchain_block_number', 'anchored_at'])
+    anchor.votes.filter(submission_status__in=IN_FLIGHT).update(
+        submission_status=CONFIRMED,
+        submission_error='',
+        blockchain_block_number=block_number,
+        next_submission_at=None,
+        confirmed_at=now,
+    )
+
+def confirm_anchors(election=None, service=None) -> Dict[str, int]:
+    """
+    Poll the transactions of sent batches and settle them
+
+    A batch still 'pending' after CONFIRMATION_TIMEOUT was never recorded
+    as sent: it is confirmed if its root is anchored on chain and failed
+    otherwise. A reverted batch whose root is anchored anyway (an earlier
+    send of the same root landed first) is confirmed too.
+
+    Args:
+        election: Limit to one election (defaults to every election)
+        service: Chain client (defaults to one built on first use)
+
+    Returns:
+        Dict counting the resulting batch statuses
+    """
+    from .models import VoteAnchor
+
+    anchors = VoteAnchor.objects.filter(status__in=('pending', 'submitted'))
+    if election is not None:
+        anchors = anchors.filter(election=election)
+    timeout = timedelta(seconds=_setting('CONFIRMATION_TIMEOUT', DEFAULT_CONFIRMATION_TIMEOUT))
+    counts: Dict[str, int] = {}
+    for anchor in anchors.order_by('id'):
+        now = timezone.now()
+        if anchor.status == 'pending' and now - anchor.created_at <= timeout:
+            # Still being sent
+            continue
+        service = service or get_blockchain_service()
+        receipt = None
+        if anchor.status == 'submitted':
+            receipt = service.get_transaction_receipt(anchor.blockchain_tx_hash)
+            if receipt is None and now - anchor.created_at <= timeout:
+                continue
+        with transaction.atomic():
+            if receipt is not None and receipt['status']:
+                _confirm_anchor(anchor, receipt['block_number'], now)
+            elif service.get_anchored_root(anchor.merkle_root):
+                _confirm_anchor(anchor, receipt['block_number'] if receipt else None, now)
+            elif receipt is not None:
+                _fail_anchor(anchor, "Transaction reverted", now)
+            elif anchor.status == 'pending':
+                _fail_anchor(anchor, "Anchoring transaction was not recorded", now)
+            else:
+                _fail_anchor(anchor, "Transaction was not mined in time", now)
+        counts[anchor.status] = counts.get(anchor.status, 0) + 1
+    return counts
+
+def run_anchoring(election_ids=None, service=None) -> Dict[str, int]:
+    """
+    Run one anchoring pass: settle submitted batches, then anchor each election's due votes
+
+    Args:
+        election_ids: Limit to these elections (defaults to every Merkle-anchored election)
+        service: Chain client (defaults to one built on first use)
+
+    Returns:
+        Dict with the batches confirmed and failed, and the batches and votes anchored
+    """
+    from .models import Election
+
+    elections = Election.objects.filter(chain_anchoring='merkle_root')
+    if election_ids is not None:
+        elections = elections.filter(id__in=election_ids)
+
+    summary = {'confirmed': 0, 'failed': 0, 'anchored': 0, 'votes': 0}
+    for election in elections:
+        counts = confirm_anchors(election, service)
+        summary['confirmed'] += counts.get('confirmed', 0)
+        summary['failed'] += counts.get('failed', 0)
+        anchor = anchor_pending_votes(election, service)
+        if anchor is not None:
+            summary['anchored'] += 1
+            summary['votes'] += anchor.leaf_count
+    return summary
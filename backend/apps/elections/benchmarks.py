@@ -0,0 +1,155 @@
+"""
+Benchmarks for Getting Votes on Chain
+
+This module provides:
+- Merkle tree timings for one anchoring batch: building the tree, producing
+  every voter's proof and checking a proof
+- A gas and latency comparison of the three ways a batch of ballots can
+  reach the VotingContract: one castVote per ballot, relayed castVotesBatch
+  transactions, and a single anchorVoteRoot over their Merkle root
+
+The chain comparison deploys the contract on an in-memory eth-tester chain
+and needs the optional eth-tester and py-solc-x packages. eth-tester mines
+every transaction immediately, so its latencies measure node-side
+execution only; on a real network each of the N castVote transactions also
+waits for block space, while an anchored batch needs one.
+"""
+
+import os
+import secrets
+import time
+from typing import Dict
+
+from apps.encryption.benchmarks import time_operation
+from .merkle import MerkleTree, verify_inclusion
+
+SOLC_VERSION = '0.8.0'
+
+def benchmark_merkle(batch_size: int = 1000, iterations: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Time the Merkle work of one anchoring batch
+
+    Args:
+        batch_size: Vote hashes in the batch
+        iterations: Runs per measurement
+
+    Returns:
+        Dict of timing results for 'build' (the whole tree), 'prove_all'
+        (every leaf's proof) and 'verify' (one proof)
+    """
+    vote_hashes = [secrets.token_bytes(32) for _ in range(batch_size)]
+    tree = MerkleTree(vote_hashes)
+    index = batch_size // 2
+    proof = tree.proof(index)
+    results = {
+        'build': time_operation(lambda: MerkleTree(vote_hashes), iterations),
+        'prove_all': time_operation(lambda: [tree.proof(i) for i in range(batch_size)], iterations),
+        'verify': time_operation(lambda: verify_inclusion(vote_hashes[index], proof, tree.root), iterations),
+    }
+    results['verify']['proof_length'] = len(proof)
+    return results
+
+def _deploy_contract(w3, election_id: str):
+    import solcx
+
+    source_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'truffle', 'contracts', 'VotingContract.sol')
+    solcx.install_solc(SOLC_VERSION)
+    compiled = solcx.compile_files([os.path.normpath(source_path)], output_values=['abi', 'bin'],
+                                   solc_version=SOLC_VERSION)
+    interface = next(v for k, v in compiled.items() if k.endswith(':VotingContract'))
+    tx_hash = w3.eth.contract(abi=interface['abi'], bytecode=interface['bin']).constructor().transact()
+    contract = w3.eth.contract(address=w3.eth.get_transaction_receipt(tx_hash)['contractAddress'],
+                               abi=interface['abi'])
+    now = w3.eth.get_block('latest')['timestamp']
+    contract.functions.createElection(election_id, 'Benchmark', now + 5, now + 86400).transact()
+    w3.testing.timeTravel(now + 10)
+    return contract
+
+def _measure(w3, send) -> Dict[str, float]:
+    """Send a mode's transactions, wait for every receipt and total their gas"""
+    start = time.perf_counter()
+    tx_hashes = send()
+    receipts = [w3.eth.wait_for_transaction_receipt(tx_hash) for tx_hash in tx_hashes]
+    seconds = time.perf_counter() - start
+    if not all(receipt['status'] for receipt in receipts):
+        raise RuntimeError("A benchmark transaction reverted")
+    return {
+        'transactions': len(receipts),
+        'total_gas': sum(receipt['gasUsed'] for receipt in receipts),
+        'seconds': seconds,
+    }
+
+def compare_chain_anchoring(votes: int = 50, ciphertext_bytes: int = 512,
+                            relay_batch_size: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    Compare the gas and latency of getting a batch of ballots on chain
+
+    Each mode records its own fresh ballots in the same election.
+
+    Args:
+        votes: Ballots per mode
+        ciphertext_bytes: Ciphertext size per ballot (512 for 2048-bit Paillier)
+        relay_batch_size: Ballots per castVotesBatch transaction
+
+    Returns:
+        Dict keyed by 'castVote', 'castVotesBatch' and 'anchorVoteRoot' with
+        transactions, total_gas, gas_per_vote, seconds and ms_per_vote
+
+    Raises:
+        ImportError: If eth-tester or py-solc-x is not installed
+    """
+    try:
+        import eth_tester  # noqa: F401
+        import solcx  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The chain benchmark needs the eth-tester and py-solc-x packages") from e
+    from web3 import EthereumTesterProvider, Web3
+    from .relayer import sign_ballot
+
+    w3 = Web3(EthereumTesterProvider())
+    w3.eth.default_account = w3.eth.accounts[0]
+    election_id = 'benchmark'
+    contract = _deploy_contract(w3, election_id)
+
+    def ballots(count):
+        return [(w3.eth.account.create(), secrets.token_bytes(ciphertext_bytes), secrets.token_bytes(32))
+                for _ in range(count)]
+
+    # castVote is sent by each voter, so every voter account is unlocked and funded first
+    direct = ballots(votes)
+    for account, _, _ in direct:
+        w3.provider.ethereum_tester.add_account(account.key.hex())
+        w3.eth.send_transaction({'to': account.address, 'value': Web3.to_wei(1, 'ether')})
+
+    def send_direct():
+        return [
+            contract.functions.castVote(election_id, ciphertext, vote_hash).transact({'from': account.address})
+            for account, ciphertext, vote_hash in direct
+        ]
+
+    relayed = [sign_ballot(account.key, contract.address, election_id, ciphertext, vote_hash)
+               for account, ciphertext, vote_hash in ballots(votes)]
+
+    def send_relayed():
+        return [
+            contract.functions.castVotesBatch(
+                election_id, [b.as_tuple() for b in relayed[start:start + relay_batch_size]]
+            ).transact()
+            for start in range(0, len(relayed), relay_batch_size)
+        ]
+
+    anchored = [vote_hash for _, _, vote_hash in ballots(votes)]
+
+    def send_anchor():
+        root = MerkleTree(anchored).root
+        return [contract.functions.anchorVoteRoot(election_id, root, len(anchored)).transact()]
+
+    results = {
+        'castVote': _measure(w3, send_direct),
+        'castVotesBatch': _measure(w3, send_relayed),
+        'anchorVoteRoot': _measure(w3, send_anchor),
+    }
+    for result in results.values():
+        result['gas_per_vote'] = result['total_gas'] / votes
+        result['ms_per_vote'] = result['seconds'] * 1000 / votes
+    return results
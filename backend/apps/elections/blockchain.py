@@ -1,9 +1,18 @@
 import json
 import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3.logs import DISCARD
 from django.conf import settings
 from datetime import datetime
 from django.contrib.auth import get_user_model
+from .merkle import verify_inclusion
+from .nonces import DEFAULT_GAS_BUMP, DEFAULT_STUCK_AFTER, NonceManager
+from .relayer import DEFAULT_MAX_BATCH_AGE, DEFAULT_MAX_BATCH_SIZE, VoteBatcher
 User = get_user_model()
 
 def get_private_key_for_user(address):
@@ -13,66 +22,177 @@ def get_private_key_for_user(address):
     except User.DoesNotExist:
         raise Exception(f"No user found with blockchain address {address}")
 
-class BlockchainService:
-    def __init__(self):
-        # Connect to local Ganache instance
-        self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:7545'))
-        
-        # Load contract ABI and address
-        contract_path = os.path.join(settings.BASE_DIR, '..', 'truffle', 'build', 'contracts', 'VotingContract.json')
+def blockchain_settings():
+    """Read BLOCKCHAIN from settings"""
+    return dict(getattr(settings, 'BLOCKCHAIN', {}) or {})
+
+def contract_build_path():
+    """Path of the Truffle build artifact holding the contract ABI and addresses"""
+    return blockchain_settings().get('CONTRACT_PATH') or os.path.join(
+        settings.BASE_DIR, '..', 'truffle', 'build', 'contracts', 'VotingContract.json'
+    )
+
+class BlockchainClient:
+    """Web3 connection, contract and admin account shared by every BlockchainService in a process"""
+
+    def __init__(self, provider_url, contract_path, network_id, pool_size=10, timeout=30,
+                 stuck_after=DEFAULT_STUCK_AFTER, gas_bump=DEFAULT_GAS_BUMP):
+        """
+        Connect to the node and load the contract
+
+        Args:
+            provider_url: JSON-RPC endpoint
+            contract_path: Truffle build artifact with the ABI and deployed addresses
+            network_id: Network whose deployed address is used
+            pool_size: Keep-alive connections kept open to the node
+            timeout: Seconds before an RPC request is abandoned
+            stuck_after: Seconds before an unmined transaction is replaced
+            gas_bump: Gas price multiplier for replacement transactions
+        """
+        # One keep-alive session per client, so votes reuse open connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.w3 = Web3(Web3.HTTPProvider(provider_url, request_kwargs={'timeout': timeout}, session=self.session))
+
+        self.contract_path = contract_path
+        self.contract_mtime = os.stat(contract_path).st_mtime_ns
         print(f"DEBUG: Contract path = {contract_path}")
-        print(f"DEBUG: Contract file exists = {os.path.exists(contract_path)}")
-        
         with open(contract_path) as f:
             contract_json = json.load(f)
             self.contract_abi = contract_json['abi']
-            self.contract_address = contract_json['networks']['5777']['address']
+            self.contract_address = contract_json['networks'][str(network_id)]['address']
             print(f"DEBUG: Contract address = {self.contract_address}")
-        
-        # Initialize contract
-        self.contract = self.w3.eth.contract(
-            address=self.contract_address,
-            abi=self.contract_abi
-        )
-        
+
+        self.contract = self.w3.eth.contract(address=self.contract_address, abi=self.contract_abi)
+
         # Set admin account from ADMIN_PRIVATE_KEY using from_key
-        self.admin_account = Web3().eth.account.from_key(settings.ADMIN_PRIVATE_KEY).address
+        self.admin_account = self.w3.eth.account.from_key(settings.ADMIN_PRIVATE_KEY).address
         print(f"DEBUG: Admin account = {self.admin_account}")
-        
-    def create_election(self, election_id, title, start_time, end_time):
-        """Create a new election on the blockchain."""
+
+        # Nonces are allocated locally so one account can send without waiting for each receipt
+        self.nonces = NonceManager(self.w3, stuck_after=stuck_after, gas_bump=gas_bump)
+
+    def is_stale(self):
+        """Whether the build artifact changed (e.g. a redeploy) since it was loaded"""
+        try:
+            return os.stat(self.contract_path).st_mtime_ns != self.contract_mtime
+        except OSError:
+            return False
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_blockchain_client(reload=False):
+    """
+    Get the process-wide client, creating it on first use
+
+    The build artifact is only stat()ed on later calls and is parsed again
+    when it changes (unless BLOCKCHAIN['RELOAD_ON_CHANGE'] is False).
+
+    Args:
+        reload: Build a new client even if the artifact is unchanged
+
+    Returns:
+        BlockchainClient: Shared client
+    """
+    global _client
+    config = blockchain_settings()
+    with _client_lock:
+        if (_client is None or reload
+                or (config.get('RELOAD_ON_CHANGE', True) and _client.is_stale())):
+            _client = BlockchainClient(
+                config.get('PROVIDER_URL', 'http://127.0.0.1:7545'),
+                contract_build_path(),
+                config.get('NETWORK_ID', '5777'),
+                pool_size=config.get('POOL_SIZE', 10),
+                timeout=config.get('REQUEST_TIMEOUT', 30),
+                stuck_after=config.get('STUCK_TRANSACTION_TIMEOUT', DEFAULT_STUCK_AFTER),
+                gas_bump=config.get('REPLACEMENT_GAS_BUMP', DEFAULT_GAS_BUMP),
+            )
+        return _client
+
+def reset_blockchain_client():
+    """Drop the shared client so the next use reconnects and reloads the contract"""
+    global _client
+    with _client_lock:
+        _client = None
+
+class BlockchainService:
+    def __init__(self, client=None):
+        # The connection, ABI and contract are built once per process and shared
+        self.client = client or get_blockchain_client()
+        self.w3 = self.client.w3
+        self.contract_abi = self.client.contract_abi
+        self.contract_address = self.client.contract_address
+        self.contract = self.client.contract
+        self.admin_account = self.client.admin_account
+        self.nonces = self.client.nonces
+
+    def send_transaction(self, function_call, sender, private_key, gas=None):
+        """Build, sign and send a contract call with a locally allocated nonce, without waiting for it to be mined."""
+        tx = function_call.build_transaction({
+            'from': sender,
+            'gas': gas or blockchain_settings().get('GAS_LIMIT', 2000000),
+        })
+        return self.nonces.send(sender, tx, private_key)
+
+    def wait_for_receipts(self, tx_hashes, timeout=120, poll_interval=0.5):
+        """
+        Wait until every transaction is mined, replacing stuck ones along the way.
+
+        Returns a dict mapping each given hash to its receipt's status, block
+        number and final transaction hash (which differs if it was replaced).
+        Raises TimeoutError if some are still unmined after timeout seconds.
+        """
+        waiting = list(tx_hashes)
+        receipts = {}
+        deadline = time.monotonic() + timeout
+        while True:
+            for tx_hash in list(waiting):
+                receipt = self.get_transaction_receipt(tx_hash)
+                if receipt is not None:
+                    receipt['transaction_hash'] = self.nonces.current_hash(tx_hash)
+                    self.nonces.mark_mined(tx_hash)
+                    receipts[tx_hash] = receipt
+                    waiting.remove(tx_hash)
+            if not waiting:
+                return receipts
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(waiting)} transactions were not mined within {timeout}s")
+            self.nonces.replace_stuck()
+            time.sleep(poll_interval)
+
+    def _wait_for_receipt(self, tx_hash):
+        receipt = self.wait_for_receipts([tx_hash])[tx_hash]
+        if not receipt['status']:
+            raise Exception(f"Transaction {receipt['transaction_hash']} reverted")
+        return receipt['transaction_hash']
+
+    def create_election(self, election_id, title, start_time, end_time, wait=True):
+        """Create a new election on the blockchain (wait=False returns as soon as it is sent)."""
         try:
             # Convert datetime to Unix timestamp
             start_timestamp = int(start_time.timestamp())
             end_timestamp = int(end_time.timestamp())
             
-            # Build transaction
-            tx = self.contract.functions.createElection(
-                election_id,
-                title,
-                start_timestamp,
-                end_timestamp
-            ).build_transaction({
-                'from': self.admin_account,
-                'gas': 2000000,
-                'nonce': self.w3.eth.get_transaction_count(self.admin_account)
-            })
-            
-            # Sign and send transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=settings.ADMIN_PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            
-            # Wait for transaction receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            return True, receipt.transactionHash.hex()
+            tx_hash = self.send_transaction(
+                self.contract.functions.createElection(election_id, title, start_timestamp, end_timestamp),
+                self.admin_account,
+                settings.ADMIN_PRIVATE_KEY,
+            )
+            if not wait:
+                return True, tx_hash
+            return True, self._wait_for_receipt(tx_hash)
             
         except Exception as e:
             return False, str(e)
     
-    def cast_vote(self, election_id, voter_address, encrypted_vote, vote_hash):
-        """Cast a vote in an election."""
+    def submit_vote(self, election_id, voter_address, encrypted_vote, vote_hash):
+        """Sign and send a castVote transaction without waiting for it to be mined."""
         try:
-            print(f"DEBUG: cast_vote called with:")
+            print(f"DEBUG: submit_vote called with:")
             print(f"  election_id = {election_id} (type: {type(election_id)})")
             print(f"  voter_address = {voter_address} (type: {type(voter_address)})")
             print(f"  encrypted_vote = {encrypted_vote} (type: {type(encrypted_vote)})")
@@ -95,26 +215,108 @@ class BlockchainService:
             if has_voted:
                 return False, "Voter has already cast a vote in this election"
             
-            # Build transaction
-            tx = self.contract.functions.castVote(
-                election_id,
-                encrypted_vote_bytes,
-                vote_hash_bytes
-            ).build_transaction({
-                'from': voter_address,
-                'gas': 2000000,
-                'nonce': self.w3.eth.get_transaction_count(voter_address)
-            })
-            
             # Sign and send transaction with the voter's private key
-            private_key = get_private_key_for_user(voter_address)
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            
-            # Wait for transaction receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            return True, receipt.transactionHash.hex()
+            tx_hash = self.send_transaction(
+                self.contract.functions.castVote(election_id, encrypted_vote_bytes, vote_hash_bytes),
+                voter_address,
+                get_private_key_for_user(voter_address),
+            )
+            return True, tx_hash
             
+        except Exception as e:
+            print(f"DEBUG: submit_vote exception = {e}")
+            return False, str(e)
+    
+    def submit_vote_batch(self, election_id, ballots):
+        """Relay voter-signed ballots (relayer.RelayedBallot) in one castVotesBatch transaction from the admin account."""
+        try:
+            config = blockchain_settings()
+            gas = config.get('RELAY_BASE_GAS', 100000) + config.get('RELAY_GAS_PER_BALLOT', 120000) * len(ballots)
+            tx_hash = self.send_transaction(
+                self.contract.functions.castVotesBatch(str(election_id), [b.as_tuple() for b in ballots]),
+                self.admin_account,
+                settings.ADMIN_PRIVATE_KEY,
+                gas=gas,
+            )
+            return True, tx_hash
+        except Exception as e:
+            return False, str(e)
+
+    def get_batch_results(self, tx_hash):
+        """
+        Get a mined castVotesBatch transaction's per-ballot outcomes, or None while it is still pending.
+
+        Returns the receipt's status and block number plus 'ballots', mapping
+        each vote hash (hex, no 0x) to its outcome code (relayer.BALLOT_ACCEPTED
+        or a rejection reason code).
+        """
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(self.nonces.current_hash(tx_hash))
+        except TransactionNotFound:
+            return None
+        ballots = {}
+        if receipt['status']:
+            for event in self.contract.events.VoteCast().process_receipt(receipt, errors=DISCARD):
+                ballots[bytes(event['args']['voteHash']).hex()] = 0
+            for event in self.contract.events.VoteRejected().process_receipt(receipt, errors=DISCARD):
+                ballots[bytes(event['args']['voteHash']).hex()] = event['args']['reason']
+        return {'status': receipt['status'], 'block_number': receipt['blockNumber'], 'ballots': ballots}
+
+    def make_batcher(self, max_size=None, max_age=None, **kwargs):
+        """VoteBatcher that relays through this service (sizes default to VOTE_SUBMISSION RELAY_* settings)."""
+        config = getattr(settings, 'VOTE_SUBMISSION', {}) or {}
+        return VoteBatcher(
+            self.submit_vote_batch,
+            max_size=max_size or config.get('RELAY_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE),
+            max_age=config.get('RELAY_MAX_AGE', DEFAULT_MAX_BATCH_AGE) if max_age is None else max_age,
+            **kwargs
+        )
+
+    def anchor_vote_root(self, election_id, root, vote_count):
+        """Commit a batch of off-chain votes by its Merkle root (anchorVoteRoot) without waiting for it to be mined."""
+        try:
+            tx_hash = self.send_transaction(
+                self.contract.functions.anchorVoteRoot(str(election_id), bytes(root), vote_count),
+                self.admin_account,
+                settings.ADMIN_PRIVATE_KEY,
+            )
+            return True, tx_hash
+        except Exception as e:
+            return False, str(e)
+
+    def get_anchored_root(self, root):
+        """Get an anchored Merkle root's election, vote count, time and batch index, or None if it was never anchored."""
+        try:
+            if isinstance(root, str):
+                root = bytes.fromhex(root[2:] if root.startswith('0x') else root)
+            details = self.contract.functions.voteRoots(root).call()
+        except Exception as e:
+            return None
+        if not details[2]:
+            return None
+        return {
+            'election_id': details[0],
+            'vote_count': details[1],
+            'timestamp': datetime.fromtimestamp(details[2]),
+            'batch_index': details[3],
+        }
+
+    def get_transaction_receipt(self, tx_hash):
+        """Get a mined transaction's status and block number, or None while it is still pending."""
+        try:
+            # Follows replacements of stuck transactions sent by this process
+            receipt = self.w3.eth.get_transaction_receipt(self.nonces.current_hash(tx_hash))
+        except TransactionNotFound:
+            return None
+        return {'status': receipt['status'], 'block_number': receipt['blockNumber']}
+    
+    def cast_vote(self, election_id, voter_address, encrypted_vote, vote_hash):
+        """Cast a vote in an election and wait for it to be mined."""
+        success, tx_hash = self.submit_vote(election_id, voter_address, encrypted_vote, vote_hash)
+        if not success:
+            return False, tx_hash
+        try:
+            return True, self._wait_for_receipt(tx_hash)
         except Exception as e:
             print(f"DEBUG: cast_vote exception = {e}")
             return False, str(e)
@@ -135,8 +337,28 @@ class BlockchainService:
         except Exception as e:
             return None
     
-    def verify_vote(self, vote_hash):
-        """Verify a vote on the blockchain."""
+    def verify_vote(self, vote_hash, inclusion_proof=None):
+        """
+        Verify a vote on the blockchain.
+
+        Votes of Merkle-anchored elections are not stored on chain; pass their
+        inclusion proof ({'root', 'proof'}) to check it locally and confirm
+        only that the root is anchored.
+        """
+        if inclusion_proof is not None:
+            if not verify_inclusion(vote_hash, inclusion_proof['proof'], inclusion_proof['root']):
+                return None
+            anchored = self.get_anchored_root(inclusion_proof['root'])
+            if not anchored:
+                return None
+            return {
+                'election_id': anchored['election_id'],
+                'timestamp': anchored['timestamp'],
+                'voter': None,
+                'is_valid': True,
+                'merkle_root': inclusion_proof['root'],
+                'batch_index': anchored['batch_index'],
+            }
         try:
             details = self.contract.functions.getVote(vote_hash).call()
             return {
@@ -148,19 +370,15 @@ class BlockchainService:
         except Exception as e:
             return None
     
-    def end_election(self, election_id):
-        """End an election on the blockchain."""
+    def end_election(self, election_id, wait=True):
+        """End an election on the blockchain (wait=False returns as soon as it is sent)."""
         try:
-            tx = self.contract.functions.endElection(election_id).build_transaction({
-                'from': self.admin_account,
-                'gas': 2000000,
-                'nonce': self.w3.eth.get_transaction_count(self.admin_account)
-            })
-            
-            signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=settings.ADMIN_PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            return True, receipt.transactionHash.hex()
+            tx_hash = self.send_transaction(
+                self.contract.functions.endElection(election_id), self.admin_account, settings.ADMIN_PRIVATE_KEY
+            )
+            if not wait:
+                return True, tx_hash
+            return True, self._wait_for_receipt(tx_hash)
             
         except Exception as e:
             return False, str(e) 
\ No newline at end of file
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.elections.anchoring import anchoring_settings, run_anchoring
+
+class Command(BaseCommand):
+    help = 'Commit pending votes of Merkle-anchored elections on chain by Merkle root and confirm sent batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--election',
+            type=int,
+            action='append',
+            default=None,
+            help='Election ID to anchor (repeatable; defaults to every Merkle-anchored election)',
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Keep running, one pass every VOTE_ANCHORING INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        interval = anchoring_settings().get('INTERVAL', 60.0)
+        while True:
+            summary = run_anchoring(election_ids=options['election'])
+            self.stdout.write(
+                f"Anchored {summary['votes']} votes in {summary['anchored']} batches; "
+                f"confirmed {summary['confirmed']}, failed {summary['failed']} earlier batches"
+            )
+            if not options['watch']:
+                break
+            time.sleep(interval)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from apps.elections.benchmarks import benchmark_merkle, compare_chain_anchoring
+
+class Command(BaseCommand):
+    help = 'Compare per-vote castVote, relayed castVotesBatch and Merkle-root anchoring'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=50, help='Ballots per mode on the test chain')
+        parser.add_argument('--ciphertext-bytes', type=int, default=512, help='Ciphertext size per ballot')
+        parser.add_argument('--relay-batch-size', type=int, default=50, help='Ballots per castVotesBatch')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Vote hashes per Merkle tree')
+        parser.add_argument('--iterations', type=int, default=10, help='Runs per Merkle measurement')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Merkle tree over {options['batch_size']} vote hashes"))
+        for name, result in benchmark_merkle(options['batch_size'], options['iterations']).items():
+            self.stdout.write(f"  {name:<16} {result['mean_ms']:>10.3f} ms {result['p95_ms']:>10.3f} ms p95")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{options['votes']} ballots of {options['ciphertext_bytes']} bytes on the test chain"
+        ))
+        try:
+            results = compare_chain_anchoring(options['votes'], options['ciphertext_bytes'],
+                                              options['relay_batch_size'])
+        except ImportError as e:
+            self.stdout.write(self.style.WARNING(f"  Skipped: {e}"))
+            return
+        for name, result in results.items():
+            self.stdout.write(
+                f"  {name:<16} {result['transactions']:>5} txs {result['total_gas']:>12} gas "
+                f"{result['gas_per_vote']:>10.0f} gas/vote {result['ms_per_vote']:>8.3f} ms/vote"
+            )
@@ -0,0 +1,54 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.elections.models import Election
+
+class Command(BaseCommand):
+    help = "Split elections' private keys among trustees and publish Feldman commitments"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--election',
+            type=int,
+            action='append',
+            dest='election_ids',
+            required=True,
+            help='Election ID to deal (repeatable)',
+        )
+        parser.add_argument('--trustees', type=int, required=True, help='Total number of trustees')
+        parser.add_argument('--threshold', type=int, required=True, help='Trustees needed to reconstruct')
+        parser.add_argument(
+            '--output-dir',
+            required=True,
+            help='Directory that receives one trustee_<id>.json share file per trustee',
+        )
+
+    def handle(self, *args, **options):
+        elections = list(Election.objects.filter(id__in=options['election_ids']))
+        if not elections:
+            raise CommandError('No matching elections.')
+
+        by_trustee = {}
+        for election in elections:
+            try:
+                shares = election.deal_key_shares(options['trustees'], options['threshold'])
+            except ValueError as e:
+                raise CommandError(f"'{election.title}': {e}")
+            election.save(update_fields=['key_share_commitments'])
+            for trustee_id, share in shares:
+                by_trustee.setdefault(trustee_id, []).append(
+                    {'election': election.id, 'trustee': trustee_id, 'share': str(share)}
+                )
+            self.stdout.write(f"Dealt {len(shares)} shares for '{election.title}'")
+
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for trustee_id, entries in by_trustee.items():
+            path = os.path.join(options['output_dir'], f'trustee_{trustee_id}.json')
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote share files for {len(by_trustee)} trustees to {options['output_dir']}"
+        ))
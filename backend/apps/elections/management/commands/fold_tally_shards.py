@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.elections.models import Election
+from apps.elections.tally import ShardedTally
+
+class Command(BaseCommand):
+    help = 'Fold accepted votes into the sharded running encrypted tally of each election'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--election',
+            type=int,
+            action='append',
+            dest='election_ids',
+            help='Election ID to fold (repeatable). Defaults to all active elections with keys.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Votes folded per transaction (defaults to ELECTION_TALLY FOLD_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop each pass after this many batches per election (default: drain the queue)',
+        )
+        parser.add_argument(
+            '--watch',
+            type=float,
+            default=0,
+            help='Keep running, sleeping this many seconds between passes',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='After folding, cross-check the shards against a full recount of the folded votes',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.fold_once(options)
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
+
+    def fold_once(self, options):
+        if options['election_ids']:
+            elections = Election.objects.filter(id__in=options['election_ids'])
+        else:
+            elections = Election.objects.filter(status='active')
+
+        elections = [e for e in elections if e.public_key_n]
+        if not elections and not options['watch']:
+            raise CommandError('No elections with a public key to fold.')
+
+        for election in elections:
+            tally = ShardedTally(election, batch_size=options['batch_size'])
+            folded = tally.fold_pending(max_batches=options['max_batches'])
+            for vote_id, error in tally.errors:
+                self.stdout.write(self.style.WARNING(f"Skipped vote {vote_id}: {error}"))
+            self.stdout.write(f"Folded {folded} votes for '{election.title}'")
+
+            if options['verify']:
+                if tally.verify_against_recount():
+                    self.stdout.write(self.style.SUCCESS(f"Shards for '{election.title}' match a full recount"))
+                else:
+                    raise CommandError(f"Shards for '{election.title}' do not match a full recount")
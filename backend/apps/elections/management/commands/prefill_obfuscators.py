@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.elections.models import Election
+from apps.encryption.obfuscators import ObfuscatorPool
+
+class Command(BaseCommand):
+    help = 'Precompute Paillier obfuscators (r^n mod n^2) for elections and spill them to disk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--election',
+            type=int,
+            action='append',
+            dest='election_ids',
+            help='Election ID to prefill (repeatable). Defaults to all draft and active elections with keys.',
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1000,
+            help='Number of obfuscators to precompute per election',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=256,
+            help='Number of obfuscators per spilled chunk file',
+        )
+
+    def handle(self, *args, **options):
+        if options['election_ids']:
+            elections = Election.objects.filter(id__in=options['election_ids'])
+        else:
+            elections = Election.objects.filter(status__in=['draft', 'active'])
+
+        elections = [e for e in elections if e.public_key_n and e.public_key_g]
+        if not elections:
+            raise CommandError('No elections with a public key to prefill.')
+
+        for election in elections:
+            public_key = (int(election.public_key_n), int(election.public_key_g))
+            pool = ObfuscatorPool(public_key, size=options['chunk_size'], low_water_mark=0)
+            if not pool.spill_dir:
+                raise CommandError('PAILLIER_OBFUSCATOR_POOL has no SPILL_DIR configured.')
+
+            remaining = options['count']
+            while remaining > 0:
+                pool.fill(min(options['chunk_size'], remaining))
+                remaining -= pool.spill()
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Prefilled {options['count']} obfuscators for '{election.title}' in {pool.spill_dir}")
+            )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.elections.submission import process_due_votes
+
+class Command(BaseCommand):
+    help = 'Submit queued votes to the blockchain and confirm submitted ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Votes processed per pass (defaults to VOTE_SUBMISSION BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--watch',
+            type=float,
+            default=0,
+            help='Keep running, sleeping this many seconds between passes',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = process_due_votes(limit=options['limit'])
+            if counts:
+                summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+                self.stdout.write(f"Processed votes: {summary}")
+            elif not options['watch']:
+                self.stdout.write('No votes due for submission')
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
@@ -0,0 +1,59 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.elections.models import Election
+
+class Command(BaseCommand):
+    help = 'Verify trustee key shares against the Feldman commitments published with each election'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'share_files',
+            nargs='+',
+            help='JSON files holding [{"election": id, "trustee": id, "share": "..."}] entries',
+        )
+
+    def handle(self, *args, **options):
+        shares_by_election = {}
+        for path in options['share_files']:
+            try:
+                with open(path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {path}: {e}")
+            for entry in entries:
+                shares_by_election.setdefault(int(entry['election']), []).append(
+                    (int(entry['trustee']), int(entry['share']))
+                )
+
+        # Elections whose shares live in the same field are checked in one batch
+        batches = {}
+        for election in Election.objects.filter(id__in=shares_by_election):
+            verifier = election.get_key_share_verifier()
+            if verifier is None:
+                raise CommandError(f"'{election.title}' has no published key share commitments")
+            vss, commitments = verifier
+            batch = batches.setdefault(vss.prime, (vss, [], []))
+            batch[1].append((commitments, shares_by_election[election.id]))
+            batch[2].append(election)
+
+        missing = set(shares_by_election) - {e.id for _, _, elections in batches.values() for e in elections}
+        if missing:
+            raise CommandError(f"Unknown election IDs: {sorted(missing)}")
+
+        start = time.perf_counter()
+        invalid = []
+        for vss, dealings, elections in batches.values():
+            for index, trustee_id in vss.find_invalid_shares(dealings):
+                invalid.append((elections[index], trustee_id))
+        elapsed = time.perf_counter() - start
+
+        total = sum(len(shares) for shares in shares_by_election.values())
+        for election, trustee_id in invalid:
+            self.stdout.write(self.style.ERROR(f"Invalid share from trustee {trustee_id} for '{election.title}'"))
+        if invalid:
+            raise CommandError(f"{len(invalid)} of {total} shares failed verification")
+        self.stdout.write(self.style.SUCCESS(
+            f"All {total} shares across {len(shares_by_election)} elections verified in {elapsed:.3f}s"
+        ))
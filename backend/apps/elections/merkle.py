@@ -0,0 +1,110 @@
+"""
+Merkle Trees over Vote Hashes
+
+This module provides:
+- Leaf and node hashing that matches VotingContract.verifyVoteInclusion
+- MerkleTree: built once over a batch of vote hashes, with its root and
+  per-leaf inclusion proofs
+- verify_inclusion: checks a proof against a root without the rest of the tree
+
+Leaves are keccak256(0x00 || vote hash) and inner nodes keccak256(0x01 ||
+lower child || higher child). The prefixes keep a leaf from being passed off
+as an inner node. Sorting each pair means a proof is just the list of
+sibling hashes, with no left/right flags. A node without a sibling on its
+level is carried up unchanged, so proofs for a batch of n votes hold at most
+ceil(log2 n) hashes.
+"""
+
+from typing import Iterable, List, Sequence
+
+from web3 import Web3
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def _to_bytes32(value) -> bytes:
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    value = bytes(value)
+    if len(value) != 32:
+        raise ValueError(f"Expected 32 bytes, got {len(value)}")
+    return value
+
+def hash_leaf(vote_hash) -> bytes:
+    """Leaf hash of a 32-byte vote hash (bytes or hex)"""
+    return bytes(Web3.keccak(LEAF_PREFIX + _to_bytes32(vote_hash)))
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    """Parent of two nodes, independent of their order"""
+    low, high = (a, b) if a <= b else (b, a)
+    return bytes(Web3.keccak(NODE_PREFIX + low + high))
+
+class MerkleTree:
+    """Merkle tree over an ordered batch of vote hashes"""
+
+    def __init__(self, vote_hashes: Iterable):
+        """
+        Build the tree
+
+        Args:
+            vote_hashes: 32-byte vote hashes (bytes or hex), in leaf order
+
+        Raises:
+            ValueError: If there are no vote hashes
+        """
+        level = [hash_leaf(vote_hash) for vote_hash in vote_hashes]
+        if not level:
+            raise ValueError("Cannot build a Merkle tree without leaves")
+        self.levels: List[List[bytes]] = [level]
+        while len(level) > 1:
+            level = [hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)]
+            self.levels.append(level)
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    @property
+    def root(self) -> bytes:
+        """32-byte root committed on chain"""
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[bytes]:
+        """
+        Inclusion proof for one leaf
+
+        Args:
+            index: Leaf position
+
+        Returns:
+            Sibling hashes from the leaf level up
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Leaf {index} is out of range")
+        siblings = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                siblings.append(level[sibling])
+            index //= 2
+        return siblings
+
+def verify_inclusion(vote_hash, proof: Sequence, root) -> bool:
+    """
+    Check that a vote hash is a leaf of the tree with the given root
+
+    Args:
+        vote_hash: 32-byte vote hash (bytes or hex)
+        proof: Sibling hashes (bytes or hex) as returned by MerkleTree.proof
+        root: Expected root (bytes or hex)
+
+    Returns:
+        bool: True if the proof leads to the root
+    """
+    try:
+        node = hash_leaf(vote_hash)
+        for sibling in proof:
+            node = hash_pair(node, _to_bytes32(sibling))
+        return node == _to_bytes32(root)
+    except ValueError:
+        return False
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0006_add_candidate_image_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='private_key_p',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='private_key_q',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0007_election_private_key_p_q'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='ballot_encoding',
+            field=models.CharField(choices=[('per_candidate', 'One ciphertext per candidate'), ('packed', 'Packed single ciphertext')], default='per_candidate', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='max_electorate',
+            field=models.PositiveIntegerField(blank=True, help_text='Upper bound on ballots cast; sizes the slots of packed ballots', null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0008_election_packed_ballots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EncryptedTallyShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard_index', models.PositiveSmallIntegerField()),
+                ('encrypted_totals', models.JSONField(blank=True, default=dict)),
+                ('ballot_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['election', 'shard_index'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='folded_into_tally',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['election', 'folded_into_tally'], name='elections_v_electio_c389a7_idx'),
+        ),
+        migrations.AddField(
+            model_name='encryptedtallyshard',
+            name='election',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tally_shards', to='elections.election'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='encryptedtallyshard',
+            unique_together={('election', 'shard_index')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0009_encrypted_tally_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='key_share_commitments',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
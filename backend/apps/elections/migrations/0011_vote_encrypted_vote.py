@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0010_election_key_share_commitments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='encrypted_vote',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,80 @@
+import json
+
+from django.db import migrations
+
+from apps.encryption.serialization import CiphertextCodec, decode_ciphertext
+
+BATCH_SIZE = 1000
+
+
+def _parse_ciphertext(value):
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith('0x') else int(value)
+    return int(value)
+
+
+def convert_to_binary(apps, schema_editor):
+    """Move JSON hex ciphertexts into fixed-width binary records, batch by batch"""
+    Election = apps.get_model('elections', 'Election')
+    Vote = apps.get_model('elections', 'Vote')
+
+    for election_id, public_key_n in Election.objects.exclude(public_key_n=None).exclude(
+            public_key_n='').values_list('id', 'public_key_n'):
+        codec = CiphertextCodec(int(public_key_n))
+        last_id = 0
+        while True:
+            batch = list(
+                Vote.objects.filter(election_id=election_id, encrypted_vote=None, id__gt=last_id)
+                .order_by('id')
+                .only('id', 'encrypted_vote_data')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            converted = []
+            for vote in batch:
+                try:
+                    payload = json.loads(vote.encrypted_vote_data)
+                    ciphertext = _parse_ciphertext(payload.pop('encrypted_vote'))
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    # Leave unparseable rows untouched; the tally reports them
+                    continue
+                vote.encrypted_vote = codec.encode(ciphertext)
+                vote.encrypted_vote_data = json.dumps(payload)
+                converted.append(vote)
+            Vote.objects.bulk_update(converted, ['encrypted_vote', 'encrypted_vote_data'])
+
+
+def convert_to_json(apps, schema_editor):
+    """Put binary ciphertexts back into the JSON payload as hex"""
+    Vote = apps.get_model('elections', 'Vote')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Vote.objects.exclude(encrypted_vote=None).filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'encrypted_vote', 'encrypted_vote_data')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        for vote in batch:
+            payload = json.loads(vote.encrypted_vote_data) if vote.encrypted_vote_data else {}
+            payload['encrypted_vote'] = hex(decode_ciphertext(vote.encrypted_vote))
+            vote.encrypted_vote_data = json.dumps(payload)
+            vote.encrypted_vote = None
+        Vote.objects.bulk_update(batch, ['encrypted_vote', 'encrypted_vote_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0011_vote_encrypted_vote'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_to_binary, convert_to_json),
+    ]
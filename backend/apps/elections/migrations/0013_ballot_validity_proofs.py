@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0012_convert_votes_to_binary_ciphertexts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='require_ballot_proofs',
+            field=models.BooleanField(default=False, help_text='Only count ballots carrying a valid proof that they encrypt an allowed value'),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='validity_proof',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
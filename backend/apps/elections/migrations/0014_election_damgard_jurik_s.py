@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0013_ballot_validity_proofs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='damgard_jurik_s',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Damgard-Jurik degree s: plaintexts mod n^s, ciphertexts mod n^(s+1); 1 is plain Paillier', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(8)]),
+        ),
+    ]
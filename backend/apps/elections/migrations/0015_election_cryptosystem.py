@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0014_election_damgard_jurik_s'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='cryptosystem',
+            field=models.CharField(choices=[('paillier', 'Paillier'), ('ec_elgamal', 'Exponential ElGamal (secp256k1)')], default='paillier', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='private_key_scalar',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='election',
+            name='public_key_point',
+            field=models.CharField(blank=True, max_length=66, null=True),
+        ),
+    ]
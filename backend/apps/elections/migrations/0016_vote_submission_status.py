@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0015_election_cryptosystem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='next_submission_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='submission_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='submission_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='submission_status',
+            field=models.CharField(choices=[('pending', 'Accepted, awaiting submission'), ('submitted', 'Submitted, awaiting confirmation'), ('confirmed', 'Confirmed on chain'), ('failed', 'Submission failed')], default='confirmed', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['submission_status', 'next_submission_at'], name='elections_v_submiss_1481e1_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0016_vote_submission_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='chain_anchoring',
+            field=models.CharField(choices=[('per_vote', 'One castVote transaction per ballot'), ('merkle_root', 'Merkle roots over batches of vote hashes')], default='per_vote', help_text='Merkle roots keep ballots off-chain and commit each batch with one transaction', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='anchor_leaf_index',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='VoteAnchor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merkle_root', models.CharField(db_index=True, max_length=64)),
+                ('leaf_count', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('submitted', 'Submitted, awaiting confirmation'), ('confirmed', 'Anchored on chain'), ('failed', 'Anchoring failed')], default='submitted', max_length=10)),
+                ('blockchain_tx_hash', models.CharField(blank=True, max_length=66, null=True)),
+                ('blockchain_block_number', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('anchored_at', models.DateTimeField(blank=True, null=True)),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_anchors', to='elections.election')),
+            ],
+            options={
+                'ordering': ['election', 'created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='anchor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='votes', to='elections.voteanchor'),
+        ),
+    ]
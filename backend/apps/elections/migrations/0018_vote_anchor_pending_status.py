@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0017_merkle_anchoring'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='voteanchor',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Votes claimed, root not yet sent'), ('submitted', 'Submitted, awaiting confirmation'), ('confirmed', 'Anchored on chain'), ('failed', 'Anchoring failed')], default='pending', max_length=10),
+        ),
+    ]
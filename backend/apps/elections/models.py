@@ -8,9 +8,12 @@ This module defines the database models for:
 - Election results
 """
 
+import hashlib
 import os
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -39,6 +42,22 @@ class Election(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    BALLOT_ENCODINGS = [
+        ('per_candidate', 'One ciphertext per candidate'),
+        ('packed', 'Packed single ciphertext'),
+    ]
+    
+    CRYPTOSYSTEMS = [
+        ('paillier', 'Paillier'),
+        ('ec_elgamal', 'Exponential ElGamal (secp256k1)'),
+    ]
+    
+    # How accepted ballots reach the chain (see apps.elections.anchoring)
+    CHAIN_ANCHORING = [
+        ('per_vote', 'One castVote transaction per ballot'),
+        ('merkle_root', 'Merkle roots over batches of vote hashes'),
+    ]
+    
     title = models.CharField(max_length=200)
     description = models.TextField()
     election_type = models.CharField(max_length=20, choices=ELECTION_TYPES, default='single')
@@ -51,21 +70,44 @@ class Election(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     # Encryption keys
+    cryptosystem = models.CharField(max_length=20, choices=CRYPTOSYSTEMS, default='paillier')
     public_key_n = models.TextField(null=True, blank=True)
     public_key_g = models.TextField(null=True, blank=True)
     private_key_lambda = models.TextField(null=True, blank=True)  # Paillier private key (lambda)
     private_key_mu = models.TextField(null=True, blank=True)      # Paillier private key (mu)
+    private_key_p = models.TextField(null=True, blank=True)       # Optional prime factor p (enables CRT decryption)
+    private_key_q = models.TextField(null=True, blank=True)       # Optional prime factor q (enables CRT decryption)
     private_key_shares = models.JSONField(default=list, blank=True)  # Distributed key shares
+    key_share_commitments = models.JSONField(default=dict, blank=True)  # Feldman commitments to the key shares
+    public_key_point = models.CharField(max_length=66, null=True, blank=True)  # EC-ElGamal public key (compressed SEC1 hex)
+    private_key_scalar = models.TextField(null=True, blank=True)  # EC-ElGamal private key (x)
     
     # Configuration
     max_choices = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(10)])
     allow_abstention = models.BooleanField(default=False)
+    ballot_encoding = models.CharField(max_length=20, choices=BALLOT_ENCODINGS, default='per_candidate')
+    max_electorate = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Upper bound on ballots cast; sizes the slots of packed ballots"
+    )
+    damgard_jurik_s = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(8)],
+        help_text="Damgard-Jurik degree s: plaintexts mod n^s, ciphertexts mod n^(s+1); 1 is plain Paillier"
+    )
+    require_ballot_proofs = models.BooleanField(
+        default=False,
+        help_text="Only count ballots carrying a valid proof that they encrypt an allowed value"
+    )
     require_2fa = models.BooleanField(default=True)
     require_biometric = models.BooleanField(default=True)
     
     # Blockchain
     blockchain_contract_address = models.CharField(max_length=42, blank=True, null=True)
     blockchain_deployment_tx = models.CharField(max_length=66, blank=True, null=True)
+    chain_anchoring = models.CharField(
+        max_length=20, choices=CHAIN_ANCHORING, default='per_vote',
+        help_text="Merkle roots keep ballots off-chain and commit each batch with one transaction"
+    )
     
     # Metadata
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_elections')
@@ -113,10 +155,231 @@ class Election(models.Model):
         self.public_key_g = g
         self.save()
     
+    @property
+    def uses_paillier(self):
+        """Check if votes are encrypted with Paillier (or Damgard-Jurik)"""
+        return self.cryptosystem == 'paillier'
+    
+    @property
+    def has_public_key(self):
+        """Check if the public key of the election's cryptosystem is stored"""
+        if self.uses_paillier:
+            return bool(self.public_key_n and self.public_key_g)
+        return bool(self.public_key_point)
+    
+    @property
+    def has_private_key(self):
+        """Check if the private key of the election's cryptosystem is stored"""
+        if not self.uses_paillier:
+            return bool(self.public_key_point and self.private_key_scalar)
+        return bool(self.public_key_n and self.public_key_g and
+                    self.private_key_lambda and self.private_key_mu)
+    
+    def set_key_pair(self, key_pair):
+        """Store a key pair, including the Paillier prime factors when known"""
+        if not self.uses_paillier:
+            from apps.encryption.ec import CurveArithmetic
+            self.public_key_point = CurveArithmetic(key_pair.curve).encode_point(key_pair.public_key).hex()
+            self.private_key_scalar = str(key_pair.private_key)
+            return
+        self.public_key_n = key_pair.n
+        self.public_key_g = key_pair.g
+        self.private_key_lambda = key_pair.lambda_val
+        self.private_key_mu = key_pair.mu
+        self.private_key_p = getattr(key_pair, 'p', None)
+        self.private_key_q = getattr(key_pair, 'q', None)
+    
+    def get_key_pair(self):
+        """Get the stored key pair, or None if it has not been generated"""
+        if not self.has_private_key:
+            return None
+        
+        if not self.uses_paillier:
+            from apps.encryption.elgamal import ECElGamalKeyPair
+            return ECElGamalKeyPair(self.get_public_key(), int(self.private_key_scalar))
+        
+        from apps.encryption.paillier import PaillierKeyPair
+        key_pair = PaillierKeyPair(
+            (int(self.public_key_n), int(self.public_key_g)),
+            int(self.private_key_lambda),
+            p=int(self.private_key_p) if self.private_key_p else None,
+            q=int(self.private_key_q) if self.private_key_q else None,
+        )
+        key_pair.mu = int(self.private_key_mu)
+        return key_pair
+    
+    @property
+    def key_version(self):
+        """Short digest of the stored key text; changes whenever the key does"""
+        material = f"{self.public_key_n}:{self.public_key_g}:{self.private_key_lambda}"
+        if not self.uses_paillier:
+            material = f"{self.cryptosystem}:{self.public_key_point}:{self.private_key_scalar}"
+        return hashlib.sha256(material.encode()).hexdigest()[:16]
+    
+    def get_key_context(self, private=False):
+        """
+        Get the parsed key context for this election from the process-wide cache
+        
+        Public contexts are enough to encrypt; private ones also carry the
+        decryption constants and are only built where the private key is used.
+        """
+        from apps.encryption.keycache import KeyContext, get_key_context_cache
+        if not self.public_key_n:
+            raise ValueError(f"Election '{self.title}' has no public key")
+        if private and not self.has_private_key:
+            raise ValueError(f"Election '{self.title}' has no private key")
+        
+        def build():
+            key_pair = self.get_key_pair() if private else None
+            return KeyContext((self.public_key_n, self.public_key_g), key_pair=key_pair, s=self.damgard_jurik_s)
+        
+        return get_key_context_cache().get_or_create(
+            ('election', self.pk, self.key_version, self.damgard_jurik_s, bool(private)), build
+        )
+    
+    def get_public_key(self):
+        """
+        Get the parsed public key: (n, g) for Paillier, a curve point for EC-ElGamal
+        
+        Paillier keys come from the key context cache; points are validated as
+        they are decoded.
+        """
+        if not self.has_public_key:
+            raise ValueError(f"Election '{self.title}' has no public key")
+        if self.uses_paillier:
+            return self.get_key_context().public_key
+        from apps.encryption.ec import CurveArithmetic
+        return CurveArithmetic().decode_point(bytes.fromhex(self.public_key_point))
+    
+    def get_encryption(self, backend=None):
+        """
+        Get the cryptosystem for this election
+        
+        Paillier (Damgard-Jurik when s > 1), or EC-ElGamal whose decryption
+        searches up to max_electorate, the largest count a candidate can reach.
+        """
+        from apps.encryption.cryptosystems import get_cryptosystem
+        if self.uses_paillier:
+            return get_cryptosystem('paillier', s=self.damgard_jurik_s, backend=backend)
+        return get_cryptosystem(self.cryptosystem, backend=backend, max_value=self.max_electorate)
+    
+    @property
+    def plaintext_modulus(self):
+        """Size of the plaintext space, n^s"""
+        if not self.uses_paillier:
+            raise ValueError("Only Paillier elections have a plaintext modulus")
+        if not self.public_key_n:
+            raise ValueError("Election has no public key")
+        return int(self.public_key_n) ** self.damgard_jurik_s
+    
+    def ensure_key_pair(self, key_size=None, generate_inline=True):
+        """
+        Assign a key pair from the pre-generated pool if none is stored yet
+        
+        With generate_inline=False an empty pool raises KeyPoolEmpty instead
+        of generating a Paillier key in this process. Does not save the election.
+        """
+        if self.has_private_key:
+            return self.get_key_pair()
+        if not self.uses_paillier:
+            # EC keys are a single scalar multiplication; there is nothing to pool
+            key_pair = self.get_encryption().generate_key_pair()
+            self.set_key_pair(key_pair)
+            return key_pair
+        from apps.encryption.keypool import acquire_key_pair
+        key_pair = acquire_key_pair(key_size, generate_inline=generate_inline)
+        self.set_key_pair(key_pair)
+        return key_pair
+    
+    def deal_key_shares(self, total_trustees, threshold):
+        """
+        Split the private key among trustees and store Feldman commitments
+        
+        The shares are returned for distribution and are not stored; only the
+        public commitments are kept so trustees can verify what they receive.
+        Does not save the election.
+        """
+        from apps.encryption.feldman import FeldmanVSS
+        key_pair = self.get_key_pair()
+        if key_pair is None:
+            raise ValueError("Election has no private key to share")
+        
+        secret = self.get_encryption().key_share_secret(key_pair)
+        vss = FeldmanVSS(total_trustees, threshold, secret_bits=secret.bit_length())
+        shares, commitments = vss.deal(secret)
+        self.key_share_commitments = {
+            'cryptosystem': self.cryptosystem,
+            'field_prime': str(vss.prime),
+            'total_trustees': total_trustees,
+            'threshold': threshold,
+            'commitments': [str(c) for c in commitments],
+        }
+        return shares
+    
+    def get_key_share_verifier(self):
+        """Get the Feldman verifier and commitments for this election's key shares, or None"""
+        if not self.key_share_commitments:
+            return None
+        from apps.encryption.feldman import FeldmanVSS
+        data = self.key_share_commitments
+        vss = FeldmanVSS(data['total_trustees'], data['threshold'], prime=int(data['field_prime']))
+        return vss, [int(c) for c in data['commitments']]
+    
     def get_candidates(self):
         """Get all candidates for this election"""
         return self.candidates.all().order_by('order')
     
+    @property
+    def uses_packed_ballots(self):
+        """Check if ballots are packed into a single ciphertext"""
+        return self.ballot_encoding == 'packed'
+    
+    def get_ballot_packer(self):
+        """Get the packed ballot encoder for this election (slots follow candidate order)"""
+        from apps.encryption.packing import PackedBallotEncoder
+        if not self.public_key_n:
+            raise ValueError("Election has no public key")
+        if not self.max_electorate:
+            raise ValueError("Packed ballots require max_electorate to be set")
+        return PackedBallotEncoder(self.candidates.count(), self.max_electorate, self.plaintext_modulus)
+    
+    def get_ballot_values(self):
+        """Get the plaintexts a valid ballot may encrypt: 0/1, or one packed slot per candidate"""
+        if self.uses_packed_ballots:
+            packer = self.get_ballot_packer()
+            return [packer.encode(slot) for slot in range(packer.num_candidates)]
+        return [0, 1]
+    
+    @property
+    def uses_merkle_anchoring(self):
+        """Check if ballots are committed on chain by Merkle root instead of one by one"""
+        return self.chain_anchoring == 'merkle_root'
+    
+    @property
+    def proof_context(self):
+        """Bytes ballot proofs are bound to, so a proof cannot be replayed in another election"""
+        return f"election:{self.pk}".encode()
+    
+    def clean(self):
+        """Validate the model"""
+        super().clean()
+        if not self.uses_paillier:
+            # Packing and ballot proofs are Paillier constructions
+            if self.uses_packed_ballots:
+                raise ValidationError({'ballot_encoding': "Packed ballots require the Paillier cryptosystem."})
+            if self.require_ballot_proofs:
+                raise ValidationError({'require_ballot_proofs': "Ballot proofs require the Paillier cryptosystem."})
+            if self.damgard_jurik_s != 1:
+                raise ValidationError({'damgard_jurik_s': "The Damgard-Jurik degree only applies to Paillier."})
+        if self.uses_packed_ballots:
+            if not self.max_electorate:
+                raise ValidationError({'max_electorate': "Packed ballots require a maximum electorate."})
+            if self.pk and self.public_key_n:
+                try:
+                    self.get_ballot_packer()
+                except ValueError as e:
+                    raise ValidationError({'ballot_encoding': str(e)})
+    
     def get_valid_votes(self):
         """Get all valid votes for this election"""
         return self.votes.filter(is_valid=True)
@@ -227,6 +490,14 @@ class Candidate(models.Model):
 class Vote(models.Model):
     """Model for storing encrypted votes"""
     
+    # Chain submission lifecycle (see apps.elections.submission)
+    SUBMISSION_STATUSES = [
+        ('pending', 'Accepted, awaiting submission'),
+        ('submitted', 'Submitted, awaiting confirmation'),
+        ('confirmed', 'Confirmed on chain'),
+        ('failed', 'Submission failed'),
+    ]
+    
     election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name='votes')
     voter = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -237,17 +508,34 @@ class Vote(models.Model):
     )
     
     # Encrypted vote data
-    encrypted_vote_data = models.TextField()  # JSON string of encrypted vote
+    encrypted_vote_data = models.TextField()  # JSON string of vote metadata (legacy rows also hold the hex ciphertext)
+    encrypted_vote = models.BinaryField(null=True, blank=True, editable=False)  # Fixed-width ciphertext record (apps.encryption.serialization)
+    validity_proof = models.JSONField(null=True, blank=True)  # Membership proof that the ballot encrypts an allowed value
     vote_hash = models.CharField(max_length=64, unique=True)  # SHA-256 hash of vote
     
     # Blockchain integration
     blockchain_tx_hash = models.CharField(max_length=66, blank=True, null=True)
     blockchain_block_number = models.BigIntegerField(blank=True, null=True)
+    # Votes saved outside the submission pipeline were sent synchronously, so they default to confirmed
+    submission_status = models.CharField(max_length=10, choices=SUBMISSION_STATUSES, default='confirmed')
+    submission_attempts = models.PositiveSmallIntegerField(default=0)
+    submission_error = models.TextField(blank=True)
+    next_submission_at = models.DateTimeField(blank=True, null=True)  # When a worker should next submit or poll
+    submitted_at = models.DateTimeField(blank=True, null=True)  # When the current transaction was sent
+    
+    # Merkle-root anchoring: the batch committing this vote and its leaf position
+    anchor = models.ForeignKey(
+        'VoteAnchor', on_delete=models.SET_NULL, null=True, blank=True, related_name='votes'
+    )
+    anchor_leaf_index = models.PositiveIntegerField(null=True, blank=True)
     
     # Validation
     is_valid = models.BooleanField(default=True)
     validation_errors = models.JSONField(default=list, blank=True)
     
+    # Running tally (set once the vote is folded into an EncryptedTallyShard)
+    folded_into_tally = models.BooleanField(default=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     confirmed_at = models.DateTimeField(blank=True, null=True)
@@ -270,11 +558,46 @@ class Vote(models.Model):
             models.Index(fields=['vote_hash']),
             models.Index(fields=['blockchain_tx_hash']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['election', 'folded_into_tally']),
+            models.Index(fields=['submission_status', 'next_submission_at']),
         ]
     
     def __str__(self):
         return f"Anonymous vote in {self.election.title}"
     
+    def get_ciphertext(self):
+        """Get the encrypted vote from the binary record or the legacy JSON payload"""
+        if self.encrypted_vote is not None:
+            election = self.election
+            if not election.uses_paillier:
+                # EC-ElGamal records decode to a pair of points
+                return election.get_encryption().decode_ciphertext(self.encrypted_vote, election.get_public_key())
+            from apps.encryption.serialization import decode_ciphertext
+            return decode_ciphertext(self.encrypted_vote)
+        from .tally import parse_vote_payload
+        return parse_vote_payload(self.encrypted_vote_data)[0]
+    
+    def get_inclusion_proof(self, tree=None):
+        """
+        Get the Merkle inclusion proof of an anchored vote
+        
+        Args:
+            tree: The anchor's MerkleTree, when proving many of its votes
+        
+        Returns:
+            Dict with the hex root, leaf index, sibling hashes and anchoring
+            transaction, or None if the vote is not in an anchored batch
+        """
+        if self.anchor_id is None or self.anchor_leaf_index is None:
+            return None
+        tree = tree or self.anchor.get_tree()
+        return {
+            'root': tree.root.hex(),
+            'leaf_index': self.anchor_leaf_index,
+            'proof': [sibling.hex() for sibling in tree.proof(self.anchor_leaf_index)],
+            'transaction_hash': self.anchor.blockchain_tx_hash,
+        }
+    
     @property
     def is_confirmed(self):
         """Check if vote is confirmed on blockchain"""
@@ -385,6 +708,58 @@ class ElectionResult(models.Model):
         """Check if this record is immutable (for security)"""
         return True  # All election results are immutable for security
 
+class EncryptedTallyShard(models.Model):
+    """Model for one shard of an election's running encrypted tally"""
+    
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name='tally_shards')
+    shard_index = models.PositiveSmallIntegerField()
+    
+    # {candidate_id or 'packed': encrypted running product as a decimal string}
+    encrypted_totals = models.JSONField(default=dict, blank=True)
+    ballot_count = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['election', 'shard_index']
+        unique_together = ['election', 'shard_index']
+    
+    def __str__(self):
+        return f"Tally shard {self.shard_index} for {self.election.title}"
+
+class VoteAnchor(models.Model):
+    """Model for one Merkle root committing a batch of an election's votes on chain"""
+    
+    STATUSES = [
+        ('pending', 'Votes claimed, root not yet sent'),
+        ('submitted', 'Submitted, awaiting confirmation'),
+        ('confirmed', 'Anchored on chain'),
+        ('failed', 'Anchoring failed'),
+    ]
+    
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name='vote_anchors')
+    merkle_root = models.CharField(max_length=64, db_index=True)  # Hex, no 0x prefix; a failed batch may be re-anchored
+    leaf_count = models.PositiveIntegerField()
+    
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    blockchain_tx_hash = models.CharField(max_length=66, blank=True, null=True)
+    blockchain_block_number = models.BigIntegerField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    anchored_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['election', 'created_at']
+    
+    def __str__(self):
+        return f"Anchor {self.merkle_root[:12]} ({self.leaf_count} votes) for {self.election.title}"
+    
+    def get_tree(self):
+        """Rebuild the Merkle tree from the anchored votes, in leaf order"""
+        from .merkle import MerkleTree
+        return MerkleTree(self.votes.order_by('anchor_leaf_index').values_list('vote_hash', flat=True))
+
 class ElectionAuditLog(models.Model):
     """Model for storing election audit logs"""
     
@@ -424,4 +799,13 @@ class ElectionAuditLog(models.Model):
     
     def is_immutable(self):
         """Check if this record is immutable (for security)"""
-        return True  # All audit logs are immutable for security 
\ No newline at end of file
+        return True  # All audit logs are immutable for security 
+
+# Signal to drop this process's parsed key contexts when an election changes
+@receiver(post_save, sender=Election)
+@receiver(post_delete, sender=Election)
+def invalidate_key_context(sender, instance, **kwargs):
+    from apps.encryption.keycache import get_key_context_cache
+    get_key_context_cache().invalidate(
+        lambda key: key[0] == 'election' and key[1] == instance.pk
+    )
@@ -0,0 +1,222 @@
+"""
+Local Transaction Nonce Management
+
+This module provides:
+- Per-account nonce allocation from a local counter, synchronized with the
+  node's pending transaction count on first use and after errors
+- Tracking of in-flight transactions until they are mined
+- Detection of stuck transactions (the account's oldest unmined nonce
+  waiting longer than a timeout) and their replacement at the same nonce
+  with a higher gas price
+- Lookup of the latest hash of a replaced transaction
+
+Asking the node for the transaction count before each send forces
+transactions from one account to go out one block apart, since the count
+only moves once the previous transaction is mined or at least seen. With
+local allocation an account can send many transactions back-to-back and
+wait for all of the receipts afterwards. Allocation and sending happen
+under a per-account lock, so nonces reach the node in order and a failed
+send can hand its nonce straight back without leaving a gap.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_STUCK_AFTER = 120.0
+DEFAULT_GAS_BUMP = 1.2
+
+class InFlightTransaction:
+    """A sent transaction that has not been seen mined yet"""
+
+    def __init__(self, account: str, nonce: int, tx: dict, private_key: str, tx_hash: str, sent_at: float):
+        self.account = account
+        self.nonce = nonce
+        self.tx = tx
+        self.private_key = private_key
+        self.tx_hash = tx_hash
+        self.hashes = [tx_hash]
+        self.sent_at = sent_at
+        self.replacements = 0
+
+class _AccountState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next_nonce: Optional[int] = None
+        self.in_flight: Dict[int, InFlightTransaction] = {}
+
+class NonceManager:
+    """Allocates nonces locally and tracks in-flight transactions per account"""
+
+    def __init__(self, w3, stuck_after: float = DEFAULT_STUCK_AFTER, gas_bump: float = DEFAULT_GAS_BUMP,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the manager
+
+        Args:
+            w3: Web3 instance used to sync, sign and send
+            stuck_after: Seconds before an account's oldest unmined transaction counts as stuck
+            gas_bump: Gas price multiplier for replacements (nodes require at least 1.1)
+            clock: Monotonic time source
+        """
+        self.w3 = w3
+        self.stuck_after = stuck_after
+        self.gas_bump = gas_bump
+        self._clock = clock
+        self._accounts: Dict[str, _AccountState] = {}
+        self._accounts_lock = threading.Lock()
+        # Every hash ever sent for a transaction, mapped to its record
+        self._by_hash: Dict[str, InFlightTransaction] = {}
+
+    def _state(self, account: str) -> _AccountState:
+        key = account.lower()
+        with self._accounts_lock:
+            state = self._accounts.get(key)
+            if state is None:
+                state = self._accounts[key] = _AccountState()
+            return state
+
+    def _sync(self, account: str, state: _AccountState):
+        """
+        Reset the local counter from the node
+
+        Records of mined transactions are dropped, and so are records the
+        node no longer holds (dropped from its pool), so that their nonces
+        are reused instead of leaving a gap every later transaction waits on.
+        """
+        mined = self.w3.eth.get_transaction_count(account, 'latest')
+        pending = max(self.w3.eth.get_transaction_count(account, 'pending'), mined)
+        self._forget_below(state, mined)
+        for lost in [n for n in state.in_flight if n >= pending]:
+            self._forget(state.in_flight.pop(lost))
+        state.next_nonce = pending
+
+    def _forget_below(self, state: _AccountState, nonce: int):
+        for stale in [n for n in state.in_flight if n < nonce]:
+            self._forget(state.in_flight.pop(stale))
+
+    def _forget(self, record: InFlightTransaction):
+        for tx_hash in record.hashes:
+            self._by_hash.pop(tx_hash, None)
+
+    def resync(self, account: str):
+        """Re-read the account's nonce from the node before its next transaction"""
+        state = self._state(account)
+        with state.lock:
+            state.next_nonce = None
+
+    def send(self, account: str, tx: dict, private_key: str) -> str:
+        """
+        Assign the next nonce to a transaction, sign it and send it without waiting
+
+        If the node rejects the transaction the nonce is handed back and the
+        counter is re-read from the node before the next send.
+
+        Args:
+            account: Sending address
+            tx: Built transaction without a nonce
+            private_key: Key of the sending account
+
+        Returns:
+            str: 0x-prefixed transaction hash
+        """
+        state = self._state(account)
+        with state.lock:
+            if state.next_nonce is None:
+                self._sync(account, state)
+            nonce = state.next_nonce
+            tx = dict(tx, nonce=nonce)
+            try:
+                tx_hash = self._sign_and_send(tx, private_key)
+            except Exception:
+                # The node may know of transactions this process did not send
+                state.next_nonce = None
+                raise
+            state.next_nonce = nonce + 1
+            record = InFlightTransaction(account, nonce, tx, private_key, tx_hash, self._clock())
+            state.in_flight[nonce] = record
+            self._by_hash[tx_hash] = record
+            return tx_hash
+
+    def _sign_and_send(self, tx: dict, private_key: str) -> str:
+        signed = self.w3.eth.account.sign_transaction(tx, private_key=private_key)
+        tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+        return tx_hash.hex() if isinstance(tx_hash, (bytes, bytearray)) else str(tx_hash)
+
+    def current_hash(self, tx_hash: str) -> str:
+        """Latest hash of a transaction that may have been replaced (tx_hash itself if unknown)"""
+        record = self._by_hash.get(tx_hash)
+        return record.tx_hash if record is not None else tx_hash
+
+    def mark_mined(self, tx_hash: str):
+        """Stop tracking a transaction, and every earlier nonce of its account, once it is mined"""
+        record = self._by_hash.get(tx_hash)
+        if record is None:
+            return
+        state = self._state(record.account)
+        with state.lock:
+            self._forget_below(state, record.nonce + 1)
+
+    def in_flight(self, account: Optional[str] = None) -> List[InFlightTransaction]:
+        """In-flight transactions of one account (or every account), oldest nonce first"""
+        with self._accounts_lock:
+            states = list(self._accounts.items())
+        records = []
+        for key, state in states:
+            if account is None or key == account.lower():
+                with state.lock:
+                    records.extend(state.in_flight.values())
+        return sorted(records, key=lambda r: (r.account.lower(), r.nonce))
+
+    def _bump(self, tx: dict) -> dict:
+        tx = dict(tx)
+        for field in ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas'):
+            if field in tx:
+                tx[field] = max(math.ceil(tx[field] * self.gas_bump), tx[field] + 1)
+        return tx
+
+    def replace_stuck(self, account: Optional[str] = None) -> List[InFlightTransaction]:
+        """
+        Re-send stuck transactions at the same nonce with a higher gas price
+
+        Only each account's lowest in-flight nonce can be stuck; later ones
+        are simply queued behind it. Records the node has already mined are
+        dropped first.
+
+        Args:
+            account: Limit to one account (defaults to every account with in-flight transactions)
+
+        Returns:
+            Records that were replaced
+        """
+        with self._accounts_lock:
+            accounts = [(key, state) for key, state in self._accounts.items()
+                        if account is None or key == account.lower()]
+        replaced = []
+        now = self._clock()
+        for _, state in accounts:
+            with state.lock:
+                if not state.in_flight:
+                    continue
+                head = state.in_flight[min(state.in_flight)]
+                if now - head.sent_at < self.stuck_after:
+                    continue
+                self._forget_below(state, self.w3.eth.get_transaction_count(head.account, 'latest'))
+                if head.nonce not in state.in_flight:
+                    continue
+                tx = self._bump(head.tx)
+                try:
+                    tx_hash = self._sign_and_send(tx, head.private_key)
+                except Exception:
+                    # Mined in the meantime, or the node wants a bigger bump; try again next time
+                    head.sent_at = now
+                    continue
+                head.tx = tx
+                head.tx_hash = tx_hash
+                head.hashes.append(tx_hash)
+                head.sent_at = now
+                head.replacements += 1
+                self._by_hash[tx_hash] = head
+                replaced.append(head)
+        return replaced
@@ -0,0 +1,193 @@
+"""
+Relayed Batch Vote Submission
+
+This module provides:
+- Ballot digests and voter signatures matching
+  VotingContract.ballotDigest / castVotesBatch
+- RelayedBallot records for one signed ballot
+- VoteBatcher: groups ballots per election and flushes a batch once it is
+  full or its oldest ballot has waited long enough
+- Decoding of per-ballot outcome codes
+
+castVote costs a full transaction per ballot and stores the whole
+ciphertext on-chain. castVotesBatch takes many ballots in one transaction
+sent by a relayer account, checks each voter's signature with ecrecover and
+stores only the ciphertext hash. The shared transaction overhead and the
+smaller storage footprint fit many more ballots into each block. A ballot
+that fails its checks is reported with a VoteRejected event instead of
+reverting the rest of the batch.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+
+BALLOT_ACCEPTED = 0
+REJECTION_REASONS = {
+    1: 'invalid voter signature',
+    2: 'voter has already voted',
+    3: 'vote hash already exists',
+    4: 'invalid ballot',
+}
+DEFAULT_MAX_BATCH_SIZE = 50
+DEFAULT_MAX_BATCH_AGE = 5.0
+
+def _to_bytes32(value) -> bytes:
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    value = bytes(value)
+    if len(value) != 32:
+        raise ValueError(f"Expected 32 bytes, got {len(value)}")
+    return value
+
+def ballot_digest(contract_address: str, election_id: str, encrypted_vote_hash, vote_hash) -> bytes:
+    """
+    Digest a voter signs to authorize a relayed ballot
+
+    Args:
+        contract_address: Address of the VotingContract
+        election_id: Election identifier
+        encrypted_vote_hash: keccak256 of the ciphertext bytes
+        vote_hash: 32-byte vote hash
+
+    Returns:
+        bytes: keccak256(contract, election id, encrypted vote hash, vote hash), tightly packed
+    """
+    return bytes(Web3.solidity_keccak(
+        ['address', 'string', 'bytes32', 'bytes32'],
+        [Web3.to_checksum_address(contract_address), str(election_id),
+         _to_bytes32(encrypted_vote_hash), _to_bytes32(vote_hash)],
+    ))
+
+class RelayedBallot:
+    """One voter-signed ballot waiting to be relayed"""
+
+    def __init__(self, voter: str, encrypted_vote_hash: bytes, vote_hash: bytes, signature: bytes,
+                 queued_at: Optional[float] = None):
+        self.voter = Web3.to_checksum_address(voter)
+        self.encrypted_vote_hash = _to_bytes32(encrypted_vote_hash)
+        self.vote_hash = _to_bytes32(vote_hash)
+        self.signature = bytes(signature)
+        self.queued_at = time.time() if queued_at is None else queued_at
+
+    def as_tuple(self) -> Tuple[str, bytes, bytes, bytes]:
+        """Contract BallotSubmission struct"""
+        return (self.voter, self.encrypted_vote_hash, self.vote_hash, self.signature)
+
+def sign_ballot(private_key: str, contract_address: str, election_id: str, encrypted_vote,
+                vote_hash, queued_at: Optional[float] = None) -> RelayedBallot:
+    """
+    Sign a ballot for relaying with the voter's key
+
+    Args:
+        private_key: Voter's private key
+        contract_address: Address of the VotingContract
+        election_id: Election identifier
+        encrypted_vote: Ciphertext bytes (or 0x-prefixed hex) as anchored on-chain
+        vote_hash: 32-byte vote hash (bytes or hex)
+        queued_at: When the ballot was accepted (Unix time), for age-based flushing
+
+    Returns:
+        RelayedBallot: Signed ballot
+    """
+    if isinstance(encrypted_vote, str):
+        encrypted_vote = bytes.fromhex(encrypted_vote[2:] if encrypted_vote.startswith('0x') else encrypted_vote)
+    encrypted_vote_hash = bytes(Web3.keccak(encrypted_vote))
+    digest = ballot_digest(contract_address, election_id, encrypted_vote_hash, vote_hash)
+    account = Account.from_key(private_key)
+    signature = account.sign_message(encode_defunct(primitive=digest)).signature
+    return RelayedBallot(account.address, encrypted_vote_hash, vote_hash, signature, queued_at)
+
+def recover_ballot_signer(contract_address: str, election_id: str, ballot: RelayedBallot) -> str:
+    """Address that signed a ballot, recovered the same way the contract does"""
+    digest = ballot_digest(contract_address, election_id, ballot.encrypted_vote_hash, ballot.vote_hash)
+    return Account.recover_message(encode_defunct(primitive=digest), signature=ballot.signature)
+
+def rejection_reason(code: int) -> Optional[str]:
+    """Readable reason for a castVotesBatch outcome code (None when accepted)"""
+    if code == BALLOT_ACCEPTED:
+        return None
+    return REJECTION_REASONS.get(code, f'rejected with code {code}')
+
+class BatchSubmission:
+    """Outcome of sending one batch"""
+
+    def __init__(self, election_id: str, ballots: List[RelayedBallot], success: bool, result: str):
+        self.election_id = election_id
+        self.ballots = ballots
+        self.success = success
+        # Transaction hash on success, error message otherwise
+        self.result = result
+
+class VoteBatcher:
+    """Accumulates signed ballots per election and flushes them by size or age"""
+
+    def __init__(self, send: Callable[[str, List[RelayedBallot]], Tuple[bool, str]],
+                 max_size: int = DEFAULT_MAX_BATCH_SIZE, max_age: float = DEFAULT_MAX_BATCH_AGE,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the batcher
+
+        Args:
+            send: Sends one batch and returns (success, tx hash or error),
+                e.g. BlockchainService.submit_vote_batch
+            max_size: Ballots per batch; a full batch is sent immediately
+            max_age: Seconds the oldest queued ballot of an election may wait
+            clock: Time source comparable with RelayedBallot.queued_at
+        """
+        self.send = send
+        self.max_size = max_size
+        self.max_age = max_age
+        self._clock = clock
+        self._queues: Dict[str, List[RelayedBallot]] = {}
+        self._lock = threading.Lock()
+
+    def pending_count(self) -> int:
+        """Ballots queued and not yet sent"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def add(self, election_id: str, ballot: RelayedBallot) -> List[BatchSubmission]:
+        """
+        Queue a ballot, sending its election's batch if it is now full
+
+        Returns:
+            Batches sent by this call (empty if the ballot is still queued)
+        """
+        election_id = str(election_id)
+        with self._lock:
+            queue = self._queues.setdefault(election_id, [])
+            queue.append(ballot)
+            if len(queue) < self.max_size:
+                return []
+            batch, self._queues[election_id] = queue[:self.max_size], queue[self.max_size:]
+        return [self._send(election_id, batch)]
+
+    def flush_due(self) -> List[BatchSubmission]:
+        """Send every election's batch whose oldest ballot has waited max_age or longer"""
+        now = self._clock()
+        with self._lock:
+            due = [election_id for election_id, queue in self._queues.items()
+                   if queue and now - min(b.queued_at for b in queue) >= self.max_age]
+        return self.flush(due)
+
+    def flush(self, election_ids: Optional[List[str]] = None) -> List[BatchSubmission]:
+        """Send the queued ballots of the given elections (defaults to all), in batches of max_size"""
+        batches = []
+        with self._lock:
+            for election_id in list(self._queues if election_ids is None else election_ids):
+                queue = self._queues.pop(str(election_id), [])
+                for start in range(0, len(queue), self.max_size):
+                    batches.append((str(election_id), queue[start:start + self.max_size]))
+        return [self._send(election_id, batch) for election_id, batch in batches]
+
+    def _send(self, election_id: str, batch: List[RelayedBallot]) -> BatchSubmission:
+        try:
+            success, result = self.send(election_id, batch)
+        except Exception as e:
+            success, result = False, str(e)
+        return BatchSubmission(election_id, batch, success, result)
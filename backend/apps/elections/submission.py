@@ -0,0 +1,561 @@
+"""
+Asynchronous Vote Submission
+
+This module provides:
+- A durable queue of accepted ballots awaiting chain submission, kept in the
+  Vote table itself (submission_status / next_submission_at)
+- A submit step that signs and sends the castVote transaction and a confirm
+  step that polls for its receipt, each retried with exponential backoff
+- Dispatch of queued votes to Celery, an in-process worker thread, or
+  nothing at all for deployments that run the process_vote_submissions
+  polling worker
+- A relayer mode in which the polling worker signs due ballots with their
+  voters' keys and sends them in castVotesBatch transactions, mapping the
+  per-ballot outcomes back to the Vote rows
+- Status lookups for the receipts voters get back from cast_vote
+
+Votes of elections anchored by Merkle root skip this pipeline; the
+anchoring job in apps.elections.anchoring commits them in batches.
+
+cast_vote only encrypts, stores the ballot as pending and returns, so its
+latency no longer depends on block time. Because the queue is the database,
+a ballot survives a lost Celery message or a restarted web process: any
+worker that polls for due votes picks it up again. A worker claims a vote
+under a skip_locked row lock and leases it by pushing next_submission_at
+one CONFIRMATION_TIMEOUT ahead, then talks to the chain with no
+transaction open and records the outcome in a second short transaction.
+No row lock is held across an RPC, and a worker that dies or cannot
+record a sent transaction leaves the vote leased rather than free. Once
+the lease runs out, the vote is submitted again, and the duplicate is
+recognised on chain by its vote hash.
+
+A ballot is counted by the tallies only once it is confirmed; one that runs
+out of attempts is invalidated with the last error.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+SUBMITTED = 'submitted'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+IN_FLIGHT = (PENDING, SUBMITTED)
+
+DEFAULT_BACKEND = 'thread'
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 2.0
+DEFAULT_MAX_RETRY_DELAY = 300.0
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_CONFIRMATION_TIMEOUT = 600.0
+DEFAULT_BATCH_SIZE = 100
+BACKENDS = ('celery', 'thread', 'database', 'inline')
+SAVE_FIELDS = [
+    'submission_status', 'submission_attempts', 'submission_error', 'next_submission_at',
+    'submitted_at', 'blockchain_tx_hash', 'blockchain_block_number', 'confirmed_at', 'is_valid', 'validation_errors',
+]
+
+def submission_settings() -> dict:
+    """Read VOTE_SUBMISSION from settings"""
+    from django.conf import settings
+    return dict(getattr(settings, 'VOTE_SUBMISSION', {}) or {})
+
+def _setting(name: str, default):
+    return submission_settings().get(name, default)
+
+def get_blockchain_service():
+    """Build the chain client used by the submission workers"""
+    from .blockchain import BlockchainService
+    return BlockchainService()
+
+def vote_chain_payload(vote) -> Tuple[str, str, str, str]:
+    """
+    Rebuild the castVote arguments of a stored ballot
+
+    Args:
+        vote: Vote with its election and voter
+
+    Returns:
+        Tuple of (election id, voter address, 0x-prefixed ciphertext bytes,
+        0x-prefixed vote hash)
+    """
+    from web3 import Web3
+
+    election = vote.election
+    if vote.voter is None or not getattr(vote.voter, 'blockchain_address', None):
+        raise ValueError("Vote has no voter blockchain address")
+    ciphertext = election.get_encryption().ciphertext_bytes(vote.get_ciphertext(), election.get_public_key())
+    voter_address = Web3.to_checksum_address(vote.voter.blockchain_address)
+    return str(election.id), voter_address, '0x' + ciphertext.hex(), '0x' + vote.vote_hash
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before attempt number attempts + 1 (exponential, capped)"""
+    base = _setting('RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    return min(base * 2 ** max(attempts - 1, 0), _setting('MAX_RETRY_DELAY', DEFAULT_MAX_RETRY_DELAY))
+
+def _schedule_retry(vote, error: str, now):
+    """Count a failed attempt and either reschedule the vote or give up on it"""
+    vote.submission_attempts += 1
+    vote.submission_error = error
+    if vote.submission_attempts >= _setting('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS):
+        vote.submission_status = FAILED
+        vote.next_submission_at = None
+        vote.invalidate(f"Blockchain submission failed: {error}")
+        logger.warning("Vote %s failed after %s attempts: %s", vote.id, vote.submission_attempts, error)
+        return
+    vote.submission_status = PENDING
+    vote.blockchain_tx_hash = None
+    vote.next_submission_at = now + timedelta(seconds=retry_delay(vote.submission_attempts))
+
+def _fail(vote, error: str, now):
+    """Give up on a vote whose problem no retry can fix"""
+    vote.submission_attempts = _setting('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS) - 1
+    _schedule_retry(vote, error, now)
+
+def _mark_submitted(vote, tx_hash: str, now):
+    vote.blockchain_tx_hash = tx_hash
+    vote.submitted_at = now
+    vote.submission_status = SUBMITTED
+    vote.submission_error = ''
+    vote.next_submission_at = now + timedelta(seconds=_setting('POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
+
+def _mark_confirmed(vote, now, block_number=None):
+    vote.submission_status = CONFIRMED
+    vote.submission_error = ''
+    vote.next_submission_at = None
+    if block_number is not None:
+        vote.blockchain_block_number = block_number
+    vote.confirmed_at = now
+
+def _lease_until(now):
+    """When a claimed vote becomes due again if its worker never records an outcome"""
+    return now + timedelta(seconds=_setting('CONFIRMATION_TIMEOUT', DEFAULT_CONFIRMATION_TIMEOUT))
+
+def _record(votes):
+    """Store the outcome of a chain round trip for claimed votes"""
+    with transaction.atomic():
+        for vote in votes:
+            vote.save(update_fields=SAVE_FIELDS)
+
+def _submit(vote, service, now):
+    """Send a pending vote's transaction"""
+    try:
+        payload = vote_chain_payload(vote)
+    except (ValueError, TypeError) as e:
+        _fail(vote, str(e), now)
+        return
+
+    # A previous attempt may have landed without its hash being recorded
+    if service.verify_vote(payload[3]):
+        _mark_confirmed(vote, now)
+        return
+
+    success, result = service.submit_vote(*payload)
+    if not success:
+        _schedule_retry(vote, result, now)
+        return
+    _mark_submitted(vote, result, now)
+
+def _confirm(vote, service, now):
+    """Poll a submitted vote's transaction for its receipt"""
+    _apply_receipt(vote, service, now, service.get_transaction_receipt(vote.blockchain_tx_hash))
+
+def _apply_receipt(vote, service, now, receipt, error: str = "Transaction reverted"):
+    """
+    Move a submitted vote on according to its transaction receipt
+
+    Args:
+        vote: Submitted vote
+        service: Chain client
+        now: Current time
+        receipt: {'status', 'block_number'} or None while unmined
+        error: Reason recorded when the receipt shows the ballot was not recorded
+    """
+    if receipt is None:
+        # Dropped transactions are resent once they have been pending too long
+        timeout = _setting('CONFIRMATION_TIMEOUT', DEFAULT_CONFIRMATION_TIMEOUT)
+        if vote.submitted_at is None or now - vote.submitted_at > timedelta(seconds=timeout):
+            _schedule_retry(vote, "Transaction was not mined in time", now)
+        else:
+            vote.next_submission_at = now + timedelta(seconds=_setting('POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
+        return
+    if not receipt['status']:
+        if service.verify_vote('0x' + vote.vote_hash):
+            # An earlier send of the same ballot landed first, so this duplicate was refused
+            _mark_confirmed(vote, now)
+            return
+        # A reverted castVote (closed election, double vote) fails the same way every time
+        _fail(vote, error, now)
+        return
+    _mark_confirmed(vote, now, receipt['block_number'])
+
+def process_vote(vote_id: int, service=None) -> Tuple[Optional[str], Optional[object]]:
+    """
+    Advance one vote through the pipeline by a single step, if it is due
+
+    Args:
+        vote_id: Vote to process
+        service: Chain client (defaults to get_blockchain_service())
+
+    Returns:
+        Tuple of (submission status after the step, or None if the vote is
+        gone, and when the vote is next due, or None when it is final)
+    """
+    from .models import Vote
+
+    with transaction.atomic():
+        vote = (
+            Vote.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('election', 'voter')
+            .filter(id=vote_id)
+            .first()
+        )
+        if vote is None:
+            # Either deleted or another worker holds it right now
+            current = Vote.objects.filter(id=vote_id).values_list('submission_status', 'next_submission_at').first()
+            return current if current else (None, None)
+
+        now = timezone.now()
+        if vote.submission_status not in IN_FLIGHT or (vote.next_submission_at and vote.next_submission_at > now):
+            return vote.submission_status, vote.next_submission_at
+        if vote.election.uses_merkle_anchoring:
+            return vote.submission_status, None
+        lease = _lease_until(now)
+        Vote.objects.filter(id=vote.id).update(next_submission_at=lease)
+
+    # The chain round trip runs with no transaction open and no row locked
+    service = service or get_blockchain_service()
+    status = vote.submission_status
+    if vote.submission_status == PENDING:
+        _submit(vote, service, now)
+    else:
+        _confirm(vote, service, now)
+    try:
+        _record([vote])
+    except Exception:
+        logger.exception("Could not record the submission outcome of vote %s; it is retried once its lease ends",
+                         vote.id)
+        return status, lease
+    return vote.submission_status, vote.next_submission_at
+
+def drive_vote(vote_id: int, service=None, timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Process a vote step by step, sleeping between steps, until it is final or timeout passes
+
+    Args:
+        vote_id: Vote to process
+        service: Chain client (defaults to one built on first use)
+        timeout: Give up after this many seconds (defaults to CONFIRMATION_TIMEOUT);
+            a poller picks the vote up later
+
+    Returns:
+        Submission status when the loop stopped
+    """
+    timeout = _setting('CONFIRMATION_TIMEOUT', DEFAULT_CONFIRMATION_TIMEOUT) if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    service = service or get_blockchain_service()
+    while True:
+        status, due = process_vote(vote_id, service)
+        if status not in IN_FLIGHT or due is None:
+            return status
+        wait = max((due - timezone.now()).total_seconds(), 0.0)
+        if time.monotonic() + wait > deadline:
+            return status
+        time.sleep(wait)
+
+def process_due_votes(limit: Optional[int] = None, service=None) -> Dict[str, int]:
+    """
+    Run one step for every vote that is due, oldest first
+
+    Args:
+        limit: Most votes processed (defaults to VOTE_SUBMISSION['BATCH_SIZE'])
+        service: Chain client (defaults to one built on first use)
+
+    Returns:
+        Dict counting the resulting submission statuses
+    """
+    from django.db.models import Q
+    from .models import Vote
+
+    if _setting('RELAYER', False):
+        return process_relayed_votes(limit, service)
+
+    limit = limit or _setting('BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    now = timezone.now()
+    vote_ids = list(
+        Vote.objects.filter(submission_status__in=IN_FLIGHT)
+        .exclude(election__chain_anchoring='merkle_root')
+        .filter(Q(next_submission_at__isnull=True) | Q(next_submission_at__lte=now))
+        .order_by('id')
+        .values_list('id', flat=True)[:limit]
+    )
+    counts: Dict[str, int] = {}
+    if vote_ids:
+        service = service or get_blockchain_service()
+    for vote_id in vote_ids:
+        status, _ = process_vote(vote_id, service)
+        if status is not None:
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+def relay_ballot(vote, contract_address: str):
+    """
+    Sign a stored ballot with its voter's key for castVotesBatch
+
+    Args:
+        vote: Vote with its election and voter
+        contract_address: Address of the VotingContract
+
+    Returns:
+        relayer.RelayedBallot, queued at the vote's creation time
+    """
+    from .relayer import sign_ballot
+
+    election_id, _, encrypted_vote, vote_hash = vote_chain_payload(vote)
+    if not getattr(vote.voter, 'blockchain_private_key', None):
+        raise ValueError("Vote has no voter key to sign the relayed ballot")
+    return sign_ballot(vote.voter.blockchain_private_key, contract_address, election_id, encrypted_vote,
+                       vote_hash, queued_at=vote.created_at.timestamp())
+
+def process_relayed_votes(limit: Optional[int] = None, service=None) -> Dict[str, int]:
+    """
+    Run one relayer pass: confirm sent batches, then batch and send due ballots
+
+    Submitted votes are grouped by batch transaction, so each batch costs a
+    single receipt lookup. Pending ballots are signed with their voters'
+    keys and grouped per election; an election's batch is sent once it
+    holds RELAY_BATCH_SIZE ballots or its oldest ballot is RELAY_MAX_AGE
+    seconds old. Ballots of a partial, younger batch stay pending for the
+    next pass.
+
+    As in process_vote, the votes are claimed and leased in one short
+    transaction, the chain is polled and sent to with none open, and the
+    outcomes are recorded in a second one. If that record fails, the
+    ballots stay leased. Once the lease runs out they are relayed again,
+    and the contract's rejection of the duplicate confirms them.
+
+    Args:
+        limit: Most votes looked at (defaults to VOTE_SUBMISSION['BATCH_SIZE'])
+        service: Chain client (defaults to one built on first use)
+
+    Returns:
+        Dict counting the resulting submission statuses of the votes changed
+    """
+    from django.db.models import Q
+    from .models import Vote
+    from .relayer import DEFAULT_MAX_BATCH_AGE, DEFAULT_MAX_BATCH_SIZE, VoteBatcher, rejection_reason
+
+    limit = limit or _setting('BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    service = service or get_blockchain_service()
+    with transaction.atomic():
+        now = timezone.now()
+        votes = list(
+            Vote.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('election', 'voter')
+            .filter(submission_status__in=IN_FLIGHT)
+            .exclude(election__chain_anchoring='merkle_root')
+            .filter(Q(next_submission_at__isnull=True) | Q(next_submission_at__lte=now))
+            .order_by('id')[:limit]
+        )
+        # Leased until the outcome is recorded; ballots of a batch held back get their due time back then
+        Vote.objects.filter(id__in=[vote.id for vote in votes]).update(next_submission_at=_lease_until(now))
+
+    # Receipt polls and batch sends run with no transaction open and no row locked
+    changed = []
+    batches: Dict[str, list] = {}
+    for vote in votes:
+        if vote.submission_status == SUBMITTED:
+            batches.setdefault(vote.blockchain_tx_hash, []).append(vote)
+    for tx_hash, group in batches.items():
+        results = service.get_batch_results(tx_hash)
+        for vote in group:
+            if results is None:
+                _apply_receipt(vote, service, now, None)
+                continue
+            code = results['ballots'].get(vote.vote_hash) if results['status'] else None
+            receipt = {'status': code == 0, 'block_number': results['block_number']}
+            if not results['status']:
+                error = "Transaction reverted"
+            elif code is None:
+                error = "Ballot missing from batch"
+            else:
+                error = rejection_reason(code)
+            _apply_receipt(vote, service, now, receipt, error=error)
+        changed.extend(group)
+
+    batcher = VoteBatcher(
+        service.submit_vote_batch,
+        max_size=_setting('RELAY_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE),
+        max_age=_setting('RELAY_MAX_AGE', DEFAULT_MAX_BATCH_AGE),
+        clock=now.timestamp,
+    )
+    by_hash = {}
+    sent = []
+    for vote in votes:
+        if vote.submission_status != PENDING or vote in changed:
+            continue
+        try:
+            ballot = relay_ballot(vote, service.contract_address)
+        except (ValueError, TypeError) as e:
+            _fail(vote, str(e), now)
+            changed.append(vote)
+            continue
+        by_hash[ballot.vote_hash] = vote
+        sent.extend(batcher.add(vote.election_id, ballot))
+    sent.extend(batcher.flush_due())
+    for batch in sent:
+        for ballot in batch.ballots:
+            vote = by_hash[ballot.vote_hash]
+            if batch.success:
+                _mark_submitted(vote, batch.result, now)
+            else:
+                _schedule_retry(vote, batch.result, now)
+            changed.append(vote)
+
+    try:
+        _record(votes)
+    except Exception:
+        logger.exception("Could not record relayed batches %s; their votes are retried once their lease ends",
+                         sorted({batch.result for batch in sent if batch.success}))
+        return {}
+    counts: Dict[str, int] = {}
+    for vote in changed:
+        counts[vote.submission_status] = counts.get(vote.submission_status, 0) + 1
+    return counts
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_setting('THREAD_WORKERS', 4), thread_name_prefix='vote-submission'
+            )
+        return _executor
+
+def _drive_in_thread(vote_id: int):
+    from django.db import close_old_connections
+    try:
+        drive_vote(vote_id)
+    except Exception:
+        logger.exception("Submitting vote %s failed; it stays queued for the next poll", vote_id)
+    finally:
+        close_old_connections()
+
+def dispatch(vote_id: int):
+    """Hand a queued vote to the configured worker backend (best effort; the row stays queued regardless)"""
+    backend = _setting('BACKEND', DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vote submission backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    if _setting('RELAYER', False):
+        # Relayed ballots are batched by the polling worker
+        return
+    try:
+        if backend == 'celery':
+            from .tasks import process_vote_submission
+            process_vote_submission.delay(vote_id)
+        elif backend == 'thread':
+            _get_executor().submit(_drive_in_thread, vote_id)
+        elif backend == 'inline':
+            process_vote(vote_id)
+        # 'database': the process_vote_submissions worker polls for due votes
+    except Exception:
+        logger.exception("Could not dispatch vote %s; it stays queued for the next poll", vote_id)
+
+def store_pending_vote(election, voter, **ballot):
+    """
+    Save a voter's ballot as pending and queue it, inside the caller's transaction
+
+    A voter whose earlier ballot ran out of submission attempts may vote
+    again: the failed row is reused for the new ballot, since a voter has
+    one row per election.
+
+    Args:
+        election: Election voted in
+        voter: Voting user
+        **ballot: Vote fields of the new ballot (encrypted_vote, vote_hash, ...)
+
+    Returns:
+        The pending Vote, or None if the voter already has a ballot that is
+        queued, on its way or counted
+    """
+    from .models import Vote
+
+    existing = Vote.objects.select_for_update().filter(election=election, voter=voter).first()
+    if existing is None:
+        vote = Vote(election=election, voter=voter)
+    elif existing.submission_status == FAILED:
+        vote = existing
+        vote.created_at = timezone.now()
+    else:
+        return None
+    fields = dict(
+        is_valid=True,
+        validation_errors=[],
+        submission_status=PENDING,
+        submission_attempts=0,
+        submission_error='',
+        next_submission_at=timezone.now(),
+        submitted_at=None,
+        blockchain_tx_hash=None,
+        blockchain_block_number=None,
+        confirmed_at=None,
+        anchor=None,
+        anchor_leaf_index=None,
+        folded_into_tally=False,
+    )
+    fields.update(ballot)
+    for name, value in fields.items():
+        setattr(vote, name, value)
+    vote.save()
+    enqueue_vote(vote)
+    return vote
+
+def enqueue_vote(vote):
+    """
+    Queue a stored ballot for chain submission once the current transaction commits
+
+    Args:
+        vote: Vote saved with submission_status 'pending'
+    """
+    if vote.election.uses_merkle_anchoring:
+        # Picked up by the next anchoring pass
+        return
+    transaction.on_commit(lambda: dispatch(vote.id))
+
+def submission_receipt(vote) -> dict:
+    """
+    Describe a vote's submission state for its voter
+
+    Args:
+        vote: Vote to describe
+
+    Returns:
+        Dict with the vote hash, status, attempts, last error and, once
+        known, the transaction hash, block number and confirmation time,
+        plus the Merkle inclusion proof of an anchored vote
+    """
+    return {
+        'vote_hash': vote.vote_hash,
+        'election_id': vote.election_id,
+        'status': vote.submission_status,
+        'attempts': vote.submission_attempts,
+        'error': vote.submission_error or None,
+        'transaction_hash': vote.blockchain_tx_hash,
+        'submitted_at': vote.submitted_at.isoformat() if vote.submitted_at else None,
+        'block_number': vote.blockchain_block_number,
+        'confirmed_at': vote.confirmed_at.isoformat() if vote.confirmed_at else None,
+        'next_attempt_at': vote.next_submission_at.isoformat() if vote.next_submission_at else None,
+        'inclusion_proof': vote.get_inclusion_proof(),
+    }
@@ -0,0 +1,609 @@
+"""
+Streaming Encrypted Tally
+
+This module provides:
+- Single-pass parsing of stored votes read through a server-side cursor
+- Routing of each ciphertext to a per-candidate (or packed) accumulator
+- Batch validity checks of every chunk before its votes are counted
+- Batch verification of ballot proofs, in the workers that reduce the chunks
+- Optional fan-out of vote chunks to the shared worker pool
+- One decryption per accumulator at the end of the tally
+- Sharded running tallies folded from accepted votes in background batches
+
+Votes are read as (id, encrypted_vote, encrypted_vote_data, validity_proof)
+rows in fixed-size chunks, so memory is bounded by the chunk size and the
+number of candidates rather than by the size of the election. Every
+ciphertext is parsed exactly once: binary records are read straight from the
+row buffer, and only legacy rows still go through JSON and hex parsing.
+
+The running tally keeps N EncryptedTallyShard rows per election. A background
+fold step takes a batch of accepted but unfolded votes, reduces them to
+per-candidate products and multiplies those into one shard row; concurrent
+folders pick different shards, so no single row becomes a hot spot. At close
+of polls only the remaining unfolded votes and the N shards are combined
+before decryption, so publishing results no longer scales with vote volume.
+Because ciphertext multiplication is commutative, the combined shards equal
+the product a full recount produces, which makes the two cheap to compare.
+
+Elections on another cryptosystem (EC-ElGamal) take a sequential path that
+only uses the Cryptosystem interface: decode, validate, aggregate per
+candidate, decrypt. Sharded running tallies are Paillier-only.
+"""
+
+import json
+import random
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from apps.encryption.aggregation import TreeReducer
+from apps.encryption.arithmetic import get_backend
+from apps.encryption.parallel import chunked, get_process_pool, max_workers
+from apps.encryption.proofs import verify_membership_proofs
+from apps.encryption.serialization import CiphertextCodec
+from apps.encryption.validation import CiphertextValidator
+
+DEFAULT_TALLY_CHUNK_SIZE = 2000
+DEFAULT_TALLY_SHARDS = 8
+DEFAULT_FOLD_BATCH_SIZE = 500
+PACKED_ACCUMULATOR = 'packed'
+INVALID_CIPHERTEXT = "Ciphertext is out of range or shares a factor with n"
+INVALID_PROOF = "Ballot validity proof is missing or invalid"
+INVALID_ENCRYPTION = "Ciphertext is not a valid encryption under the election key"
+
+def tally_settings() -> dict:
+    """Read ELECTION_TALLY from settings"""
+    from django.conf import settings
+    return dict(getattr(settings, 'ELECTION_TALLY', {}) or {})
+
+def parse_vote_payload(data) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Parse stored encrypted vote data
+
+    Args:
+        data: JSON payload, hex string or decimal string from Vote.encrypted_vote_data
+
+    Returns:
+        Tuple of (ciphertext or None when it is stored in binary,
+        candidate_id or None for packed/legacy votes)
+    """
+    candidate_id = None
+    if isinstance(data, str) and data.startswith('{'):
+        payload = json.loads(data)
+        data = payload.get('encrypted_vote')
+        if payload.get('candidate_id') is not None:
+            candidate_id = str(payload['candidate_id'])
+        if data is None:
+            return None, candidate_id
+    if isinstance(data, str):
+        data = int(data, 16) if data.startswith('0x') else int(data)
+    return int(data), candidate_id
+
+def _picklable_rows(rows: List[tuple]) -> List[tuple]:
+    """Copy memoryview columns (as returned by some database drivers) to bytes for worker processes"""
+    return [
+        (vote_id, bytes(record) if isinstance(record, memoryview) else record, data, proof)
+        for vote_id, record, data, proof in rows
+    ]
+
+def proof_requirements(election, public_key) -> Optional[Tuple[Tuple[int, int], List[int], bytes]]:
+    """
+    Get what ballot proofs are checked against, or None if the election does not require them
+
+    Args:
+        election: Election being tallied
+        public_key: Its public key (n, g) as integers
+
+    Returns:
+        Tuple of (public key, allowed values, proof context) or None
+    """
+    if not election.require_ballot_proofs:
+        return None
+    return tuple(public_key), election.get_ballot_values(), election.proof_context
+
+def _multiply_by_key(entries: List[tuple], modulus, arith) -> Tuple[dict, Dict[str, int]]:
+    """Multiply (vote_id, key, ciphertext, proof) entries into one product per key"""
+    products = {}
+    counts = {}
+    for _, key, ciphertext, _ in entries:
+        ciphertext = arith.mpz(ciphertext)
+        if key in products:
+            products[key] = arith.mulmod(products[key], ciphertext, modulus)
+            counts[key] += 1
+        else:
+            products[key] = ciphertext
+            counts[key] = 1
+    return products, counts
+
+def _reduce_vote_chunk(rows: List[tuple], n: int, backend_name: str, packed: bool,
+                       proof_check: Optional[tuple] = None, s: int = 1
+                       ) -> Tuple[Dict[str, int], Dict[str, int], List[Tuple[int, str]]]:
+    """Worker-process entry point: parse and validate a chunk of vote rows into per-accumulator products"""
+    arith = get_backend(backend_name)
+    codec = CiphertextCodec(n, s)
+    validator = CiphertextValidator(n, backend=arith, s=s)
+    modulus = arith.mpz(n) ** (s + 1)
+    entries = []
+    errors = []
+    for vote_id, record, data, proof in rows:
+        try:
+            if record is not None and packed:
+                # Packed ballots carry no metadata worth parsing
+                ciphertext, candidate_id = int.from_bytes(codec.view(record), 'big'), None
+            else:
+                ciphertext, candidate_id = parse_vote_payload(data)
+                if record is not None:
+                    ciphertext = int.from_bytes(codec.view(record), 'big')
+                elif ciphertext is None:
+                    raise ValueError("Vote has no ciphertext")
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append((vote_id, str(e)))
+            continue
+
+        key = PACKED_ACCUMULATOR if packed else candidate_id
+        if key is None:
+            errors.append((vote_id, "Vote has no candidate_id"))
+            continue
+        if not validator.in_range(ciphertext):
+            errors.append((vote_id, INVALID_CIPHERTEXT))
+            continue
+        entries.append((vote_id, key, ciphertext, proof))
+
+    if proof_check is not None:
+        # Batch-verify the chunk's ballot proofs; only failing sub-batches are checked one by one
+        public_key, allowed_values, context = proof_check
+        invalid = set(verify_membership_proofs(
+            [(ciphertext, proof, context) for _, _, ciphertext, proof in entries],
+            public_key, allowed_values, parallel=False, backend=arith, s=s
+        ))
+        errors.extend((entries[i][0], INVALID_PROOF) for i in sorted(invalid))
+        entries = [entry for i, entry in enumerate(entries) if i not in invalid]
+
+    products, counts = _multiply_by_key(entries, modulus, arith)
+
+    # The products mod n^(s+1) reduce to the chunk's product mod n, so one gcd
+    # checks every ciphertext in the chunk; search only if it fails
+    if not validator.is_coprime(validator.product_mod_n(products.values())):
+        invalid = set(validator.invalid_indices(entry[2] for entry in entries))
+        errors.extend((entries[i][0], INVALID_CIPHERTEXT) for i in sorted(invalid))
+        entries = [entry for i, entry in enumerate(entries) if i not in invalid]
+        products, counts = _multiply_by_key(entries, modulus, arith)
+
+    return {key: arith.to_int(value) for key, value in products.items()}, counts, errors
+
+def _aggregate_vote_chunk(rows: List[tuple], cryptosystem, public_key
+                          ) -> Tuple[Dict[str, object], Dict[str, int], List[Tuple[int, str]]]:
+    """Parse, validate and aggregate a chunk of vote rows through the Cryptosystem interface"""
+    entries = []
+    errors = []
+    for vote_id, record, data, _ in rows:
+        try:
+            _, candidate_id = parse_vote_payload(data)
+            if record is None:
+                raise ValueError("Vote has no ciphertext")
+            ciphertext = cryptosystem.decode_ciphertext(record, public_key)
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append((vote_id, str(e)))
+            continue
+        if candidate_id is None:
+            errors.append((vote_id, "Vote has no candidate_id"))
+            continue
+        entries.append((vote_id, candidate_id, ciphertext))
+
+    invalid = set(cryptosystem.invalid_ciphertexts([entry[2] for entry in entries], public_key))
+    errors.extend((entries[i][0], INVALID_ENCRYPTION) for i in sorted(invalid))
+
+    by_key: Dict[str, list] = {}
+    for i, (_, key, ciphertext) in enumerate(entries):
+        if i not in invalid:
+            by_key.setdefault(key, []).append(ciphertext)
+    totals = {key: cryptosystem.aggregate(ciphertexts, public_key) for key, ciphertexts in by_key.items()}
+    return totals, {key: len(ciphertexts) for key, ciphertexts in by_key.items()}, errors
+
+def stored_key_pair(election):
+    """
+    Get the election's stored key pair for decryption, or None if it has none
+
+    Paillier key pairs come from the key context cache, which also holds
+    their decryption constants; other cryptosystems parse the stored key.
+    """
+    if not election.has_private_key:
+        return None
+    if election.uses_paillier:
+        return election.get_key_context(private=True).key_pair
+    return election.get_key_pair()
+
+def decrypt_totals(election, totals: Dict[str, int], key_pair, paillier) -> Tuple[Dict[str, int], int, List[str]]:
+    """
+    Decrypt encrypted accumulators once each and map them onto the candidates
+
+    Args:
+        election: Election the totals belong to
+        totals: Dict mapping candidate id (or 'packed') to an encrypted total
+        key_pair: Key pair used to decrypt
+        paillier: Cryptosystem instance used to decrypt
+
+    Returns:
+        Tuple of (candidate_results keyed by candidate id, total_votes,
+        accumulator keys that matched no candidate)
+    """
+    candidate_ids = [str(cid) for cid in election.get_candidates().values_list('id', flat=True)]
+    candidate_results = {cid: 0 for cid in candidate_ids}
+    unknown = []
+
+    if election.uses_packed_ballots:
+        if PACKED_ACCUMULATOR in totals:
+            plaintext = paillier.decrypt(totals[PACKED_ACCUMULATOR], key_pair)
+            counts = election.get_ballot_packer().unpack(plaintext)
+            candidate_results = dict(zip(candidate_ids, counts))
+    else:
+        for cid, ciphertext in totals.items():
+            if cid not in candidate_results:
+                unknown.append(cid)
+                continue
+            candidate_results[cid] = paillier.decrypt(ciphertext, key_pair)
+
+    return candidate_results, sum(candidate_results.values()), unknown
+
+class StreamingTally:
+    """Single-pass homomorphic tally of an election's stored votes"""
+
+    def __init__(self, election, key_pair=None, chunk_size: int = DEFAULT_TALLY_CHUNK_SIZE,
+                 parallel: Optional[bool] = None, paillier=None, backend: Optional[object] = None):
+        """
+        Initialize a streaming tally
+
+        Args:
+            election: Election whose valid votes are tallied
+            key_pair: Key pair used to decrypt (defaults to the election's stored key)
+            chunk_size: Votes fetched from the cursor and reduced per task
+            parallel: Force (True) or prevent (False) worker fan-out; None uses
+                workers once the election turns out to be longer than one chunk
+            paillier: Encryption scheme used to decrypt (defaults to the election's)
+            backend: Arithmetic backend name or instance
+        """
+        self.election = election
+        # Accumulating only needs n; the private key is first used by decrypt()
+        if key_pair is None:
+            key_pair = stored_key_pair(election)
+        self.key_pair = key_pair
+        if self.key_pair is not None:
+            public_key = self.key_pair.public_key
+        elif election.has_public_key:
+            public_key = election.get_public_key()
+        else:
+            raise ValueError(f"Election '{election.title}' has no key pair to tally with")
+
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.paillier = paillier or election.get_encryption(backend=backend)
+        self.backend = get_backend(backend)
+        self.public_key = public_key
+        self.packed = election.uses_packed_ballots
+        # Non-Paillier elections are reduced through the Cryptosystem interface
+        self.generic = not election.uses_paillier
+        if self.generic:
+            self.n = None
+            self.proof_check = None
+        else:
+            self.n = int(public_key[0])
+            self.s = election.damgard_jurik_s
+            self.modulus = self.n ** (self.s + 1)
+            self.proof_check = proof_requirements(election, public_key)
+
+        self._partials: Dict[str, list] = {}
+        self._reducers: Dict[str, TreeReducer] = {}
+        self.ballot_counts: Dict[str, int] = {}
+        self.errors: List[Tuple[int, str]] = []
+
+    def vote_rows(self) -> Iterable[tuple]:
+        """
+        Stream the election's valid votes as (id, encrypted_vote, encrypted_vote_data, validity_proof) rows
+
+        Returns:
+            Iterator over rows, fetched chunk_size at a time
+        """
+        from .models import Vote
+
+        # Drop the default ordering so the database does not sort the whole table.
+        # Ballots still on their way to the chain are counted once confirmed.
+        return (
+            Vote.objects.filter(election=self.election, is_valid=True, submission_status='confirmed')
+            .order_by()
+            .values_list('id', 'encrypted_vote', 'encrypted_vote_data', 'validity_proof')
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+    def _merge(self, result):
+        """Fold one reduced chunk into the running accumulators"""
+        products, counts, errors = result
+        if self.generic:
+            for key, total in products.items():
+                self._partials.setdefault(key, []).append(total)
+                self.ballot_counts[key] = self.ballot_counts.get(key, 0) + counts[key]
+            self.errors.extend(errors)
+            return
+        for key, product in products.items():
+            if key not in self._reducers:
+                self._reducers[key] = TreeReducer(self.modulus, backend=self.backend)
+                self.ballot_counts[key] = 0
+            self._reducers[key].add(product)
+            self.ballot_counts[key] += counts[key]
+        self.errors.extend(errors)
+
+    def accumulate(self, rows: Optional[Iterable[tuple]] = None) -> Dict[str, int]:
+        """
+        Read every vote once and build the encrypted totals
+
+        Args:
+            rows: (id, encrypted_vote, encrypted_vote_data, validity_proof) rows; defaults to vote_rows()
+
+        Returns:
+            Dict mapping candidate id (or 'packed') to its encrypted total
+        """
+        rows = self.vote_rows() if rows is None else rows
+        chunks = chunked(rows, self.chunk_size)
+        if self.generic:
+            for chunk in chunks:
+                self._merge(_aggregate_vote_chunk(chunk, self.paillier, self.public_key))
+            return self.encrypted_totals()
+        first = next(chunks, None)
+        if first is not None:
+            parallel = self.parallel
+            if parallel is None:
+                parallel = len(first) == self.chunk_size
+            args = (self.n, self.backend.name, self.packed, self.proof_check, self.s)
+
+            if not parallel:
+                self._merge(_reduce_vote_chunk(first, *args))
+                for chunk in chunks:
+                    self._merge(_reduce_vote_chunk(chunk, *args))
+            else:
+                # Keep a bounded number of chunks in flight so memory stays flat
+                pool = get_process_pool()
+                max_in_flight = max_workers() * 2
+                in_flight = deque([pool.submit(_reduce_vote_chunk, _picklable_rows(first), *args)])
+                for chunk in chunks:
+                    in_flight.append(pool.submit(_reduce_vote_chunk, _picklable_rows(chunk), *args))
+                    if len(in_flight) >= max_in_flight:
+                        self._merge(in_flight.popleft().result())
+                while in_flight:
+                    self._merge(in_flight.popleft().result())
+
+        return self.encrypted_totals()
+
+    def encrypted_totals(self) -> Dict[str, int]:
+        """
+        Get the encrypted total of each accumulator
+
+        Returns:
+            Dict mapping candidate id (or 'packed') to its encrypted total
+        """
+        if self.generic:
+            return {key: self.paillier.aggregate(partials, self.public_key)
+                    for key, partials in self._partials.items()}
+        return {key: self.backend.to_int(reducer.result()) for key, reducer in self._reducers.items()}
+
+    def stored_totals(self) -> Dict[str, str]:
+        """
+        Get the encrypted totals as text for ElectionResult.encrypted_candidate_votes
+
+        Returns:
+            Dict mapping accumulator keys to decimal ciphertexts, or hex records for non-Paillier elections
+        """
+        if self.generic:
+            return {key: self.paillier.encode_ciphertext(total, self.public_key).hex()
+                    for key, total in self.encrypted_totals().items()}
+        return {key: str(value) for key, value in self.encrypted_totals().items()}
+
+    def decrypt(self) -> Tuple[Dict[str, int], int]:
+        """
+        Decrypt each accumulator once and map the totals onto the candidates
+
+        Returns:
+            Tuple of (candidate_results keyed by candidate id, total_votes)
+        """
+        if self.key_pair is None:
+            raise ValueError(f"Election '{self.election.title}' has no private key to decrypt with")
+        candidate_results, total_votes, unknown = decrypt_totals(
+            self.election, self.encrypted_totals(), self.key_pair, self.paillier
+        )
+        self.errors.extend((None, f"Votes reference unknown candidate {cid}") for cid in unknown)
+        return candidate_results, total_votes
+
+    def run(self) -> Tuple[Dict[str, int], int]:
+        """
+        Stream, accumulate and decrypt the election's votes
+
+        Returns:
+            Tuple of (candidate_results keyed by candidate id, total_votes)
+        """
+        self.accumulate()
+        return self.decrypt()
+
+class ShardedTally:
+    """Running encrypted tally kept in N shard rows per election"""
+
+    def __init__(self, election, num_shards: Optional[int] = None, batch_size: Optional[int] = None,
+                 backend: Optional[object] = None):
+        """
+        Initialize a sharded tally
+
+        Args:
+            election: Election whose votes are folded
+            num_shards: Shard rows per election
+            batch_size: Votes folded per transaction
+            backend: Arithmetic backend name or instance
+        """
+        if not election.uses_paillier:
+            raise ValueError(f"Election '{election.title}' does not use Paillier; sharded tallies need it")
+        if not election.public_key_n:
+            raise ValueError(f"Election '{election.title}' has no public key to tally with")
+
+        config = tally_settings()
+        self.election = election
+        self.num_shards = num_shards or config.get('SHARDS', DEFAULT_TALLY_SHARDS)
+        self.batch_size = batch_size or config.get('FOLD_BATCH_SIZE', DEFAULT_FOLD_BATCH_SIZE)
+        self.backend = get_backend(backend)
+        key_context = election.get_key_context()
+        self.n = key_context.public_key[0]
+        self.s = key_context.s
+        self.modulus = int(key_context.modulus)
+        self.proof_check = proof_requirements(election, key_context.public_key)
+        self.errors: List[Tuple[int, str]] = []
+
+    def _pending_votes(self):
+        from .models import Vote
+        # Only confirmed ballots are folded, so a vote that later fails submission never reaches a shard
+        return Vote.objects.filter(
+            election=self.election, is_valid=True, submission_status='confirmed', folded_into_tally=False
+        )
+
+    def fold_batch(self) -> int:
+        """
+        Fold one batch of pending votes into a randomly chosen shard
+
+        Returns:
+            int: Number of votes taken off the pending queue (0 when none are left)
+        """
+        from django.db import transaction
+        from .models import EncryptedTallyShard, Vote
+
+        with transaction.atomic():
+            # Lock the batch so concurrent folders never fold the same vote twice
+            rows = list(
+                self._pending_votes()
+                .select_for_update(skip_locked=True)
+                .order_by('id')
+                .values_list('id', 'encrypted_vote', 'encrypted_vote_data', 'validity_proof')[:self.batch_size]
+            )
+            if not rows:
+                return 0
+
+            products, counts, errors = _reduce_vote_chunk(
+                rows, self.n, self.backend.name, self.election.uses_packed_ballots, self.proof_check, self.s
+            )
+            self.errors.extend(errors)
+
+            shard, _ = EncryptedTallyShard.objects.select_for_update().get_or_create(
+                election=self.election, shard_index=random.randrange(self.num_shards)
+            )
+            arith = self.backend
+            modulus = arith.mpz(self.modulus)
+            totals = dict(shard.encrypted_totals)
+            for key, product in products.items():
+                if key in totals:
+                    product = arith.mulmod(arith.mpz(int(totals[key])), arith.mpz(product), modulus)
+                totals[key] = str(arith.to_int(product))
+            shard.encrypted_totals = totals
+            shard.ballot_count += sum(counts.values())
+            shard.save(update_fields=['encrypted_totals', 'ballot_count', 'updated_at'])
+
+            # Unparseable votes are taken off the queue too; a recount skips them as well
+            Vote.objects.filter(id__in=[row[0] for row in rows]).update(folded_into_tally=True)
+        return len(rows)
+
+    def fold_pending(self, max_batches: Optional[int] = None) -> int:
+        """
+        Fold pending votes batch by batch
+
+        Args:
+            max_batches: Stop after this many batches (None drains the queue)
+
+        Returns:
+            int: Number of votes folded
+        """
+        folded = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.fold_batch()
+            if not count:
+                break
+            folded += count
+            batches += 1
+        return folded
+
+    def combine(self) -> Tuple[Dict[str, int], int]:
+        """
+        Multiply the election's shards together
+
+        Returns:
+            Tuple of (encrypted totals keyed by candidate id or 'packed', ballot count)
+        """
+        from .models import EncryptedTallyShard
+
+        reducers: Dict[str, TreeReducer] = {}
+        ballot_count = 0
+        for totals, count in EncryptedTallyShard.objects.filter(election=self.election).values_list(
+                'encrypted_totals', 'ballot_count'):
+            ballot_count += count
+            for key, ciphertext in totals.items():
+                reducers.setdefault(key, TreeReducer(self.modulus, backend=self.backend)).add(int(ciphertext))
+        totals = {key: self.backend.to_int(reducer.result()) for key, reducer in reducers.items()}
+        return totals, ballot_count
+
+    def publish(self, key_pair=None, paillier=None) -> Tuple[Dict[str, int], int]:
+        """
+        Fold the remaining votes, combine the shards, decrypt and store the result
+
+        Args:
+            key_pair: Key pair used to decrypt (defaults to the election's stored key)
+            paillier: Encryption scheme used to decrypt (defaults to the election's)
+
+        Returns:
+            Tuple of (candidate_results keyed by candidate id, total_votes)
+        """
+        from .models import ElectionResult
+
+        if key_pair is None:
+            key_pair = stored_key_pair(self.election)
+        if key_pair is None:
+            raise ValueError(f"Election '{self.election.title}' has no key pair to tally with")
+        paillier = paillier or self.election.get_encryption(backend=self.backend)
+
+        self.fold_pending()
+        totals, _ = self.combine()
+        candidate_results, total_votes, unknown = decrypt_totals(self.election, totals, key_pair, paillier)
+        self.errors.extend((None, f"Votes reference unknown candidate {cid}") for cid in unknown)
+
+        encrypted_total = 1
+        for ciphertext in totals.values():
+            encrypted_total = (encrypted_total * ciphertext) % self.modulus
+        ElectionResult.objects.update_or_create(
+            election=self.election,
+            defaults={
+                'encrypted_total_votes': str(encrypted_total),
+                'encrypted_candidate_votes': {key: str(value) for key, value in totals.items()},
+                'candidate_results': candidate_results,
+                'total_votes': total_votes,
+            }
+        )
+        return candidate_results, total_votes
+
+    def verify_against_recount(self, chunk_size: int = DEFAULT_TALLY_CHUNK_SIZE) -> bool:
+        """
+        Check the folded shards against a full recount of the folded votes
+
+        Ciphertext products are order-independent, so the combined shards must
+        equal a fresh streaming product over the same votes exactly; no
+        decryption is needed.
+
+        Args:
+            chunk_size: Votes fetched from the cursor per chunk during the recount
+
+        Returns:
+            bool: True if every accumulator and the ballot count match
+        """
+        from .models import Vote
+
+        totals, ballot_count = self.combine()
+        recount = StreamingTally(self.election, chunk_size=chunk_size, backend=self.backend)
+        folded_rows = (
+            Vote.objects.filter(
+                election=self.election, is_valid=True, submission_status='confirmed', folded_into_tally=True
+            )
+            .order_by()
+            .values_list('id', 'encrypted_vote', 'encrypted_vote_data', 'validity_proof')
+            .iterator(chunk_size=chunk_size)
+        )
+        recounted = recount.accumulate(folded_rows)
+        return recounted == totals and sum(recount.ballot_counts.values()) == ballot_count
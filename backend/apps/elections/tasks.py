@@ -0,0 +1,34 @@
+"""
+Celery tasks for vote submission
+
+This module provides:
+- process_vote_submission: drives one vote through submit and confirm,
+  re-scheduling itself until the vote is confirmed or failed
+- process_due_vote_submissions: a periodic sweep that picks up votes whose
+  task message was lost
+- anchor_vote_roots: the periodic Merkle-root anchoring pass
+"""
+
+from celery import shared_task
+from django.utils import timezone
+
+from .anchoring import run_anchoring
+from .submission import IN_FLIGHT, process_due_votes, process_vote
+
+@shared_task(bind=True, ignore_result=True)
+def process_vote_submission(self, vote_id):
+    """Run one pipeline step for a vote and schedule the next one"""
+    status, due = process_vote(vote_id)
+    if status in IN_FLIGHT and due is not None:
+        countdown = max((due - timezone.now()).total_seconds(), 0.0)
+        self.apply_async((vote_id,), countdown=countdown)
+
+@shared_task(ignore_result=True)
+def process_due_vote_submissions(limit=None):
+    """Run one pipeline step for every due vote"""
+    return process_due_votes(limit=limit)
+
+@shared_task(ignore_result=True)
+def anchor_vote_roots():
+    """Anchor the due votes of every Merkle-anchored election and confirm sent batches"""
+    return run_anchoring()
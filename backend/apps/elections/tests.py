@@ -1,10 +1,36 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from unittest.mock import patch, MagicMock
-from apps.elections.blockchain import BlockchainService
+from django.utils import timezone
+from datetime import timedelta
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+from apps.elections.blockchain import BlockchainService, get_blockchain_client, reset_blockchain_client
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from apps.elections import submission
+from apps.elections.anchoring import anchor_pending_votes, run_anchoring
+from apps.elections.benchmarks import benchmark_merkle, compare_chain_anchoring
+from apps.elections.merkle import MerkleTree, hash_leaf, hash_pair, verify_inclusion
+from apps.elections.nonces import NonceManager
+from apps.elections.relayer import RelayedBallot, VoteBatcher, ballot_digest, recover_ballot_signer, sign_ballot
+from apps.elections.models import Election, Candidate, Vote, ElectionResult, EncryptedTallyShard, VoteAnchor
+from apps.elections.tally import ShardedTally, StreamingTally, parse_vote_payload
 from apps.encryption.paillier import PaillierEncryption, VoteEncryption
+from hexbytes import HexBytes
 from web3 import Web3
 
+try:
+    import eth_tester
+    import solcx
+except ImportError:  # Optional: only needed to run the contract on an in-process EVM
+    eth_tester = solcx = None
+
 User = get_user_model()
 
 class BlockchainIntegrationTest(TestCase):
@@ -46,6 +72,222 @@ class BlockchainIntegrationTest(TestCase):
         self.assertEqual(self.user.username, 'test_blockchain_voter')
         self.assertEqual(self.user.blockchain_address, '0x447588dA5593dA72bdBC607f50C1C87382FdCA58')
 
+class BlockchainClientTest(TestCase):
+    def setUp(self):
+        """Point the shared client at a temporary contract artifact."""
+        self.tmpdir = tempfile.mkdtemp()
+        self.contract_path = os.path.join(self.tmpdir, 'VotingContract.json')
+        self._write_artifact('0x48A82B4612571571936334Df41EDf073b529f8B4')
+        self.settings_override = override_settings(BLOCKCHAIN={
+            'PROVIDER_URL': 'http://127.0.0.1:7545', 'NETWORK_ID': '5777', 'CONTRACT_PATH': self.contract_path,
+            'POOL_SIZE': 4,
+        })
+        self.settings_override.enable()
+        reset_blockchain_client()
+
+    def tearDown(self):
+        reset_blockchain_client()
+        self.settings_override.disable()
+
+    def _write_artifact(self, address, mtime=None):
+        with open(self.contract_path, 'w') as f:
+            json.dump({'abi': [], 'networks': {'5777': {'address': address}}}, f)
+        if mtime is not None:
+            os.utime(self.contract_path, ns=(mtime, mtime))
+
+    def test_services_share_one_client(self):
+        """Services should reuse one connection, contract and keep-alive session."""
+        first, second = BlockchainService(), BlockchainService()
+        self.assertIs(first.client, second.client)
+        self.assertIs(first.contract, second.contract)
+        self.assertEqual(first.client.session.get_adapter('http://127.0.0.1:7545')._pool_maxsize, 4)
+        self.assertEqual(first.admin_account, Web3().eth.account.from_key(settings.ADMIN_PRIVATE_KEY).address)
+
+    def test_reloads_when_artifact_changes(self):
+        """A redeployed contract artifact should be picked up by the next service."""
+        client = get_blockchain_client()
+        self.assertIs(get_blockchain_client(), client)
+        self._write_artifact('0x447588dA5593dA72bdBC607f50C1C87382FdCA58', mtime=client.contract_mtime + 10 ** 9)
+        reloaded = BlockchainService().client
+        self.assertIsNot(reloaded, client)
+        self.assertEqual(reloaded.contract_address, '0x447588dA5593dA72bdBC607f50C1C87382FdCA58')
+        self.assertIsNot(get_blockchain_client(reload=True), reloaded)
+
+class FakeEth:
+    """Minimal node for the nonce manager: counts, signs and accepts raw transactions."""
+
+    def __init__(self, mined=0, pending=None):
+        self.mined = mined
+        self.pending = mined if pending is None else pending
+        self.sent = []
+        self.count_calls = 0
+        self.reject = None
+        self.account = self
+
+    def get_transaction_count(self, account, block_identifier='latest'):
+        self.count_calls += 1
+        return self.mined if block_identifier == 'latest' else self.pending
+
+    def sign_transaction(self, tx, private_key):
+        from types import SimpleNamespace
+        return SimpleNamespace(raw_transaction=json.dumps(tx, sort_keys=True).encode())
+
+    def send_raw_transaction(self, raw):
+        if self.reject:
+            error, self.reject = self.reject, None
+            raise ValueError(error)
+        tx = json.loads(raw)
+        self.sent.append(tx)
+        self.pending = max(self.pending, tx['nonce'] + 1)
+        return HexBytes(Web3.keccak(raw))
+
+class NonceManagerTest(TestCase):
+    def setUp(self):
+        from types import SimpleNamespace
+        self.eth = FakeEth(mined=5)
+        self.now = [0.0]
+        self.nonces = NonceManager(SimpleNamespace(eth=self.eth), stuck_after=60, clock=lambda: self.now[0])
+        self.account = '0x447588dA5593dA72bdBC607f50C1C87382FdCA58'
+
+    def _send(self, **fields):
+        return self.nonces.send(self.account, dict({'gasPrice': 100}, **fields), '0x01')
+
+    def test_allocates_locally_after_one_sync(self):
+        """Back-to-back sends should get consecutive nonces without asking the node each time."""
+        hashes = [self._send(value=i) for i in range(4)]
+        self.assertEqual([tx['nonce'] for tx in self.eth.sent], [5, 6, 7, 8])
+        self.assertEqual(self.eth.count_calls, 2)
+        self.assertEqual(len(set(hashes)), 4)
+        self.assertEqual([r.nonce for r in self.nonces.in_flight(self.account)], [5, 6, 7, 8])
+        self.nonces.mark_mined(hashes[2])
+        self.assertEqual([r.nonce for r in self.nonces.in_flight()], [8])
+
+    def test_resyncs_after_rejected_send(self):
+        """A rejected send should hand its nonce back and re-read the counter from the node."""
+        self._send()
+        self.eth.reject = 'nonce too low'
+        with self.assertRaises(ValueError):
+            self._send()
+        # Another process used nonces 6 and 7 meanwhile
+        self.eth.pending = 8
+        self._send()
+        self.assertEqual([tx['nonce'] for tx in self.eth.sent], [5, 8])
+
+    def test_resync_reuses_nonces_the_node_dropped(self):
+        """Records the node no longer holds should be dropped so their nonces fill the gap."""
+        for _ in range(3):
+            self._send()
+        self.eth.pending = 6
+        self.nonces.resync(self.account)
+        self._send()
+        self.assertEqual(self.eth.sent[-1]['nonce'], 6)
+        self.assertEqual([r.nonce for r in self.nonces.in_flight()], [5, 6])
+
+    def test_replaces_stuck_transaction(self):
+        """The oldest unmined transaction should be re-sent at the same nonce with a higher gas price."""
+        first = self._send()
+        self._send()
+        self.now[0] = 30
+        self.assertEqual(self.nonces.replace_stuck(), [])
+        self.now[0] = 61
+        replaced = self.nonces.replace_stuck()
+        self.assertEqual([r.nonce for r in replaced], [5])
+        self.assertEqual(self.eth.sent[-1]['nonce'], 5)
+        self.assertEqual(self.eth.sent[-1]['gasPrice'], 120)
+        self.assertNotEqual(self.nonces.current_hash(first), first)
+        self.assertEqual(self.nonces.current_hash(first), replaced[0].tx_hash)
+
+        # Once the node has mined it, nothing is replaced and its record is dropped
+        self.eth.mined = 7
+        self.now[0] = 200
+        self.assertEqual(self.nonces.replace_stuck(), [])
+        self.assertEqual(self.nonces.in_flight(), [])
+
+class RelayerTest(TestCase):
+    contract_address = '0x48A82B4612571571936334Df41EDf073b529f8B4'
+    private_key = '0x0ed17026394b4281656acc55a667c779fe602966a48596a8148076ad043c81f5'
+
+    def _ballot(self, index, queued_at=0.0):
+        return sign_ballot(self.private_key, self.contract_address, '7', b'ciphertext %d' % index,
+                           f'{index + 1:064x}', queued_at=queued_at)
+
+    def test_signature_matches_contract_digest(self):
+        """The signed digest should be the tightly packed hash the contract recomputes."""
+        ballot = self._ballot(0)
+        expected = Web3.solidity_keccak(
+            ['address', 'string', 'bytes32', 'bytes32'],
+            [self.contract_address, '7', Web3.keccak(b'ciphertext 0'), bytes.fromhex(f'{1:064x}')],
+        )
+        self.assertEqual(ballot_digest(self.contract_address, '7', ballot.encrypted_vote_hash, ballot.vote_hash),
+                         bytes(expected))
+        self.assertEqual(len(ballot.signature), 65)
+        self.assertEqual(recover_ballot_signer(self.contract_address, '7', ballot), ballot.voter)
+        # Bound to the election
+        self.assertNotEqual(recover_ballot_signer(self.contract_address, '8', ballot), ballot.voter)
+
+    def test_batcher_flushes_by_size_and_age(self):
+        """Full batches should go out immediately and partial ones once their oldest ballot is old enough."""
+        sent = []
+        now = [100.0]
+
+        def send(election_id, ballots):
+            sent.append((election_id, len(ballots)))
+            return True, f'0x{len(sent):064x}'
+
+        batcher = VoteBatcher(send, max_size=3, max_age=10, clock=lambda: now[0])
+        for i in range(2):
+            self.assertEqual(batcher.add('7', self._ballot(i, queued_at=95.0)), [])
+        batcher.add('8', self._ballot(2, queued_at=99.0))
+        flushed = batcher.add('7', self._ballot(3, queued_at=99.0))
+        self.assertEqual([(b.election_id, len(b.ballots), b.success) for b in flushed], [('7', 3, True)])
+        self.assertEqual(batcher.pending_count(), 1)
+
+        self.assertEqual(batcher.flush_due(), [])
+        now[0] = 109.0
+        self.assertEqual([b.election_id for b in batcher.flush_due()], ['8'])
+        self.assertEqual(sent, [('7', 3), ('8', 1)])
+
+        failing = VoteBatcher(lambda election_id, ballots: (False, 'gas too low'), max_size=1)
+        self.assertEqual([(b.success, b.result) for b in failing.add('7', self._ballot(4))], [(False, 'gas too low')])
+
+    @unittest.skipUnless(eth_tester and solcx, "eth-tester[py-evm] and py-solc-x are needed for the in-process EVM")
+    def test_cast_votes_batch_on_evm(self):
+        """castVotesBatch should record signed ballots and reject bad or repeated ones without reverting."""
+        from web3 import EthereumTesterProvider
+
+        source_path = os.path.join(settings.BASE_DIR, '..', 'truffle', 'contracts', 'VotingContract.sol')
+        solcx.install_solc('0.8.0')
+        compiled = solcx.compile_files([source_path], output_values=['abi', 'bin'], solc_version='0.8.0')
+        interface = next(v for k, v in compiled.items() if k.endswith(':VotingContract'))
+
+        w3 = Web3(EthereumTesterProvider())
+        # The relayer pays for gas; voters only sign
+        w3.eth.default_account = w3.eth.accounts[0]
+        tx_hash = w3.eth.contract(abi=interface['abi'], bytecode=interface['bin']).constructor().transact()
+        contract = w3.eth.contract(address=w3.eth.get_transaction_receipt(tx_hash)['contractAddress'],
+                                   abi=interface['abi'])
+        now = w3.eth.get_block('latest')['timestamp']
+        contract.functions.createElection('7', 'Relayed', now + 5, now + 3600).transact()
+        w3.testing.timeTravel(now + 10)
+
+        voters = [Web3().eth.account.create() for _ in range(2)]
+        good = [sign_ballot(voter.key, contract.address, '7', b'ciphertext %d' % i, f'{i + 1:064x}')
+                for i, voter in enumerate(voters)]
+        forged = RelayedBallot(voters[0].address, good[1].encrypted_vote_hash, f'{9:064x}', good[1].signature)
+        repeat = sign_ballot(voters[0].key, contract.address, '7', b'again', f'{10:064x}')
+
+        receipt = w3.eth.get_transaction_receipt(contract.functions.castVotesBatch(
+            '7', [b.as_tuple() for b in good + [forged, repeat]]
+        ).transact({'gas': 2000000}))
+        self.assertEqual(receipt['status'], 1)
+        accepted = [bytes(e['args']['voteHash']) for e in contract.events.VoteCast().process_receipt(receipt)]
+        rejected = {bytes(e['args']['voteHash']): e['args']['reason']
+                    for e in contract.events.VoteRejected().process_receipt(receipt)}
+        self.assertEqual(accepted, [b.vote_hash for b in good])
+        self.assertEqual(rejected, {forged.vote_hash: 1, repeat.vote_hash: 2})
+        self.assertEqual(contract.functions.getElection('7').call()[5], 2)
+        self.assertEqual(contract.functions.getVote(good[0].vote_hash).call()[2], voters[0].address)
+
 class CompleteVotingProcessTest(TestCase):
     def setUp(self):
         """Set up the environment for the complete voting process test."""
@@ -105,4 +347,1067 @@ class CompleteVotingProcessTest(TestCase):
 
         self.assertIsNotNone(vote_hash)
         self.assertTrue(vote_hash.startswith('0x'))
-        self.assertEqual(len(vote_hash), 66) # 0x + 32 bytes hex
\ No newline at end of file
+        self.assertEqual(len(vote_hash), 66) # 0x + 32 bytes hex
+
+class ElectionKeyStorageTest(TestCase):
+    def setUp(self):
+        """Set up an election to store keys on."""
+        self.user = User.objects.create_user(username='key_admin', password='testpassword123')
+        self.election = Election.objects.create(
+            title='Key Storage Election',
+            description='Stores a Paillier key pair',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(hours=1),
+            created_by=self.user,
+        )
+        self.paillier = PaillierEncryption(key_size=512)
+
+    def test_key_pair_round_trip_keeps_crt_factors(self):
+        """A stored key pair should come back with its prime factors and still decrypt."""
+        key_pair = self.paillier.generate_key_pair()
+        self.election.set_key_pair(key_pair)
+        self.election.save()
+
+        restored = Election.objects.get(pk=self.election.pk).get_key_pair()
+        self.assertTrue(restored.has_crt)
+        ciphertext = self.paillier.encrypt(3, restored.public_key)
+        self.assertEqual(self.paillier.decrypt(ciphertext, restored), 3)
+
+    def test_missing_key_pair(self):
+        """Elections without keys should report no key pair."""
+        self.assertFalse(self.election.has_private_key)
+        self.assertIsNone(self.election.get_key_pair())
+
+    def test_ensure_key_pair_takes_from_pool(self):
+        """A new election should claim a pooled key pair and keep it afterwards."""
+        from apps.encryption.keypool import refill_key_pool
+        from apps.encryption.models import PooledKeyPair
+        refill_key_pool(512, target=1, parallel=False)
+
+        key_pair = self.election.ensure_key_pair(512)
+        self.assertFalse(PooledKeyPair.objects.exists())
+        self.assertTrue(self.election.has_private_key)
+        self.assertEqual(self.election.ensure_key_pair(512).n, key_pair.n)
+
+    @override_settings(PAILLIER_KEY_SIZE=512)
+    def test_api_creation_is_admin_only_and_never_generates_keys_inline(self):
+        """Only staff may create elections, and an empty key pool should answer 503 instead of a prime search."""
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from apps.encryption.keypool import refill_key_pool
+        payload = {
+            'title': 'API Election',
+            'description': 'Created over the API',
+            'start_date': timezone.now().isoformat(),
+            'end_date': (timezone.now() + timedelta(hours=1)).isoformat(),
+        }
+        client = APIClient()
+        self.assertIn(client.post(reverse('election-list'), payload, format='json').status_code, (401, 403))
+        client.force_authenticate(self.user)
+        self.assertEqual(client.post(reverse('election-list'), payload, format='json').status_code, 403)
+
+        client.force_authenticate(User.objects.create_user(username='key_staff', password='testpassword123',
+                                                           is_staff=True))
+        with patch('apps.encryption.keypool.PaillierEncryption.generate_key_pair') as generate:
+            response = client.post(reverse('election-list'), payload, format='json')
+        self.assertEqual(response.status_code, 503)
+        generate.assert_not_called()
+        self.assertFalse(Election.objects.filter(title='API Election').exists())
+
+        refill_key_pool(512, target=1, parallel=False)
+        response = client.post(reverse('election-list'), payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Election.objects.get(title='API Election').has_private_key)
+
+    def test_key_context_cached_until_election_saved(self):
+        """Key contexts should be reused per key version and dropped when the election is saved."""
+        key_pair = self.paillier.generate_key_pair()
+        self.election.set_key_pair(key_pair)
+        self.election.save()
+
+        election = Election.objects.get(pk=self.election.pk)
+        context = election.get_key_context()
+        self.assertEqual(context.public_key, key_pair.public_key)
+        self.assertIs(Election.objects.get(pk=self.election.pk).get_key_context(), context)
+        self.assertFalse(context.has_private_key)
+
+        private = election.get_key_context(private=True)
+        self.assertEqual(private.decrypt(context.encrypt(4)), 4)
+
+        election.save()
+        self.assertIsNot(election.get_key_context(), context)
+
+        election.set_key_pair(self.paillier.generate_key_pair())
+        self.assertNotEqual(election.get_key_context().public_key, key_pair.public_key)
+
+class PackedBallotElectionTest(TestCase):
+    def setUp(self):
+        """Set up a packed-ballot election with a key and candidates."""
+        self.user = User.objects.create_user(username='packed_admin', password='testpassword123')
+        self.election = Election.objects.create(
+            title='Packed Election',
+            description='Tallies with one decryption',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(hours=1),
+            created_by=self.user,
+            ballot_encoding='packed',
+            max_electorate=1000,
+        )
+        for order, name in enumerate(['Alice', 'Bob', 'Carol']):
+            Candidate.objects.create(election=self.election, name=name, order=order)
+        self.election.set_key_pair(PaillierEncryption(key_size=512).generate_key_pair())
+        self.election.save()
+
+    def test_packer_follows_candidate_order(self):
+        """Slots should be sized by max_electorate and follow candidate order."""
+        packer = self.election.get_ballot_packer()
+        self.assertEqual(packer.num_candidates, 3)
+        self.assertGreater(packer.base, 1000)
+        self.election.full_clean()
+
+    def test_clean_requires_max_electorate(self):
+        """Packed elections without an electorate bound should not validate."""
+        self.election.max_electorate = None
+        with self.assertRaises(ValidationError):
+            self.election.full_clean()
+
+    def test_clean_rejects_overflowing_layout(self):
+        """Packed elections whose slots do not fit below n should not validate."""
+        self.election.max_electorate = 2 ** 200
+        with self.assertRaises(ValidationError):
+            self.election.full_clean()
+
+    def test_damgard_jurik_widens_plaintext_space(self):
+        """With s = 2 the slots only need to fit below n^2."""
+        self.election.max_electorate = 2 ** 200
+        self.election.damgard_jurik_s = 2
+        self.election.full_clean()
+        packer = self.election.get_ballot_packer()
+        self.assertGreater(packer.base ** packer.num_candidates, int(self.election.public_key_n))
+
+class StoredVotesTestCase(TestCase):
+    def setUp(self):
+        """Set up an election with a key, candidates and stored votes."""
+        self.user = User.objects.create_user(username='tally_admin', password='testpassword123')
+        self.election = Election.objects.create(
+            title='Streaming Tally Election',
+            description='Tallied in a single pass',
+            start_date=timezone.now(),
+            end_date=timezone.now() + timedelta(hours=1),
+            created_by=self.user,
+            max_electorate=100,
+        )
+        self.candidates = [
+            Candidate.objects.create(election=self.election, name=name, order=order)
+            for order, name in enumerate(['Alice', 'Bob', 'Carol'])
+        ]
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.election.set_key_pair(self.key_pair)
+        self.election.save()
+
+    def _store_votes(self, payloads):
+        """Store votes from JSON payloads or (binary record, payload) pairs."""
+        for i, payload in enumerate(payloads):
+            record = None
+            if isinstance(payload, tuple):
+                record, payload = payload
+            voter = User.objects.create_user(username=f'tally_voter_{i}', password='testpassword123')
+            Vote.objects.create(
+                election=self.election,
+                voter=voter,
+                encrypted_vote=record,
+                encrypted_vote_data=payload,
+                vote_hash=f'{i:064x}',
+            )
+
+    def _ballot(self, candidate, value=1):
+        ciphertext = self.paillier.encrypt(value, self.key_pair.public_key)
+        return json.dumps({"encrypted_vote": hex(ciphertext), "candidate_id": candidate.id})
+
+    def _binary_ballot(self, candidate, value=1):
+        ciphertext = self.paillier.encrypt(value, self.key_pair.public_key)
+        record = self.election.get_key_context().codec.encode(ciphertext)
+        return record, json.dumps({"candidate_id": candidate.id})
+
+class StreamingTallyTest(StoredVotesTestCase):
+
+    def test_per_candidate_tally(self):
+        """Each candidate's accumulator should decrypt to its own vote count."""
+        alice, bob, carol = self.candidates
+        self._store_votes([self._ballot(c) for c in [alice, bob, alice, alice, bob]] + ['not a vote'])
+
+        tally = StreamingTally(self.election, chunk_size=2, parallel=False)
+        candidate_results, total_votes = tally.run()
+        self.assertEqual(candidate_results, {str(alice.id): 3, str(bob.id): 2, str(carol.id): 0})
+        self.assertEqual(total_votes, 5)
+        self.assertEqual(len(tally.errors), 1)
+
+    def test_parallel_matches_sequential(self):
+        """Worker fan-out should produce the same encrypted totals as a sequential pass."""
+        self._store_votes([self._ballot(self.candidates[i % 3]) for i in range(7)])
+        sequential = StreamingTally(self.election, chunk_size=3, parallel=False).accumulate()
+        parallel = StreamingTally(self.election, chunk_size=3, parallel=True).accumulate()
+        self.assertEqual(sequential, parallel)
+
+    def test_packed_tally_decrypts_once(self):
+        """Packed elections should fold every ballot into one accumulator."""
+        self.election.ballot_encoding = 'packed'
+        self.election.save()
+        packer = self.election.get_ballot_packer()
+        payloads = []
+        for slot in [2, 0, 2, 1, 2]:
+            ciphertext = self.paillier.encrypt(packer.encode(slot), self.key_pair.public_key)
+            payloads.append(json.dumps({"encrypted_vote": hex(ciphertext), "encoding": "packed"}))
+        self._store_votes(payloads)
+
+        tally = StreamingTally(self.election, parallel=False)
+        candidate_results, total_votes = tally.run()
+        self.assertEqual(list(tally.encrypted_totals()), ['packed'])
+        self.assertEqual(candidate_results, {str(c.id): n for c, n in zip(self.candidates, [1, 1, 3])})
+        self.assertEqual(total_votes, 5)
+
+    def test_parse_vote_payload_formats(self):
+        """JSON, hex and decimal payloads should all parse."""
+        self.assertEqual(parse_vote_payload('{"encrypted_vote": "0x1f", "candidate_id": 4}'), (31, '4'))
+        self.assertEqual(parse_vote_payload('{"candidate_id": 4}'), (None, '4'))
+        self.assertEqual(parse_vote_payload('0x1f'), (31, None))
+        self.assertEqual(parse_vote_payload('31'), (31, None))
+
+    def test_binary_and_legacy_rows_tally_together(self):
+        """Binary records and legacy JSON rows should tally together; foreign records are rejected."""
+        alice, bob, carol = self.candidates
+        foreign = self.election.get_key_context().codec.encode(0)
+        foreign = foreign[:1] + bytes(8) + foreign[9:]
+        self._store_votes([
+            self._binary_ballot(alice), self._ballot(alice), self._binary_ballot(carol),
+            (foreign, json.dumps({"candidate_id": bob.id})),
+            json.dumps({"candidate_id": bob.id}),
+        ])
+
+        for parallel in (False, True):
+            tally = StreamingTally(self.election, chunk_size=2, parallel=parallel)
+            candidate_results, total_votes = tally.run()
+            self.assertEqual(candidate_results, {str(alice.id): 2, str(bob.id): 0, str(carol.id): 1})
+            self.assertEqual(len(tally.errors), 2)
+        vote = Vote.objects.filter(encrypted_vote__isnull=False).order_by('id').first()
+        self.assertEqual(self.paillier.decrypt(vote.get_ciphertext(), self.key_pair), 1)
+
+    def test_invalid_ciphertexts_are_excluded(self):
+        """Ciphertexts sharing a factor with n should be reported and left out of the totals."""
+        alice, bob, _ = self.candidates
+        bad = json.dumps({"encrypted_vote": hex(self.key_pair.p * 7), "candidate_id": alice.id})
+        self._store_votes([self._ballot(alice), bad, self._ballot(bob), self._binary_ballot(alice)])
+
+        tally = StreamingTally(self.election, parallel=False)
+        candidate_results, total_votes = tally.run()
+        self.assertEqual((candidate_results[str(alice.id)], total_votes), (2, 3))
+        bad_id = Vote.objects.get(encrypted_vote_data=bad).id
+        self.assertEqual([vote_id for vote_id, _ in tally.errors], [bad_id])
+
+    def _proven_ballot(self, candidate, value=1):
+        context = self.election.get_key_context()
+        ciphertext, proof = context.encrypt_with_proof(value, [0, 1], self.election.proof_context)
+        return context.codec.encode(ciphertext), json.dumps({"candidate_id": candidate.id}), proof.to_dict()
+
+    def test_ballot_proofs_required(self):
+        """With proofs required, ballots encrypting other values or lacking proofs should not count."""
+        alice, bob, _ = self.candidates
+        self.election.require_ballot_proofs = True
+        self.election.save()
+        ballots = [self._proven_ballot(c) for c in [alice, bob, alice, alice]]
+        five = self.election.get_key_context().encrypt(5)
+        ballots[3] = (self.election.get_key_context().codec.encode(five),) + ballots[3][1:]
+        self._store_votes([(record, payload) for record, payload, _ in ballots] + [self._binary_ballot(bob)])
+        for vote, (_, _, proof) in zip(Vote.objects.order_by('id'), ballots):
+            vote.validity_proof = proof
+            vote.save()
+
+        for parallel in (False, True):
+            tally = StreamingTally(self.election, chunk_size=2, parallel=parallel)
+            candidate_results, total_votes = tally.run()
+            self.assertEqual((candidate_results[str(alice.id)], candidate_results[str(bob.id)]), (2, 1))
+            self.assertEqual(len(tally.errors), 2)
+
+        sharded = ShardedTally(self.election, num_shards=2)
+        sharded.fold_pending()
+        self.assertEqual(len(sharded.errors), 2)
+        self.assertEqual(sharded.combine()[1], 3)
+
+    def test_damgard_jurik_packed_tally(self):
+        """A degree-2 election should tally packed slots past n, proofs included, with one decryption."""
+        candidates = self.candidates + [
+            Candidate.objects.create(election=self.election, name=f'Candidate {order}', order=order)
+            for order in range(3, 20)
+        ]
+        self.election.ballot_encoding = 'packed'
+        self.election.max_electorate = 2 ** 31 - 1
+        self.election.damgard_jurik_s = 2
+        self.election.require_ballot_proofs = True
+        self.election.save()
+        context = self.election.get_key_context()
+        allowed = self.election.get_ballot_values()
+        ballots = []
+        self.assertGreater(allowed[-1], self.key_pair.n)
+        for slot in [19, 0, 19, 1, 19]:
+            ciphertext, proof = context.encrypt_with_proof(allowed[slot], allowed, self.election.proof_context)
+            ballots.append((context.codec.encode(ciphertext), json.dumps({"encoding": "packed"}), proof.to_dict()))
+        self._store_votes([(record, payload) for record, payload, _ in ballots])
+        for vote, (_, _, proof) in zip(Vote.objects.order_by('id'), ballots):
+            vote.validity_proof = proof
+            vote.save()
+
+        expected = {str(c.id): 0 for c in candidates}
+        expected.update({str(candidates[0].id): 1, str(candidates[1].id): 1, str(candidates[19].id): 3})
+        tally = StreamingTally(self.election, chunk_size=2, parallel=False)
+        self.assertEqual(tally.run(), (expected, 5))
+        self.assertEqual(tally.errors, [])
+        sharded = ShardedTally(self.election, num_shards=2, batch_size=2)
+        self.assertEqual(sharded.publish(), (expected, 5))
+        self.assertTrue(sharded.verify_against_recount())
+
+    def test_vote_serializer_validates_batches(self):
+        """Submitted votes should be checked against the election key, one batch per election."""
+        from apps.api.serializers import VoteSerializer
+        alice = self.candidates[0]
+        good = {'election': self.election.id, 'encrypted_vote_data': self._ballot(alice)}
+        bad = {'election': self.election.id,
+               'encrypted_vote_data': json.dumps({"encrypted_vote": hex(self.key_pair.q), "candidate_id": alice.id})}
+
+        self.assertTrue(VoteSerializer(data=good).is_valid())
+        self.assertFalse(VoteSerializer(data=bad).is_valid())
+        batch = VoteSerializer(data=[good, bad, good], many=True)
+        self.assertFalse(batch.is_valid())
+        self.assertEqual([bool(e) for e in batch.errors], [False, True, False])
+
+    def test_binary_conversion_migration(self):
+        """The data migration should move hex ciphertexts into binary records and back."""
+        from importlib import import_module
+        from django.apps import apps as django_apps
+        migration = import_module('apps.elections.migrations.0012_convert_votes_to_binary_ciphertexts')
+
+        self._store_votes([self._ballot(c) for c in self.candidates] + ['not a vote'])
+        before = StreamingTally(self.election, parallel=False).accumulate()
+
+        migration.convert_to_binary(django_apps, None)
+        self.assertEqual(Vote.objects.filter(encrypted_vote__isnull=False).count(), 3)
+        for data in Vote.objects.exclude(encrypted_vote=None).values_list('encrypted_vote_data', flat=True):
+            self.assertNotIn('encrypted_vote', json.loads(data))
+        self.assertEqual(StreamingTally(self.election, parallel=False).accumulate(), before)
+
+        migration.convert_to_json(django_apps, None)
+        self.assertFalse(Vote.objects.filter(encrypted_vote__isnull=False).exists())
+        self.assertEqual(StreamingTally(self.election, parallel=False).accumulate(), before)
+
+class ShardedTallyTest(StoredVotesTestCase):
+    def test_fold_spreads_votes_over_shards(self):
+        """Folding should drain pending votes into at most N shard rows."""
+        self._store_votes([self._ballot(self.candidates[i % 3]) for i in range(9)])
+        tally = ShardedTally(self.election, num_shards=3, batch_size=2)
+        self.assertEqual(tally.fold_pending(max_batches=2), 4)
+        self.assertEqual(Vote.objects.filter(folded_into_tally=False).count(), 5)
+        self.assertEqual(tally.fold_pending(), 5)
+        self.assertEqual(tally.fold_batch(), 0)
+
+        shards = EncryptedTallyShard.objects.filter(election=self.election)
+        self.assertLessEqual(shards.count(), 3)
+        self.assertEqual(sum(shard.ballot_count for shard in shards), 9)
+        self.assertTrue(tally.verify_against_recount())
+
+    def test_publish_matches_streaming_tally(self):
+        """Publishing from shards should give the recount's result and fill the encrypted fields."""
+        alice, bob, carol = self.candidates
+        self._store_votes([self._ballot(c) for c in [alice, carol, carol, bob, carol]])
+        tally = ShardedTally(self.election, num_shards=2, batch_size=2)
+        tally.fold_pending(max_batches=1)
+
+        candidate_results, total_votes = tally.publish(key_pair=self.key_pair)
+        self.assertEqual(
+            (candidate_results, total_votes),
+            StreamingTally(self.election, key_pair=self.key_pair, parallel=False).run()
+        )
+        result = ElectionResult.objects.get(election=self.election)
+        self.assertEqual(result.total_votes, 5)
+        self.assertEqual(set(result.encrypted_candidate_votes), {str(alice.id), str(bob.id), str(carol.id)})
+        self.assertEqual(self.paillier.decrypt(int(result.encrypted_total_votes), self.key_pair), 5)
+
+    def test_tampered_shard_fails_recount(self):
+        """A shard that no longer matches its votes should fail the cross-check."""
+        self._store_votes([self._ballot(self.candidates[0]) for _ in range(3)])
+        tally = ShardedTally(self.election, num_shards=1)
+        tally.fold_pending()
+        shard = EncryptedTallyShard.objects.get(election=self.election)
+        key = str(self.candidates[0].id)
+        shard.encrypted_totals[key] = str(self.paillier.encrypt(1, self.key_pair.public_key))
+        shard.save()
+        self.assertFalse(tally.verify_against_recount())
+
+class KeyShareCommitmentTest(TestCase):
+    def setUp(self):
+        """Set up two elections with keys to deal among trustees."""
+        self.user = User.objects.create_user(username='share_admin', password='testpassword123')
+        self.elections = []
+        for title in ['Share Election A', 'Share Election B']:
+            election = Election.objects.create(
+                title=title,
+                description='Key shared among trustees',
+                start_date=timezone.now(),
+                end_date=timezone.now() + timedelta(hours=1),
+                created_by=self.user,
+            )
+            election.set_key_pair(PaillierEncryption(key_size=512).generate_key_pair())
+            election.save()
+            self.elections.append(election)
+        self.output_dir = tempfile.mkdtemp()
+
+    def _deal(self):
+        call_command(
+            'deal_key_shares', '--trustees', '4', '--threshold', '2', '--output-dir', self.output_dir,
+            *[arg for e in self.elections for arg in ('--election', str(e.id))], stdout=StringIO()
+        )
+        return sorted(os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir))
+
+    def test_deal_publishes_commitments(self):
+        """Dealing should store commitments only and shares should verify against them."""
+        shares = self.elections[0].deal_key_shares(4, 2)
+        vss, commitments = self.elections[0].get_key_share_verifier()
+        self.assertEqual(len(commitments), 2)
+        self.assertTrue(vss.verify_shares_batch([(commitments, shares)]))
+        self.assertEqual(vss.reconstruct_secret(shares[1:3]), int(self.elections[0].private_key_lambda))
+
+    def test_verify_command_accepts_honest_shares(self):
+        """Trustee share files from a dealing should verify in one command."""
+        paths = self._deal()
+        self.assertEqual(len(paths), 4)
+        call_command('verify_key_shares', *paths, stdout=StringIO())
+
+    def test_verify_command_rejects_altered_share(self):
+        """A trustee holding a corrupted share should make the audit fail."""
+        paths = self._deal()
+        with open(paths[0]) as f:
+            entries = json.load(f)
+        entries[1]['share'] = str(int(entries[1]['share']) + 1)
+        with open(paths[0], 'w') as f:
+            json.dump(entries, f)
+        with self.assertRaises(CommandError):
+            call_command('verify_key_shares', *paths, stdout=StringIO())
+
+class ECElGamalElectionTest(StoredVotesTestCase):
+    def setUp(self):
+        """Switch the stored-votes election to EC-ElGamal with its own key."""
+        super().setUp()
+        self.election.cryptosystem = 'ec_elgamal'
+        self.elgamal_key_pair = self.election.ensure_key_pair()
+        self.election.save()
+        self.scheme = self.election.get_encryption()
+
+    def _ec_ballot(self, candidate, value=1):
+        public_key = self.election.get_public_key()
+        record = self.scheme.encode_ciphertext(self.scheme.encrypt(value, public_key), public_key)
+        return record, json.dumps({"candidate_id": candidate.id})
+
+    def test_keys_and_configuration(self):
+        """EC keys should round-trip, size decryption to the electorate and refuse Paillier-only options."""
+        election = Election.objects.get(pk=self.election.pk)
+        self.assertTrue(election.has_private_key)
+        key_pair = election.get_key_pair()
+        self.assertEqual(key_pair.public_key, self.elgamal_key_pair.public_key)
+        self.assertEqual(self.scheme.max_value, 100)
+        self.assertEqual(self.scheme.decrypt(self.scheme.encrypt(42, election.get_public_key()), key_pair), 42)
+        election.full_clean()
+        for field, value in [('ballot_encoding', 'packed'), ('require_ballot_proofs', True), ('damgard_jurik_s', 2)]:
+            election = Election.objects.get(pk=self.election.pk)
+            setattr(election, field, value)
+            with self.assertRaises(ValidationError):
+                election.full_clean()
+
+    def test_streaming_tally(self):
+        """EC ballots should tally per candidate and malformed or foreign records should be excluded."""
+        alice, bob, _ = self.candidates
+        foreign = self.scheme.generate_key_pair().public_key
+        stray = self.scheme.encode_ciphertext(self.scheme.encrypt(1, foreign), foreign)
+        self._store_votes([
+            self._ec_ballot(alice), self._ec_ballot(bob), self._ec_ballot(alice),
+            (stray, json.dumps({"candidate_id": bob.id})),
+            (b'\x00' * 10, json.dumps({"candidate_id": bob.id})),
+        ])
+        tally = StreamingTally(self.election, chunk_size=2)
+        candidate_results, total_votes = tally.run()
+        self.assertEqual(candidate_results[str(alice.id)], 2)
+        self.assertEqual(candidate_results[str(bob.id)], 1)
+        self.assertEqual(total_votes, 3)
+        self.assertEqual(len(tally.errors), 2)
+        stored = tally.stored_totals()
+        public_key = self.election.get_public_key()
+        self.assertEqual(self.scheme.decrypt(self.scheme.decode_ciphertext(bytes.fromhex(stored[str(alice.id)]),
+                                                                           public_key), self.elgamal_key_pair), 2)
+        vote = Vote.objects.order_by('id').first()
+        self.assertEqual(self.scheme.decrypt(vote.get_ciphertext(), self.elgamal_key_pair), 1)
+        with self.assertRaises(ValueError):
+            ShardedTally(self.election)
+
+    def test_streaming_tally_of_new_ec_election(self):
+        """An election created as EC-ElGamal, with no Paillier key on the row, should tally with its stored key."""
+        election = Election.objects.create(
+            title='EC', description='Created as EC-ElGamal', cryptosystem='ec_elgamal',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(hours=1),
+            created_by=self.user, max_electorate=10,
+        )
+        key_pair = election.ensure_key_pair()
+        election.save()
+        self.assertFalse(election.public_key_n)
+        alice, bob = [Candidate.objects.create(election=election, name=name, order=order)
+                      for order, name in enumerate(['Alice', 'Bob'])]
+        self.election, self.scheme = election, election.get_encryption()
+        self._store_votes([self._ec_ballot(alice), self._ec_ballot(bob), self._ec_ballot(bob)])
+        candidate_results, total_votes = StreamingTally(Election.objects.get(pk=election.pk)).run()
+        self.assertEqual(candidate_results, {str(alice.id): 1, str(bob.id): 2})
+        self.assertEqual(total_votes, 3)
+        self.assertEqual(StreamingTally(election).key_pair.private_key, key_pair.private_key)
+
+    def test_key_ceremony_shares_private_scalar(self):
+        """The key ceremony should split the EC private scalar."""
+        shares = self.election.deal_key_shares(3, 2)
+        vss, commitments = self.election.get_key_share_verifier()
+        self.assertTrue(vss.verify_shares_batch([(commitments, shares)]))
+        self.assertEqual(vss.reconstruct_secret(shares[:2]), self.elgamal_key_pair.private_key)
+        self.assertEqual(self.election.key_share_commitments['cryptosystem'], 'ec_elgamal')
+
+    def test_vote_serializer_rejects_integer_ciphertexts(self):
+        """Raw integer ciphertext payloads should be refused for EC elections."""
+        from apps.api.serializers import VoteSerializer
+        data = {'election': self.election.id, 'encrypted_vote_data': self._ballot(self.candidates[0])}
+        self.assertFalse(VoteSerializer(data=data).is_valid())
+
+class FakeChain:
+    """Stands in for BlockchainService in the submission pipeline tests."""
+
+    def __init__(self, submit_results=(), receipts=None):
+        self.submit_results = list(submit_results)
+        self.receipts = receipts or {}
+        self.submitted = []
+        # Hex roots the chain holds, as the tests decide they were mined
+        self.anchored_roots = set()
+
+    def verify_vote(self, vote_hash):
+        return None
+
+    def submit_vote(self, election_id, voter_address, encrypted_vote, vote_hash):
+        self.submitted.append((election_id, voter_address, encrypted_vote, vote_hash))
+        return self.submit_results.pop(0) if self.submit_results else (True, f'0x{len(self.submitted):064x}')
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    contract_address = '0x48A82B4612571571936334Df41EDf073b529f8B4'
+
+    def submit_vote_batch(self, election_id, ballots):
+        self.submitted.append((election_id, list(ballots)))
+        return self.submit_results.pop(0) if self.submit_results else (True, f'0x{len(self.submitted):064x}')
+
+    def get_batch_results(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    def anchor_vote_root(self, election_id, root, vote_count):
+        self.submitted.append((election_id, bytes(root), vote_count))
+        return self.submit_results.pop(0) if self.submit_results else (True, f'0x{len(self.submitted):064x}')
+
+    def get_anchored_root(self, root):
+        return {'vote_count': 0, 'batch_index': 0} if root in self.anchored_roots else None
+
+@override_settings(VOTE_SUBMISSION={'BACKEND': 'database', 'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 1.0,
+                                    'POLL_INTERVAL': 1.0})
+class VoteSubmissionTest(StoredVotesTestCase):
+    def _pending_vote(self, candidate, confirmed=()):
+        """Store confirmed votes for the given candidates, then one pending vote for candidate."""
+        self._store_votes([self._ballot(c) for c in confirmed] + [self._ballot(candidate)])
+        vote = Vote.objects.order_by('-id').first()
+        Vote.objects.filter(id=vote.id).update(submission_status='pending', next_submission_at=timezone.now())
+        return vote.id
+
+    def _pending_votes(self, candidates):
+        self._store_votes([self._ballot(c) for c in candidates])
+        votes = Vote.objects.filter(election=self.election)
+        votes.update(submission_status='pending', next_submission_at=timezone.now())
+        return list(votes.order_by('id').values_list('id', flat=True))
+
+    def _make_due(self, vote_id):
+        Vote.objects.filter(id=vote_id).update(next_submission_at=timezone.now())
+
+    def test_submit_then_confirm(self):
+        """A pending vote should be submitted, then confirmed once its receipt shows success."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        status, due = submission.process_vote(vote_id, chain)
+        self.assertEqual(status, 'submitted')
+        self.assertIsNotNone(due)
+        vote = Vote.objects.get(id=vote_id)
+        election_id, _, encrypted_vote, vote_hash = chain.submitted[0]
+        self.assertEqual(election_id, str(self.election.id))
+        self.assertEqual(vote_hash, '0x' + vote.vote_hash)
+        self.assertEqual(bytes.fromhex(encrypted_vote[2:]), self.paillier.ciphertext_bytes(
+            vote.get_ciphertext(), self.key_pair.public_key))
+
+        # Not mined yet: poll again later
+        self._make_due(vote_id)
+        self.assertEqual(submission.process_vote(vote_id, chain)[0], 'submitted')
+
+        chain.receipts[vote.blockchain_tx_hash] = {'status': 1, 'block_number': 7}
+        self._make_due(vote_id)
+        self.assertEqual(submission.process_vote(vote_id, chain), ('confirmed', None))
+        vote = Vote.objects.get(id=vote_id)
+        self.assertTrue(vote.is_confirmed)
+        self.assertEqual(vote.blockchain_block_number, 7)
+        self.assertEqual(len(chain.submitted), 1)
+
+    def test_retries_with_backoff_then_fails(self):
+        """Failed submissions should back off exponentially and invalidate the vote after MAX_ATTEMPTS."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain(submit_results=[(False, 'nonce too low')] * 3)
+        delays = []
+        for _ in range(2):
+            before = timezone.now()
+            status, due = submission.process_vote(vote_id, chain)
+            self.assertEqual(status, 'pending')
+            delays.append((due - before).total_seconds())
+            self._make_due(vote_id)
+        self.assertAlmostEqual(delays[0], 1.0, delta=0.5)
+        self.assertAlmostEqual(delays[1], 2.0, delta=0.5)
+
+        self.assertEqual(submission.process_vote(vote_id, chain), ('failed', None))
+        vote = Vote.objects.get(id=vote_id)
+        self.assertFalse(vote.is_valid)
+        self.assertEqual(vote.submission_attempts, 3)
+        self.assertEqual(vote.submission_error, 'nonce too low')
+        self.assertIn('nonce too low', vote.validation_errors[-1]['reason'])
+
+    def test_reverted_transaction_fails(self):
+        """A reverted castVote should fail the vote without resubmitting it."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        submission.process_vote(vote_id, chain)
+        chain.receipts[Vote.objects.get(id=vote_id).blockchain_tx_hash] = {'status': 0, 'block_number': 3}
+        self._make_due(vote_id)
+        self.assertEqual(submission.process_vote(vote_id, chain)[0], 'failed')
+        self.assertEqual(len(chain.submitted), 1)
+
+    def test_reverted_duplicate_of_landed_vote_confirms(self):
+        """A reverted resend should confirm the vote if an earlier send already recorded it."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        submission.process_vote(vote_id, chain)
+        chain.receipts[Vote.objects.get(id=vote_id).blockchain_tx_hash] = {'status': 0, 'block_number': 3}
+        chain.verify_vote = lambda vote_hash: {'is_valid': True}
+        self._make_due(vote_id)
+        self.assertEqual(submission.process_vote(vote_id, chain)[0], 'confirmed')
+        self.assertTrue(Vote.objects.get(id=vote_id).is_valid)
+
+    def test_unmined_transaction_is_resent_after_timeout(self):
+        """A transaction with no receipt past CONFIRMATION_TIMEOUT should go back to pending."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        submission.process_vote(vote_id, chain)
+        Vote.objects.filter(id=vote_id).update(
+            submitted_at=timezone.now() - timedelta(hours=1), next_submission_at=timezone.now()
+        )
+        self.assertEqual(submission.process_vote(vote_id, chain)[0], 'pending')
+        self._make_due(vote_id)
+        self.assertEqual(submission.process_vote(vote_id, chain)[0], 'submitted')
+        self.assertEqual(len(chain.submitted), 2)
+        self.assertEqual(Vote.objects.get(id=vote_id).submission_attempts, 1)
+
+    def test_tallies_count_only_confirmed_votes(self):
+        """Votes still in the pipeline should stay out of streaming and sharded tallies."""
+        alice, bob, _ = self.candidates
+        pending_id = self._pending_vote(bob, confirmed=[alice])
+        candidate_results, total_votes = StreamingTally(self.election, parallel=False).run()
+        self.assertEqual(candidate_results[str(bob.id)], 0)
+        self.assertEqual(total_votes, 1)
+        sharded = ShardedTally(self.election)
+        self.assertEqual(sharded.fold_pending(), 1)
+        self.assertFalse(Vote.objects.get(id=pending_id).folded_into_tally)
+
+    def test_worker_command_and_receipt(self):
+        """The polling worker should advance due votes and the receipt should report their status."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        out = StringIO()
+        with patch('apps.elections.submission.get_blockchain_service', return_value=chain):
+            call_command('process_vote_submissions', stdout=out)
+        self.assertIn('1 submitted', out.getvalue())
+        receipt = submission.submission_receipt(Vote.objects.get(id=vote_id))
+        self.assertEqual(receipt['status'], 'submitted')
+        self.assertEqual(receipt['transaction_hash'], f'0x{1:064x}')
+        self.assertEqual(receipt['attempts'], 0)
+
+    def test_unrecorded_send_stays_leased_then_confirms_from_chain(self):
+        """A vote whose sent transaction could not be recorded should not be resent until its lease ends."""
+        vote_id = self._pending_vote(self.candidates[0])
+        chain = FakeChain()
+        with patch('apps.elections.submission._record', side_effect=DatabaseError('connection lost')), \
+                self.assertLogs('apps.elections.submission', 'ERROR'):
+            status, due = submission.process_vote(vote_id, chain)
+        self.assertEqual(status, 'pending')
+        self.assertGreater(due, timezone.now() + timedelta(minutes=5))
+        vote = Vote.objects.get(id=vote_id)
+        self.assertEqual((vote.submission_status, vote.next_submission_at), ('pending', due))
+        self.assertEqual(submission.process_due_votes(service=chain), {})
+        self.assertEqual(len(chain.submitted), 1)
+
+        # Once the lease runs out, the ballot already on chain is found instead of sent again
+        self._make_due(vote_id)
+        with patch.object(chain, 'verify_vote', return_value={'is_valid': True}):
+            self.assertEqual(submission.process_vote(vote_id, chain), ('confirmed', None))
+        self.assertEqual(len(chain.submitted), 1)
+
+    def test_cast_vote_proves_ballots_only_when_required(self):
+        """cast_vote should attach validity proofs only for elections that require them."""
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from apps.encryption.keycache import KeyContext
+
+        client = APIClient()
+        data = {'election_id': str(self.election.id), 'candidate_id': str(self.candidates[1].id)}
+        with patch('apps.api.views.BlockchainService') as service:
+            service.return_value.get_election_details.return_value = {'is_active': True}
+            client.force_authenticate(User.objects.create_user(username='unproven_voter', password='testpassword123'))
+            with patch.object(KeyContext, 'encrypt_with_proof') as encrypt_with_proof:
+                response = client.post(reverse('cast_vote'), data, format='json')
+            self.assertEqual(response.status_code, 202)
+            encrypt_with_proof.assert_not_called()
+            vote = Vote.objects.get(vote_hash=response.data['vote_hash'])
+            self.assertIsNone(vote.validity_proof)
+            self.assertEqual(self.paillier.decrypt(vote.get_ciphertext(), self.key_pair), 1)
+
+            self.election.require_ballot_proofs = True
+            self.election.save()
+            client.force_authenticate(User.objects.create_user(username='proven_voter', password='testpassword123'))
+            response = client.post(reverse('cast_vote'), data, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertIsNotNone(Vote.objects.get(vote_hash=response.data['vote_hash']).validity_proof)
+
+    def test_voter_can_cast_again_after_submission_fails(self):
+        """A ballot that failed for good should be replaced by the voter's next one; a live one should not."""
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        voter = User.objects.create_user(username='recasting_voter', password='testpassword123')
+        client = APIClient()
+        client.force_authenticate(voter)
+        data = {'election_id': str(self.election.id), 'candidate_id': str(self.candidates[0].id)}
+        with patch('apps.api.views.BlockchainService') as service:
+            service.return_value.get_election_details.return_value = {'is_active': True}
+            response = client.post(reverse('cast_vote'), data, format='json')
+            self.assertEqual(response.status_code, 202)
+            vote_id = Vote.objects.get(vote_hash=response.data['vote_hash']).id
+            # Only one live ballot per voter
+            response = client.post(reverse('cast_vote'), data, format='json')
+            self.assertEqual((response.status_code, response.data['error']), (400, 'User has already voted'))
+
+            chain = FakeChain(submit_results=[(False, 'node unavailable')] * 3)
+            for _ in range(3):
+                self._make_due(vote_id)
+                submission.process_vote(vote_id, chain)
+            failed = Vote.objects.get(id=vote_id)
+            self.assertEqual(failed.submission_status, 'failed')
+            self.assertFalse(failed.is_valid)
+
+            response = client.post(reverse('cast_vote'), data, format='json')
+        self.assertEqual(response.status_code, 202)
+        vote = Vote.objects.get(election=self.election, voter=voter)
+        self.assertEqual(vote.id, vote_id)
+        self.assertEqual(vote.vote_hash, response.data['vote_hash'])
+        self.assertNotEqual(vote.vote_hash, failed.vote_hash)
+        self.assertEqual((vote.submission_status, vote.submission_attempts, vote.submission_error), ('pending', 0, ''))
+        self.assertTrue(vote.is_valid)
+        self.assertEqual(vote.validation_errors, [])
+        self.assertEqual(submission.process_vote(vote.id, FakeChain())[0], 'submitted')
+
+    def test_unrecorded_relayed_batch_is_not_relayed_again_early(self):
+        """Ballots of a sent batch that could not be recorded should stay leased, then confirm from the chain."""
+        vote_ids = self._pending_votes(self.candidates[:2])
+        chain = FakeChain()
+        relayer_settings = dict(settings.VOTE_SUBMISSION, RELAYER=True, RELAY_BATCH_SIZE=2, RELAY_MAX_AGE=3600)
+        with self.settings(VOTE_SUBMISSION=relayer_settings):
+            with patch('apps.elections.submission._record', side_effect=DatabaseError('connection lost')), \
+                    self.assertLogs('apps.elections.submission', 'ERROR'):
+                self.assertEqual(submission.process_due_votes(service=chain), {})
+            self.assertEqual(len(chain.submitted), 1)
+            for vote in Vote.objects.filter(id__in=vote_ids):
+                self.assertEqual(vote.submission_status, 'pending')
+                self.assertGreater(vote.next_submission_at, timezone.now() + timedelta(minutes=5))
+            self.assertEqual(submission.process_due_votes(service=chain), {})
+            self.assertEqual(len(chain.submitted), 1)
+
+            # After the lease the ballots are relayed again and refused as duplicates of the landed ones
+            for vote_id in vote_ids:
+                self._make_due(vote_id)
+            self.assertEqual(submission.process_due_votes(service=chain), {'submitted': 2})
+            votes = list(Vote.objects.filter(id__in=vote_ids))
+            chain.receipts[votes[0].blockchain_tx_hash] = {
+                'status': 1, 'block_number': 4, 'ballots': {vote.vote_hash: 3 for vote in votes},
+            }
+            for vote_id in vote_ids:
+                self._make_due(vote_id)
+            with patch.object(chain, 'verify_vote', return_value={'is_valid': True}):
+                self.assertEqual(submission.process_due_votes(service=chain), {'confirmed': 2})
+
+    def test_relayed_batches_map_results_to_votes(self):
+        """Relayer mode should batch signed ballots per election and map per-ballot outcomes back to votes."""
+        alice, bob, carol = self.candidates
+        vote_ids = self._pending_votes([alice, bob, carol])
+        chain = FakeChain()
+        relayer_settings = dict(settings.VOTE_SUBMISSION, RELAYER=True, RELAY_BATCH_SIZE=2, RELAY_MAX_AGE=3600)
+        with self.settings(VOTE_SUBMISSION=relayer_settings):
+            self.assertEqual(submission.process_due_votes(service=chain), {'submitted': 2})
+            election_id, ballots = chain.submitted[0]
+            self.assertEqual(election_id, str(self.election.id))
+            votes = [Vote.objects.get(id=vote_id) for vote_id in vote_ids]
+            self.assertEqual([b.vote_hash.hex() for b in ballots], [v.vote_hash for v in votes[:2]])
+            for ballot, vote in zip(ballots, votes):
+                self.assertEqual(recover_ballot_signer(chain.contract_address, election_id, ballot), ballot.voter)
+                self.assertEqual(ballot.voter.lower(), vote.voter.blockchain_address.lower())
+            self.assertEqual(votes[0].blockchain_tx_hash, votes[1].blockchain_tx_hash)
+            self.assertEqual(votes[2].submission_status, 'pending')
+
+            # One ballot recorded, one refused for its signature
+            chain.receipts[votes[0].blockchain_tx_hash] = {
+                'status': 1, 'block_number': 9, 'ballots': {votes[0].vote_hash: 0, votes[1].vote_hash: 1},
+            }
+            for vote_id in vote_ids[:2]:
+                self._make_due(vote_id)
+            self.assertEqual(submission.process_due_votes(service=chain), {'confirmed': 1, 'failed': 1})
+            failed = Vote.objects.get(id=vote_ids[1])
+            self.assertEqual(failed.submission_error, 'invalid voter signature')
+            self.assertFalse(failed.is_valid)
+            self.assertEqual(Vote.objects.get(id=vote_ids[0]).blockchain_block_number, 9)
+
+        # The lone ballot goes out once it is old enough
+        with self.settings(VOTE_SUBMISSION=dict(relayer_settings, RELAY_MAX_AGE=0)):
+            self.assertEqual(submission.process_due_votes(service=chain), {'submitted': 1})
+            self.assertEqual(len(chain.submitted[-1][1]), 1)
+            # Per-vote dispatch is left to the batching worker
+            submission.dispatch(vote_ids[2])
+
+
+class MerkleTreeTest(TestCase):
+    def test_every_leaf_proves_inclusion(self):
+        """Each leaf's proof should lead to the root, for balanced and unbalanced trees."""
+        for size in range(1, 10):
+            hashes = [f'{i + 1:064x}' for i in range(size)]
+            tree = MerkleTree(hashes)
+            self.assertEqual(len(tree), size)
+            for index, vote_hash in enumerate(hashes):
+                proof = tree.proof(index)
+                self.assertLessEqual(len(proof), (size - 1).bit_length())
+                self.assertTrue(verify_inclusion(vote_hash, proof, tree.root))
+                self.assertTrue(verify_inclusion('0x' + vote_hash, [p.hex() for p in proof], tree.root.hex()))
+
+    def test_root_layout_and_tampering(self):
+        """The root should follow the contract's layout and altered inputs should not verify."""
+        a, b, c = (bytes([i]) * 32 for i in (1, 2, 3))
+        tree = MerkleTree([a, b, c])
+        # The third leaf has no sibling and is carried up unchanged
+        self.assertEqual(tree.root, hash_pair(hash_pair(hash_leaf(a), hash_leaf(b)), hash_leaf(c)))
+        self.assertEqual(MerkleTree([a]).root, hash_leaf(a))
+        proof = tree.proof(0)
+        self.assertFalse(verify_inclusion(bytes(32), proof, tree.root))
+        self.assertFalse(verify_inclusion(a, proof[:1], tree.root))
+        self.assertFalse(verify_inclusion(a, [bytes(32)] + proof[1:], tree.root))
+        # An inner node cannot pass as a leaf
+        self.assertFalse(verify_inclusion(hash_pair(hash_leaf(a), hash_leaf(b)), proof[1:], tree.root))
+        self.assertFalse(verify_inclusion(a, ['not hex'], tree.root))
+        with self.assertRaises(ValueError):
+            MerkleTree([])
+        with self.assertRaises(IndexError):
+            tree.proof(3)
+
+    def test_benchmark_reports_timings(self):
+        """The Merkle benchmark should time building, proving and verifying."""
+        results = benchmark_merkle(batch_size=16, iterations=2)
+        self.assertEqual(set(results), {'build', 'prove_all', 'verify'})
+        self.assertEqual(results['verify']['proof_length'], 4)
+        self.assertGreater(results['build']['ops_per_sec'], 0)
+
+    @unittest.skipUnless(eth_tester and solcx, "eth-tester and py-solc-x are needed to run the contract")
+    def test_anchor_vote_root_on_evm(self):
+        """anchorVoteRoot should record the root and verifyVoteInclusion should accept the Python proofs."""
+        from web3 import EthereumTesterProvider
+
+        source_path = os.path.join(settings.BASE_DIR, '..', 'truffle', 'contracts', 'VotingContract.sol')
+        solcx.install_solc('0.8.0')
+        compiled = solcx.compile_files([source_path], output_values=['abi', 'bin'], solc_version='0.8.0')
+        interface = next(v for k, v in compiled.items() if k.endswith(':VotingContract'))
+
+        w3 = Web3(EthereumTesterProvider())
+        w3.eth.default_account = w3.eth.accounts[0]
+        tx_hash = w3.eth.contract(abi=interface['abi'], bytecode=interface['bin']).constructor().transact()
+        contract = w3.eth.contract(address=w3.eth.get_transaction_receipt(tx_hash)['contractAddress'],
+                                   abi=interface['abi'])
+        now = w3.eth.get_block('latest')['timestamp']
+        contract.functions.createElection('8', 'Anchored', now + 5, now + 3600).transact()
+        w3.testing.timeTravel(now + 10)
+
+        hashes = [bytes([i + 1]) * 32 for i in range(5)]
+        tree = MerkleTree(hashes)
+        self.assertFalse(contract.functions.verifyVoteInclusion(tree.root, hashes[0], tree.proof(0)).call())
+        contract.functions.anchorVoteRoot('8', tree.root, len(hashes)).transact()
+        for index, vote_hash in enumerate(hashes):
+            self.assertTrue(contract.functions.verifyVoteInclusion(tree.root, vote_hash, tree.proof(index)).call())
+        self.assertFalse(contract.functions.verifyVoteInclusion(tree.root, bytes(32), tree.proof(0)).call())
+        self.assertEqual(contract.functions.voteRoots(tree.root).call()[:2], ['8', 5])
+        self.assertEqual(contract.functions.getElection('8').call()[5], 5)
+        # Only the election creator may anchor
+        with self.assertRaises(Exception):
+            contract.functions.anchorVoteRoot('8', bytes([9]) * 32, 1).transact({'from': w3.eth.accounts[1]})
+
+        results = compare_chain_anchoring(votes=4, ciphertext_bytes=64, relay_batch_size=4)
+        self.assertEqual(results['anchorVoteRoot']['transactions'], 1)
+        self.assertLess(results['anchorVoteRoot']['total_gas'], results['castVotesBatch']['total_gas'])
+        self.assertLess(results['castVotesBatch']['total_gas'], results['castVote']['total_gas'])
+
+@override_settings(VOTE_SUBMISSION={'BACKEND': 'database', 'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 1.0,
+                                    'POLL_INTERVAL': 1.0})
+class VoteAnchoringTest(StoredVotesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.election.chain_anchoring = 'merkle_root'
+        self.election.save()
+
+    def _pending_votes(self, candidates):
+        self._store_votes([self._ballot(c) for c in candidates])
+        votes = Vote.objects.filter(election=self.election)
+        votes.update(submission_status='pending', next_submission_at=timezone.now())
+        return list(votes.order_by('id'))
+
+    def test_batch_is_anchored_then_confirmed(self):
+        """Pending votes should be committed under one root and confirmed with its transaction."""
+        votes = self._pending_votes(self.candidates)
+        chain = FakeChain()
+        # The per-vote pipeline leaves anchored elections alone
+        self.assertEqual(submission.process_due_votes(service=chain), {})
+        self.assertEqual(submission.process_vote(votes[0].id, chain), ('pending', None))
+        self.assertEqual(chain.submitted, [])
+
+        summary = run_anchoring(service=chain)
+        self.assertEqual(summary, {'confirmed': 0, 'failed': 0, 'anchored': 1, 'votes': 3})
+        election_id, root, vote_count = chain.submitted[0]
+        self.assertEqual((election_id, vote_count), (str(self.election.id), 3))
+        self.assertEqual(root, MerkleTree([v.vote_hash for v in votes]).root)
+        anchor = VoteAnchor.objects.get()
+        self.assertEqual(anchor.merkle_root, root.hex())
+        self.assertEqual(set(anchor.votes.values_list('submission_status', flat=True)), {'submitted'})
+
+        # Not mined yet: nothing changes
+        self.assertEqual(run_anchoring(service=chain)['confirmed'], 0)
+        chain.receipts[anchor.blockchain_tx_hash] = {'status': 1, 'block_number': 12}
+        self.assertEqual(run_anchoring(service=chain)['confirmed'], 1)
+        anchor.refresh_from_db()
+        self.assertEqual((anchor.status, anchor.blockchain_block_number), ('confirmed', 12))
+        for vote in Vote.objects.filter(election=self.election):
+            self.assertEqual((vote.submission_status, vote.blockchain_block_number), ('confirmed', 12))
+            self.assertTrue(vote.is_confirmed)
+            receipt = submission.submission_receipt(vote)
+            proof = receipt['inclusion_proof']
+            self.assertEqual(proof['root'], anchor.merkle_root)
+            self.assertTrue(verify_inclusion(vote.vote_hash, proof['proof'], proof['root']))
+
+        # Tallies count anchored votes once confirmed
+        candidate_results, total_votes = StreamingTally(self.election, parallel=False).run()
+        self.assertEqual(total_votes, 3)
+
+    def test_verify_vote_checks_proof_against_anchored_root(self):
+        """verify_vote should check an inclusion proof locally and only ask the chain about the root."""
+        votes = self._pending_votes(self.candidates[:2])
+        chain = FakeChain()
+        run_anchoring(service=chain)
+        vote = Vote.objects.get(id=votes[1].id)
+        proof = vote.get_inclusion_proof()
+        with patch.object(BlockchainService, '__init__', return_value=None), \
+                patch.object(BlockchainService, 'get_anchored_root') as get_anchored_root:
+            service = BlockchainService()
+            get_anchored_root.return_value = {
+                'election_id': str(self.election.id), 'vote_count': 2, 'timestamp': timezone.now(), 'batch_index': 0,
+            }
+            result = service.verify_vote(vote.vote_hash, inclusion_proof=proof)
+            self.assertTrue(result['is_valid'])
+            self.assertEqual(result['merkle_root'], proof['root'])
+            get_anchored_root.assert_called_once_with(proof['root'])
+            # A proof for another hash fails before the chain is asked
+            self.assertIsNone(service.verify_vote(votes[0].vote_hash, inclusion_proof=proof))
+            self.assertEqual(get_anchored_root.call_count, 1)
+            get_anchored_root.return_value = None
+            self.assertIsNone(service.verify_vote(vote.vote_hash, inclusion_proof=proof))
+
+    def test_failed_batch_returns_votes_to_queue(self):
+        """Votes of a reverted batch should go back to pending and join a later batch."""
+        votes = self._pending_votes(self.candidates)
+        chain = FakeChain(submit_results=[(False, 'node unavailable')])
+        self.assertEqual(run_anchoring(service=chain)['anchored'], 0)
+        self.assertEqual(Vote.objects.get(id=votes[0].id).submission_attempts, 1)
+
+        self.assertEqual(VoteAnchor.objects.get().status, 'failed')
+        Vote.objects.filter(election=self.election).update(next_submission_at=timezone.now())
+        run_anchoring(service=chain)
+        anchor = VoteAnchor.objects.get(status='submitted')
+        chain.receipts[anchor.blockchain_tx_hash] = {'status': 0, 'block_number': 5}
+        self.assertEqual(run_anchoring(service=chain)['failed'], 1)
+        anchor.refresh_from_db()
+        self.assertEqual(anchor.status, 'failed')
+        for vote in Vote.objects.filter(election=self.election):
+            self.assertEqual((vote.submission_status, vote.anchor_id, vote.submission_attempts), ('pending', None, 2))
+            self.assertIsNone(vote.get_inclusion_proof())
+
+        Vote.objects.filter(election=self.election).update(next_submission_at=timezone.now())
+        out = StringIO()
+        with patch('apps.elections.anchoring.get_blockchain_service', return_value=chain):
+            call_command('anchor_vote_roots', election=[self.election.id], stdout=out)
+        self.assertIn('Anchored 3 votes in 1 batches', out.getvalue())
+        self.assertEqual(Vote.objects.filter(anchor__status='submitted').count(), 3)
+
+    def test_unrecorded_send_is_settled_from_chain(self):
+        """A batch whose sent root could not be recorded should stay claimed and settle from the chain."""
+        votes = self._pending_votes(self.candidates)
+        chain = FakeChain()
+        with patch('apps.elections.anchoring._record_sent', side_effect=DatabaseError('connection lost')), \
+                self.assertLogs('apps.elections.anchoring', 'ERROR'):
+            self.assertIsNone(anchor_pending_votes(self.election, chain))
+        anchor = VoteAnchor.objects.get()
+        self.assertEqual(anchor.status, 'pending')
+        self.assertEqual(Vote.objects.filter(anchor=anchor, submission_status='pending').count(), 3)
+
+        # The claimed votes are not anchored under a second root
+        self.assertEqual(run_anchoring(service=chain), {'confirmed': 0, 'failed': 0, 'anchored': 0, 'votes': 0})
+        self.assertEqual(len(chain.submitted), 1)
+
+        # Once the send window has passed, the root found on chain confirms the batch
+        VoteAnchor.objects.filter(id=anchor.id).update(created_at=timezone.now() - timedelta(hours=1))
+        chain.anchored_roots.add(anchor.merkle_root)
+        self.assertEqual(run_anchoring(service=chain)['confirmed'], 1)
+        anchor.refresh_from_db()
+        self.assertEqual(anchor.status, 'confirmed')
+        for vote in Vote.objects.filter(id__in=[v.id for v in votes]):
+            self.assertEqual(vote.submission_status, 'confirmed')
+            self.assertTrue(verify_inclusion(vote.vote_hash, vote.get_inclusion_proof()['proof'], anchor.merkle_root))
+
+    def test_unsent_claim_is_released_after_timeout(self):
+        """A claimed batch whose root never reached the chain should release its votes after the timeout."""
+        votes = self._pending_votes(self.candidates[:2])
+        chain = FakeChain()
+        with patch.object(chain, 'anchor_vote_root', side_effect=ConnectionError('node unavailable')):
+            self.assertIsNone(anchor_pending_votes(self.election, chain))
+        anchor = VoteAnchor.objects.get()
+        self.assertEqual((anchor.status, anchor.error), ('failed', 'node unavailable'))
+        self.assertEqual(Vote.objects.filter(anchor__isnull=True, submission_status='pending').count(), 2)
+
+        # A claim left behind by a crashed worker
+        Vote.objects.filter(election=self.election).update(next_submission_at=timezone.now())
+        with patch('apps.elections.anchoring._record_sent', side_effect=DatabaseError('connection lost')), \
+                self.assertLogs('apps.elections.anchoring', 'ERROR'):
+            anchor_pending_votes(self.election, chain)
+        claimed = VoteAnchor.objects.get(status='pending')
+        VoteAnchor.objects.filter(id=claimed.id).update(created_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(run_anchoring(service=chain)['failed'], 1)
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.error, 'Anchoring transaction was not recorded')
+        self.assertEqual(Vote.objects.filter(id__in=[v.id for v in votes], anchor__isnull=True).count(), 2)
@@ -0,0 +1,127 @@
+"""
+Homomorphic Aggregation Engine
+
+This module provides:
+- Streaming aggregation of Paillier ciphertexts from any iterable
+- Chunked reduction in the shared worker pool for large inputs
+- Tree combination of partial products with bounded memory
+
+Multiplying ciphertexts mod n^2 adds the underlying votes. The stream is cut
+into fixed-size chunks, each chunk is reduced to one partial product (in a
+worker process when the input is large), and partial products are combined
+pairwise like a binary counter. Only a bounded number of chunks is ever in
+flight, so the full ciphertext stream is never held in memory.
+"""
+
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from .arithmetic import ArithmeticBackend, get_backend
+from .parallel import chunked, get_process_pool, max_workers, parallel_settings
+
+DEFAULT_AGGREGATION_CHUNK_SIZE = 2048
+
+def aggregation_chunk_size() -> int:
+    """Number of ciphertexts reduced per worker task"""
+    return parallel_settings().get('AGGREGATION_CHUNK_SIZE', DEFAULT_AGGREGATION_CHUNK_SIZE)
+
+class TreeReducer:
+    """Combines partial products pairwise, keeping one value per tree level"""
+
+    def __init__(self, modulus, backend: Optional[object] = None):
+        self.backend: ArithmeticBackend = get_backend(backend)
+        self.modulus = self.backend.mpz(modulus)
+        self._levels: List = []
+
+    def add(self, value):
+        """
+        Add a partial product, merging equal-height subtrees like a binary counter
+
+        Args:
+            value: Partial product (int or native integer)
+        """
+        arith = self.backend
+        value = arith.mpz(value)
+        level = 0
+        while level < len(self._levels) and self._levels[level] is not None:
+            value = arith.mulmod(self._levels[level], value, self.modulus)
+            self._levels[level] = None
+            level += 1
+
+        if level == len(self._levels):
+            self._levels.append(value)
+        else:
+            self._levels[level] = value
+
+    def result(self):
+        """
+        Combine every remaining subtree
+
+        Returns:
+            Native integer product (1 if nothing was added)
+        """
+        arith = self.backend
+        result = arith.mpz(1)
+        for value in self._levels:
+            if value is not None:
+                result = arith.mulmod(result, value, self.modulus)
+        return result
+
+def _multiply_chunk(ciphertexts: List[int], modulus: int, backend_name: str) -> int:
+    """Worker-process entry point: reduce one chunk to its product"""
+    arith = get_backend(backend_name)
+    modulus = arith.mpz(modulus)
+    product = arith.mpz(1)
+    for ciphertext in ciphertexts:
+        product = arith.mulmod(product, arith.mpz(ciphertext), modulus)
+    return arith.to_int(product)
+
+def aggregate_ciphertexts(ciphertexts: Iterable[int], public_key: Tuple[int, int],
+                          chunk_size: Optional[int] = None, parallel: Optional[bool] = None,
+                          backend: Optional[object] = None, s: int = 1) -> int:
+    """
+    Homomorphically add a stream of ciphertexts
+
+    Args:
+        ciphertexts: Any iterable of ciphertexts, consumed lazily
+        public_key: Public key tuple (n, g)
+        chunk_size: Ciphertexts per chunk
+        parallel: Force (True) or prevent (False) worker fan-out; None uses
+            workers once the stream turns out to be longer than one chunk
+        backend: Arithmetic backend name or instance
+        s: Damgard-Jurik degree; ciphertexts are reduced mod n^(s+1)
+
+    Returns:
+        int: Encrypted sum (1, a valid encryption of 0, for an empty stream)
+    """
+    arith = get_backend(backend)
+    n = int(public_key[0])
+    modulus = n ** (s + 1)
+    chunk_size = chunk_size or aggregation_chunk_size()
+    reducer = TreeReducer(modulus, backend=arith)
+
+    chunks = chunked(ciphertexts, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return 1
+
+    if parallel is None:
+        parallel = len(first) == chunk_size
+    if not parallel:
+        reducer.add(_multiply_chunk(first, modulus, arith.name))
+        for chunk in chunks:
+            reducer.add(_multiply_chunk(chunk, modulus, arith.name))
+        return arith.to_int(reducer.result())
+
+    # Keep a bounded number of chunks in flight so memory stays flat
+    pool = get_process_pool()
+    max_in_flight = max_workers() * 2
+    in_flight = deque([pool.submit(_multiply_chunk, first, modulus, arith.name)])
+    for chunk in chunks:
+        in_flight.append(pool.submit(_multiply_chunk, chunk, modulus, arith.name))
+        if len(in_flight) >= max_in_flight:
+            reducer.add(in_flight.popleft().result())
+    while in_flight:
+        reducer.add(in_flight.popleft().result())
+
+    return arith.to_int(reducer.result())
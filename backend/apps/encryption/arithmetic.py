@@ -0,0 +1,286 @@
+"""
+Big-Integer Arithmetic Backends for the Encryption App
+
+This module provides:
+- A gmpy2 (mpz/powmod) backend used by default when gmpy2 is installed
+- A pure-Python fallback backend built on int and the builtin pow
+- A registry for selecting a backend by name or from settings
+- Fixed-base windowed exponentiation tables for bases that are reused
+- Simultaneous multi-exponentiation for products of powers
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+try:
+    import gmpy2
+except ImportError:  # pragma: no cover - depends on the environment
+    gmpy2 = None
+
+class ArithmeticBackend:
+    """Common interface for modular arithmetic on big integers"""
+
+    name = 'base'
+
+    def mpz(self, value):
+        """
+        Convert a value to the backend's native integer type
+
+        Args:
+            value: Python int, backend integer or decimal string
+
+        Returns:
+            Native integer
+        """
+        raise NotImplementedError
+
+    def to_int(self, value) -> int:
+        """
+        Convert a native integer back to a Python int
+
+        Args:
+            value: Native integer
+
+        Returns:
+            int: Python integer
+        """
+        return int(value)
+
+    def powmod(self, base, exponent, modulus):
+        """Compute base^exponent mod modulus"""
+        raise NotImplementedError
+
+    def mulmod(self, a, b, modulus):
+        """Compute a * b mod modulus"""
+        return (a * b) % modulus
+
+    def invert(self, a, modulus):
+        """Compute the modular inverse of a mod modulus"""
+        raise NotImplementedError
+
+    def gcd(self, a, b):
+        """Compute the greatest common divisor of a and b"""
+        raise NotImplementedError
+
+    def lcm(self, a, b):
+        """Compute the least common multiple of a and b"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(name={self.name!r})"
+
+class PythonArithmetic(ArithmeticBackend):
+    """Pure-Python backend using int and the builtin pow"""
+
+    name = 'python'
+
+    def mpz(self, value):
+        return int(value)
+
+    def powmod(self, base, exponent, modulus):
+        return pow(base, exponent, modulus)
+
+    def invert(self, a, modulus):
+        try:
+            return pow(a, -1, modulus)
+        except ValueError:
+            raise ValueError("Modular inverse does not exist")
+
+    def gcd(self, a, b):
+        return math.gcd(a, b)
+
+    def lcm(self, a, b):
+        return math.lcm(a, b)
+
+class GmpyArithmetic(ArithmeticBackend):
+    """gmpy2 backend using mpz integers and GMP's powmod"""
+
+    name = 'gmpy2'
+
+    def __init__(self):
+        if gmpy2 is None:
+            raise ImportError("gmpy2 is not installed")
+
+    def mpz(self, value):
+        return gmpy2.mpz(value)
+
+    def powmod(self, base, exponent, modulus):
+        return gmpy2.powmod(base, exponent, modulus)
+
+    def invert(self, a, modulus):
+        try:
+            return gmpy2.invert(a, modulus)
+        except ZeroDivisionError:
+            raise ValueError("Modular inverse does not exist")
+
+    def gcd(self, a, b):
+        return gmpy2.gcd(a, b)
+
+    def lcm(self, a, b):
+        return gmpy2.lcm(a, b)
+
+_BACKEND_CLASSES = {
+    PythonArithmetic.name: PythonArithmetic,
+    GmpyArithmetic.name: GmpyArithmetic,
+}
+
+_backend_instances: Dict[str, ArithmeticBackend] = {}
+
+def available_backends() -> Iterable[str]:
+    """
+    List the backends that can be used in this environment
+
+    Returns:
+        List of backend names, fastest first
+    """
+    names = []
+    if gmpy2 is not None:
+        names.append(GmpyArithmetic.name)
+    names.append(PythonArithmetic.name)
+    return names
+
+def _default_backend_name() -> str:
+    """Read the configured backend name, falling back to the fastest available"""
+    try:
+        from django.conf import settings
+        configured = getattr(settings, 'PAILLIER_ARITHMETIC_BACKEND', None)
+    except Exception:
+        configured = None
+
+    if configured and (configured != GmpyArithmetic.name or gmpy2 is not None):
+        return configured
+    return available_backends()[0]
+
+def get_backend(backend: Optional[object] = None) -> ArithmeticBackend:
+    """
+    Resolve an arithmetic backend
+
+    Args:
+        backend: Backend instance, backend name or None for the configured default
+
+    Returns:
+        ArithmeticBackend: Shared backend instance
+    """
+    if isinstance(backend, ArithmeticBackend):
+        return backend
+
+    name = backend or _default_backend_name()
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown arithmetic backend '{name}'. Choose from {sorted(_BACKEND_CLASSES)}")
+
+    if name not in _backend_instances:
+        _backend_instances[name] = _BACKEND_CLASSES[name]()
+    return _backend_instances[name]
+
+class FixedBaseTable:
+    """Windowed precomputation table for repeated powers of one fixed base"""
+
+    def __init__(self, base, modulus, exponent_bits: int, window: int = 4,
+                 backend: Optional[object] = None):
+        """
+        Precompute base^(d * 2^(window * i)) for every window position i and digit d
+
+        Args:
+            base: Fixed base
+            modulus: Modulus the powers are reduced by
+            exponent_bits: Largest exponent size (in bits) the table covers
+            window: Window width in bits; larger windows trade memory for speed
+            backend: Arithmetic backend name or instance
+        """
+        if window < 1:
+            raise ValueError("Window must be at least 1 bit")
+
+        self.backend = get_backend(backend)
+        arith = self.backend
+        self.base = int(base)
+        self.modulus = arith.mpz(modulus)
+        self.window = window
+        self.exponent_bits = exponent_bits
+        self._mask = (1 << window) - 1
+
+        positions = max(1, -(-exponent_bits // window))
+        self._rows = []
+        row_base = arith.mpz(base) % self.modulus
+        for _ in range(positions):
+            row = [arith.mpz(1), row_base]
+            for _ in range(2, 1 << window):
+                row.append(arith.mulmod(row[-1], row_base, self.modulus))
+            self._rows.append(row)
+            # Next row's base is this row's base raised to 2^window
+            row_base = arith.mulmod(row[-1], row_base, self.modulus)
+
+    def covers(self, exponent: int) -> bool:
+        """Whether the exponent fits in the precomputed table"""
+        return 0 <= exponent and exponent.bit_length() <= len(self._rows) * self.window
+
+    def pow(self, exponent: int):
+        """
+        Compute base^exponent mod modulus with one multiplication per window
+
+        Args:
+            exponent: Non-negative exponent
+
+        Returns:
+            Native integer result
+        """
+        arith = self.backend
+        if not self.covers(exponent):
+            return arith.powmod(arith.mpz(self.base), exponent, self.modulus)
+
+        result = arith.mpz(1)
+        position = 0
+        while exponent:
+            digit = exponent & self._mask
+            if digit:
+                result = arith.mulmod(result, self._rows[position][digit], self.modulus)
+            exponent >>= self.window
+            position += 1
+        return result
+
+def multi_powmod(pairs: Sequence[Tuple[int, int]], modulus, window: int = 4,
+                 backend: Optional[object] = None):
+    """
+    Compute prod(base_i ^ exponent_i) mod modulus with interleaved windows (Straus)
+
+    All bases share one chain of squarings, so the cost is roughly one
+    exponentiation of the longest exponent plus one multiplication per
+    non-zero window digit, instead of one full exponentiation per base.
+
+    Args:
+        pairs: (base, non-negative exponent) pairs
+        modulus: Modulus the product is reduced by
+        window: Window width in bits
+        backend: Arithmetic backend name or instance
+
+    Returns:
+        Native integer product
+    """
+    arith = get_backend(backend)
+    modulus = arith.mpz(modulus)
+    pairs = [(base, int(exponent)) for base, exponent in pairs if exponent]
+    if any(exponent < 0 for _, exponent in pairs):
+        raise ValueError("Exponents must be non-negative")
+    if not pairs:
+        return arith.mpz(1) % modulus
+
+    # Per-base tables of base^0 .. base^(2^window - 1)
+    tables = []
+    for base, _ in pairs:
+        base = arith.mpz(base) % modulus
+        row = [arith.mpz(1), base]
+        for _ in range(2, 1 << window):
+            row.append(arith.mulmod(row[-1], base, modulus))
+        tables.append(row)
+
+    mask = (1 << window) - 1
+    positions = -(-max(exponent.bit_length() for _, exponent in pairs) // window)
+    result = arith.mpz(1)
+    for position in reversed(range(positions)):
+        for _ in range(window):
+            result = arith.mulmod(result, result, modulus)
+        shift = position * window
+        for row, (_, exponent) in zip(tables, pairs):
+            digit = (exponent >> shift) & mask
+            if digit:
+                result = arith.mulmod(result, row[digit], modulus)
+    return result
@@ -0,0 +1,224 @@
+"""
+Offline Crypto Benchmark Suite
+
+This module provides:
+- A fixed set of operations timed per key size and arithmetic backend:
+  key generation, encryption, decryption, aggregation, Shamir split and
+  reconstruct, and threshold partial decryption
+- JSON reports with ops/sec and p50/p95/p99 latencies
+- Comparison against a stored baseline report with per-operation regression
+  thresholds
+
+Everything runs in-process with freshly generated keys, so the suite needs
+no database, network or key pool. Regressions are judged on p50 latency,
+which is less sensitive than the mean to the odd slow call. Slowdowns
+smaller than a fixed noise floor are ignored so that microsecond-scale
+operations do not flap, and key generation gets a looser threshold by
+default because the prime search time varies from run to run.
+"""
+
+import json
+import os
+import platform
+import secrets
+import sys
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .aggregation import aggregate_ciphertexts
+from .arithmetic import available_backends
+from .benchmarks import time_operation
+from .paillier import PaillierEncryption, ThresholdPaillier
+from .shamir import DistributedKeyManager
+
+REPORT_VERSION = 1
+DEFAULT_KEY_SIZES = (512, 1024, 2048, 3072)
+DEFAULT_ITERATIONS = 20
+DEFAULT_KEYGEN_ITERATIONS = 3
+DEFAULT_AGGREGATE_BATCH = 256
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+DEFAULT_REGRESSION_THRESHOLDS = {'keygen': 1.0}
+DEFAULT_NOISE_FLOOR_MS = 0.05
+REGRESSION_METRIC = 'p50_ms'
+
+OPERATIONS = (
+    'keygen', 'encrypt', 'decrypt', 'aggregate', 'shamir_split', 'shamir_reconstruct',
+    'threshold_partial_decrypt',
+)
+
+def benchmark_settings() -> dict:
+    """Read CRYPTO_BENCHMARKS from settings, tolerating unconfigured Django"""
+    try:
+        from django.conf import settings
+        return dict(getattr(settings, 'CRYPTO_BENCHMARKS', {}) or {})
+    except Exception:
+        return {}
+
+def benchmark_key_size(key_size: int, backend: str, iterations: int = DEFAULT_ITERATIONS,
+                       keygen_iterations: int = DEFAULT_KEYGEN_ITERATIONS,
+                       aggregate_batch: int = DEFAULT_AGGREGATE_BATCH, trustees: int = 5,
+                       threshold: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Time every suite operation for one key size on one backend
+
+    Args:
+        key_size: Paillier key size in bits
+        backend: Arithmetic backend name
+        iterations: Calls timed per operation
+        keygen_iterations: Key pairs generated for the keygen timing
+        aggregate_batch: Ciphertexts combined per aggregate call
+        trustees: Total trustees for the Shamir and threshold operations
+        threshold: Trustees needed to reconstruct or decrypt
+
+    Returns:
+        Dict of timing results keyed by operation name
+    """
+    paillier = PaillierEncryption(key_size=key_size, backend=backend, use_obfuscator_pool=False)
+    results = {'keygen': time_operation(paillier.generate_key_pair, keygen_iterations)}
+
+    key_pair = paillier.generate_key_pair()
+    public_key = key_pair.public_key
+    votes = iter([secrets.randbelow(2) for _ in range(iterations)])
+    results['encrypt'] = time_operation(lambda: paillier.encrypt(next(votes), public_key), iterations)
+
+    ciphertexts = paillier.encrypt_many(
+        [secrets.randbelow(2) for _ in range(max(iterations, aggregate_batch))], public_key, parallel=False
+    )
+    targets = iter(ciphertexts)
+    results['decrypt'] = time_operation(lambda: paillier.decrypt(next(targets), key_pair), iterations)
+
+    batch = ciphertexts[:aggregate_batch]
+    aggregate = time_operation(
+        lambda: aggregate_ciphertexts(batch, public_key, parallel=False, backend=backend), iterations
+    )
+    aggregate['batch_size'] = len(batch)
+    aggregate['ciphertexts_per_sec'] = aggregate['ops_per_sec'] * len(batch)
+    results['aggregate'] = aggregate
+
+    manager = DistributedKeyManager(trustees, threshold, secret_bits=key_pair.lambda_val.bit_length())
+    results['shamir_split'] = time_operation(lambda: manager.distribute_private_key(key_pair.lambda_val), iterations)
+    shares = manager.distribute_private_key(key_pair.lambda_val)
+    results['shamir_reconstruct'] = time_operation(
+        lambda: manager.reconstruct_private_key(shares[:threshold]), iterations
+    )
+
+    scheme = ThresholdPaillier(trustees, threshold, backend=backend)
+    _, share = scheme.generate_distributed_keys(key_pair)[0]
+    targets = iter(ciphertexts)
+    results['threshold_partial_decrypt'] = time_operation(
+        lambda: scheme.partial_decrypt(next(targets), share, key_pair), iterations
+    )
+    return results
+
+def run_suite(key_sizes: Iterable[int] = DEFAULT_KEY_SIZES, backends: Optional[Iterable[str]] = None,
+              iterations: int = DEFAULT_ITERATIONS, keygen_iterations: int = DEFAULT_KEYGEN_ITERATIONS,
+              progress: Optional[Callable[[str, int], None]] = None) -> dict:
+    """
+    Run the suite for every key size and backend
+
+    Args:
+        key_sizes: Paillier key sizes in bits
+        backends: Arithmetic backend names (defaults to every available backend)
+        iterations: Calls timed per operation
+        keygen_iterations: Key pairs generated per keygen timing
+        progress: Called with (backend, key_size) before each combination
+
+    Returns:
+        Report dict: version, generated_at, environment, settings and
+        results[backend][key_size][operation]
+    """
+    backends = list(backends or available_backends())
+    key_sizes = [int(size) for size in key_sizes]
+    results = {}
+    for backend in backends:
+        for key_size in key_sizes:
+            if progress is not None:
+                progress(backend, key_size)
+            results.setdefault(backend, {})[str(key_size)] = benchmark_key_size(
+                key_size, backend, iterations=iterations, keygen_iterations=keygen_iterations
+            )
+    return {
+        'version': REPORT_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'settings': {
+            'key_sizes': key_sizes,
+            'backends': backends,
+            'iterations': iterations,
+            'keygen_iterations': keygen_iterations,
+        },
+        'results': results,
+    }
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: Optional[float] = None,
+                        thresholds: Optional[Dict[str, float]] = None,
+                        noise_floor_ms: Optional[float] = None) -> List[dict]:
+    """
+    Compare a report with a baseline report, operation by operation
+
+    Only combinations present in both reports are compared.
+
+    Args:
+        report: Report from run_suite
+        baseline: Earlier report to compare against
+        threshold: Allowed fractional slowdown of p50 latency (0.25 = 25%)
+        thresholds: Per-operation overrides of threshold
+        noise_floor_ms: Slowdowns below this many milliseconds never count
+
+    Returns:
+        One dict per compared operation with backend, key_size, operation,
+        baseline_ms, current_ms, change (fractional) and regressed
+    """
+    config = benchmark_settings()
+    if threshold is None:
+        threshold = config.get('REGRESSION_THRESHOLD', DEFAULT_REGRESSION_THRESHOLD)
+    limits = dict(DEFAULT_REGRESSION_THRESHOLDS)
+    limits.update(config.get('REGRESSION_THRESHOLDS', {}))
+    limits.update(thresholds or {})
+    if noise_floor_ms is None:
+        noise_floor_ms = config.get('NOISE_FLOOR_MS', DEFAULT_NOISE_FLOOR_MS)
+
+    comparisons = []
+    for backend, sizes in report.get('results', {}).items():
+        for key_size, operations in sizes.items():
+            previous = baseline.get('results', {}).get(backend, {}).get(key_size, {})
+            for operation, result in operations.items():
+                if operation not in previous:
+                    continue
+                baseline_ms = previous[operation][REGRESSION_METRIC]
+                current_ms = result[REGRESSION_METRIC]
+                change = (current_ms - baseline_ms) / baseline_ms if baseline_ms else 0.0
+                comparisons.append({
+                    'backend': backend,
+                    'key_size': int(key_size),
+                    'operation': operation,
+                    'baseline_ms': baseline_ms,
+                    'current_ms': current_ms,
+                    'change': change,
+                    'regressed': (change > limits.get(operation, threshold)
+                                  and current_ms - baseline_ms > noise_floor_ms),
+                })
+    return comparisons
+
+def load_report(path) -> dict:
+    """Read a JSON report (e.g. the stored baseline)"""
+    with open(path) as f:
+        report = json.load(f)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"Unsupported benchmark report version {report.get('version')}")
+    return report
+
+def save_report(report: dict, path):
+    """Write a JSON report, creating its directory if needed"""
+    directory = os.path.dirname(os.fspath(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,262 @@
+"""
+Micro-Benchmarks for the Encryption App
+
+This module provides:
+- A small timing helper that reports ops/sec, mean latency and percentiles
+- Comparisons of the generic and specialised Paillier encryption paths
+- A locally simulated threshold decryption ceremony
+- Per-candidate Paillier ballots against one packed Damgard-Jurik ciphertext
+"""
+
+import secrets
+import time
+from typing import Callable, Dict, List, Optional
+
+from .aggregation import aggregate_ciphertexts
+from .damgard_jurik import DamgardJurikEncryption
+from .packing import PackedBallotEncoder
+from .paillier import PaillierEncryption, PaillierKeyPair, ThresholdPaillier
+from .serialization import ciphertext_width
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """
+    Linearly interpolated percentile of a list of samples
+
+    Args:
+        samples: Sorted samples
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        float: Interpolated value
+    """
+    position = (len(samples) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(samples) - 1)
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+def time_operation(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """
+    Time repeated calls of a zero-argument function
+
+    Args:
+        func: Operation to time
+        iterations: Number of calls
+
+    Returns:
+        Dict with iterations, total_seconds, ops_per_sec, mean_ms and the
+        p50_ms, p95_ms and p99_ms latency percentiles
+    """
+    latencies = []
+    clock = time.perf_counter
+    for _ in range(iterations):
+        start = clock()
+        func()
+        latencies.append((clock() - start) * 1000)
+    total = sum(latencies) / 1000
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'total_seconds': total,
+        'ops_per_sec': iterations / total if total else float('inf'),
+        'mean_ms': total * 1000 / iterations,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+    }
+
+def compare_generator_paths(key_size: int = 2048, iterations: int = 50, backend: Optional[str] = None,
+                            key_pair: Optional[PaillierKeyPair] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Compare g^m via generic powmod, a fixed-base table and the n+1 closed form
+
+    Args:
+        key_size: Key size in bits (ignored when key_pair is given)
+        iterations: Encryptions per path
+        backend: Arithmetic backend name
+        key_pair: Existing key pair to reuse
+
+    Returns:
+        Dict of timing results keyed by path name
+    """
+    key_pair = key_pair or PaillierEncryption(key_size=key_size, backend=backend).generate_key_pair()
+    public_key = key_pair.public_key
+    paths = {
+        'generic_powmod': PaillierEncryption(backend=backend, generator_shortcut=False),
+        'fixed_base_table': PaillierEncryption(backend=backend, generator_shortcut=False, fixed_base_tables=True),
+        'closed_form': PaillierEncryption(backend=backend),
+    }
+    messages = [secrets.randbelow(key_pair.n) for _ in range(iterations)]
+
+    results = {}
+    for name, paillier in paths.items():
+        arith = paillier.backend
+        n = arith.mpz(key_pair.n)
+        n_squared = n * n
+        paillier._generator_power(key_pair.g, 1, n, n_squared)  # Build any table up front
+        values = iter(messages)
+        results[name] = time_operation(
+            lambda: paillier._generator_power(key_pair.g, next(values), n, n_squared), iterations
+        )
+        values = iter(messages)
+        results[f'{name}_encrypt'] = time_operation(
+            lambda: paillier.encrypt(next(values), public_key), iterations
+        )
+    return results
+
+def compare_fixed_base_multiply(key_size: int = 2048, iterations: int = 50, backend: Optional[str] = None,
+                                key_pair: Optional[PaillierKeyPair] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Compare multiply_ciphertext on one fixed ciphertext with and without a table
+
+    Args:
+        key_size: Key size in bits (ignored when key_pair is given)
+        iterations: Multiplications per path
+        backend: Arithmetic backend name
+        key_pair: Existing key pair to reuse
+
+    Returns:
+        Dict of timing results keyed by path name
+    """
+    paillier = PaillierEncryption(key_size=key_size, backend=backend)
+    key_pair = key_pair or paillier.generate_key_pair()
+    public_key = key_pair.public_key
+    ciphertext = paillier.encrypt(1, public_key)
+    scalars = [secrets.randbelow(key_pair.n) for _ in range(iterations)]
+
+    build_start = time.perf_counter()
+    table = paillier.fixed_base_table(ciphertext, public_key)
+    build_seconds = time.perf_counter() - build_start
+
+    values = iter(scalars)
+    generic = time_operation(lambda: paillier.multiply_ciphertext(ciphertext, next(values), public_key), iterations)
+    values = iter(scalars)
+    tabled = time_operation(
+        lambda: paillier.multiply_ciphertext(ciphertext, next(values), public_key, table=table), iterations
+    )
+    tabled['table_build_seconds'] = build_seconds
+    return {'generic_powmod': generic, 'fixed_base_table': tabled}
+
+def _throughput(func: Callable[[], object], items: int) -> Dict[str, float]:
+    """Time one call that processes a batch of items, reported per item"""
+    start = time.perf_counter()
+    func()
+    total = time.perf_counter() - start
+    return {
+        'iterations': items,
+        'total_seconds': total,
+        'ops_per_sec': items / total if total else float('inf'),
+        'mean_ms': total * 1000 / items,
+    }
+
+def compare_threshold_decryption(key_size: int = 2048, iterations: int = 50, backend: Optional[str] = None,
+                                 key_pair: Optional[PaillierKeyPair] = None, trustees: int = 5,
+                                 threshold: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Compare threshold decryption ceremonies with simulated trustees
+
+    Args:
+        key_size: Key size in bits (ignored when key_pair is given)
+        iterations: Ciphertexts in the tally vector (e.g. one per candidate)
+        backend: Arithmetic backend name
+        key_pair: Existing key pair to reuse
+        trustees: Total number of trustees
+        threshold: Trustees needed to decrypt
+
+    Returns:
+        Dict of per-ciphertext timing results keyed by path name
+    """
+    paillier = PaillierEncryption(key_size=key_size, backend=backend)
+    key_pair = key_pair or paillier.generate_key_pair()
+    scheme = ThresholdPaillier(trustees, threshold, backend=backend)
+    shares = scheme.generate_distributed_keys(key_pair)
+    active = dict(shares[:threshold])
+    ciphertexts = paillier.encrypt_many(
+        [secrets.randbelow(1000) for _ in range(iterations)], key_pair.public_key, parallel=False
+    )
+
+    def round_trips():
+        # One trustee round trip per ciphertext
+        for ciphertext in ciphertexts:
+            partials = [(tid, scheme.partial_decrypt(ciphertext, share, key_pair)) for tid, share in active.items()]
+            scheme.combine_partial_decryptions(partials, key_pair)
+
+    return {
+        'private_key_decrypt': _throughput(lambda: [paillier.decrypt(c, key_pair) for c in ciphertexts], iterations),
+        'threshold_round_trips': _throughput(round_trips, iterations),
+        'threshold_vector': _throughput(
+            lambda: scheme.simulate_ceremony(ciphertexts, key_pair, shares=shares, parallel=False), iterations
+        ),
+        'threshold_vector_parallel': _throughput(
+            lambda: scheme.simulate_ceremony(ciphertexts, key_pair, shares=shares, parallel=True), iterations
+        ),
+    }
+
+def compare_damgard_jurik_packing(key_size: int = 2048, iterations: int = 50, backend: Optional[str] = None,
+                                  key_pair: Optional[PaillierKeyPair] = None, num_candidates: int = 32,
+                                  max_voters: int = 10 ** 6, s: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Compare per-candidate Paillier ballots with one packed Damgard-Jurik ciphertext per ballot
+
+    iterations ballots are cast both ways and tallied: per-candidate ballots
+    need one product and one decryption per candidate, packed ballots one
+    product and one decryption in total.
+
+    Args:
+        key_size: Key size in bits (ignored when key_pair is given)
+        iterations: Ballots cast
+        backend: Arithmetic backend name
+        key_pair: Existing key pair to reuse
+        num_candidates: Candidates on the ballot
+        max_voters: Electorate the packed slots are sized for
+        s: Damgard-Jurik degree (defaults to the smallest that fits every slot)
+
+    Returns:
+        Dict of per-ballot timing results keyed by path name; tally results
+        also carry ms_per_candidate, bytes_per_ballot and s
+    """
+    key_pair = key_pair or PaillierEncryption(key_size=key_size, backend=backend).generate_key_pair()
+    n, public_key = key_pair.n, key_pair.public_key
+    if s is None:
+        s = 1
+        while PackedBallotEncoder.max_candidates(max_voters, n ** s) < num_candidates:
+            s += 1
+    packer = PackedBallotEncoder(num_candidates, max_voters, n ** s)
+    paillier = PaillierEncryption(backend=backend, use_obfuscator_pool=False)
+    damgard_jurik = DamgardJurikEncryption(s, backend=backend, use_obfuscator_pool=False)
+    choices = [secrets.randbelow(num_candidates) for _ in range(iterations)]
+
+    per_candidate = []
+    packed = []
+    results = {
+        'per_candidate_encrypt': _throughput(lambda: per_candidate.extend(
+            paillier.encrypt_many([int(i == choice) for i in range(num_candidates)], public_key, parallel=False)
+            for choice in choices
+        ), iterations),
+        'packed_encrypt': _throughput(lambda: packed.extend(
+            damgard_jurik.encrypt_many([packer.encode(choice) for choice in choices], public_key, parallel=False)
+        ), iterations),
+    }
+
+    def tally_per_candidate():
+        return [paillier.decrypt(aggregate_ciphertexts((ballot[i] for ballot in per_candidate), public_key,
+                                                       parallel=False, backend=backend), key_pair)
+                for i in range(num_candidates)]
+
+    def tally_packed():
+        total = aggregate_ciphertexts(packed, public_key, parallel=False, backend=backend, s=s)
+        return packer.unpack(damgard_jurik.decrypt(total, key_pair))
+
+    expected = [choices.count(i) for i in range(num_candidates)]
+    for name, tally, size in [
+        ('per_candidate_tally', tally_per_candidate, num_candidates * ciphertext_width(n)),
+        ('packed_tally', tally_packed, ciphertext_width(n, s)),
+    ]:
+        counts = []
+        result = _throughput(lambda: counts.extend(tally()), iterations)
+        if counts != expected:
+            raise RuntimeError(f"{name} produced wrong counts")
+        result['ms_per_candidate'] = result['total_seconds'] * 1000 / num_candidates
+        result['bytes_per_ballot'] = size
+        result['s'] = s if name == 'packed_tally' else 1
+        results[name] = result
+    return results
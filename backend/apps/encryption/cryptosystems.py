@@ -0,0 +1,110 @@
+"""
+Pluggable Additively Homomorphic Cryptosystems
+
+This module provides:
+- Cryptosystem: the interface vote casting, tallying and the key ceremony
+  use, so an election can switch schemes without touching those paths
+- A registry of the schemes an election can choose from
+- get_cryptosystem: build a scheme by name
+
+Two schemes are registered:
+
+    paillier     Paillier (Damgard-Jurik for s > 1); integer ciphertexts,
+                 ballot proofs and packed ballots
+    ec_elgamal   exponential ElGamal over secp256k1; 66-byte ciphertexts,
+                 plaintexts recovered by a baby-step/giant-step search
+                 bounded by the electorate
+
+Ciphertexts are opaque to callers: they are combined with add_ciphertexts or
+aggregate, stored with encode_ciphertext and checked with
+invalid_ciphertexts, and only the scheme that made them looks inside.
+"""
+
+from functools import reduce
+from typing import Iterable, List, Sequence
+
+class Cryptosystem:
+    """Interface of an additively homomorphic encryption scheme"""
+
+    # Registry name, stored on Election.cryptosystem
+    name = ''
+    # Whether encrypt_with_randomness and the proofs module can be used
+    supports_ballot_proofs = False
+    # Whether a packed ballot (many counters in one plaintext) fits
+    supports_packed_ballots = False
+
+    def generate_key_pair(self):
+        """Generate a new key pair"""
+        raise NotImplementedError
+
+    def encrypt(self, message: int, public_key):
+        """Encrypt a message under a public key"""
+        raise NotImplementedError
+
+    def encrypt_many(self, messages: Iterable[int], public_key) -> List:
+        """Encrypt several messages under the same public key"""
+        return [self.encrypt(message, public_key) for message in messages]
+
+    def decrypt(self, ciphertext, key_pair) -> int:
+        """Decrypt a ciphertext with the private key"""
+        raise NotImplementedError
+
+    def add_ciphertexts(self, ciphertext1, ciphertext2, public_key):
+        """Encrypt the sum of two plaintexts from their ciphertexts"""
+        raise NotImplementedError
+
+    def aggregate(self, ciphertexts: Iterable, public_key):
+        """
+        Combine many ciphertexts into an encryption of their sum
+
+        Args:
+            ciphertexts: Ciphertexts under public_key (at least one)
+            public_key: Public key
+
+        Returns:
+            Encrypted sum
+        """
+        return reduce(lambda a, b: self.add_ciphertexts(a, b, public_key), ciphertexts)
+
+    def encode_ciphertext(self, ciphertext, public_key) -> bytes:
+        """Serialize a ciphertext into a self-describing binary record"""
+        raise NotImplementedError
+
+    def decode_ciphertext(self, data, public_key):
+        """Parse a record written by encode_ciphertext"""
+        raise NotImplementedError
+
+    def ciphertext_bytes(self, ciphertext, public_key) -> bytes:
+        """Raw ciphertext bytes, without a header, as hashed and anchored on-chain"""
+        raise NotImplementedError
+
+    def invalid_ciphertexts(self, ciphertexts: Sequence, public_key) -> List[int]:
+        """Sorted indices of ciphertexts that are not well-formed under public_key"""
+        raise NotImplementedError
+
+    def key_share_secret(self, key_pair) -> int:
+        """The private value a key ceremony splits between trustees"""
+        raise NotImplementedError
+
+CRYPTOSYSTEMS = ('paillier', 'ec_elgamal')
+
+def get_cryptosystem(name: str = 'paillier', **options) -> Cryptosystem:
+    """
+    Build a cryptosystem by registry name
+
+    Args:
+        name: 'paillier' or 'ec_elgamal'
+        **options: Scheme options; s selects the Damgard-Jurik degree for
+            paillier, max_value the decryption search bound for ec_elgamal,
+            and backend is accepted by both
+
+    Returns:
+        Cryptosystem
+    """
+    if name == 'paillier':
+        from .damgard_jurik import get_encryption
+        return get_encryption(options.pop('s', 1), **options)
+    if name == 'ec_elgamal':
+        from .elgamal import ECElGamalEncryption
+        return ECElGamalEncryption(**options)
+    raise ValueError(f"Unknown cryptosystem '{name}' (choose from {', '.join(CRYPTOSYSTEMS)})")
@@ -0,0 +1,176 @@
+"""
+Damgard-Jurik Cryptosystem
+
+This module provides:
+- Damgard-Jurik encryption of degree s: plaintexts mod n^s, ciphertexts mod
+  n^(s+1), under the same key pairs as Paillier
+- The same encrypt/decrypt/add/multiply interface as PaillierEncryption
+- A factory returning the right scheme for a given degree
+
+Paillier is the s = 1 case. For s > 1 a ciphertext c = g^m * r^(n^s) mod
+n^(s+1) carries s*|n| bits of plaintext at (s+1)*|n| bits of ciphertext, so
+the expansion falls from 2 towards 1 as s grows. That lets one ciphertext
+hold every slot of a packed ballot that would not fit below n, instead of
+falling back to one ciphertext per candidate.
+
+With g = n + 1, g^m is the short binomial sum sum_{k<=s} C(m, k) n^k mod
+n^(s+1). Decryption raises c to lambda, which leaves (1 + n)^(m*lambda),
+recovers m*lambda mod n^s digit by digit (Damgard-Jurik, Theorem 1) and
+divides out lambda. When p and q are known, c^lambda is computed mod
+p^(s+1) and q^(s+1) and recombined.
+
+Threshold decryption (ThresholdPaillier) and the obfuscator pools only cover
+s = 1.
+"""
+
+import math
+from typing import Dict, Tuple
+
+from Crypto.Util.number import inverse
+
+from .paillier import PaillierEncryption, PaillierKeyPair
+
+class DamgardJurikEncryption(PaillierEncryption):
+    """Damgard-Jurik encryption of degree s over Paillier key pairs"""
+
+    def __init__(self, s: int = 2, **kwargs):
+        """
+        Initialize the scheme
+
+        Args:
+            s: Degree; plaintexts live mod n^s and ciphertexts mod n^(s+1)
+            **kwargs: Passed on to PaillierEncryption
+        """
+        if s < 1:
+            raise ValueError("Damgard-Jurik degree s must be at least 1")
+        super().__init__(**kwargs)
+        self.s = s
+        self._decryption_constants = {}
+
+    def _take_obfuscator(self, public_key: Tuple[int, int]):
+        # Pools hold r^n mod n^2, which only fits s = 1
+        if self.s == 1:
+            return super()._take_obfuscator(public_key)
+        return None
+
+    def _generator_power(self, g: int, message: int, n, modulus):
+        """
+        Compute g^m mod n^(s+1)
+
+        Args:
+            g: Generator
+            message: Plaintext message
+            n: Public modulus (native integer)
+            modulus: n^(s+1) (native integer)
+
+        Returns:
+            Native integer g^m mod n^(s+1)
+        """
+        if self.s == 1 or not (self.generator_shortcut and g == n + 1):
+            return super()._generator_power(g, message, n, modulus)
+
+        # (1 + n)^m = sum_{k=0..s} C(m, k) n^k mod n^(s+1)
+        arith = self.backend
+        n = int(n)
+        result = 1
+        binomial = 1
+        n_power = 1
+        for k in range(1, self.s + 1):
+            binomial = binomial * (message - k + 1) // k
+            n_power *= n
+            result += binomial * n_power
+        return arith.mpz(result) % modulus
+
+    def _log_one_plus_n(self, value: int, n: int) -> int:
+        """
+        Recover i mod n^s from value = (1 + n)^i mod n^(s+1)
+
+        Peels off one power of n per round (Damgard-Jurik, Theorem 1).
+
+        Args:
+            value: Power of 1 + n mod n^(s+1)
+            n: Public modulus
+
+        Returns:
+            int: i mod n^s
+        """
+        powers = [n ** j for j in range(self.s + 2)]
+        i = 0
+        for j in range(1, self.s + 1):
+            modulus = powers[j]
+            t1 = (value % powers[j + 1] - 1) // n
+            t2 = i
+            for k in range(2, j + 1):
+                i -= 1
+                t2 = t2 * i % modulus
+                t1 = (t1 - t2 * powers[k - 1] * inverse(math.factorial(k), modulus)) % modulus
+            i = t1
+        return i
+
+    def _constants(self, key_pair: PaillierKeyPair) -> Dict[str, int]:
+        """Per-key decryption constants, computed on first use"""
+        n = int(key_pair.n)
+        key = (n, int(key_pair.g), int(key_pair.lambda_val))
+        constants = self._decryption_constants.get(key)
+        if constants is not None:
+            return constants
+
+        constants = {}
+        if getattr(key_pair, 'has_crt', False):
+            p_power = int(key_pair.p) ** (self.s + 1)
+            q_power = int(key_pair.q) ** (self.s + 1)
+            constants.update(p_power=p_power, q_power=q_power, p_power_inverse=inverse(p_power, q_power))
+
+        # Dividing by log(g^lambda) undoes both lambda and a generator other than n + 1
+        plaintext_modulus = self.plaintext_modulus(n)
+        g_lambda = pow(int(key_pair.g), int(key_pair.lambda_val), self.ciphertext_modulus(n))
+        constants['divisor'] = inverse(self._log_one_plus_n(g_lambda, n), plaintext_modulus)
+        self._decryption_constants[key] = constants
+        return constants
+
+    def decrypt(self, ciphertext: int, key_pair: PaillierKeyPair) -> int:
+        """
+        Decrypt a ciphertext
+
+        Args:
+            ciphertext: Encrypted message
+            key_pair: Key pair containing private key
+
+        Returns:
+            int: Decrypted message in [0, n^s)
+        """
+        if self.s == 1:
+            return super().decrypt(ciphertext, key_pair)
+
+        arith = self.backend
+        n = int(key_pair.n)
+        lambda_val = arith.mpz(key_pair.lambda_val)
+        constants = self._constants(key_pair)
+        c = arith.mpz(ciphertext)
+
+        if self.use_crt and 'p_power' in constants:
+            # c^lambda mod p^(s+1) and q^(s+1), recombined mod n^(s+1)
+            p_power, q_power = arith.mpz(constants['p_power']), arith.mpz(constants['q_power'])
+            x_p = arith.powmod(c % p_power, lambda_val, p_power)
+            x_q = arith.powmod(c % q_power, lambda_val, q_power)
+            h = arith.mulmod(x_q - x_p, arith.mpz(constants['p_power_inverse']), q_power)
+            x = arith.to_int(x_p + p_power * h)
+        else:
+            x = arith.to_int(arith.powmod(c, lambda_val, arith.mpz(self.ciphertext_modulus(n))))
+
+        return self._log_one_plus_n(x, n) * constants['divisor'] % self.plaintext_modulus(n)
+
+def get_encryption(s: int = 1, **kwargs) -> PaillierEncryption:
+    """
+    Get the encryption scheme for a degree
+
+    Args:
+        s: Damgard-Jurik degree (1 is plain Paillier)
+        **kwargs: Passed on to the scheme
+
+    Returns:
+        PaillierEncryption for s = 1, DamgardJurikEncryption otherwise
+    """
+    if s == 1:
+        return PaillierEncryption(**kwargs)
+    return DamgardJurikEncryption(s, **kwargs)
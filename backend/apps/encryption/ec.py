@@ -0,0 +1,438 @@
+"""
+Elliptic Curve Arithmetic
+
+This module provides:
+- Short Weierstrass curve parameters (secp256k1)
+- Point addition, doubling and scalar multiplication in Jacobian
+  coordinates on the configured arithmetic backend
+- Fixed-base tables that turn a scalar multiplication of a fixed point into
+  one mixed addition per 4-bit window
+- Compressed SEC1 point encoding and validated decoding
+- Baby-step/giant-step tables for small discrete logarithms
+
+Affine points are (x, y) tuples of ints and None is the point at infinity.
+Jacobian points (X, Y, Z) stand for (X/Z^2, Y/Z^3) and skip the field
+inversion on every addition; a point is converted back to affine once, when
+it is stored or compared. secp256k1 has cofactor 1, so every point that
+decodes onto the curve is in the prime-order group.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .arithmetic import ArithmeticBackend, get_backend
+
+Point = Optional[Tuple[int, int]]
+
+class Curve:
+    """Parameters of a short Weierstrass curve y^2 = x^3 + a*x + b over GF(p)"""
+
+    def __init__(self, name: str, p: int, a: int, b: int, order: int, gx: int, gy: int):
+        self.name = name
+        self.p = p
+        self.a = a
+        self.b = b
+        self.order = order
+        self.generator = (gx, gy)
+        self.field_bytes = (p.bit_length() + 7) // 8
+        self.point_bytes = self.field_bytes + 1
+
+    def __repr__(self):
+        return f"Curve({self.name})"
+
+SECP256K1 = Curve(
+    'secp256k1',
+    p=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    a=0,
+    b=7,
+    order=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    gx=0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    gy=0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+CURVES = {SECP256K1.name: SECP256K1}
+
+def get_curve(name: str) -> Curve:
+    """Look up a supported curve by name"""
+    try:
+        return CURVES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported curve '{name}' (choose from {', '.join(CURVES)})")
+
+class CurveArithmetic:
+    """Group operations on one curve"""
+
+    def __init__(self, curve: Curve = SECP256K1, backend: Optional[object] = None):
+        """
+        Initialize curve arithmetic
+
+        Args:
+            curve: Curve parameters
+            backend: Arithmetic backend name or instance
+        """
+        if curve.a != 0:
+            raise ValueError("Only curves with a = 0 are supported")
+        self.curve = curve
+        self.backend: ArithmeticBackend = get_backend(backend)
+        self.p = self.backend.mpz(curve.p)
+        self.infinity = (self.backend.mpz(1), self.backend.mpz(1), self.backend.mpz(0))
+
+    def is_on_curve(self, point: Point) -> bool:
+        """Whether an affine point satisfies the curve equation (infinity counts)"""
+        if point is None:
+            return True
+        x, y = point
+        p = self.curve.p
+        return 0 <= x < p and 0 <= y < p and (y * y - x * x * x - self.curve.b) % p == 0
+
+    def to_jacobian(self, point: Point):
+        if point is None:
+            return self.infinity
+        mpz = self.backend.mpz
+        return (mpz(point[0]), mpz(point[1]), mpz(1))
+
+    def to_affine(self, point) -> Point:
+        """Convert a Jacobian point to affine with one field inversion"""
+        X, Y, Z = point
+        if not Z:
+            return None
+        arith = self.backend
+        p = self.p
+        z_inverse = arith.invert(Z, p)
+        z_inverse_squared = z_inverse * z_inverse % p
+        return (arith.to_int(X * z_inverse_squared % p), arith.to_int(Y * z_inverse_squared * z_inverse % p))
+
+    def batch_to_affine(self, points: List) -> List[Point]:
+        """Convert many Jacobian points to affine with a single field inversion (Montgomery's trick)"""
+        arith = self.backend
+        p = self.p
+        prefix = []
+        running = arith.mpz(1)
+        for _, _, Z in points:
+            prefix.append(running)
+            if Z:
+                running = running * Z % p
+        inverse = arith.invert(running, p)
+
+        result = [None] * len(points)
+        for i in reversed(range(len(points))):
+            X, Y, Z = points[i]
+            if not Z:
+                continue
+            z_inverse = inverse * prefix[i] % p
+            inverse = inverse * Z % p
+            z_inverse_squared = z_inverse * z_inverse % p
+            result[i] = (arith.to_int(X * z_inverse_squared % p),
+                         arith.to_int(Y * z_inverse_squared * z_inverse % p))
+        return result
+
+    def double(self, point):
+        """Double a Jacobian point"""
+        X, Y, Z = point
+        if not Z or not Y:
+            return self.infinity
+        p = self.p
+        A = X * X % p
+        B = Y * Y % p
+        C = B * B % p
+        D = 2 * ((X + B) * (X + B) - A - C) % p
+        E = 3 * A % p
+        X3 = (E * E - 2 * D) % p
+        Y3 = (E * (D - X3) - 8 * C) % p
+        Z3 = 2 * Y * Z % p
+        return (X3, Y3, Z3)
+
+    def add_mixed(self, point, other: Point):
+        """Add an affine point to a Jacobian point"""
+        if other is None:
+            return point
+        X1, Y1, Z1 = point
+        if not Z1:
+            return self.to_jacobian(other)
+        p = self.p
+        x2, y2 = other
+        Z1Z1 = Z1 * Z1 % p
+        H = (x2 * Z1Z1 - X1) % p
+        r = 2 * (y2 * Z1 * Z1Z1 - Y1) % p
+        if not H:
+            return self.double(point) if not r else self.infinity
+        HH = H * H % p
+        I = 4 * HH % p
+        J = H * I % p
+        V = X1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * Y1 * J) % p
+        Z3 = ((Z1 + H) * (Z1 + H) - Z1Z1 - HH) % p
+        return (X3, Y3, Z3)
+
+    def add_jacobian(self, point, other):
+        """Add two Jacobian points"""
+        X1, Y1, Z1 = point
+        X2, Y2, Z2 = other
+        if not Z1:
+            return other
+        if not Z2:
+            return point
+        p = self.p
+        Z1Z1 = Z1 * Z1 % p
+        Z2Z2 = Z2 * Z2 % p
+        U1 = X1 * Z2Z2 % p
+        U2 = X2 * Z1Z1 % p
+        S1 = Y1 * Z2 * Z2Z2 % p
+        S2 = Y2 * Z1 * Z1Z1 % p
+        H = (U2 - U1) % p
+        r = 2 * (S2 - S1) % p
+        if not H:
+            return self.double(point) if not r else self.infinity
+        I = 4 * H * H % p
+        J = H * I % p
+        V = U1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * S1 * J) % p
+        Z3 = ((Z1 + Z2) * (Z1 + Z2) - Z1Z1 - Z2Z2) * H % p
+        return (X3, Y3, Z3)
+
+    def add(self, point: Point, other: Point) -> Point:
+        """Add two affine points"""
+        return self.to_affine(self.add_mixed(self.to_jacobian(point), other))
+
+    def negate(self, point: Point) -> Point:
+        """Negate an affine point"""
+        if point is None:
+            return None
+        return (point[0], (-point[1]) % self.curve.p)
+
+    def sum(self, points: Iterable[Point]) -> Point:
+        """Add up a stream of affine points with a single inversion at the end"""
+        total = self.infinity
+        for point in points:
+            total = self.add_mixed(total, point)
+        return self.to_affine(total)
+
+    def multiply_jacobian(self, point: Point, scalar: int, window: int = 4):
+        """
+        Multiply an affine point by a scalar with a fixed 4-bit window
+
+        Args:
+            point: Affine point
+            scalar: Scalar (reduced mod the group order)
+            window: Window width in bits
+
+        Returns:
+            Jacobian point
+        """
+        scalar %= self.curve.order
+        if point is None or not scalar:
+            return self.infinity
+
+        # Affine table of 1*P .. (2^w - 1)*P so the main loop can use mixed additions
+        jacobian = [self.to_jacobian(point)]
+        for _ in range(2, 1 << window):
+            jacobian.append(self.add_mixed(jacobian[-1], point))
+        table = [None] + self.batch_to_affine(jacobian)
+
+        mask = (1 << window) - 1
+        result = self.infinity
+        for position in reversed(range(-(-scalar.bit_length() // window))):
+            for _ in range(window):
+                result = self.double(result)
+            digit = (scalar >> (position * window)) & mask
+            if digit:
+                result = self.add_mixed(result, table[digit])
+        return result
+
+    def multiply(self, point: Point, scalar: int) -> Point:
+        """Multiply an affine point by a scalar"""
+        return self.to_affine(self.multiply_jacobian(point, scalar))
+
+    def encode_point(self, point: Point) -> bytes:
+        """
+        Compressed SEC1 encoding (all zero bytes for the point at infinity)
+
+        Args:
+            point: Affine point
+
+        Returns:
+            bytes: point_bytes-long encoding
+        """
+        if point is None:
+            return bytes(self.curve.point_bytes)
+        x, y = point
+        return bytes([2 | (y & 1)]) + int(x).to_bytes(self.curve.field_bytes, 'big')
+
+    def decode_point(self, data) -> Point:
+        """
+        Decode and validate a compressed point
+
+        Args:
+            data: point_bytes-long encoding
+
+        Returns:
+            Affine point on the curve (None for infinity)
+
+        Raises:
+            ValueError: If the bytes do not encode a point on the curve
+        """
+        data = bytes(data)
+        if len(data) != self.curve.point_bytes:
+            raise ValueError("Encoded point has the wrong length")
+        if not any(data):
+            return None
+        prefix = data[0]
+        if prefix not in (2, 3):
+            raise ValueError("Encoded point is not in compressed form")
+        p = self.curve.p
+        x = int.from_bytes(data[1:], 'big')
+        if x >= p:
+            raise ValueError("Encoded point is not on the curve")
+        rhs = (x * x * x + self.curve.b) % p
+        # p = 3 mod 4, so a square root is rhs^((p+1)/4)
+        y = self.backend.to_int(self.backend.powmod(self.backend.mpz(rhs), (p + 1) // 4, self.p))
+        if y * y % p != rhs:
+            raise ValueError("Encoded point is not on the curve")
+        if (y & 1) != (prefix & 1):
+            y = p - y
+        return (x, y)
+
+class FixedBasePointTable:
+    """Precomputed multiples of one fixed point for fast scalar multiplication"""
+
+    def __init__(self, point: Point, arithmetic: CurveArithmetic, window: int = 4):
+        """
+        Precompute d * 2^(window * i) * P for every window position i and digit d
+
+        Args:
+            point: Fixed affine point
+            arithmetic: Curve arithmetic
+            window: Window width in bits
+        """
+        self.point = point
+        self.arithmetic = arithmetic
+        self.window = window
+        self._mask = (1 << window) - 1
+        positions = -(-arithmetic.curve.order.bit_length() // window)
+
+        jacobian = []
+        row_base = arithmetic.to_jacobian(point)
+        for _ in range(positions):
+            row = [row_base]
+            row_base_affine = arithmetic.to_affine(row_base)
+            for _ in range(2, 1 << window):
+                row.append(arithmetic.add_mixed(row[-1], row_base_affine))
+            jacobian.extend(row)
+            # Next row's base is this row's base times 2^window
+            row_base = arithmetic.add_mixed(row[-1], row_base_affine)
+        affine = arithmetic.batch_to_affine(jacobian)
+        width = (1 << window) - 1
+        self._rows = [[None] + affine[i * width:(i + 1) * width] for i in range(positions)]
+
+    def multiply_jacobian(self, scalar: int):
+        """Multiply the fixed point by a scalar with one mixed addition per window"""
+        arithmetic = self.arithmetic
+        scalar %= arithmetic.curve.order
+        result = arithmetic.infinity
+        position = 0
+        while scalar:
+            digit = scalar & self._mask
+            if digit:
+                result = arithmetic.add_mixed(result, self._rows[position][digit])
+            scalar >>= self.window
+            position += 1
+        return result
+
+    def multiply(self, scalar: int) -> Point:
+        """Multiply the fixed point by a scalar"""
+        return self.arithmetic.to_affine(self.multiply_jacobian(scalar))
+
+class DiscreteLogTable:
+    """Baby-step/giant-step solver for log_G(P) in [0, max_value]"""
+
+    def __init__(self, base_table: FixedBasePointTable, max_value: int):
+        """
+        Precompute the baby steps j*G for 0 <= j < m, with m about sqrt(max_value)
+
+        Args:
+            base_table: Fixed-base table of the generator G
+            max_value: Largest logarithm the table must find
+        """
+        arithmetic = base_table.arithmetic
+        self.arithmetic = arithmetic
+        self.max_value = max_value
+        # A power of two, so electorates of similar size share one table
+        self.baby_steps = 1 << max(1, (math.isqrt(max(max_value, 1)) + 1).bit_length())
+
+        jacobian = [arithmetic.infinity]
+        generator = base_table.point
+        for _ in range(1, self.baby_steps):
+            jacobian.append(arithmetic.add_mixed(jacobian[-1], generator))
+        self._baby: Dict[int, int] = {}
+        self._baby_y: Dict[int, int] = {}
+        for j, point in enumerate(arithmetic.batch_to_affine(jacobian[1:]), start=1):
+            self._baby[point[0]] = j
+            self._baby_y[point[0]] = point[1]
+        self._giant = arithmetic.negate(base_table.multiply(self.baby_steps))
+
+    def solve(self, point: Point) -> int:
+        """
+        Find m with m*G = point
+
+        Args:
+            point: Affine point
+
+        Returns:
+            int: m in [0, max_value]
+
+        Raises:
+            ValueError: If no such m is in range
+        """
+        arithmetic = self.arithmetic
+        for i in range(self.max_value // self.baby_steps + 1):
+            if point is None:
+                value = i * self.baby_steps
+            else:
+                j = self._baby.get(point[0])
+                # Same x means +-j*G; only the matching y is in range
+                value = i * self.baby_steps + j if j is not None and self._baby_y[point[0]] == point[1] else None
+            if value is not None and value <= self.max_value:
+                return value
+            point = arithmetic.add(point, self._giant)
+        raise ValueError(f"Discrete logarithm is not in range [0, {self.max_value}]")
+
+_tables: Dict[tuple, object] = {}
+_tables_lock = threading.Lock()
+
+def _cached(key: tuple, factory):
+    table = _tables.get(key)
+    if table is None:
+        table = factory()
+        with _tables_lock:
+            table = _tables.setdefault(key, table)
+    return table
+
+def generator_table(curve: Curve = SECP256K1, backend: Optional[object] = None) -> FixedBasePointTable:
+    """Get the process-wide fixed-base table of a curve's generator"""
+    arithmetic = CurveArithmetic(curve, backend)
+    return _cached(('generator', curve.name, arithmetic.backend.name),
+                   lambda: FixedBasePointTable(curve.generator, arithmetic))
+
+def point_table(point: Point, curve: Curve = SECP256K1, backend: Optional[object] = None) -> FixedBasePointTable:
+    """Get the process-wide fixed-base table of a point, e.g. an election public key"""
+    arithmetic = CurveArithmetic(curve, backend)
+    return _cached(('point', curve.name, arithmetic.backend.name, point),
+                   lambda: FixedBasePointTable(point, arithmetic))
+
+def discrete_log_table(max_value: int, curve: Curve = SECP256K1,
+                       backend: Optional[object] = None) -> DiscreteLogTable:
+    """Get the process-wide baby-step/giant-step table covering [0, max_value]"""
+    base = generator_table(curve, backend)
+    baby_steps = 1 << max(1, (math.isqrt(max(max_value, 1)) + 1).bit_length())
+    table = _cached(('dlog', curve.name, base.arithmetic.backend.name, baby_steps),
+                    lambda: DiscreteLogTable(base, max_value))
+    if table.max_value == max_value:
+        return table
+    # Reuse the baby steps, but stop the giant steps at this caller's bound
+    bounded = object.__new__(DiscreteLogTable)
+    bounded.__dict__.update(table.__dict__)
+    bounded.max_value = max_value
+    return bounded
@@ -0,0 +1,228 @@
+"""
+Parsed Key Context Cache
+
+This module provides:
+- KeyContext: a public key parsed once into native integers with n^2 (or
+  n^(s+1) for Damgard-Jurik), encryption helpers, the binary ciphertext
+  codec, a batch validator and ballot proof verifiers ready to use
+- Optional private material (lambda, mu and the CRT constants) for trustee
+  and tally processes
+- An in-process LRU cache with a time-to-live, keyed by caller-chosen keys
+  such as (election id, key version)
+
+Keys are stored as decimal text, so using one from the database means
+parsing several hundred digits and recomputing n^2 on every request. A
+context is built once per key and reused until it is evicted, expires or is
+invalidated explicitly (the elections app does this on Election saves).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple
+
+from .arithmetic import ArithmeticBackend, get_backend
+from .damgard_jurik import get_encryption
+from .paillier import PaillierKeyPair
+from .proofs import MembershipProof, MembershipVerifier
+from .serialization import CiphertextCodec
+from .validation import CiphertextValidator
+
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_CACHE_TTL = 300
+
+def key_cache_settings() -> dict:
+    """Read PAILLIER_KEY_CACHE from settings, tolerating unconfigured Django"""
+    try:
+        from django.conf import settings
+        return dict(getattr(settings, 'PAILLIER_KEY_CACHE', {}) or {})
+    except Exception:
+        return {}
+
+class KeyContext:
+    """A Paillier key parsed once, with its derived constants"""
+
+    def __init__(self, public_key: Tuple[int, int], key_pair: Optional[PaillierKeyPair] = None,
+                 backend: Optional[object] = None, s: int = 1):
+        """
+        Initialize a key context
+
+        Args:
+            public_key: Public key (n, g) as integers or decimal strings
+            key_pair: Key pair with the private constants, for trustee processes
+            backend: Arithmetic backend name or instance
+            s: Damgard-Jurik degree (1 is plain Paillier)
+        """
+        self.backend: ArithmeticBackend = get_backend(backend)
+        n, g = int(public_key[0]), int(public_key[1])
+        self.public_key = (n, g)
+        self.s = s
+        self.n = self.backend.mpz(n)
+        self.g = self.backend.mpz(g)
+        self.n_squared = self.n * self.n
+        self.modulus = self.n ** (s + 1)
+        self.plaintext_modulus = n ** s
+        self.key_pair = key_pair
+        self.codec = CiphertextCodec(n, s)
+        self.validator = CiphertextValidator(n, backend=self.backend, s=s)
+        self.paillier = get_encryption(s, key_size=n.bit_length(), backend=self.backend,
+                                       fixed_base_tables=g != n + 1)
+        self._verifiers = {}
+
+    @property
+    def has_private_key(self) -> bool:
+        """Whether the context can decrypt"""
+        return self.key_pair is not None
+
+    def encrypt(self, message: int) -> int:
+        """
+        Encrypt a message under this key
+
+        Args:
+            message: Plaintext in [0, n^s)
+
+        Returns:
+            int: Ciphertext
+        """
+        return self.encrypt_many([message])[0]
+
+    def encrypt_many(self, messages: Iterable[int]) -> List[int]:
+        """
+        Encrypt several messages under this key in this process
+
+        Args:
+            messages: Plaintexts in [0, n^s)
+
+        Returns:
+            List of ciphertexts in input order
+        """
+        messages = [int(message) for message in messages]
+        bound = self.plaintext_modulus
+        for message in messages:
+            if message < 0 or message >= bound:
+                raise ValueError(f"Message must be in range [0, {bound-1}]")
+        return self.paillier._encrypt_batch(messages, self.public_key, modulus=self.modulus)
+
+    def membership_verifier(self, allowed_values: Iterable[int]) -> MembershipVerifier:
+        """Get the (cached) ballot proof verifier for a list of allowed values"""
+        allowed = tuple(int(m) for m in allowed_values)
+        verifier = self._verifiers.get(allowed)
+        if verifier is None:
+            verifier = MembershipVerifier(self.public_key, allowed, backend=self.backend, s=self.s)
+            self._verifiers[allowed] = verifier
+        return verifier
+
+    def encrypt_with_proof(self, message: int, allowed_values: Iterable[int],
+                           context: bytes = b'') -> Tuple[int, MembershipProof]:
+        """
+        Encrypt a message and prove it is one of the allowed values
+
+        Args:
+            message: Plaintext (must be in allowed_values)
+            allowed_values: Values a valid ballot may encrypt
+            context: Bytes the proof is bound to (e.g. the election ID)
+
+        Returns:
+            Tuple of (ciphertext, MembershipProof)
+        """
+        ciphertext, r = self.paillier.encrypt_with_randomness(message, self.public_key, modulus=self.modulus)
+        return ciphertext, self.membership_verifier(allowed_values).prove(ciphertext, message, r, context)
+
+    def decrypt(self, ciphertext: int) -> int:
+        """
+        Decrypt a ciphertext (CRT path when the prime factors are known)
+
+        Args:
+            ciphertext: Ciphertext under this key
+
+        Returns:
+            int: Plaintext
+        """
+        if self.key_pair is None:
+            raise ValueError("Key context has no private key")
+        return self.paillier.decrypt(ciphertext, self.key_pair)
+
+class KeyContextCache:
+    """Thread-safe LRU cache of key contexts with a time-to-live"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize a cache
+
+        Args:
+            max_size: Most contexts kept (defaults to PAILLIER_KEY_CACHE['SIZE'])
+            ttl: Seconds a context stays valid (defaults to PAILLIER_KEY_CACHE['TTL'])
+            clock: Monotonic time source
+        """
+        config = key_cache_settings()
+        self.max_size = max_size if max_size is not None else config.get('SIZE', DEFAULT_CACHE_SIZE)
+        self.ttl = ttl if ttl is not None else config.get('TTL', DEFAULT_CACHE_TTL)
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], KeyContext]) -> KeyContext:
+        """
+        Get a cached context, building it with factory on a miss or after expiry
+
+        Args:
+            key: Cache key, e.g. (election id, key version, private)
+            factory: Builds the context; called outside the lock
+
+        Returns:
+            KeyContext
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        context = factory()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, context)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every context whose key matches
+
+        Args:
+            predicate: Called with each cache key
+
+        Returns:
+            int: Number of contexts dropped
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Drop every context"""
+        with self._lock:
+            self._entries.clear()
+
+_cache: Optional[KeyContextCache] = None
+_cache_lock = threading.Lock()
+
+def get_key_context_cache() -> KeyContextCache:
+    """Get the process-wide key context cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = KeyContextCache()
+        return _cache
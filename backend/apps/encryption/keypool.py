@@ -0,0 +1,189 @@
+"""
+Paillier Key-Pair Pool
+
+This module provides:
+- Sealing of key material at rest with Fernet (keyed from settings)
+- Multi-process generation of key pairs to keep the pool at its target size
+- Atomic hand-out of one pooled key pair per election
+- An inline-generation fallback when the pool for a size is empty, which
+  request handlers turn off so they never run a prime search
+
+Prime generation for 2048-4096 bit keys takes seconds. The pool moves that
+work to refill_key_pool (run from cron, with --watch or by the
+refill_key_pools Celery task), so creating an election only has to claim
+and unseal a row.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from django.conf import settings
+from django.db import transaction
+
+from .obfuscators import key_fingerprint
+from .paillier import PaillierEncryption, PaillierKeyPair
+from .parallel import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_TARGET = 4
+
+class KeyPoolEmpty(Exception):
+    """Raised when no pooled key pair is ready and inline generation is off"""
+
+def key_pool_settings() -> dict:
+    """Read PAILLIER_KEY_POOL from settings"""
+    return dict(getattr(settings, 'PAILLIER_KEY_POOL', {}) or {})
+
+def pool_key_sizes() -> List[int]:
+    """Key sizes the pool keeps stocked"""
+    return list(key_pool_settings().get('SIZES') or [settings.PAILLIER_KEY_SIZE])
+
+def pool_target() -> int:
+    """Number of key pairs kept ready per size"""
+    return key_pool_settings().get('TARGET', DEFAULT_POOL_TARGET)
+
+def _fernet() -> Fernet:
+    """Fernet instance keyed from PAILLIER_KEY_POOL['ENCRYPTION_KEY'] or SECRET_KEY"""
+    secret = key_pool_settings().get('ENCRYPTION_KEY') or settings.SECRET_KEY
+    digest = hashlib.sha256(b'paillier-key-pool:' + secret.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+def seal_key_pair(key_pair: PaillierKeyPair) -> str:
+    """
+    Encrypt a key pair for storage
+
+    Args:
+        key_pair: Key pair with its prime factors
+
+    Returns:
+        str: Fernet token
+    """
+    material = {
+        'n': str(key_pair.n),
+        'g': str(key_pair.g),
+        'lambda': str(key_pair.lambda_val),
+        'p': str(key_pair.p) if key_pair.p else None,
+        'q': str(key_pair.q) if key_pair.q else None,
+    }
+    return _fernet().encrypt(json.dumps(material).encode()).decode()
+
+def unseal_key_pair(token: str) -> PaillierKeyPair:
+    """
+    Decrypt a stored key pair
+
+    Args:
+        token: Fernet token from seal_key_pair
+
+    Returns:
+        PaillierKeyPair: Restored key pair
+    """
+    material = json.loads(_fernet().decrypt(token.encode()))
+    return PaillierKeyPair(
+        (int(material['n']), int(material['g'])),
+        int(material['lambda']),
+        p=int(material['p']) if material['p'] else None,
+        q=int(material['q']) if material['q'] else None,
+    )
+
+def _generate_sealed_key(key_size: int) -> str:
+    """Worker-process entry point: generate and seal one key pair"""
+    return seal_key_pair(PaillierEncryption(key_size=key_size).generate_key_pair())
+
+def refill_key_pool(key_size: Optional[int] = None, target: Optional[int] = None,
+                    parallel: bool = True) -> int:
+    """
+    Generate key pairs until the pool for a size holds the target count
+
+    Args:
+        key_size: Key size in bits (defaults to PAILLIER_KEY_SIZE)
+        target: Key pairs to keep ready (defaults to PAILLIER_KEY_POOL['TARGET'])
+        parallel: Search for primes in the shared worker pool, one key pair per task
+
+    Returns:
+        int: Number of key pairs added
+    """
+    from .models import PooledKeyPair
+
+    key_size = key_size or settings.PAILLIER_KEY_SIZE
+    target = pool_target() if target is None else target
+    missing = target - PooledKeyPair.objects.filter(key_size=key_size).count()
+    if missing <= 0:
+        return 0
+
+    if parallel and missing > 1:
+        tokens = list(get_process_pool().map(_generate_sealed_key, [key_size] * missing))
+    else:
+        tokens = [_generate_sealed_key(key_size) for _ in range(missing)]
+
+    fernet = _fernet()
+    PooledKeyPair.objects.bulk_create([
+        PooledKeyPair(
+            key_size=key_size,
+            key_fingerprint=key_fingerprint(json.loads(fernet.decrypt(token.encode()))['n']),
+            sealed_key=token,
+        )
+        for token in tokens
+    ])
+    return len(tokens)
+
+def take_key_pair(key_size: Optional[int] = None) -> Optional[PaillierKeyPair]:
+    """
+    Atomically claim and remove one pooled key pair
+
+    Concurrent callers skip rows locked by each other, so no key pair is
+    ever handed out twice.
+
+    Args:
+        key_size: Key size in bits (defaults to PAILLIER_KEY_SIZE)
+
+    Returns:
+        PaillierKeyPair, or None if the pool for this size is empty
+    """
+    from .models import PooledKeyPair
+
+    key_size = key_size or settings.PAILLIER_KEY_SIZE
+    while True:
+        with transaction.atomic():
+            row = (
+                PooledKeyPair.objects.select_for_update(skip_locked=True)
+                .filter(key_size=key_size)
+                .order_by('created_at')
+                .first()
+            )
+            if row is None:
+                return None
+            row.delete()
+
+        try:
+            return unseal_key_pair(row.sealed_key)
+        except InvalidToken:
+            # Sealed under a different key (e.g. SECRET_KEY was rotated); drop it
+            logger.warning("Discarding pooled key pair %s that can no longer be unsealed", row.key_fingerprint)
+
+def acquire_key_pair(key_size: Optional[int] = None, generate_inline: bool = True) -> PaillierKeyPair:
+    """
+    Get a key pair from the pool, generating one inline if the pool is empty
+
+    Args:
+        key_size: Key size in bits (defaults to PAILLIER_KEY_SIZE)
+        generate_inline: Fall back to a prime search in this process when the pool is empty
+
+    Returns:
+        PaillierKeyPair: Fresh key pair that no other election uses
+
+    Raises:
+        KeyPoolEmpty: If the pool is empty and generate_inline is False
+    """
+    key_size = key_size or settings.PAILLIER_KEY_SIZE
+    key_pair = take_key_pair(key_size)
+    if key_pair is None:
+        if not generate_inline:
+            raise KeyPoolEmpty(f"No pre-generated {key_size}-bit Paillier key pair is available")
+        logger.warning("Paillier key pool for %d-bit keys is empty; generating inline", key_size)
+        key_pair = PaillierEncryption(key_size=key_size).generate_key_pair()
+    return key_pair
@@ -0,0 +1,47 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from apps.encryption.arithmetic import available_backends
+from apps.encryption.benchmarks import (
+    compare_damgard_jurik_packing, compare_fixed_base_multiply, compare_generator_paths,
+    compare_threshold_decryption,
+)
+from apps.encryption.paillier import PaillierEncryption
+
+class Command(BaseCommand):
+    help = 'Benchmark Paillier encryption paths and threshold decryption ceremonies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--key-size', type=int, default=2048, help='Paillier key size in bits')
+        parser.add_argument('--iterations', type=int, default=50, help='Operations per measurement')
+        parser.add_argument('--candidates', type=int, default=32,
+                            help='Candidates per ballot for the packed Damgard-Jurik comparison')
+        parser.add_argument(
+            '--backend',
+            choices=list(available_backends()),
+            help='Arithmetic backend (defaults to PAILLIER_ARITHMETIC_BACKEND)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Generating {options['key_size']}-bit key pair...")
+        key_pair = PaillierEncryption(key_size=options['key_size'], backend=options['backend']).generate_key_pair()
+
+        sections = [
+            ('g^m and encrypt', compare_generator_paths),
+            ('multiply_ciphertext on a fixed ciphertext', compare_fixed_base_multiply),
+            ('threshold decryption (per ciphertext, simulated trustees)', compare_threshold_decryption),
+            (f"{options['candidates']}-candidate ballots: per-candidate Paillier vs packed Damgard-Jurik (per ballot)",
+             partial(compare_damgard_jurik_packing, num_candidates=options['candidates'])),
+        ]
+        for title, benchmark in sections:
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            results = benchmark(iterations=options['iterations'], backend=options['backend'], key_pair=key_pair)
+            for name, result in results.items():
+                self.stdout.write(
+                    f"  {name:<28} {result['ops_per_sec']:>12.1f} ops/sec {result['mean_ms']:>10.3f} ms/op"
+                )
+                if 'bytes_per_ballot' in result:
+                    self.stdout.write(
+                        f"  {'':<28} s={result['s']} {result['bytes_per_ballot']:>8} bytes/ballot "
+                        f"{result['ms_per_candidate']:>10.3f} ms/candidate"
+                    )
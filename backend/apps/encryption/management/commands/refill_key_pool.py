@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.encryption.keypool import pool_key_sizes, pool_target, refill_key_pool
+from apps.encryption.models import PooledKeyPair
+
+class Command(BaseCommand):
+    help = 'Pre-generate Paillier key pairs so new elections can take one instantly'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            action='append',
+            dest='sizes',
+            help='Key size in bits (repeatable). Defaults to PAILLIER_KEY_POOL SIZES.',
+        )
+        parser.add_argument('--target', type=int, help='Key pairs to keep ready per size')
+        parser.add_argument(
+            '--watch',
+            type=float,
+            default=0,
+            help='Keep running, topping the pool up every this many seconds',
+        )
+        parser.add_argument('--sequential', action='store_true', help='Generate in this process only')
+
+    def handle(self, *args, **options):
+        sizes = options['sizes'] or pool_key_sizes()
+        target = pool_target() if options['target'] is None else options['target']
+        while True:
+            for key_size in sizes:
+                start = time.perf_counter()
+                added = refill_key_pool(key_size, target, parallel=not options['sequential'])
+                if added or not options['watch']:
+                    available = PooledKeyPair.objects.filter(key_size=key_size).count()
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{key_size}-bit: added {added} key pairs in {time.perf_counter() - start:.1f}s "
+                        f"({available} ready)"
+                    ))
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
@@ -0,0 +1,82 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.encryption.arithmetic import available_backends
+from apps.encryption.benchmark_suite import (
+    DEFAULT_ITERATIONS, DEFAULT_KEY_SIZES, DEFAULT_KEYGEN_ITERATIONS, OPERATIONS, benchmark_settings,
+    compare_to_baseline, load_report, run_suite, save_report,
+)
+
+class Command(BaseCommand):
+    help = 'Run the offline crypto benchmark suite and compare it with the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            action='append',
+            dest='sizes',
+            help='Key size in bits (repeatable). Defaults to CRYPTO_BENCHMARKS KEY_SIZES.',
+        )
+        parser.add_argument(
+            '--backend',
+            action='append',
+            dest='backends',
+            choices=list(available_backends()),
+            help='Arithmetic backend (repeatable). Defaults to every available backend.',
+        )
+        parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Calls timed per operation')
+        parser.add_argument('--keygen-iterations', type=int, default=DEFAULT_KEYGEN_ITERATIONS,
+                            help='Key pairs generated per keygen timing')
+        parser.add_argument('--output', help='Write the JSON report to this path')
+        parser.add_argument('--baseline', help='Baseline report to compare with. Defaults to CRYPTO_BENCHMARKS BASELINE.')
+        parser.add_argument('--threshold', type=float,
+                            help='Allowed fractional p50 slowdown. Defaults to CRYPTO_BENCHMARKS REGRESSION_THRESHOLD.')
+        parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+
+    def handle(self, *args, **options):
+        config = benchmark_settings()
+        sizes = options['sizes'] or config.get('KEY_SIZES', DEFAULT_KEY_SIZES)
+        baseline_path = options['baseline'] or config.get('BASELINE')
+
+        report = run_suite(
+            sizes, options['backends'], iterations=options['iterations'],
+            keygen_iterations=options['keygen_iterations'],
+            progress=lambda backend, size: self.stdout.write(f"Benchmarking {backend} / {size}-bit keys..."),
+        )
+        for backend, by_size in report['results'].items():
+            for size, results in by_size.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{backend} / {size}-bit"))
+                for name in OPERATIONS:
+                    result = results[name]
+                    self.stdout.write(
+                        f"  {name:<26} {result['ops_per_sec']:>10.1f} ops/sec "
+                        f"p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+                        f"p99 {result['p99_ms']:>9.3f} ms"
+                    )
+
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f"Wrote report to {options['output']}")
+
+        if options['save_baseline']:
+            if not baseline_path:
+                raise CommandError('No baseline path: pass --baseline or set CRYPTO_BENCHMARKS BASELINE.')
+            save_report(report, baseline_path)
+            self.stdout.write(self.style.SUCCESS(f"Stored baseline at {baseline_path}"))
+            return
+
+        if not baseline_path or not os.path.exists(baseline_path):
+            self.stdout.write('No baseline to compare with; run with --save-baseline to store one.')
+            return
+
+        comparisons = compare_to_baseline(report, load_report(baseline_path), threshold=options['threshold'])
+        regressions = [c for c in comparisons if c['regressed']]
+        for c in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"  {c['backend']} / {c['key_size']}-bit {c['operation']}: "
+                f"{c['baseline_ms']:.3f} -> {c['current_ms']:.3f} ms p50 ({c['change']:+.0%})"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} of {len(comparisons)} operations regressed against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions in {len(comparisons)} operations against {baseline_path}"))
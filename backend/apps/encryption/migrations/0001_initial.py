@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledKeyPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_size', models.PositiveIntegerField()),
+                ('key_fingerprint', models.CharField(max_length=16)),
+                ('sealed_key', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['key_size', 'created_at'], name='encryption__key_siz_056f6e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+"""
+Encryption Models for E-Voting System
+
+This module defines the database models for:
+- Pre-generated Paillier key pairs waiting to be assigned to elections
+"""
+
+from django.db import models
+
+class PooledKeyPair(models.Model):
+    """Model for a pre-generated Paillier key pair, sealed at rest"""
+    
+    key_size = models.PositiveIntegerField()
+    key_fingerprint = models.CharField(max_length=16)
+    
+    # Fernet token of the JSON key material (n, g, lambda, p, q)
+    sealed_key = models.TextField()
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['key_size', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.key_size}-bit key pair {self.key_fingerprint}"
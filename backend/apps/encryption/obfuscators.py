@@ -0,0 +1,309 @@
+"""
+Precomputed Obfuscator Pools for Paillier Encryption
+
+This module provides:
+- Per-key pools of precomputed r^n mod n^2 values
+- Background refilling once a pool drops below its low-water mark
+- Persistent spill-to-disk so idle-time precomputation survives restarts
+
+The expensive half of Paillier encryption is r^n mod n^2, which does not
+depend on the vote. Pools move that work off the request path; encrypt then
+only needs g^m and a single multiplication.
+
+Obfuscators are secret: anyone holding r^n for a ballot can strip it from
+the ciphertext. Spilled chunks are written owner-readable only and every
+chunk is claimed with an atomic rename before it is read, so a value is
+never handed to two processes.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .arithmetic import ArithmeticBackend, get_backend
+
+logger = logging.getLogger('apps.encryption')
+
+DEFAULT_POOL_SIZE = 256
+DEFAULT_LOW_WATER_MARK = 64
+CHUNK_SUFFIX = '.obf'
+
+def _pool_settings() -> dict:
+    """Read PAILLIER_OBFUSCATOR_POOL from settings, tolerating unconfigured Django"""
+    try:
+        from django.conf import settings
+        return dict(getattr(settings, 'PAILLIER_OBFUSCATOR_POOL', {}) or {})
+    except Exception:
+        return {}
+
+def pools_enabled() -> bool:
+    """Whether encrypt should draw from registered obfuscator pools"""
+    return bool(_pool_settings().get('ENABLED', False))
+
+def key_fingerprint(n: int) -> str:
+    """
+    Short stable identifier for a public modulus
+
+    Args:
+        n: Public modulus
+
+    Returns:
+        str: Hex fingerprint
+    """
+    return hashlib.sha256(str(int(n)).encode()).hexdigest()[:16]
+
+class ObfuscatorPool:
+    """Pool of precomputed r^n mod n^2 values for a single public key"""
+
+    def __init__(self, public_key: Tuple[int, int], size: int = None, low_water_mark: int = None,
+                 spill_dir: Optional[str] = None, backend: Optional[object] = None):
+        """
+        Initialize an obfuscator pool
+
+        Args:
+            public_key: Paillier public key (n, g)
+            size: Number of values to keep ready
+            low_water_mark: Refill is triggered when the pool drops below this
+            spill_dir: Directory for persisted chunks (None disables spilling)
+            backend: Arithmetic backend name or instance
+        """
+        config = _pool_settings()
+        self.n = int(public_key[0])
+        self.n_squared = self.n * self.n
+        self.size = size or config.get('SIZE', DEFAULT_POOL_SIZE)
+        self.low_water_mark = low_water_mark if low_water_mark is not None else config.get('LOW_WATER_MARK', DEFAULT_LOW_WATER_MARK)
+        if self.low_water_mark > self.size:
+            raise ValueError("Low-water mark cannot be greater than pool size")
+
+        spill_root = spill_dir if spill_dir is not None else config.get('SPILL_DIR')
+        self.spill_dir = os.path.join(str(spill_root), key_fingerprint(self.n)) if spill_root else None
+        self.backend: ArithmeticBackend = get_backend(backend)
+
+        self._values = deque()
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._width = (self.n_squared.bit_length() + 7) // 8
+
+    def __len__(self):
+        return len(self._values)
+
+    def compute(self) -> int:
+        """
+        Compute a single fresh obfuscator r^n mod n^2
+
+        Returns:
+            int: Obfuscator value
+        """
+        arith = self.backend
+        r = secrets.randbelow(self.n - 1) + 1
+        while arith.gcd(r, self.n) != 1:
+            r = secrets.randbelow(self.n - 1) + 1
+        n = arith.mpz(self.n)
+        return arith.to_int(arith.powmod(arith.mpz(r), n, n * n))
+
+    def take(self) -> int:
+        """
+        Take one obfuscator from the pool
+
+        Falls back to computing inline when the pool is empty, so callers
+        never block on the refill thread.
+
+        Returns:
+            int: Obfuscator value, never handed out twice
+        """
+        with self._lock:
+            value = self._values.popleft() if self._values else None
+            remaining = len(self._values)
+
+        if remaining < self.low_water_mark:
+            self._refill_needed.set()
+
+        return value if value is not None else self.compute()
+
+    def fill(self, count: Optional[int] = None) -> int:
+        """
+        Synchronously top the pool up
+
+        Args:
+            count: Number of values to add (defaults to filling up to size)
+
+        Returns:
+            int: Number of values added
+        """
+        if count is None:
+            count = max(self.size - len(self._values), 0)
+
+        added = 0
+        while added < count and not self._stopping.is_set():
+            value = self.compute()
+            with self._lock:
+                self._values.append(value)
+            added += 1
+        return added
+
+    def start(self):
+        """Load spilled chunks and start the background refill thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self.load_spilled()
+        self._stopping.clear()
+        self._refill_needed.set()
+        self._thread = threading.Thread(
+            target=self._refill_loop,
+            name=f"obfuscator-pool-{key_fingerprint(self.n)}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, spill: bool = True):
+        """
+        Stop the refill thread
+
+        Args:
+            spill: Persist unused values so the work is not lost
+        """
+        self._stopping.set()
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if spill:
+            self.spill()
+
+    def _refill_loop(self):
+        """Background loop that refills the pool whenever it runs low"""
+        while not self._stopping.is_set():
+            self._refill_needed.wait()
+            if self._stopping.is_set():
+                break
+            self._refill_needed.clear()
+            try:
+                self.fill()
+            except Exception as e:
+                logger.error(f"Obfuscator pool refill failed: {e}")
+
+    def spill(self) -> int:
+        """
+        Move every pooled value into a new chunk file on disk
+
+        Returns:
+            int: Number of values written
+        """
+        if not self.spill_dir:
+            return 0
+
+        with self._lock:
+            values = list(self._values)
+            self._values.clear()
+        if not values:
+            return 0
+
+        os.makedirs(self.spill_dir, mode=0o700, exist_ok=True)
+        final_path = os.path.join(self.spill_dir, f"{uuid.uuid4().hex}{CHUNK_SUFFIX}")
+        temp_path = final_path + '.tmp'
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            for value in values:
+                f.write(value.to_bytes(self._width, 'big'))
+        os.replace(temp_path, final_path)
+        return len(values)
+
+    def load_spilled(self, limit: Optional[int] = None) -> int:
+        """
+        Claim spilled chunks and load their values into the pool
+
+        Args:
+            limit: Stop after loading roughly this many values (defaults to size)
+
+        Returns:
+            int: Number of values loaded
+        """
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return 0
+
+        limit = self.size if limit is None else limit
+        loaded = 0
+        for name in sorted(os.listdir(self.spill_dir)):
+            if loaded >= limit:
+                break
+            if not name.endswith(CHUNK_SUFFIX):
+                continue
+
+            values = self._claim_chunk(os.path.join(self.spill_dir, name))
+            with self._lock:
+                self._values.extend(values)
+            loaded += len(values)
+        return loaded
+
+    def _claim_chunk(self, path: str) -> List[int]:
+        """Atomically claim a chunk file, read it and delete it"""
+        claimed_path = f"{path}.claimed-{os.getpid()}-{threading.get_ident()}"
+        try:
+            os.rename(path, claimed_path)
+        except OSError:
+            return []  # Another process claimed it first
+
+        try:
+            with open(claimed_path, 'rb') as f:
+                data = f.read()
+        finally:
+            os.remove(claimed_path)
+
+        width = self._width
+        return [
+            int.from_bytes(data[offset:offset + width], 'big')
+            for offset in range(0, len(data) - width + 1, width)
+        ]
+
+_pools: Dict[int, ObfuscatorPool] = {}
+_pools_lock = threading.Lock()
+
+def get_obfuscator_pool(public_key: Tuple[int, int], create: bool = True, start: bool = True) -> Optional[ObfuscatorPool]:
+    """
+    Get the process-wide pool for a public key
+
+    Args:
+        public_key: Paillier public key (n, g)
+        create: Create the pool if it does not exist yet
+        start: Start the background refill thread for new pools
+
+    Returns:
+        ObfuscatorPool or None
+    """
+    n = int(public_key[0])
+    with _pools_lock:
+        pool = _pools.get(n)
+        if pool is None and create:
+            pool = ObfuscatorPool(public_key)
+            _pools[n] = pool
+            if start:
+                pool.start()
+    return pool
+
+def discard_obfuscator_pool(public_key: Tuple[int, int], spill: bool = True):
+    """Stop and forget the pool for a public key"""
+    with _pools_lock:
+        pool = _pools.pop(int(public_key[0]), None)
+    if pool is not None:
+        pool.stop(spill=spill)
+
+@atexit.register
+def _spill_all_pools():
+    """Persist unused obfuscators when the process exits"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.stop(spill=True)
+        except Exception as e:
+            logger.error(f"Failed to spill obfuscator pool: {e}")
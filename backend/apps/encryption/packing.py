@@ -0,0 +1,101 @@
+"""
+Packed Ballot Encoding
+
+This module provides:
+- Encoding of a vote for candidate i as B^i in a single plaintext
+- Unpacking of a decrypted tally into per-candidate counts
+- Capacity checks so no slot can overflow into the next or past n
+
+With B larger than the maximum electorate, the homomorphic product of all
+packed ballots decrypts to sum(count_i * B^i): every candidate's count sits in
+its own base-B digit. A whole election then tallies with one product and one
+decryption instead of one per candidate. B is a power of two so slots can be
+unpacked with shifts and masks.
+"""
+
+from typing import List
+
+class PackedBallotEncoder:
+    """Encodes candidate choices into base-B slots of one Paillier plaintext"""
+
+    def __init__(self, num_candidates: int, max_voters: int, n: int):
+        """
+        Initialize a packed ballot encoder
+
+        Args:
+            num_candidates: Number of candidates (slots)
+            max_voters: Upper bound on the number of ballots that will be summed
+            n: Plaintext modulus the packed plaintext must stay below (n, or n^s for Damgard-Jurik)
+
+        Raises:
+            ValueError: If the slots cannot fit in the plaintext space
+        """
+        if num_candidates < 1:
+            raise ValueError("A packed ballot needs at least one candidate")
+        if max_voters < 1:
+            raise ValueError("Maximum number of voters must be positive")
+
+        self.num_candidates = num_candidates
+        self.max_voters = max_voters
+        self.n = int(n)
+
+        # Smallest power of two strictly greater than max_voters
+        self.slot_bits = max_voters.bit_length()
+        self.base = 1 << self.slot_bits
+        self._mask = self.base - 1
+
+        if self.base ** num_candidates > self.n:
+            raise ValueError(
+                f"Packed ballot needs {self.slot_bits * num_candidates} bits for {num_candidates} "
+                f"candidates and up to {max_voters} voters, but n only has {self.n.bit_length() - 1} "
+                f"usable bits (at most {self.max_candidates(max_voters, self.n)} candidates fit)"
+            )
+
+    @staticmethod
+    def max_candidates(max_voters: int, n: int) -> int:
+        """
+        Largest number of candidates that fit for a given electorate and key
+
+        Args:
+            max_voters: Upper bound on the number of ballots that will be summed
+            n: Public modulus
+
+        Returns:
+            int: Maximum slot count
+        """
+        slot_bits = max_voters.bit_length()
+        return (int(n).bit_length() - 1) // slot_bits
+
+    def encode(self, candidate_index: int) -> int:
+        """
+        Encode a vote for one candidate
+
+        Args:
+            candidate_index: Zero-based slot of the chosen candidate
+
+        Returns:
+            int: Plaintext B^candidate_index
+        """
+        if not 0 <= candidate_index < self.num_candidates:
+            raise ValueError(f"Candidate index must be in range [0, {self.num_candidates - 1}]")
+        return 1 << (self.slot_bits * candidate_index)
+
+    def unpack(self, plaintext: int) -> List[int]:
+        """
+        Split a decrypted packed tally into per-candidate counts
+
+        Args:
+            plaintext: Decrypted sum of packed ballots
+
+        Returns:
+            List of counts, one per candidate slot
+        """
+        plaintext = int(plaintext)
+        if plaintext >> (self.slot_bits * self.num_candidates):
+            raise ValueError("Packed tally overflowed its slots; more ballots than max_voters were summed")
+
+        counts = []
+        for _ in range(self.num_candidates):
+            counts.append(plaintext & self._mask)
+            plaintext >>= self.slot_bits
+        return counts
@@ -8,32 +8,94 @@ This module provides:
 - Vote aggregation without revealing individual votes
 """
 
-import random
+import itertools
 import math
-from typing import Tuple, List, Optional
+import secrets
+from typing import Iterable, Tuple, List, Optional
 from Crypto.Util.number import getPrime, inverse
 from Crypto.Random import get_random_bytes
-import gmpy2
 from django.conf import settings
+from .arithmetic import ArithmeticBackend, FixedBaseTable, get_backend
+from .cryptosystems import Cryptosystem
+from .parallel import chunked, default_chunk_size, get_process_pool, parallel_threshold
 
 class PaillierKeyPair:
     """Represents a Paillier public/private key pair"""
     
-    def __init__(self, public_key: Tuple[int, int], private_key: int):
+    def __init__(self, public_key: Tuple[int, int], private_key: int,
+                 p: Optional[int] = None, q: Optional[int] = None):
         self.public_key = public_key
         self.private_key = private_key
         self.n, self.g = public_key
         self.lambda_val = private_key
         self.mu = inverse(self.lambda_val, self.n)
+        
+        # Prime factors are optional; when present they enable CRT decryption
+        self.p = None
+        self.q = None
+        if p is not None and q is not None:
+            self._set_prime_factors(int(p), int(q))
+    
+    def _set_prime_factors(self, p: int, q: int):
+        """
+        Retain the prime factors and precompute the CRT decryption constants
+        
+        Args:
+            p: First prime factor of n
+            q: Second prime factor of n
+        """
+        if p * q != self.n:
+            raise ValueError("Prime factors do not match the public modulus")
+        
+        self.p, self.q = p, q
+        self.p_squared = p * p
+        self.q_squared = q * q
+        
+        # hp = L_p(g^(p-1) mod p^2)^-1 mod p, and likewise for q
+        self.hp = inverse((pow(self.g, p - 1, self.p_squared) - 1) // p, p)
+        self.hq = inverse((pow(self.g, q - 1, self.q_squared) - 1) // q, q)
+        
+        # p^-1 mod q for recombining the two residues
+        self.p_inverse = inverse(p, q)
+    
+    @property
+    def has_crt(self) -> bool:
+        """Whether the prime factors are available for CRT decryption"""
+        return self.p is not None and self.q is not None
     
     def __str__(self):
         return f"PaillierKeyPair(n={self.n}, g={self.g})"
 
-class PaillierEncryption:
+class PaillierEncryption(Cryptosystem):
     """Main class for Paillier encryption operations"""
     
-    def __init__(self, key_size: int = None):
+    name = 'paillier'
+    supports_ballot_proofs = True
+    supports_packed_ballots = True
+    
+    # Damgard-Jurik degree: plaintexts live mod n^s and ciphertexts mod
+    # n^(s+1). Paillier is the s = 1 case; see damgard_jurik.py for s > 1.
+    s = 1
+    
+    def __init__(self, key_size: int = None, backend: Optional[object] = None, use_crt: bool = True,
+                 obfuscator_pool=None, use_obfuscator_pool: Optional[bool] = None,
+                 generator_shortcut: bool = True, fixed_base_tables: bool = False):
         self.key_size = key_size or 512  # Default to 512 bits
+        self.backend: ArithmeticBackend = get_backend(backend)
+        self.use_crt = use_crt
+        
+        # g = n + 1 lets g^m be computed in closed form as 1 + m*n mod n^2.
+        # For any other generator, fixed_base_tables caches a windowed
+        # table of powers of g per key instead of a generic powmod.
+        self.generator_shortcut = generator_shortcut
+        self.fixed_base_tables = fixed_base_tables
+        self._generator_tables = {}
+        
+        # An explicit pool wins; otherwise use_obfuscator_pool (or the
+        # PAILLIER_OBFUSCATOR_POOL setting) decides whether to use the
+        # process-wide per-key pools
+        self.obfuscator_pool = obfuscator_pool
+        self.use_obfuscator_pool = use_obfuscator_pool
     
     def generate_key_pair(self) -> PaillierKeyPair:
         """
@@ -56,13 +118,19 @@ class PaillierEncryption:
         # Choose generator g
         g = n + 1  # Common choice for g
         
-        # Calculate mu
-        mu = inverse(lambda_val, n)
-        
         public_key = (n, g)
         private_key = lambda_val
         
-        return PaillierKeyPair(public_key, private_key)
+        # Keep p and q so decryption can take the CRT path
+        return PaillierKeyPair(public_key, private_key, p=p, q=q)
+    
+    def plaintext_modulus(self, n: int) -> int:
+        """Size of the message space under public modulus n (n^s)"""
+        return int(n) ** self.s
+    
+    def ciphertext_modulus(self, n: int) -> int:
+        """Modulus ciphertexts are reduced by under public modulus n (n^(s+1))"""
+        return int(n) ** (self.s + 1)
     
     def encrypt(self, message: int, public_key: Tuple[int, int]) -> int:
         """
@@ -75,22 +143,197 @@ class PaillierEncryption:
         Returns:
             int: Encrypted message
         """
-        n, g = public_key
+        bound = self.plaintext_modulus(public_key[0])
         
         # Ensure message is in valid range
-        if message < 0 or message >= n:
-            raise ValueError(f"Message must be in range [0, {n-1}]")
+        if message < 0 or message >= bound:
+            raise ValueError(f"Message must be in range [0, {bound-1}]")
         
-        # Choose random r
-        r = random.randint(1, n - 1)
-        while math.gcd(r, n) != 1:
-            r = random.randint(1, n - 1)
+        return self._encrypt_batch([message], public_key)[0]
+    
+    def encrypt_with_randomness(self, message: int, public_key: Tuple[int, int],
+                                modulus=None) -> Tuple[int, int]:
+        """
+        Encrypt a message and return the randomness used, e.g. to prove facts about it
         
-        # Encrypt: c = g^m * r^n mod n^2
-        n_squared = n * n
-        c = (pow(g, message, n_squared) * pow(r, n, n_squared)) % n_squared
+        The obfuscator is always computed inline, since pools only keep r^n.
+        
+        Args:
+            message: Plaintext message (integer)
+            public_key: Public key tuple (n, g)
+            modulus: Precomputed native ciphertext modulus (e.g. from a KeyContext)
+            
+        Returns:
+            Tuple of (ciphertext, r)
+        """
+        arith = self.backend
+        n, g = public_key
+        bound = self.plaintext_modulus(n)
+        if message < 0 or message >= bound:
+            raise ValueError(f"Message must be in range [0, {bound-1}]")
+        if modulus is None:
+            modulus = arith.mpz(self.ciphertext_modulus(n))
+        
+        r = secrets.randbelow(int(n) - 1) + 1
+        while math.gcd(r, int(n)) != 1:
+            r = secrets.randbelow(int(n) - 1) + 1
+        c = arith.mulmod(
+            self._generator_power(g, message, arith.mpz(n), modulus),
+            arith.powmod(arith.mpz(r), arith.mpz(bound), modulus),
+            modulus
+        )
+        return arith.to_int(c), r
+    
+    def encrypt_many(self, messages: Iterable[int], public_key: Tuple[int, int],
+                     parallel: Optional[bool] = None) -> List[int]:
+        """
+        Encrypt many messages under the same public key
         
-        return c
+        Key setup (n^2, native integer conversion) is done once per batch.
+        Batches at or above PAILLIER_PARALLELISM['THRESHOLD'] are split into
+        chunks and encrypted in the shared worker pool.
+        
+        Args:
+            messages: Plaintext messages (integers)
+            public_key: Public key tuple (n, g)
+            parallel: Force (True) or prevent (False) fan-out; None decides by size
+            
+        Returns:
+            List of ciphertexts in input order
+        """
+        messages = [int(message) for message in messages]
+        bound = self.plaintext_modulus(public_key[0])
+        for message in messages:
+            if message < 0 or message >= bound:
+                raise ValueError(f"Message must be in range [0, {bound-1}]")
+        
+        if parallel is None:
+            parallel = len(messages) >= parallel_threshold()
+        if not parallel or len(messages) < 2:
+            return self._encrypt_batch(messages, public_key)
+        
+        # Executor.map yields chunk results in submission order
+        chunks = chunked(messages, default_chunk_size())
+        results = get_process_pool().map(
+            _encrypt_chunk, chunks,
+            itertools.repeat(tuple(public_key)),
+            itertools.repeat(self.backend.name),
+            itertools.repeat(self.generator_shortcut),
+            itertools.repeat(self.s),
+        )
+        return [ciphertext for chunk in results for ciphertext in chunk]
+    
+    def _encrypt_batch(self, messages: List[int], public_key: Tuple[int, int],
+                       modulus=None) -> List[int]:
+        """
+        Encrypt already-validated messages in this process
+        
+        Args:
+            messages: Plaintext messages within [0, n^s)
+            public_key: Public key tuple (n, g)
+            modulus: Precomputed native ciphertext modulus (e.g. from a KeyContext)
+            
+        Returns:
+            List of ciphertexts in input order
+        """
+        arith = self.backend
+        n, g = public_key
+        if modulus is None:
+            modulus = arith.mpz(self.ciphertext_modulus(n))
+        exponent = arith.mpz(self.plaintext_modulus(n))
+        n = arith.mpz(n)
+        
+        ciphertexts = []
+        for message in messages:
+            # Precomputed r^n mod n^2 from the key's pool, if pooling is on
+            obfuscator = self._take_obfuscator(public_key)
+            if obfuscator is None:
+                # Choose random r from the OS CSPRNG
+                r = secrets.randbelow(int(n) - 1) + 1
+                while math.gcd(r, int(n)) != 1:
+                    r = secrets.randbelow(int(n) - 1) + 1
+                obfuscator = arith.powmod(arith.mpz(r), exponent, modulus)
+            
+            # Encrypt: c = g^m * r^(n^s) mod n^(s+1), i.e. g^m * r^n mod n^2
+            c = arith.mulmod(
+                self._generator_power(g, message, n, modulus),
+                arith.mpz(obfuscator),
+                modulus
+            )
+            ciphertexts.append(arith.to_int(c))
+        
+        return ciphertexts
+    
+    def _generator_power(self, g: int, message: int, n, n_squared):
+        """
+        Compute g^m mod n^2 using the cheapest path available for this generator
+        
+        Args:
+            g: Generator
+            message: Plaintext message
+            n: Public modulus (native integer)
+            n_squared: Ciphertext modulus n^2 (native integer)
+            
+        Returns:
+            Native integer g^m mod n^2
+        """
+        arith = self.backend
+        
+        # (n + 1)^m = 1 + m*n mod n^2 by the binomial theorem
+        if self.generator_shortcut and g == n + 1:
+            return (1 + arith.mpz(message) * n) % n_squared
+        
+        if self.fixed_base_tables:
+            table = self._generator_tables.get(int(n))
+            if table is None:
+                table = self.fixed_base_table(g, (int(n), g))
+                self._generator_tables[int(n)] = table
+            return table.pow(message)
+        
+        return arith.powmod(arith.mpz(g), message, n_squared)
+    
+    def fixed_base_table(self, base: int, public_key: Tuple[int, int], exponent_bits: Optional[int] = None,
+                         window: int = 4) -> FixedBaseTable:
+        """
+        Build a fixed-base exponentiation table mod n^2
+        
+        Useful when the same base is raised to many different exponents, e.g.
+        multiply_ciphertext with a fixed ciphertext or proof verification.
+        
+        Args:
+            base: Base to precompute powers of
+            public_key: Public key tuple (n, g)
+            exponent_bits: Largest exponent size to cover (defaults to the size of n)
+            window: Window width in bits
+            
+        Returns:
+            FixedBaseTable: Table reduced mod n^2 (n^(s+1))
+        """
+        n = int(public_key[0])
+        return FixedBaseTable(base, self.ciphertext_modulus(n),
+                              exponent_bits or self.plaintext_modulus(n).bit_length(),
+                              window=window, backend=self.backend)
+    
+    def _take_obfuscator(self, public_key: Tuple[int, int]) -> Optional[int]:
+        """
+        Take a precomputed r^n mod n^2 for this key, if a pool is in use
+        
+        Args:
+            public_key: Public key tuple (n, g)
+            
+        Returns:
+            Obfuscator value, or None to compute one inline
+        """
+        from .obfuscators import get_obfuscator_pool, pools_enabled
+        
+        pool = self.obfuscator_pool
+        if pool is not None:
+            return pool.take() if pool.n == int(public_key[0]) else None
+        
+        use_pool = pools_enabled() if self.use_obfuscator_pool is None else self.use_obfuscator_pool
+        if not use_pool:
+            return None
+        return get_obfuscator_pool(public_key).take()
     
     def decrypt(self, ciphertext: int, key_pair: PaillierKeyPair) -> int:
         """
@@ -103,18 +346,51 @@ class PaillierEncryption:
         Returns:
             int: Decrypted message
         """
-        n = key_pair.n
-        lambda_val = key_pair.lambda_val
-        mu = key_pair.mu
+        if self.use_crt and getattr(key_pair, 'has_crt', False):
+            return self._decrypt_crt(ciphertext, key_pair)
+        
+        arith = self.backend
+        n = arith.mpz(key_pair.n)
+        lambda_val = arith.mpz(key_pair.lambda_val)
+        mu = arith.mpz(key_pair.mu)
         n_squared = n * n
         
         # Decrypt: m = L(c^lambda mod n^2) * mu mod n
         # where L(x) = (x - 1) / n
-        x = pow(ciphertext, lambda_val, n_squared)
+        x = arith.powmod(arith.mpz(ciphertext), lambda_val, n_squared)
         l_x = (x - 1) // n
-        message = (l_x * mu) % n
+        message = arith.mulmod(l_x, mu, n)
+        
+        return arith.to_int(message)
+    
+    def _decrypt_crt(self, ciphertext: int, key_pair: PaillierKeyPair) -> int:
+        """
+        Decrypt using the Chinese Remainder Theorem
         
-        return message
+        Works mod p^2 and q^2 separately with half-width exponents, then
+        recombines the two residues mod n.
+        
+        Args:
+            ciphertext: Encrypted message
+            key_pair: Key pair with retained prime factors
+            
+        Returns:
+            int: Decrypted message
+        """
+        arith = self.backend
+        c = arith.mpz(ciphertext)
+        p, q = arith.mpz(key_pair.p), arith.mpz(key_pair.q)
+        p_squared, q_squared = arith.mpz(key_pair.p_squared), arith.mpz(key_pair.q_squared)
+        
+        # m_p = L_p(c^(p-1) mod p^2) * hp mod p, and likewise for q
+        x_p = arith.powmod(c % p_squared, p - 1, p_squared)
+        m_p = arith.mulmod((x_p - 1) // p, arith.mpz(key_pair.hp), p)
+        x_q = arith.powmod(c % q_squared, q - 1, q_squared)
+        m_q = arith.mulmod((x_q - 1) // q, arith.mpz(key_pair.hq), q)
+        
+        # Recombine: m = m_p + p * ((m_q - m_p) * p^-1 mod q)
+        h = arith.mulmod(m_q - m_p, arith.mpz(key_pair.p_inverse), q)
+        return arith.to_int(m_p + p * h)
     
     def add_ciphertexts(self, ciphertext1: int, ciphertext2: int, public_key: Tuple[int, int]) -> int:
         """
@@ -128,14 +404,15 @@ class PaillierEncryption:
         Returns:
             int: Encrypted sum
         """
-        n, _ = public_key
-        n_squared = n * n
+        arith = self.backend
+        modulus = arith.mpz(self.ciphertext_modulus(public_key[0]))
         
         # Add: c1 * c2 mod n^2
-        result = (ciphertext1 * ciphertext2) % n_squared
-        return result
+        result = arith.mulmod(arith.mpz(ciphertext1), arith.mpz(ciphertext2), modulus)
+        return arith.to_int(result)
     
-    def multiply_ciphertext(self, ciphertext: int, scalar: int, public_key: Tuple[int, int]) -> int:
+    def multiply_ciphertext(self, ciphertext: int, scalar: int, public_key: Tuple[int, int],
+                            table: Optional[FixedBaseTable] = None) -> int:
         """
         Multiply encrypted value by a scalar (homomorphic property)
         
@@ -143,30 +420,92 @@ class PaillierEncryption:
             ciphertext: Encrypted value
             scalar: Plaintext scalar
             public_key: Public key tuple (n, g)
+            table: Optional fixed_base_table() for this ciphertext
             
         Returns:
             int: Encrypted product
         """
-        n, _ = public_key
-        n_squared = n * n
+        arith = self.backend
+        if table is not None:
+            if table.base != int(ciphertext):
+                raise ValueError("Fixed-base table was built for a different ciphertext")
+            return arith.to_int(table.pow(scalar))
+        
+        modulus = arith.mpz(self.ciphertext_modulus(public_key[0]))
         
         # Multiply: c^scalar mod n^2
-        result = pow(ciphertext, scalar, n_squared)
-        return result
+        result = arith.powmod(arith.mpz(ciphertext), scalar, modulus)
+        return arith.to_int(result)
+    
+    def aggregate(self, ciphertexts: Iterable[int], public_key: Tuple[int, int]) -> int:
+        """
+        Combine many ciphertexts into an encryption of their sum
+        
+        Args:
+            ciphertexts: Ciphertexts under public_key
+            public_key: Public key tuple (n, g)
+            
+        Returns:
+            int: Encrypted sum
+        """
+        from .aggregation import aggregate_ciphertexts
+        return aggregate_ciphertexts(ciphertexts, public_key, backend=self.backend, s=self.s)
+    
+    def encode_ciphertext(self, ciphertext: int, public_key: Tuple[int, int]) -> bytes:
+        """Serialize a ciphertext into a binary record (see serialization.py)"""
+        from .serialization import CiphertextCodec
+        return CiphertextCodec(public_key[0], self.s).encode(ciphertext)
+    
+    def decode_ciphertext(self, data, public_key: Tuple[int, int]) -> int:
+        """Parse a binary record written by encode_ciphertext"""
+        from .serialization import CiphertextCodec
+        return CiphertextCodec(public_key[0], self.s).decode(data)
+    
+    def ciphertext_bytes(self, ciphertext: int, public_key: Tuple[int, int]) -> bytes:
+        """Minimal big-endian bytes of a ciphertext, as hashed and anchored on-chain"""
+        ciphertext = int(ciphertext)
+        return ciphertext.to_bytes(max(1, (ciphertext.bit_length() + 7) // 8), 'big')
+    
+    def invalid_ciphertexts(self, ciphertexts: Iterable[int], public_key: Tuple[int, int]) -> List[int]:
+        """Sorted indices of ciphertexts outside [1, n^(s+1)) or sharing a factor with n"""
+        from .validation import validate_ciphertexts
+        return validate_ciphertexts(ciphertexts, public_key, backend=self.backend, s=self.s)
+    
+    def key_share_secret(self, key_pair: PaillierKeyPair) -> int:
+        """Lambda, the exponent threshold decryption splits between trustees"""
+        return int(key_pair.lambda_val)
+
+def _encrypt_chunk(messages: List[int], public_key: Tuple[int, int], backend_name: str,
+                   generator_shortcut: bool, s: int = 1) -> List[int]:
+    """Worker-process entry point for PaillierEncryption.encrypt_many"""
+    from .damgard_jurik import get_encryption
+    paillier = get_encryption(s, backend=backend_name, generator_shortcut=generator_shortcut,
+                              use_obfuscator_pool=False)
+    return paillier._encrypt_batch(messages, public_key)
 
 class ThresholdPaillier:
     """Threshold Paillier implementation for distributed decryption"""
     
-    def __init__(self, total_trustees: int, threshold: int = None):
+    def __init__(self, total_trustees: int, threshold: int = None, backend: Optional[object] = None):
         self.total_trustees = total_trustees
         self.threshold = threshold or settings.PAILLIER_THRESHOLD
+        self.backend: ArithmeticBackend = get_backend(backend)
         
         if self.threshold > self.total_trustees:
             raise ValueError("Threshold cannot be greater than total trustees")
+        
+        # Delta = N! makes every Lagrange coefficient at 0 an integer once
+        # scaled, so combining never needs an inverse mod the secret n*lambda
+        self.delta = math.factorial(self.total_trustees)
+        self._lagrange_cache = {}
     
     def generate_distributed_keys(self, key_pair: PaillierKeyPair) -> List[Tuple[int, int]]:
         """
-        Generate distributed private key shares using Shamir's Secret Sharing
+        Generate distributed private key shares (trusted dealer)
+        
+        The shared secret is d with d = 0 mod lambda and d = 1 mod n, so
+        c^d = (1 + n)^m mod n^2 for any ciphertext of m. d is shared with a
+        random degree (threshold - 1) polynomial over the integers mod n*lambda.
         
         Args:
             key_pair: Original key pair
@@ -174,63 +513,215 @@ class ThresholdPaillier:
         Returns:
             List of (trustee_id, private_key_share) tuples
         """
-        from .shamir import ShamirSecretSharing
+        n = key_pair.n
+        lambda_val = key_pair.lambda_val
+        share_modulus = n * lambda_val
+        d = lambda_val * inverse(lambda_val, n)
         
-        shamir = ShamirSecretSharing(self.total_trustees, self.threshold)
-        shares = shamir.generate_shares(key_pair.private_key)
+        coefficients = [d] + [secrets.randbelow(share_modulus) for _ in range(self.threshold - 1)]
+        shares = []
+        for trustee_id in range(1, self.total_trustees + 1):
+            value = 0
+            for coefficient in reversed(coefficients):
+                value = (value * trustee_id + coefficient) % share_modulus
+            shares.append((trustee_id, value))
         
         return shares
     
-    def partial_decrypt(self, ciphertext: int, private_key_share: int, key_pair: PaillierKeyPair) -> int:
+    def partial_decrypt(self, ciphertext: int, private_key_share: int, key_pair) -> int:
         """
         Perform partial decryption using a private key share
         
         Args:
             ciphertext: Encrypted message
             private_key_share: Private key share
-            key_pair: Original key pair
+            key_pair: Key pair or public key tuple (n, g); only n is used
             
         Returns:
             int: Partial decryption result
         """
-        n = key_pair.n
-        n_squared = n * n
+        return self.partial_decrypt_many([ciphertext], private_key_share, key_pair, parallel=False)[0]
+    
+    def partial_decrypt_many(self, ciphertexts: Iterable[int], private_key_share: int, key_pair,
+                             parallel: Optional[bool] = None) -> List[int]:
+        """
+        Partially decrypt a whole vector of ciphertexts with one trustee's share
+        
+        One call covers every ciphertext of a tally (e.g. one per candidate),
+        so a trustee is contacted once per ceremony rather than once per
+        ciphertext. Large vectors are split across the shared worker pool.
         
-        # Partial decrypt: c^share mod n^2
-        partial_result = pow(ciphertext, private_key_share, n_squared)
-        return partial_result
+        Args:
+            ciphertexts: Encrypted messages
+            private_key_share: This trustee's private key share
+            key_pair: Key pair or public key tuple (n, g); only n is used
+            parallel: Force (True) or prevent (False) fan-out; None decides by size
+            
+        Returns:
+            List of partial decryptions in input order
+        """
+        ciphertexts = [int(ciphertext) for ciphertext in ciphertexts]
+        n = _public_modulus(key_pair)
+        
+        if parallel is None:
+            parallel = len(ciphertexts) >= parallel_threshold()
+        if not parallel or len(ciphertexts) < 2:
+            return _partial_decrypt_chunk(ciphertexts, private_key_share, n, self.backend.name)
+        
+        chunks = chunked(ciphertexts, default_chunk_size())
+        results = get_process_pool().map(
+            _partial_decrypt_chunk, chunks,
+            itertools.repeat(private_key_share),
+            itertools.repeat(n),
+            itertools.repeat(self.backend.name),
+        )
+        return [partial for chunk in results for partial in chunk]
     
-    def combine_partial_decryptions(self, partial_results: List[int], key_pair: PaillierKeyPair) -> int:
+    def lagrange_coefficients(self, trustee_ids: Iterable[int]) -> dict:
+        """
+        Get the Delta-scaled Lagrange coefficients at 0 for a trustee subset
+        
+        Coefficients depend only on which trustees take part, so they are
+        computed once per subset and cached.
+        
+        Args:
+            trustee_ids: IDs (1..total_trustees) of the participating trustees
+            
+        Returns:
+            Dict mapping trustee_id to the integer Delta * lambda_i(0)
+        """
+        subset = tuple(sorted(set(trustee_ids)))
+        cached = self._lagrange_cache.get(subset)
+        if cached is not None:
+            return cached
+        
+        if len(subset) < self.threshold:
+            raise ValueError(f"Need at least {self.threshold} trustees to decrypt")
+        if subset[0] < 1 or subset[-1] > self.total_trustees:
+            raise ValueError(f"Trustee IDs must be in range [1, {self.total_trustees}]")
+        
+        coefficients = {}
+        for i in subset:
+            numerator = self.delta
+            denominator = 1
+            for j in subset:
+                if j != i:
+                    numerator *= -j
+                    denominator *= i - j
+            coefficients[i] = numerator // denominator
+        
+        self._lagrange_cache[subset] = coefficients
+        return coefficients
+    
+    def combine_partial_decryptions(self, partial_results: List[Tuple[int, int]], key_pair) -> int:
         """
         Combine partial decryptions to get final result
         
         Args:
-            partial_results: List of partial decryption results
-            key_pair: Original key pair
+            partial_results: List of (trustee_id, partial decryption) pairs
+            key_pair: Key pair or public key tuple (n, g); only n is used
             
         Returns:
             int: Final decrypted message
         """
-        n = key_pair.n
+        partials = {trustee_id: [partial] for trustee_id, partial in partial_results}
+        return self.combine_partial_decryptions_many(partials, key_pair)[0]
+    
+    def combine_partial_decryptions_many(self, partials_by_trustee: dict, key_pair) -> List[int]:
+        """
+        Combine vectors of partial decryptions from several trustees
+        
+        Args:
+            partials_by_trustee: Dict mapping trustee_id to that trustee's
+                partial_decrypt_many() output; all vectors must line up
+            key_pair: Key pair or public key tuple (n, g); only n is used
+            
+        Returns:
+            List of decrypted messages in vector order
+        """
+        arith = self.backend
+        n = arith.mpz(_public_modulus(key_pair))
         n_squared = n * n
         
-        # Combine using Lagrange interpolation
-        combined = 1
-        for partial in partial_results:
-            combined = (combined * partial) % n_squared
+        # Any threshold-sized subset works; use the lowest IDs so the
+        # coefficient cache is hit across ceremonies
+        trustee_ids = sorted(partials_by_trustee)[:self.threshold]
+        coefficients = self.lagrange_coefficients(trustee_ids)
+        vectors = [partials_by_trustee[trustee_id] for trustee_id in trustee_ids]
+        if len({len(vector) for vector in vectors}) != 1:
+            raise ValueError("Partial decryption vectors have different lengths")
+        delta_inverse = arith.invert(arith.mpz(self.delta), n)
+        
+        messages = []
+        for partials in zip(*vectors):
+            # prod(partial_i ^ (Delta * lambda_i)) = c^(Delta * d) = (1 + n)^(Delta * m);
+            # negative coefficients are gathered and inverted once
+            positive = arith.mpz(1)
+            negative = arith.mpz(1)
+            for trustee_id, partial in zip(trustee_ids, partials):
+                coefficient = coefficients[trustee_id]
+                term = arith.powmod(arith.mpz(partial), abs(coefficient), n_squared)
+                if coefficient < 0:
+                    negative = arith.mulmod(negative, term, n_squared)
+                else:
+                    positive = arith.mulmod(positive, term, n_squared)
+            combined = arith.mulmod(positive, arith.invert(negative, n_squared), n_squared)
+            
+            # L(x) = (x - 1) / n gives Delta * m mod n
+            messages.append(arith.to_int(arith.mulmod((combined - 1) // n, delta_inverse, n)))
         
-        # Apply final decryption step
-        l_combined = (combined - 1) // n
-        mu = key_pair.mu
-        message = (l_combined * mu) % n
+        return messages
+    
+    def simulate_ceremony(self, ciphertexts: Iterable[int], key_pair: PaillierKeyPair,
+                          shares: Optional[List[Tuple[int, int]]] = None,
+                          trustee_ids: Optional[Iterable[int]] = None,
+                          parallel: Optional[bool] = None) -> List[int]:
+        """
+        Run a whole threshold decryption locally with simulated trustees
         
-        return message
+        Args:
+            ciphertexts: Encrypted messages to decrypt
+            key_pair: Key pair the shares are dealt from
+            shares: Existing (trustee_id, share) pairs; dealt fresh when None
+            trustee_ids: Trustees that take part (defaults to the first threshold)
+            parallel: Passed to partial_decrypt_many
+            
+        Returns:
+            List of decrypted messages in input order
+        """
+        ciphertexts = list(ciphertexts)
+        shares = dict(shares or self.generate_distributed_keys(key_pair))
+        trustee_ids = list(trustee_ids or sorted(shares)[:self.threshold])
+        
+        partials = {
+            trustee_id: self.partial_decrypt_many(ciphertexts, shares[trustee_id], key_pair, parallel=parallel)
+            for trustee_id in trustee_ids
+        }
+        return self.combine_partial_decryptions_many(partials, key_pair)
+
+def _public_modulus(key) -> int:
+    """Read n from a key pair or a public key tuple (n, g)"""
+    if isinstance(key, PaillierKeyPair):
+        return int(key.n)
+    return int(key[0])
+
+def _partial_decrypt_chunk(ciphertexts: List[int], private_key_share: int, n: int,
+                           backend_name: str) -> List[int]:
+    """Worker-process entry point for ThresholdPaillier.partial_decrypt_many"""
+    arith = get_backend(backend_name)
+    n = arith.mpz(n)
+    n_squared = n * n
+    share = arith.mpz(private_key_share)
+    
+    # Partial decrypt: c^share mod n^2
+    return [arith.to_int(arith.powmod(arith.mpz(c), share, n_squared)) for c in ciphertexts]
 
 class VoteEncryption:
     """High-level interface for vote encryption operations"""
     
-    def __init__(self):
-        self.paillier = PaillierEncryption()
+    def __init__(self, backend: Optional[object] = None):
+        self.paillier = PaillierEncryption(backend=backend)
+        self.backend: ArithmeticBackend = self.paillier.backend
     
     def encrypt_vote(self, vote_value: int, public_key: Tuple[int, int]) -> int:
         """
@@ -245,25 +736,54 @@ class VoteEncryption:
         """
         return self.paillier.encrypt(vote_value, public_key)
     
-    def aggregate_votes(self, encrypted_votes: List[int], public_key: Tuple[int, int]) -> int:
+    def encrypt_many(self, values: Iterable[int], public_key: Tuple[int, int]) -> List[int]:
+        """
+        Encrypt many vote values under the same election key
+        
+        Args:
+            values: Vote values (e.g. a multi-choice or one-hot ballot)
+            public_key: Election public key
+            
+        Returns:
+            List of encrypted votes in input order
+        """
+        return self.paillier.encrypt_many(values, public_key)
+    
+    def encrypt_ballot(self, choice_index: int, num_candidates: int, public_key: Tuple[int, int]) -> List[int]:
+        """
+        Encrypt a one-hot ballot vector with one ciphertext per candidate
+        
+        Args:
+            choice_index: Position of the chosen candidate
+            num_candidates: Number of candidates on the ballot
+            public_key: Election public key
+            
+        Returns:
+            List of encrypted 0/1 values, one per candidate
+        """
+        if not 0 <= choice_index < num_candidates:
+            raise ValueError(f"Choice must be in range [0, {num_candidates - 1}]")
+        
+        values = [1 if i == choice_index else 0 for i in range(num_candidates)]
+        return self.encrypt_many(values, public_key)
+    
+    def aggregate_votes(self, encrypted_votes: Iterable[int], public_key: Tuple[int, int]) -> int:
         """
         Aggregate multiple encrypted votes
         
         Args:
-            encrypted_votes: List of encrypted votes
+            encrypted_votes: List or lazy iterable of encrypted votes
             public_key: Election public key
             
         Returns:
             int: Encrypted vote count
         """
-        if not encrypted_votes:
+        if isinstance(encrypted_votes, (list, tuple)) and not encrypted_votes:
             return 0
         
-        result = encrypted_votes[0]
-        for vote in encrypted_votes[1:]:
-            result = self.paillier.add_ciphertexts(result, vote, public_key)
-        
-        return result
+        # Chunked tree reduction, fanned out to worker processes for large inputs
+        from .aggregation import aggregate_ciphertexts
+        return aggregate_ciphertexts(encrypted_votes, public_key, backend=self.backend)
     
     def verify_vote_encryption(self, encrypted_vote: int, public_key: Tuple[int, int]) -> bool:
         """
@@ -284,10 +804,43 @@ class VoteEncryption:
             return False
         
         # Check if ciphertext is coprime with n
-        if math.gcd(encrypted_vote, n) != 1:
+        if self.backend.gcd(self.backend.mpz(encrypted_vote), self.backend.mpz(n)) != 1:
             return False
         
         return True
+    
+    def encrypt_vote_with_proof(self, vote_value: int, public_key: Tuple[int, int],
+                                allowed_values: Iterable[int], context: bytes = b''):
+        """
+        Encrypt a vote and prove it is one of the allowed values
+        
+        Args:
+            vote_value: Vote value
+            public_key: Election public key
+            allowed_values: Values a valid ballot may encrypt (e.g. [0, 1])
+            context: Bytes the proof is bound to (e.g. the election ID)
+            
+        Returns:
+            Tuple of (encrypted vote, MembershipProof)
+        """
+        from .proofs import MembershipVerifier
+        ciphertext, r = self.paillier.encrypt_with_randomness(vote_value, public_key)
+        verifier = MembershipVerifier(public_key, list(allowed_values), backend=self.backend)
+        return ciphertext, verifier.prove(ciphertext, vote_value, r, context)
+    
+    def find_invalid_votes(self, encrypted_votes: Iterable[int], public_key: Tuple[int, int]) -> List[int]:
+        """
+        Verify many encrypted votes with one gcd, locating failures only if there are any
+        
+        Args:
+            encrypted_votes: Encrypted votes to verify
+            public_key: Election public key
+            
+        Returns:
+            Sorted indices of invalid votes (empty if all are valid)
+        """
+        from .validation import validate_ciphertexts
+        return validate_ciphertexts(encrypted_votes, public_key, backend=self.backend)
 
 # Global instance for easy access
 vote_encryption = VoteEncryption() 
\ No newline at end of file
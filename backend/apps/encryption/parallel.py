@@ -0,0 +1,81 @@
+"""
+Process-Pool Helpers for the Encryption App
+
+This module provides:
+- A lazily created, process-wide worker pool for CPU-bound crypto work
+- Settings lookup for parallelism thresholds and worker counts
+- Chunking helpers for splitting work into per-worker batches
+"""
+
+import atexit
+import itertools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+DEFAULT_THRESHOLD = 64
+DEFAULT_CHUNK_SIZE = 32
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def parallel_settings() -> dict:
+    """Read PAILLIER_PARALLELISM from settings, tolerating unconfigured Django"""
+    try:
+        from django.conf import settings
+        return dict(getattr(settings, 'PAILLIER_PARALLELISM', {}) or {})
+    except Exception:
+        return {}
+
+def parallel_threshold() -> int:
+    """Smallest batch that is worth fanning out to worker processes"""
+    return parallel_settings().get('THRESHOLD', DEFAULT_THRESHOLD)
+
+def default_chunk_size() -> int:
+    """Number of items sent to a worker per task"""
+    return parallel_settings().get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+def max_workers() -> int:
+    """Number of worker processes in the shared pool"""
+    return parallel_settings().get('MAX_WORKERS') or os.cpu_count() or 1
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared worker pool, creating it on first use
+
+    Returns:
+        ProcessPoolExecutor: Persistent pool reused across calls
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max_workers())
+        return _pool
+
+@atexit.register
+def shutdown_process_pool():
+    """Shut the shared worker pool down"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most size items without materialising it
+
+    Args:
+        items: Any iterable
+        size: Maximum chunk length
+
+    Returns:
+        Iterator of lists
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
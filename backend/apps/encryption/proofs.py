@@ -0,0 +1,350 @@
+"""
+Ballot Validity Proofs
+
+This module provides:
+- Non-interactive 1-of-L membership proofs that a Paillier ciphertext
+  encrypts one of a public list of allowed values
+- Single-proof verification
+- Randomised batch verification with one multi-exponentiation per batch
+- Chunked batch verification in the shared worker pool for the tally
+- The same proofs for Damgard-Jurik ciphertexts, with n^s-th powers mod n^(s+1)
+
+For c = g^m * r^n mod n^2 and allowed values m_1..m_L, let u_j = c / g^m_j.
+Exactly one u_j (the one with m_j = m) is an n-th power, namely r^n. The
+prover runs an honest sigma protocol for that branch and simulates the
+others (Cramer-Damgard-Schoenmakers OR composition):
+
+    a_j = z_j^n * u_j^(-e_j)   for the simulated branches
+    a_i = rho^n                for the real branch
+    e   = H(context, n, c, allowed values, a_1..a_L) mod 2^128
+    e_i = e - sum of the other e_j mod 2^128,  z_i = rho * r^e_i mod n
+
+and a verifier checks sum(e_j) = e mod 2^128 and z_j^n = a_j * u_j^e_j for
+every j.
+
+Batch verification picks an independent random weight w for every one of
+those equations and checks the single product
+
+    (prod z^w)^n == prod a^w * prod_ballots c^(sum w*e) * prod_j g^(-m_j * sum w*e)
+
+The weights are short, so every product on both sides is one Straus
+multi-exponentiation with short exponents plus a single n-th power, instead
+of L full-size exponentiations per proof. The g terms collapse to one
+closed-form value when g = n + 1. A batch containing a proof for a value
+outside the list passes with probability at most about 2^-128. Components
+of order coprime to n can differ between a batch-accepted and an
+individually-accepted proof, but those components carry no information
+about m, so they cannot hide an invalid ballot.
+"""
+
+import hashlib
+import itertools
+import secrets
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .arithmetic import ArithmeticBackend, get_backend, multi_powmod
+from .parallel import chunked, get_process_pool, parallel_threshold
+
+CHALLENGE_BITS = 128
+BATCH_WEIGHT_BITS = 128
+DEFAULT_PROOF_CHUNK_SIZE = 64
+
+class MembershipProof:
+    """Non-interactive proof that a ciphertext encrypts one of L allowed values"""
+
+    def __init__(self, commitments: Sequence[int], challenges: Sequence[int], responses: Sequence[int]):
+        self.commitments = [int(a) for a in commitments]
+        self.challenges = [int(e) for e in challenges]
+        self.responses = [int(z) for z in responses]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Serialize for storage (decimal strings, like the stored keys)"""
+        return {
+            'a': [str(a) for a in self.commitments],
+            'e': [str(e) for e in self.challenges],
+            'z': [str(z) for z in self.responses],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Sequence]) -> 'MembershipProof':
+        """Deserialize a stored proof"""
+        return cls(
+            [int(a) for a in data['a']],
+            [int(e) for e in data['e']],
+            [int(z) for z in data['z']],
+        )
+
+    def __len__(self):
+        return len(self.commitments)
+
+def _challenge(context: bytes, n: int, ciphertext: int, allowed: Sequence[int],
+               commitments: Sequence[int], s: int = 1) -> int:
+    """Fiat-Shamir challenge binding the proof to its ciphertext, key, value list and context"""
+    digest = hashlib.sha256(b'paillier-membership-v1')
+    key = str(n) if s == 1 else f'{n}^{s}'
+    for part in [context, key.encode(), str(ciphertext).encode(),
+                 ','.join(str(m) for m in allowed).encode()] + [str(a).encode() for a in commitments]:
+        digest.update(len(part).to_bytes(4, 'big'))
+        digest.update(part)
+    return int.from_bytes(digest.digest(), 'big') % (1 << CHALLENGE_BITS)
+
+class MembershipVerifier:
+    """Proves and verifies ballot membership proofs for one key and value list"""
+
+    def __init__(self, public_key: Tuple[int, int], allowed_values: Sequence[int],
+                 backend: Optional[object] = None, s: int = 1):
+        """
+        Initialize a verifier
+
+        Args:
+            public_key: Public key (n, g)
+            allowed_values: Plaintexts a valid ballot may encrypt
+            backend: Arithmetic backend name or instance
+            s: Damgard-Jurik degree; n-th powers become n^s-th powers mod n^(s+1)
+        """
+        self.backend: ArithmeticBackend = get_backend(backend)
+        arith = self.backend
+        self.n, self.g = int(public_key[0]), int(public_key[1])
+        self.s = s
+        self.exponent = self.n ** s
+        self.modulus = self.n ** (s + 1)
+        self.allowed = [int(m) for m in allowed_values]
+        if len(set(self.allowed)) != len(self.allowed) or not self.allowed:
+            raise ValueError("Allowed values must be a non-empty list without duplicates")
+
+        # g^-m_j mod n^(s+1) for each allowed value, so u_j = c * g^-m_j
+        modulus = arith.mpz(self.modulus)
+        self.shortcut = self.g == self.n + 1 and s == 1
+        if self.shortcut:
+            self._inverse_powers = [(1 - m * self.n) % self.modulus for m in self.allowed]
+        else:
+            self._inverse_powers = [
+                arith.to_int(arith.invert(arith.powmod(arith.mpz(self.g), m, modulus), modulus))
+                for m in self.allowed
+            ]
+
+    def _u(self, ciphertext: int, index: int):
+        arith = self.backend
+        return arith.mulmod(arith.mpz(ciphertext), arith.mpz(self._inverse_powers[index]),
+                            arith.mpz(self.modulus))
+
+    def _random_unit(self) -> int:
+        """Random element of Z*_n"""
+        while True:
+            value = secrets.randbelow(self.n - 1) + 1
+            if self.backend.gcd(self.backend.mpz(value), self.backend.mpz(self.n)) == 1:
+                return value
+
+    def prove(self, ciphertext: int, message: int, randomness: int, context: bytes = b'') -> MembershipProof:
+        """
+        Prove that ciphertext = g^message * randomness^(n^s) encrypts an allowed value
+
+        Args:
+            ciphertext: The ciphertext
+            message: Its plaintext (must be in the allowed list)
+            randomness: The r used to encrypt it
+            context: Bytes the proof is bound to (e.g. the election ID)
+
+        Returns:
+            MembershipProof
+        """
+        arith = self.backend
+        if message not in self.allowed:
+            raise ValueError("Message is not one of the allowed values")
+        real = self.allowed.index(message)
+        n = arith.mpz(self.n)
+        exponent = arith.mpz(self.exponent)
+        modulus = arith.mpz(self.modulus)
+
+        commitments = [0] * len(self.allowed)
+        challenges = [0] * len(self.allowed)
+        responses = [0] * len(self.allowed)
+        for j in range(len(self.allowed)):
+            if j == real:
+                continue
+            challenges[j] = secrets.randbits(CHALLENGE_BITS)
+            responses[j] = self._random_unit()
+            u_e = arith.powmod(self._u(ciphertext, j), challenges[j], modulus)
+            commitments[j] = arith.to_int(arith.mulmod(
+                arith.powmod(arith.mpz(responses[j]), exponent, modulus), arith.invert(u_e, modulus), modulus
+            ))
+
+        rho = self._random_unit()
+        commitments[real] = arith.to_int(arith.powmod(arith.mpz(rho), exponent, modulus))
+        e = _challenge(context, self.n, int(ciphertext), self.allowed, commitments, self.s)
+        challenges[real] = (e - sum(challenges)) % (1 << CHALLENGE_BITS)
+        responses[real] = arith.to_int(arith.mulmod(
+            arith.mpz(rho), arith.powmod(arith.mpz(randomness), challenges[real], n), n
+        ))
+        return MembershipProof(commitments, challenges, responses)
+
+    def _well_formed(self, ciphertext: int, proof: MembershipProof, context: bytes) -> bool:
+        """Shape, range and Fiat-Shamir checks shared by single and batch verification"""
+        size = len(self.allowed)
+        if not (len(proof.commitments) == len(proof.challenges) == len(proof.responses) == size):
+            return False
+        if not 0 < ciphertext < self.modulus:
+            return False
+        if any(not 0 < a < self.modulus for a in proof.commitments):
+            return False
+        if any(not 0 < z < self.n for z in proof.responses):
+            return False
+        if any(not 0 <= e < (1 << CHALLENGE_BITS) for e in proof.challenges):
+            return False
+        expected = _challenge(context, self.n, ciphertext, self.allowed, proof.commitments, self.s)
+        return sum(proof.challenges) % (1 << CHALLENGE_BITS) == expected
+
+    def verify(self, ciphertext: int, proof: MembershipProof, context: bytes = b'') -> bool:
+        """
+        Verify one proof on its own
+
+        Args:
+            ciphertext: The ciphertext
+            proof: Its membership proof
+            context: Bytes the proof was bound to
+
+        Returns:
+            bool: True if the proof is valid
+        """
+        arith = self.backend
+        ciphertext = int(ciphertext)
+        if not self._well_formed(ciphertext, proof, context):
+            return False
+        exponent = arith.mpz(self.exponent)
+        modulus = arith.mpz(self.modulus)
+        for j in range(len(self.allowed)):
+            lhs = arith.powmod(arith.mpz(proof.responses[j]), exponent, modulus)
+            rhs = arith.mulmod(
+                arith.mpz(proof.commitments[j]),
+                arith.powmod(self._u(ciphertext, j), proof.challenges[j], modulus),
+                modulus
+            )
+            if lhs != rhs:
+                return False
+        return True
+
+    def verify_batch(self, items: Sequence[Tuple[int, MembershipProof, bytes]]) -> bool:
+        """
+        Verify many proofs with one randomised product check
+
+        Args:
+            items: (ciphertext, proof, context) triples
+
+        Returns:
+            bool: True if every proof is valid (false positives <= ~2^-128)
+        """
+        arith = self.backend
+        n = arith.mpz(self.n)
+        modulus = arith.mpz(self.modulus)
+
+        response_pairs = []
+        rhs_pairs = []
+        g_exponents = [0] * len(self.allowed)
+        unit_check = arith.mpz(1)
+        for ciphertext, proof, context in items:
+            ciphertext = int(ciphertext)
+            if not self._well_formed(ciphertext, proof, context):
+                return False
+            ciphertext_exponent = 0
+            for j in range(len(self.allowed)):
+                weight = secrets.randbits(BATCH_WEIGHT_BITS) + 1
+                weighted_challenge = weight * proof.challenges[j]
+                response_pairs.append((proof.responses[j], weight))
+                rhs_pairs.append((proof.commitments[j], weight))
+                ciphertext_exponent += weighted_challenge
+                g_exponents[j] += weighted_challenge
+                # The group argument needs units; one gcd below covers the whole batch
+                unit_check = arith.mulmod(unit_check, arith.mpz(proof.commitments[j]) % n, n)
+                unit_check = arith.mulmod(unit_check, arith.mpz(proof.responses[j]), n)
+            rhs_pairs.append((ciphertext, ciphertext_exponent))
+            unit_check = arith.mulmod(unit_check, arith.mpz(ciphertext) % n, n)
+
+        if not response_pairs:
+            return True
+        if arith.gcd(unit_check, n) != 1:
+            return False
+
+        lhs = arith.powmod(multi_powmod(response_pairs, modulus, backend=arith), arith.mpz(self.exponent),
+                           modulus)
+        rhs = multi_powmod(rhs_pairs, modulus, backend=arith)
+        if self.shortcut:
+            # prod_j (n+1)^(-m_j * x_j) = 1 - n * sum(m_j * x_j) mod n^2
+            total = sum(m * x for m, x in zip(self.allowed, g_exponents))
+            rhs = arith.mulmod(rhs, arith.mpz((1 - total * self.n) % self.modulus), modulus)
+        else:
+            rhs = arith.mulmod(
+                rhs, multi_powmod(list(zip(self._inverse_powers, g_exponents)), modulus, backend=arith),
+                modulus
+            )
+        return lhs == rhs
+
+    def find_invalid(self, items: Sequence[Tuple[int, MembershipProof, bytes]]) -> List[int]:
+        """
+        Locate invalid proofs: one batch check, then single checks only on failure
+
+        Args:
+            items: (ciphertext, proof, context) triples
+
+        Returns:
+            Sorted indices of invalid proofs
+        """
+        if self.verify_batch(items):
+            return []
+        return [i for i, (ciphertext, proof, context) in enumerate(items)
+                if not self.verify(ciphertext, proof, context)]
+
+def _verify_proof_chunk(items: List[Tuple[int, Dict, bytes]], public_key: Tuple[int, int],
+                        allowed_values: List[int], backend_name: str, s: int = 1) -> List[int]:
+    """Worker-process entry point: positions of invalid proofs within one chunk"""
+    verifier = MembershipVerifier(public_key, allowed_values, backend=backend_name, s=s)
+    parsed = []
+    malformed = set()
+    for i, (ciphertext, proof, context) in enumerate(items):
+        try:
+            parsed.append((ciphertext, MembershipProof.from_dict(proof), context))
+        except (KeyError, TypeError, ValueError):
+            malformed.add(i)
+            parsed.append(None)
+    indices = [i for i in range(len(parsed)) if parsed[i] is not None]
+    invalid = verifier.find_invalid([parsed[i] for i in indices])
+    return sorted(malformed | {indices[i] for i in invalid})
+
+def verify_membership_proofs(items: Iterable[Tuple[int, Dict, bytes]], public_key: Tuple[int, int],
+                             allowed_values: Sequence[int], chunk_size: int = DEFAULT_PROOF_CHUNK_SIZE,
+                             parallel: Optional[bool] = None, backend: Optional[object] = None,
+                             s: int = 1) -> List[int]:
+    """
+    Batch-verify stored proofs, chunk by chunk, optionally in the worker pool
+
+    A failing chunk only costs single verifications of its own proofs.
+
+    Args:
+        items: (ciphertext, proof dict, context) triples
+        public_key: Public key (n, g)
+        allowed_values: Plaintexts a valid ballot may encrypt
+        chunk_size: Proofs per batch check
+        parallel: Force (True) or prevent (False) fan-out; None decides by size
+        backend: Arithmetic backend name or instance
+        s: Damgard-Jurik degree of the ciphertexts
+
+    Returns:
+        Sorted indices of invalid or malformed proofs
+    """
+    backend_name = get_backend(backend).name
+    items = list(items)
+    chunks = chunked(items, chunk_size)
+    args = (tuple(public_key), list(allowed_values), backend_name, s)
+
+    if parallel is None:
+        parallel = len(items) >= parallel_threshold()
+    if parallel and len(items) > chunk_size:
+        results = get_process_pool().map(
+            _verify_proof_chunk, chunks, *[itertools.repeat(arg) for arg in args]
+        )
+    else:
+        results = (_verify_proof_chunk(chunk, *args) for chunk in chunks)
+
+    invalid = []
+    for chunk_index, chunk_invalid in enumerate(results):
+        invalid.extend(chunk_index * chunk_size + i for i in chunk_invalid)
+    return invalid
@@ -0,0 +1,180 @@
+"""
+Binary Ciphertext Serialization
+
+This module provides:
+- A versioned, fixed-width binary record for Paillier ciphertexts
+- Key-version headers so a record can be checked against the key it was
+  encrypted under
+- A streaming reader that yields zero-copy memoryviews over stored records
+
+Record layout (big-endian):
+
+    offset  size   field
+    0       1      format version (currently 1)
+    1       8      key version (first 8 bytes of the key fingerprint)
+    9       2      ciphertext width w in bytes, sized to n^2 (n^(s+1))
+    11      w      ciphertext, zero-padded to w bytes
+
+Every ciphertext under a given key has the same width, so records can be
+concatenated into one buffer and walked by offset. Compared with a 0x hex
+string inside a JSON document this halves the stored size and replaces
+json.loads plus int(x, 16) with a single int.from_bytes.
+"""
+
+import struct
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from .obfuscators import key_fingerprint
+
+CIPHERTEXT_FORMAT_VERSION = 1
+HEADER = struct.Struct('>B8sH')
+HEADER_SIZE = HEADER.size
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def ciphertext_width(n: int, s: int = 1) -> int:
+    """
+    Byte width of a ciphertext under public modulus n
+
+    Args:
+        n: Public modulus
+        s: Damgard-Jurik degree
+
+    Returns:
+        int: Bytes needed for any value below n^(s+1)
+    """
+    return ((s + 1) * int(n).bit_length() + 7) // 8
+
+def key_version(n: int) -> bytes:
+    """
+    Header key version for a public modulus
+
+    Args:
+        n: Public modulus
+
+    Returns:
+        bytes: 8-byte key version
+    """
+    return bytes.fromhex(key_fingerprint(n))[:8]
+
+def read_header(data: Buffer) -> Tuple[int, bytes, int]:
+    """
+    Read the header of a ciphertext record
+
+    Args:
+        data: Record bytes (at least HEADER_SIZE long)
+
+    Returns:
+        Tuple of (format version, key version, ciphertext width)
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Ciphertext record is shorter than its header")
+    version, key_version_bytes, width = HEADER.unpack_from(data)
+    if version != CIPHERTEXT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported ciphertext format version {version}")
+    return version, key_version_bytes, width
+
+class CiphertextCodec:
+    """Encoder and reader for ciphertext records under one public key"""
+
+    def __init__(self, n: int, s: int = 1):
+        """
+        Initialize a codec
+
+        Args:
+            n: Public modulus the ciphertexts are encrypted under
+            s: Damgard-Jurik degree of the ciphertexts
+        """
+        self.n = int(n)
+        self.s = s
+        self.width = ciphertext_width(self.n, s)
+        self.key_version = key_version(self.n)
+        self.record_size = HEADER_SIZE + self.width
+        self._header = HEADER.pack(CIPHERTEXT_FORMAT_VERSION, self.key_version, self.width)
+
+    def encode(self, ciphertext: int) -> bytes:
+        """
+        Serialize a ciphertext
+
+        Args:
+            ciphertext: Ciphertext below n^(s+1)
+
+        Returns:
+            bytes: Record of record_size bytes
+        """
+        return self._header + int(ciphertext).to_bytes(self.width, 'big')
+
+    def _check(self, data: Buffer, offset: int = 0):
+        """Validate the header of the record at offset"""
+        if len(data) - offset < self.record_size:
+            raise ValueError("Truncated ciphertext record")
+        if bytes(data[offset:offset + HEADER_SIZE]) != self._header:
+            _, record_key_version, width = read_header(memoryview(data)[offset:])
+            if record_key_version != self.key_version:
+                raise ValueError("Ciphertext was encrypted under a different key")
+            raise ValueError(f"Ciphertext width {width} does not match the key (expected {self.width})")
+
+    def view(self, data: Buffer) -> memoryview:
+        """
+        Get the ciphertext bytes of a single record without copying
+
+        Args:
+            data: One record
+
+        Returns:
+            memoryview over the ciphertext bytes
+        """
+        self._check(data)
+        return memoryview(data)[HEADER_SIZE:self.record_size]
+
+    def decode(self, data: Buffer) -> int:
+        """
+        Deserialize a single record
+
+        Args:
+            data: One record
+
+        Returns:
+            int: Ciphertext
+        """
+        return int.from_bytes(self.view(data), 'big')
+
+    def iter_views(self, buffers: Iterable[Buffer]) -> Iterator[memoryview]:
+        """
+        Stream the ciphertext bytes of every record in a sequence of buffers
+
+        Each buffer may hold one record (e.g. a database row) or several
+        concatenated records. Views slice the buffers in place.
+
+        Args:
+            buffers: Buffers of whole records
+
+        Returns:
+            Iterator over memoryviews of ciphertext bytes
+        """
+        record_size = self.record_size
+        for data in buffers:
+            view = memoryview(data)
+            if len(view) % record_size:
+                raise ValueError("Buffer does not hold a whole number of ciphertext records")
+            for offset in range(0, len(view), record_size):
+                self._check(view, offset)
+                yield view[offset + HEADER_SIZE:offset + record_size]
+
+def decode_ciphertext(data: Buffer, n: Optional[int] = None) -> int:
+    """
+    Deserialize a record, checking the key version when n is given
+
+    Args:
+        data: One record
+        n: Expected public modulus
+
+    Returns:
+        int: Ciphertext
+    """
+    if n is not None:
+        return CiphertextCodec(n).decode(data)
+    _, _, width = read_header(data)
+    if len(data) < HEADER_SIZE + width:
+        raise ValueError("Truncated ciphertext record")
+    return int.from_bytes(memoryview(data)[HEADER_SIZE:HEADER_SIZE + width], 'big')
@@ -5,11 +5,57 @@ This module provides:
 - Secret sharing for distributed key management
 - Threshold reconstruction of secrets
 - Secure key distribution among trustees
+- Mersenne-prime fields sized to the secret, so 2048-bit keys fit
+- Batch share generation and cached Lagrange coefficients per trustee subset
 """
 
-import random
-from typing import List, Tuple
-from Crypto.Util.number import getPrime
+import secrets
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+from .arithmetic import get_backend
+
+# Exponents p for which 2^p - 1 is prime; the field is the smallest one above the secret
+MERSENNE_EXPONENTS = (
+    127, 521, 607, 1279, 2203, 2281, 3217, 4253, 4423, 9689, 9941, 11213, 19937, 21701, 23209, 44497,
+)
+
+def mersenne_prime(secret_bits: int) -> int:
+    """
+    Get the smallest listed Mersenne prime strictly larger than any secret_bits-bit value
+
+    Args:
+        secret_bits: Size of the secrets to share, in bits
+
+    Returns:
+        Prime 2^p - 1 with p > secret_bits
+    """
+    for exponent in MERSENNE_EXPONENTS:
+        if exponent > secret_bits:
+            return (1 << exponent) - 1
+    raise ValueError(f"No Mersenne prime field configured for {secret_bits}-bit secrets")
+
+def _default_secret_bits() -> int:
+    """Size of a Paillier lambda at the configured key size"""
+    try:
+        from django.conf import settings
+        return int(getattr(settings, 'PAILLIER_KEY_SIZE', 2048))
+    except Exception:
+        return 2048
+
+@lru_cache(maxsize=1024)
+def _lagrange_at_zero(prime: int, share_ids: Tuple[int, ...], backend_name: str) -> Tuple[int, ...]:
+    """Lagrange coefficients at x = 0 for a trustee subset, shared across instances"""
+    arith = get_backend(backend_name)
+    field = arith.mpz(prime)
+    coefficients = []
+    for x_i in share_ids:
+        numerator = denominator = arith.mpz(1)
+        for x_j in share_ids:
+            if x_i != x_j:
+                numerator = arith.mulmod(numerator, -x_j, field)
+                denominator = arith.mulmod(denominator, x_i - x_j, field)
+        coefficients.append(arith.to_int(arith.mulmod(numerator, arith.invert(denominator, field), field)))
+    return tuple(coefficients)
 
 class ShamirSecretSharing:
     """
@@ -19,26 +65,31 @@ class ShamirSecretSharing:
     can reconstruct the secret, but fewer than k shares reveal nothing.
     """
     
-    def __init__(self, total_shares: int, threshold: int, prime: int = None):
+    def __init__(self, total_shares: int, threshold: int, prime: int = None,
+                 secret_bits: Optional[int] = None, backend: Optional[object] = None):
         """
         Initialize Shamir's Secret Sharing
         
         Args:
             total_shares: Total number of shares to generate
             threshold: Minimum number of shares needed to reconstruct
-            prime: Prime number for finite field (auto-generated if None)
+            prime: Prime number for finite field (a Mersenne prime sized to secret_bits if None)
+            secret_bits: Largest secret size in bits (defaults to PAILLIER_KEY_SIZE)
+            backend: Arithmetic backend name or instance
         """
         if threshold > total_shares:
             raise ValueError("Threshold cannot be greater than total shares")
         
         self.total_shares = total_shares
         self.threshold = threshold
+        self.backend = get_backend(backend)
         
-        # Generate a prime larger than the secret
+        # A fixed Mersenne prime needs no prime search and fits the secret
         if prime is None:
-            self.prime = getPrime(256)  # 256-bit prime
+            self.prime = mersenne_prime(secret_bits or _default_secret_bits())
         else:
             self.prime = prime
+        self._field = self.backend.mpz(self.prime)
     
     def generate_shares(self, secret: int) -> List[Tuple[int, int]]:
         """
@@ -50,21 +101,35 @@ class ShamirSecretSharing:
         Returns:
             List of (share_id, share_value) tuples
         """
-        if secret >= self.prime:
-            raise ValueError(f"Secret must be less than prime {self.prime}")
-        
-        # Generate random coefficients for polynomial
-        coefficients = [secret]  # a0 = secret
-        for i in range(1, self.threshold):
-            coefficients.append(random.randint(1, self.prime - 1))
+        return self.generate_shares_many([secret])[0]
+    
+    def generate_shares_many(self, secret_values: Sequence[int]) -> List[List[Tuple[int, int]]]:
+        """
+        Generate shares for many secrets at once
         
-        # Generate shares by evaluating polynomial at different points
-        shares = []
-        for i in range(1, self.total_shares + 1):
-            share_value = self._evaluate_polynomial(coefficients, i)
-            shares.append((i, share_value))
+        Args:
+            secret_values: Secrets to share, e.g. the keys of several elections
+            
+        Returns:
+            One list of (share_id, share_value) tuples per secret
+        """
+        for secret in secret_values:
+            if not 0 <= secret < self.prime:
+                raise ValueError(f"Secret must be less than prime {self.prime}")
         
-        return shares
+        all_shares = []
+        for secret in secret_values:
+            # Generate random coefficients for polynomial, a0 = secret
+            coefficients = [self.backend.mpz(secret)]
+            for _ in range(1, self.threshold):
+                coefficients.append(self.backend.mpz(secrets.randbelow(self.prime - 1) + 1))
+            
+            # Generate shares by evaluating polynomial at different points
+            all_shares.append([
+                (i, self.backend.to_int(self._evaluate_polynomial(coefficients, i)))
+                for i in range(1, self.total_shares + 1)
+            ])
+        return all_shares
     
     def _evaluate_polynomial(self, coefficients: List[int], x: int) -> int:
         """
@@ -77,11 +142,24 @@ class ShamirSecretSharing:
         Returns:
             Polynomial value at x
         """
-        result = 0
+        result = self.backend.mpz(0)
         for coefficient in reversed(coefficients):
-            result = (result * x + coefficient) % self.prime
+            result = (result * x + coefficient) % self._field
         return result
     
+    def lagrange_coefficients(self, share_ids: Sequence[int]) -> dict:
+        """
+        Get the Lagrange coefficients at 0 for a subset of shares
+        
+        Args:
+            share_ids: IDs of the shares taking part
+            
+        Returns:
+            Dict mapping share_id to its coefficient mod prime (cached per subset)
+        """
+        subset = tuple(sorted(share_ids))
+        return dict(zip(subset, _lagrange_at_zero(self.prime, subset, self.backend.name)))
+    
     def reconstruct_secret(self, shares: List[Tuple[int, int]]) -> int:
         """
         Reconstruct the secret from shares using Lagrange interpolation
@@ -97,24 +175,15 @@ class ShamirSecretSharing:
         
         # Use only the first threshold shares
         shares = shares[:self.threshold]
+        coefficients = self.lagrange_coefficients([x_i for x_i, _ in shares])
         
         # Lagrange interpolation
-        secret = 0
-        for i, (x_i, y_i) in enumerate(shares):
-            numerator = denominator = 1
-            
-            for j, (x_j, _) in enumerate(shares):
-                if i != j:
-                    numerator = (numerator * (-x_j)) % self.prime
-                    denominator = (denominator * (x_i - x_j)) % self.prime
-            
-            # Calculate Lagrange coefficient
-            lagrange_coeff = (numerator * self._mod_inverse(denominator)) % self.prime
-            
-            # Add contribution to secret
-            secret = (secret + (y_i * lagrange_coeff)) % self.prime
+        arith = self.backend
+        secret = arith.mpz(0)
+        for x_i, y_i in shares:
+            secret = (secret + arith.mulmod(arith.mpz(y_i), coefficients[x_i], self._field)) % self._field
         
-        return secret
+        return arith.to_int(secret)
     
     def _mod_inverse(self, a: int) -> int:
         """
@@ -126,19 +195,7 @@ class ShamirSecretSharing:
         Returns:
             Modular inverse of a
         """
-        def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
-            if a == 0:
-                return b, 0, 1
-            gcd, x1, y1 = extended_gcd(b % a, a)
-            x = y1 - (b // a) * x1
-            y = x1
-            return gcd, x, y
-        
-        gcd, x, _ = extended_gcd(a, self.prime)
-        if gcd != 1:
-            raise ValueError("Modular inverse does not exist")
-        
-        return (x % self.prime + self.prime) % self.prime
+        return self.backend.to_int(self.backend.invert(self.backend.mpz(a), self._field))
     
     def verify_share(self, share: Tuple[int, int], other_shares: List[Tuple[int, int]]) -> bool:
         """
@@ -169,10 +226,10 @@ class DistributedKeyManager:
     High-level interface for managing distributed keys
     """
     
-    def __init__(self, total_trustees: int, threshold: int):
+    def __init__(self, total_trustees: int, threshold: int, secret_bits: Optional[int] = None):
         self.total_trustees = total_trustees
         self.threshold = threshold
-        self.shamir = ShamirSecretSharing(total_trustees, threshold)
+        self.shamir = ShamirSecretSharing(total_trustees, threshold, secret_bits=secret_bits)
     
     def distribute_private_key(self, private_key: int) -> List[Tuple[int, int]]:
         """
@@ -184,7 +241,19 @@ class DistributedKeyManager:
         Returns:
             List of (trustee_id, key_share) tuples
         """
-        return self.shamir.generate_shares(private_key)
+        return self.distribute_private_keys([private_key])[0]
+    
+    def distribute_private_keys(self, private_keys: Sequence[int]) -> List[List[Tuple[int, int]]]:
+        """
+        Distribute many private keys (e.g. one per election) in one call
+        
+        Args:
+            private_keys: Private keys to distribute
+            
+        Returns:
+            One list of (trustee_id, key_share) tuples per key
+        """
+        return self.shamir.generate_shares_many(private_keys)
     
     def reconstruct_private_key(self, key_shares: List[Tuple[int, int]]) -> int:
         """
@@ -216,10 +285,14 @@ class DistributedKeyManager:
 class ThresholdDecryption:
     """
     Threshold decryption for Paillier cryptosystem
+    
+    Thin wrapper kept for existing callers; the scheme itself lives in
+    paillier.ThresholdPaillier.
     """
     
     def __init__(self, total_trustees: int, threshold: int):
-        self.key_manager = DistributedKeyManager(total_trustees, threshold)
+        from .paillier import ThresholdPaillier
+        self.threshold_paillier = ThresholdPaillier(total_trustees, threshold)
     
     def generate_threshold_keys(self, paillier_key_pair) -> List[Tuple[int, int]]:
         """
@@ -231,7 +304,7 @@ class ThresholdDecryption:
         Returns:
             List of (trustee_id, private_key_share) tuples
         """
-        return self.key_manager.distribute_private_key(paillier_key_pair.private_key)
+        return self.threshold_paillier.generate_distributed_keys(paillier_key_pair)
     
     def partial_decrypt(self, ciphertext: int, private_key_share: int, 
                        public_key: Tuple[int, int]) -> int:
@@ -246,33 +319,18 @@ class ThresholdDecryption:
         Returns:
             Partial decryption result
         """
-        n, _ = public_key
-        n_squared = n * n
-        
-        # Partial decrypt: c^share mod n^2
-        partial_result = pow(ciphertext, private_key_share, n_squared)
-        return partial_result
+        return self.threshold_paillier.partial_decrypt(ciphertext, private_key_share, public_key)
     
-    def combine_partial_decryptions(self, partial_results: List[int], 
+    def combine_partial_decryptions(self, partial_results: List[Tuple[int, int]], 
                                   public_key: Tuple[int, int]) -> int:
         """
         Combine partial decryptions to get final result
         
         Args:
-            partial_results: List of partial decryption results
+            partial_results: List of (trustee_id, partial decryption) pairs
             public_key: Paillier public key (n, g)
             
         Returns:
             Final decrypted message
         """
-        n, _ = public_key
-        n_squared = n * n
-        
-        # Combine using Lagrange interpolation
-        combined = 1
-        for partial in partial_results:
-            combined = (combined * partial) % n_squared
-        
-        # Apply final decryption step
-        l_combined = (combined - 1) // n
-        return l_combined 
\ No newline at end of file
+        return self.threshold_paillier.combine_partial_decryptions(partial_results, public_key)
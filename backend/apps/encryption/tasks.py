@@ -0,0 +1,15 @@
+"""
+Celery tasks for key material
+
+This module provides:
+- refill_key_pools: the periodic top-up of the Paillier key-pair pool
+"""
+
+from celery import shared_task
+
+from .keypool import pool_key_sizes, refill_key_pool
+
+@shared_task(ignore_result=True)
+def refill_key_pools():
+    """Generate key pairs until every pooled size holds its target count"""
+    return {key_size: refill_key_pool(key_size) for key_size in pool_key_sizes()}
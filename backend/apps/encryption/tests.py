@@ -1,5 +1,25 @@
+import os
+import tempfile
+import unittest
 from django.test import TestCase
-from .paillier import PaillierEncryption, VoteEncryption, ThresholdPaillier
+from .aggregation import TreeReducer, aggregate_ciphertexts
+from .arithmetic import FixedBaseTable, available_backends, get_backend, gmpy2, multi_powmod
+from .benchmark_suite import OPERATIONS, compare_to_baseline, load_report, run_suite, save_report
+from .cryptosystems import get_cryptosystem
+from .damgard_jurik import DamgardJurikEncryption, get_encryption
+from .ec import SECP256K1, CurveArithmetic, discrete_log_table, generator_table
+from .elgamal import ECElGamalEncryption
+from .feldman import FeldmanVSS
+from .keycache import KeyContext, KeyContextCache
+from .keypool import acquire_key_pair, refill_key_pool, seal_key_pair, take_key_pair, unseal_key_pair
+from .models import PooledKeyPair
+from .obfuscators import ObfuscatorPool
+from .packing import PackedBallotEncoder
+from .proofs import MembershipProof, MembershipVerifier, verify_membership_proofs
+from .serialization import HEADER_SIZE, CiphertextCodec, decode_ciphertext
+from .paillier import PaillierEncryption, PaillierKeyPair, VoteEncryption, ThresholdPaillier
+from .validation import CiphertextValidator, validate_ciphertexts
+from .shamir import DistributedKeyManager, ShamirSecretSharing, mersenne_prime
 
 class PaillierEncryptionTest(TestCase):
     def setUp(self):
@@ -80,4 +100,868 @@ class ThresholdPaillierTest(TestCase):
         
         # Test with one share
         partial_result = self.threshold_paillier.partial_decrypt(encrypted, shares[0][1], self.key_pair)
-        self.assertIsNotNone(partial_result, "Partial decryption should produce a result.") 
\ No newline at end of file
+        self.assertIsNotNone(partial_result, "Partial decryption should produce a result.") 
+
+    def test_any_threshold_subset_decrypts(self):
+        """Any threshold-sized subset of trustees should recover the message."""
+        shares = dict(self.threshold_paillier.generate_distributed_keys(self.key_pair))
+        encrypted = self.paillier.encrypt(42, self.key_pair.public_key)
+        for subset in [(1, 2, 3), (2, 4, 5), (1, 3, 5)]:
+            partials = [
+                (tid, self.threshold_paillier.partial_decrypt(encrypted, shares[tid], self.key_pair.public_key))
+                for tid in subset
+            ]
+            self.assertEqual(
+                self.threshold_paillier.combine_partial_decryptions(partials, self.key_pair.public_key), 42
+            )
+
+    def test_vector_ceremony(self):
+        """A simulated ceremony should decrypt a whole tally vector, in parallel or not."""
+        messages = [0, 7, 3, 1000, 12, 5]
+        ciphertexts = self.paillier.encrypt_many(messages, self.key_pair.public_key, parallel=False)
+        shares = self.threshold_paillier.generate_distributed_keys(self.key_pair)
+        self.assertEqual(
+            self.threshold_paillier.simulate_ceremony(ciphertexts, self.key_pair, shares=shares, parallel=False),
+            messages
+        )
+        self.assertEqual(
+            self.threshold_paillier.simulate_ceremony(ciphertexts, self.key_pair, shares=shares,
+                                                      trustee_ids=[5, 3, 4], parallel=True),
+            messages
+        )
+
+    def test_lagrange_coefficients_are_cached(self):
+        """Coefficients should be integers, cached per subset, and need enough trustees."""
+        coefficients = self.threshold_paillier.lagrange_coefficients([3, 1, 2])
+        self.assertIs(self.threshold_paillier.lagrange_coefficients((1, 2, 3)), coefficients)
+        self.assertEqual(sum(coefficients.values()), self.threshold_paillier.delta)
+        with self.assertRaises(ValueError):
+            self.threshold_paillier.lagrange_coefficients([1, 2])
+
+class ArithmeticBackendParityTest(TestCase):
+    def setUp(self):
+        """Share one key pair between the pure-Python and gmpy2 backends."""
+        self.python = PaillierEncryption(key_size=512, backend='python')
+        self.key_pair = self.python.generate_key_pair()
+
+    def test_python_backend_always_available(self):
+        """The pure-Python fallback should always be selectable."""
+        self.assertIn('python', available_backends())
+        self.assertEqual(get_backend('python').name, 'python')
+
+    def test_unknown_backend_rejected(self):
+        """Asking for a backend that does not exist should fail loudly."""
+        with self.assertRaises(ValueError):
+            get_backend('does-not-exist')
+
+    @unittest.skipIf(gmpy2 is None, "gmpy2 is not installed")
+    def test_backends_agree(self):
+        """Ciphertexts from one backend should decrypt and aggregate identically on the other."""
+        fast = PaillierEncryption(key_size=512, backend='gmpy2')
+        public_key = self.key_pair.public_key
+
+        c1 = self.python.encrypt(7, public_key)
+        c2 = fast.encrypt(5, public_key)
+        self.assertIsInstance(c2, int, "Backends should return plain ints.")
+
+        for paillier in (self.python, fast):
+            self.assertEqual(paillier.decrypt(c1, self.key_pair), 7)
+            self.assertEqual(paillier.decrypt(c2, self.key_pair), 5)
+
+        self.assertEqual(
+            self.python.add_ciphertexts(c1, c2, public_key),
+            fast.add_ciphertexts(c1, c2, public_key),
+        )
+        self.assertEqual(
+            self.python.multiply_ciphertext(c1, 3, public_key),
+            fast.multiply_ciphertext(c1, 3, public_key),
+        )
+
+    @unittest.skipIf(gmpy2 is None, "gmpy2 is not installed")
+    def test_vote_encryption_backends_agree(self):
+        """Aggregation and verification should not depend on the backend."""
+        public_key = self.key_pair.public_key
+        encrypted_votes = [self.python.encrypt(v, public_key) for v in [1, 0, 1, 1]]
+
+        python_votes = VoteEncryption(backend='python')
+        fast_votes = VoteEncryption(backend='gmpy2')
+        self.assertEqual(
+            python_votes.aggregate_votes(encrypted_votes, public_key),
+            fast_votes.aggregate_votes(encrypted_votes, public_key),
+        )
+        for vote in encrypted_votes:
+            self.assertTrue(fast_votes.verify_vote_encryption(vote, public_key))
+        self.assertFalse(fast_votes.verify_vote_encryption(self.key_pair.n, public_key))
+
+    @unittest.skipIf(gmpy2 is None, "gmpy2 is not installed")
+    def test_threshold_backends_agree(self):
+        """Partial decryptions should be identical across backends."""
+        ciphertext = self.python.encrypt(42, self.key_pair.public_key)
+        share = 123456789
+        python_threshold = ThresholdPaillier(total_trustees=5, threshold=3, backend='python')
+        fast_threshold = ThresholdPaillier(total_trustees=5, threshold=3, backend='gmpy2')
+        self.assertEqual(
+            python_threshold.partial_decrypt(ciphertext, share, self.key_pair),
+            fast_threshold.partial_decrypt(ciphertext, share, self.key_pair),
+        )
+
+class CRTDecryptionTest(TestCase):
+    def setUp(self):
+        """Set up a key pair that retains its prime factors."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+
+    def test_generated_key_pair_keeps_factors(self):
+        """Generated key pairs should carry p, q and the CRT constants."""
+        self.assertTrue(self.key_pair.has_crt)
+        self.assertEqual(self.key_pair.p * self.key_pair.q, self.key_pair.n)
+
+    def test_crt_matches_standard_decryption(self):
+        """The CRT path should decrypt to the same plaintext as the full-width path."""
+        standard = PaillierEncryption(key_size=512, use_crt=False)
+        for message in (0, 1, 42, self.key_pair.n - 1):
+            ciphertext = self.paillier.encrypt(message, self.key_pair.public_key)
+            self.assertEqual(self.paillier.decrypt(ciphertext, self.key_pair), message)
+            self.assertEqual(standard.decrypt(ciphertext, self.key_pair), message)
+
+    def test_key_pair_without_factors_falls_back(self):
+        """Key pairs restored without p and q should still decrypt."""
+        restored = PaillierKeyPair(self.key_pair.public_key, self.key_pair.private_key)
+        self.assertFalse(restored.has_crt)
+        ciphertext = self.paillier.encrypt(17, self.key_pair.public_key)
+        self.assertEqual(self.paillier.decrypt(ciphertext, restored), 17)
+
+    def test_mismatched_factors_rejected(self):
+        """Prime factors that do not multiply to n should be rejected."""
+        with self.assertRaises(ValueError):
+            PaillierKeyPair(self.key_pair.public_key, self.key_pair.private_key,
+                            p=self.key_pair.p, q=self.key_pair.q + 2)
+
+class ObfuscatorPoolTest(TestCase):
+    def setUp(self):
+        """Set up a key pair and a scratch spill directory."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.spill_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spill_dir.cleanup)
+
+    def make_pool(self, **kwargs):
+        kwargs.setdefault('size', 8)
+        kwargs.setdefault('low_water_mark', 2)
+        kwargs.setdefault('spill_dir', self.spill_dir.name)
+        return ObfuscatorPool(self.key_pair.public_key, **kwargs)
+
+    def test_encrypt_with_pool(self):
+        """Ciphertexts built from pooled obfuscators should decrypt normally."""
+        pool = self.make_pool()
+        pool.fill()
+        paillier = PaillierEncryption(key_size=512, obfuscator_pool=pool)
+        ciphertexts = [paillier.encrypt(m, self.key_pair.public_key) for m in (1, 0, 1)]
+        self.assertEqual(len(pool), 5, "Each encryption should consume one obfuscator.")
+        for message, ciphertext in zip((1, 0, 1), ciphertexts):
+            self.assertEqual(self.paillier.decrypt(ciphertext, self.key_pair), message)
+
+    def test_empty_pool_computes_inline(self):
+        """An empty pool should still hand out a valid obfuscator."""
+        pool = self.make_pool()
+        value = pool.take()
+        n_squared = self.key_pair.n ** 2
+        self.assertTrue(0 < value < n_squared)
+
+    def test_low_water_mark_triggers_refill(self):
+        """Dropping below the low-water mark should wake the refill thread."""
+        pool = self.make_pool()
+        pool.fill(3)
+        pool.take()
+        self.assertFalse(pool._refill_needed.is_set())
+        pool.take()
+        self.assertTrue(pool._refill_needed.is_set())
+
+    def test_spill_and_reload_consumes_chunks(self):
+        """Spilled values should be loadable exactly once."""
+        pool = self.make_pool()
+        pool.fill(4)
+        expected = list(pool._values)
+        self.assertEqual(pool.spill(), 4)
+        self.assertEqual(len(pool), 0)
+
+        chunk_files = os.listdir(pool.spill_dir)
+        self.assertEqual(len(chunk_files), 1)
+        mode = os.stat(os.path.join(pool.spill_dir, chunk_files[0])).st_mode & 0o777
+        self.assertEqual(mode, 0o600, "Spilled obfuscators must be owner-only.")
+
+        reloaded = self.make_pool()
+        self.assertEqual(reloaded.load_spilled(), 4)
+        self.assertEqual(list(reloaded._values), expected)
+        self.assertEqual(os.listdir(pool.spill_dir), [], "Claimed chunks should be deleted.")
+        self.assertEqual(self.make_pool().load_spilled(), 0)
+
+    def test_pool_for_other_key_is_ignored(self):
+        """A pool built for another key must not be used."""
+        other = self.paillier.generate_key_pair()
+        pool = ObfuscatorPool(other.public_key, size=2, low_water_mark=0)
+        pool.fill()
+        paillier = PaillierEncryption(key_size=512, obfuscator_pool=pool)
+        ciphertext = paillier.encrypt(9, self.key_pair.public_key)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(self.paillier.decrypt(ciphertext, self.key_pair), 9)
+
+class GeneratorShortcutAndFixedBaseTest(TestCase):
+    def setUp(self):
+        """Set up a key pair shared by the specialised and generic paths."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.n = self.key_pair.n
+        self.n_squared = self.n * self.n
+
+    def test_closed_form_matches_powmod(self):
+        """1 + m*n mod n^2 should equal (n+1)^m mod n^2."""
+        generic = PaillierEncryption(generator_shortcut=False)
+        for message in (0, 1, 12345, self.n - 1):
+            self.assertEqual(
+                int(self.paillier._generator_power(self.key_pair.g, message, self.n, self.n_squared)),
+                int(generic._generator_power(self.key_pair.g, message, self.n, self.n_squared)),
+            )
+
+    def test_generic_generator_uses_table(self):
+        """Generators other than n+1 should go through a cached fixed-base table."""
+        paillier = PaillierEncryption(fixed_base_tables=True)
+        g = 7
+        for message in (0, 1, 999, self.n - 1):
+            self.assertEqual(
+                int(paillier._generator_power(g, message, self.n, self.n_squared)),
+                pow(g, message, self.n_squared),
+            )
+        self.assertIn(self.n, paillier._generator_tables)
+
+    def test_fixed_base_table_matches_pow(self):
+        """Table lookups should agree with pow, including exponents past the table."""
+        table = FixedBaseTable(3, self.n_squared, exponent_bits=64, window=3)
+        for exponent in (0, 1, 2, 2 ** 63 + 5, 2 ** 64 - 1, 2 ** 80 + 1):
+            self.assertEqual(int(table.pow(exponent)), pow(3, exponent, self.n_squared))
+        self.assertFalse(table.covers(2 ** 80 + 1))
+
+    def test_multiply_ciphertext_with_table(self):
+        """Scalar multiplication through a table should decrypt to the product."""
+        public_key = self.key_pair.public_key
+        ciphertext = self.paillier.encrypt(6, public_key)
+        table = self.paillier.fixed_base_table(ciphertext, public_key)
+        for scalar in (0, 1, 7, 1000):
+            product = self.paillier.multiply_ciphertext(ciphertext, scalar, public_key, table=table)
+            self.assertEqual(product, self.paillier.multiply_ciphertext(ciphertext, scalar, public_key))
+            self.assertEqual(self.paillier.decrypt(product, self.key_pair), 6 * scalar)
+
+        other = self.paillier.encrypt(1, public_key)
+        with self.assertRaises(ValueError):
+            self.paillier.multiply_ciphertext(other, 2, public_key, table=table)
+
+class BatchEncryptionTest(TestCase):
+    def setUp(self):
+        """Set up a key pair for batch encryption."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.vote_encryption = VoteEncryption()
+
+    def test_encrypt_many_sequential(self):
+        """Small batches should encrypt in-process and keep their order."""
+        values = [3, 1, 4, 1, 5, 9, 2, 6]
+        ciphertexts = self.paillier.encrypt_many(values, self.key_pair.public_key, parallel=False)
+        self.assertEqual([self.paillier.decrypt(c, self.key_pair) for c in ciphertexts], values)
+
+    def test_encrypt_many_parallel_preserves_order(self):
+        """Batches fanned out to the worker pool should come back in input order."""
+        values = list(range(70))
+        ciphertexts = self.paillier.encrypt_many(values, self.key_pair.public_key, parallel=True)
+        self.assertEqual([self.paillier.decrypt(c, self.key_pair) for c in ciphertexts], values)
+        self.assertEqual(len(set(ciphertexts)), len(values), "Every ciphertext should use fresh randomness.")
+
+    def test_batch_randomness_comes_from_csprng(self):
+        """Inline obfuscators should draw r from secrets, not the Mersenne Twister."""
+        from unittest.mock import patch
+        import secrets
+
+        with patch('apps.encryption.paillier.secrets.randbelow', wraps=secrets.randbelow) as randbelow:
+            ciphertexts = self.paillier.encrypt_many([1, 2, 3], self.key_pair.public_key, parallel=False)
+        self.assertGreaterEqual(randbelow.call_count, 3)
+        self.assertEqual([self.paillier.decrypt(c, self.key_pair) for c in ciphertexts], [1, 2, 3])
+
+    def test_encrypt_many_rejects_out_of_range(self):
+        """One bad value should reject the whole batch before any work is done."""
+        with self.assertRaises(ValueError):
+            self.paillier.encrypt_many([1, -1], self.key_pair.public_key)
+
+    def test_encrypt_ballot_is_one_hot(self):
+        """A ballot vector should hold a single encrypted 1 at the chosen position."""
+        ciphertexts = self.vote_encryption.encrypt_ballot(2, 4, self.key_pair.public_key)
+        self.assertEqual([self.paillier.decrypt(c, self.key_pair) for c in ciphertexts], [0, 0, 1, 0])
+        with self.assertRaises(ValueError):
+            self.vote_encryption.encrypt_ballot(4, 4, self.key_pair.public_key)
+
+class TreeAggregationTest(TestCase):
+    def setUp(self):
+        """Set up a key pair and a batch of encrypted votes."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.votes = [1, 0, 1, 1, 0, 1, 1, 0, 0, 1, 1]
+        self.encrypted_votes = self.paillier.encrypt_many(self.votes, self.key_pair.public_key, parallel=False)
+
+    def test_sequential_matches_left_fold(self):
+        """Chunked tree reduction should give exactly the left-fold product."""
+        n_squared = self.key_pair.n ** 2
+        expected = 1
+        for ciphertext in self.encrypted_votes:
+            expected = (expected * ciphertext) % n_squared
+        result = aggregate_ciphertexts(iter(self.encrypted_votes), self.key_pair.public_key,
+                                       chunk_size=3, parallel=False)
+        self.assertEqual(result, expected)
+
+    def test_parallel_aggregation_from_iterator(self):
+        """Worker-pool aggregation of a generator should decrypt to the vote sum."""
+        stream = (ciphertext for ciphertext in self.encrypted_votes)
+        result = aggregate_ciphertexts(stream, self.key_pair.public_key, chunk_size=2, parallel=True)
+        self.assertEqual(self.paillier.decrypt(result, self.key_pair), sum(self.votes))
+
+    def test_empty_stream_is_encryption_of_zero(self):
+        """An empty stream should aggregate to the identity ciphertext."""
+        result = aggregate_ciphertexts(iter([]), self.key_pair.public_key)
+        self.assertEqual(self.paillier.decrypt(result, self.key_pair), 0)
+
+    def test_tree_reducer_handles_uneven_counts(self):
+        """The binary-counter reducer should combine any number of partials."""
+        reducer = TreeReducer(10 ** 9 + 7)
+        for value in range(2, 9):
+            reducer.add(value)
+        self.assertEqual(int(reducer.result()), 40320)
+
+    def test_vote_encryption_accepts_iterators(self):
+        """aggregate_votes should stream generators through the engine."""
+        vote_encryption = VoteEncryption()
+        aggregated = vote_encryption.aggregate_votes(iter(self.encrypted_votes), self.key_pair.public_key)
+        self.assertEqual(self.paillier.decrypt(aggregated, self.key_pair), sum(self.votes))
+        self.assertEqual(vote_encryption.aggregate_votes([], self.key_pair.public_key), 0)
+
+class PackedBallotTest(TestCase):
+    def setUp(self):
+        """Set up a key pair and a packed encoder."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.encoder = PackedBallotEncoder(4, 100, self.key_pair.n)
+
+    def test_packed_tally_decrypts_once(self):
+        """The product of packed ballots should unpack to per-candidate counts."""
+        choices = [0, 2, 2, 3, 2, 0, 1]
+        ballots = [self.encoder.encode(choice) for choice in choices]
+        encrypted = self.paillier.encrypt_many(ballots, self.key_pair.public_key, parallel=False)
+        aggregated = aggregate_ciphertexts(encrypted, self.key_pair.public_key, parallel=False)
+        counts = self.encoder.unpack(self.paillier.decrypt(aggregated, self.key_pair))
+        self.assertEqual(counts, [2, 1, 3, 1])
+
+    def test_full_slot_does_not_carry(self):
+        """A slot holding max_voters votes should not spill into its neighbour."""
+        plaintext = 100 * self.encoder.encode(1)
+        self.assertEqual(self.encoder.unpack(plaintext), [0, 100, 0, 0])
+
+    def test_capacity_checks(self):
+        """Encoders that cannot fit below n, and out-of-range choices, should be rejected."""
+        limit = PackedBallotEncoder.max_candidates(100, self.key_pair.n)
+        PackedBallotEncoder(limit, 100, self.key_pair.n)
+        with self.assertRaises(ValueError):
+            PackedBallotEncoder(limit + 1, 100, self.key_pair.n)
+        with self.assertRaises(ValueError):
+            self.encoder.encode(4)
+        with self.assertRaises(ValueError):
+            self.encoder.unpack(1 << (self.encoder.slot_bits * 4))
+
+class LargeFieldShamirTest(TestCase):
+    def setUp(self):
+        """Share secrets as large as a 2048-bit Paillier lambda."""
+        self.shamir = ShamirSecretSharing(total_shares=5, threshold=3, secret_bits=2048)
+        self.key_pair = PaillierEncryption(key_size=2048).generate_key_pair()
+
+    def test_field_fits_paillier_lambda(self):
+        """The default field should be a Mersenne prime above the configured key size."""
+        self.assertEqual(self.shamir.prime, mersenne_prime(2048))
+        self.assertEqual(self.shamir.prime.bit_length(), 2203)
+        self.assertEqual(ShamirSecretSharing(5, 3).prime, self.shamir.prime)
+        with self.assertRaises(ValueError):
+            mersenne_prime(10 ** 6)
+
+    def test_lambda_round_trip(self):
+        """A real lambda should split and reconstruct from any threshold subset."""
+        secret = self.key_pair.lambda_val
+        shares = self.shamir.generate_shares(secret)
+        self.assertEqual(self.shamir.reconstruct_secret(shares[2:]), secret)
+        self.assertEqual(self.shamir.reconstruct_secret([shares[4], shares[0], shares[2]]), secret)
+        self.assertTrue(all(isinstance(value, int) for _, value in shares))
+
+    def test_batch_shares_and_cached_coefficients(self):
+        """Many secrets should share in one call and reuse coefficients per subset."""
+        manager = DistributedKeyManager(total_trustees=5, threshold=3)
+        keys = [PaillierEncryption(key_size=512).generate_key_pair().lambda_val for _ in range(4)]
+        all_shares = manager.distribute_private_keys(keys)
+        self.assertEqual([manager.reconstruct_private_key(shares[1:4]) for shares in all_shares], keys)
+        self.assertEqual(self.shamir.lagrange_coefficients([3, 1, 2]), self.shamir.lagrange_coefficients((1, 2, 3)))
+        self.assertEqual(self.shamir._mod_inverse(2) * 2 % self.shamir.prime, 1)
+
+class FeldmanVSSTest(TestCase):
+    def setUp(self):
+        """Deal several secrets with commitments in a small Mersenne field."""
+        self.vss = FeldmanVSS(total_shares=5, threshold=3, secret_bits=500)
+        self.dealings = [(commitments, shares) for shares, commitments in self.vss.deal_many([11, 22, 33])]
+
+    def test_commitment_group_has_field_order(self):
+        """The generator should have the field prime as its order."""
+        group = self.vss.group
+        self.assertEqual(group.modulus, group.cofactor * self.vss.prime + 1)
+        self.assertTrue(group.contains(group.generator))
+        self.assertEqual(group.commit(self.vss.prime), 1)
+
+    def test_single_and_batch_verification(self):
+        """Honest shares should pass both the per-share and the batch checks."""
+        for secret, (commitments, shares) in zip([11, 22, 33], self.dealings):
+            self.assertTrue(all(self.vss.check_share(share, commitments) for share in shares))
+            self.assertEqual(self.vss.reconstruct_secret(shares[2:]), secret)
+        self.assertTrue(self.vss.verify_shares_batch(self.dealings))
+
+    def test_batch_locates_tampered_share(self):
+        """A single altered share should fail the batch and be pinpointed."""
+        commitments, shares = self.dealings[1]
+        shares = list(shares)
+        shares[3] = (shares[3][0], (shares[3][1] + 1) % self.vss.prime)
+        self.dealings[1] = (commitments, shares)
+        self.assertFalse(self.vss.verify_shares_batch(self.dealings))
+        self.assertEqual(self.vss.find_invalid_shares(self.dealings), [(1, 4)])
+
+    def test_batch_rejects_commitment_outside_subgroup(self):
+        """A commitment multiplied by -1 (order 2) should fail the batch every time, not half of the time."""
+        commitments, shares = self.dealings[0]
+        modulus = self.vss.group.modulus
+        commitments = [commitments[0] * (modulus - 1) % modulus] + list(commitments[1:])
+        self.dealings[0] = (commitments, shares)
+        self.assertFalse(self.vss.group.contains(commitments[0]))
+        for _ in range(20):
+            self.assertFalse(self.vss.verify_shares_batch(self.dealings))
+        self.assertEqual(self.vss.find_invalid_shares(self.dealings), [(0, share_id) for share_id, _ in shares])
+
+    def test_multi_powmod_matches_product_of_powers(self):
+        """Interleaved multi-exponentiation should equal the naive product."""
+        modulus = 10 ** 40 + 121
+        pairs = [(3, 2 ** 130 + 7), (5, 12345), (7, 0), (11, 2 ** 64)]
+        expected = 1
+        for base, exponent in pairs:
+            expected = expected * pow(base, exponent, modulus) % modulus
+        self.assertEqual(int(multi_powmod(pairs, modulus)), expected)
+        self.assertEqual(int(multi_powmod(pairs, modulus, backend='python', window=1)), expected)
+
+class KeyPoolTest(TestCase):
+    def test_seal_round_trip(self):
+        """Sealed key material should not contain the primes and should restore fully."""
+        key_pair = PaillierEncryption(key_size=512).generate_key_pair()
+        token = seal_key_pair(key_pair)
+        self.assertNotIn(str(key_pair.p), token)
+        restored = unseal_key_pair(token)
+        self.assertEqual((restored.n, restored.lambda_val, restored.p), (key_pair.n, key_pair.lambda_val, key_pair.p))
+        self.assertTrue(restored.has_crt)
+
+    def test_refill_and_take(self):
+        """The pool should fill to its target and hand each key pair out once."""
+        self.assertEqual(refill_key_pool(512, target=3, parallel=False), 3)
+        self.assertEqual(refill_key_pool(512, target=3, parallel=False), 0)
+
+        taken = [take_key_pair(512) for _ in range(3)]
+        self.assertEqual(len({key_pair.n for key_pair in taken}), 3)
+        self.assertIsNone(take_key_pair(512))
+        self.assertFalse(PooledKeyPair.objects.exists())
+
+        paillier = PaillierEncryption(key_size=512)
+        ciphertext = paillier.encrypt(9, taken[0].public_key)
+        self.assertEqual(paillier.decrypt(ciphertext, taken[0]), 9)
+
+    def test_parallel_refill_and_inline_fallback(self):
+        """Refills can run in worker processes, and an empty pool still yields a key."""
+        self.assertEqual(refill_key_pool(256, target=2, parallel=True), 2)
+        self.assertEqual(PooledKeyPair.objects.filter(key_size=256).count(), 2)
+        self.assertIn(acquire_key_pair(384).n.bit_length(), (383, 384))
+
+class KeyContextCacheTest(TestCase):
+    def setUp(self):
+        """Set up a key pair and a cache driven by a fake clock."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.now = 0.0
+        self.cache = KeyContextCache(max_size=2, ttl=10, clock=lambda: self.now)
+
+    def test_context_parses_text_key_and_round_trips(self):
+        """Contexts built from stored decimal text should encrypt and decrypt."""
+        n, g = self.key_pair.public_key
+        context = KeyContext((str(n), str(g)), key_pair=self.key_pair)
+        self.assertEqual(context.n_squared, n * n)
+        ciphertexts = context.encrypt_many([0, 5, 11])
+        self.assertEqual([context.decrypt(c) for c in ciphertexts], [0, 5, 11])
+        self.assertEqual(self.paillier.decrypt(context.encrypt(7), self.key_pair), 7)
+        with self.assertRaises(ValueError):
+            KeyContext((n, g)).decrypt(ciphertexts[0])
+
+    def test_lru_ttl_and_invalidation(self):
+        """Contexts should be reused until evicted, expired or invalidated."""
+        build = lambda: KeyContext(self.key_pair.public_key)
+        first = self.cache.get_or_create(('election', 1), build)
+        self.assertIs(self.cache.get_or_create(('election', 1), build), first)
+
+        self.cache.get_or_create(('election', 2), build)
+        self.cache.get_or_create(('election', 1), build)
+        self.cache.get_or_create(('election', 3), build)  # evicts 2, the least recently used
+        self.assertIs(self.cache.get_or_create(('election', 1), build), first)
+        self.assertEqual(self.cache.misses, 3)
+        self.cache.get_or_create(('election', 2), build)
+        self.assertEqual(self.cache.misses, 4)
+
+        self.now = 11
+        self.assertIsNot(self.cache.get_or_create(('election', 1), build), first)
+        self.assertEqual(self.cache.invalidate(lambda key: key[1] == 1), 1)
+        self.assertEqual(len(self.cache), 1)
+
+class CiphertextSerializationTest(TestCase):
+    def setUp(self):
+        """Set up a key and a codec for it."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.codec = CiphertextCodec(self.key_pair.n)
+
+    def test_fixed_width_round_trip(self):
+        """Every record under a key should have the same size and decode to its ciphertext."""
+        ciphertexts = [1, self.paillier.encrypt(5, self.key_pair.public_key), self.key_pair.n ** 2 - 1]
+        records = [self.codec.encode(c) for c in ciphertexts]
+        self.assertEqual({len(r) for r in records}, {HEADER_SIZE + 128})
+        self.assertEqual([self.codec.decode(r) for r in records], ciphertexts)
+        self.assertEqual(decode_ciphertext(records[1]), ciphertexts[1])
+
+    def test_streaming_views_are_zero_copy(self):
+        """Views over concatenated records should slice the buffer in place."""
+        ciphertexts = self.paillier.encrypt_many(range(4), self.key_pair.public_key)
+        buffer = b''.join(self.codec.encode(c) for c in ciphertexts)
+        views = list(self.codec.iter_views([buffer[:self.codec.record_size], buffer[self.codec.record_size:]]))
+        self.assertEqual([int.from_bytes(v, 'big') for v in views], ciphertexts)
+        self.assertIs(views[1].obj, views[2].obj)
+
+    def test_rejects_foreign_and_damaged_records(self):
+        """Records from another key, other versions or truncated buffers should be refused."""
+        other = CiphertextCodec(PaillierEncryption(key_size=512).generate_key_pair().n)
+        record = self.codec.encode(7)
+        with self.assertRaises(ValueError):
+            other.decode(record)
+        with self.assertRaises(ValueError):
+            self.codec.decode(record[:-1])
+        with self.assertRaises(ValueError):
+            decode_ciphertext(b'\x02' + record[1:])
+        with self.assertRaises(ValueError):
+            list(self.codec.iter_views([record + b'\x00']))
+
+class BatchValidationTest(TestCase):
+    def setUp(self):
+        """Set up a key and a batch of honest ciphertexts."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.ciphertexts = self.paillier.encrypt_many([i % 2 for i in range(40)], self.key_pair.public_key)
+
+    def test_valid_batch(self):
+        """An honest batch should pass with no failures reported."""
+        validator = CiphertextValidator(self.key_pair.public_key)
+        self.assertTrue(validator.all_valid(self.ciphertexts))
+        self.assertEqual(validator.invalid_indices(self.ciphertexts), [])
+        self.assertEqual(validate_ciphertexts([], self.key_pair.public_key), [])
+
+    def test_locates_every_bad_ciphertext(self):
+        """The descent should find each out-of-range or non-coprime ciphertext and nothing else."""
+        n, p, q = self.key_pair.n, self.key_pair.p, self.key_pair.q
+        batch = list(self.ciphertexts)
+        batch[3] = p * 12345
+        batch[17] = 0
+        batch[18] = n * n
+        batch[30] = q * self.ciphertexts[30] % (n * n)
+        batch[39] = n
+        expected = [3, 17, 18, 30, 39]
+        self.assertFalse(CiphertextValidator(n).all_valid(batch))
+        self.assertEqual(validate_ciphertexts(batch, self.key_pair.public_key), expected)
+
+        votes = VoteEncryption()
+        self.assertEqual(votes.find_invalid_votes(batch, self.key_pair.public_key), expected)
+        self.assertEqual(
+            [i for i, c in enumerate(batch) if not votes.verify_vote_encryption(c, self.key_pair.public_key)],
+            expected
+        )
+
+class MembershipProofTest(TestCase):
+    def setUp(self):
+        """Set up a key and a 0/1 ballot verifier."""
+        self.paillier = PaillierEncryption(key_size=512)
+        self.key_pair = self.paillier.generate_key_pair()
+        self.verifier = MembershipVerifier(self.key_pair.public_key, [0, 1])
+
+    def _ballots(self, values, context=b'election:1'):
+        ballots = []
+        for value in values:
+            ciphertext, r = self.paillier.encrypt_with_randomness(value, self.key_pair.public_key)
+            ballots.append((ciphertext, self.verifier.prove(ciphertext, value, r, context), context))
+        return ballots
+
+    def test_honest_proofs_verify_alone_and_in_batches(self):
+        """Proofs for allowed values should pass single and batch verification."""
+        ballots = self._ballots([0, 1, 1, 0, 1])
+        self.assertTrue(all(self.verifier.verify(*ballot) for ballot in ballots))
+        self.assertTrue(self.verifier.verify_batch(ballots))
+        self.assertEqual(self.paillier.decrypt(ballots[1][0], self.key_pair), 1)
+        with self.assertRaises(ValueError):
+            self.verifier.prove(ballots[0][0], 5, 1)
+
+    def test_rejects_out_of_list_values_and_replays(self):
+        """A 5 disguised with a copied proof, or a proof from another election, should fail."""
+        ballots = self._ballots([1, 0, 1, 1])
+        five = self.paillier.encrypt(5, self.key_pair.public_key)
+        forged = list(ballots)
+        forged[2] = (five, ballots[2][1], ballots[2][2])
+        forged[3] = (ballots[3][0], ballots[3][1], b'election:2')
+        self.assertFalse(self.verifier.verify(*forged[2]))
+        self.assertFalse(self.verifier.verify_batch(forged))
+        self.assertEqual(self.verifier.find_invalid(forged), [2, 3])
+
+    def test_batch_catches_tampered_responses(self):
+        """Changing one response should fail the batch check."""
+        ballots = self._ballots([0, 1, 1])
+        proof = ballots[1][1]
+        tampered = MembershipProof(proof.commitments, proof.challenges, [proof.responses[0], proof.responses[1] + 1])
+        ballots[1] = (ballots[1][0], tampered, ballots[1][2])
+        self.assertFalse(self.verifier.verify_batch(ballots))
+        self.assertEqual(self.verifier.find_invalid(ballots), [1])
+
+    def test_general_generator_and_packed_values(self):
+        """Proofs should work for a generator other than n + 1 and for 1-of-L packed slots."""
+        n = self.key_pair.n
+        n_squared = n * n
+        g = (n + 1) * pow(7, n, n_squared) % n_squared
+        public_key = (n, g)
+        allowed = [1, 64, 4096]
+        verifier = MembershipVerifier(public_key, allowed)
+        paillier = PaillierEncryption(key_size=512, generator_shortcut=False)
+        ballots = []
+        for value in [64, 4096, 1]:
+            ciphertext, r = paillier.encrypt_with_randomness(value, public_key)
+            ballots.append((ciphertext, verifier.prove(ciphertext, value, r), b''))
+        self.assertTrue(verifier.verify_batch(ballots))
+        self.assertTrue(verifier.verify(*ballots[0]))
+
+    def test_chunked_verification_of_stored_proofs(self):
+        """Stored proof dicts should verify in chunks, sequentially or in the worker pool."""
+        ballots = self._ballots([i % 2 for i in range(9)])
+        items = [(c, proof.to_dict(), context) for c, proof, context in ballots]
+        items[4] = (items[4][0], None, items[4][2])
+        items[7] = (self.paillier.encrypt(2, self.key_pair.public_key), items[7][1], items[7][2])
+        for parallel in (False, True):
+            self.assertEqual(
+                verify_membership_proofs(items, self.key_pair.public_key, [0, 1], chunk_size=4, parallel=parallel),
+                [4, 7]
+            )
+
+class DamgardJurikTest(TestCase):
+    def setUp(self):
+        """Set up a small key shared by every degree."""
+        self.key_pair = PaillierEncryption(key_size=256).generate_key_pair()
+        self.public_key = self.key_pair.public_key
+        self.n = self.key_pair.n
+
+    def test_round_trip_above_n(self):
+        """Messages up to n^s should decrypt, with and without CRT and for any generator."""
+        for s in (2, 3):
+            scheme = DamgardJurikEncryption(s)
+            generic = DamgardJurikEncryption(s, generator_shortcut=False, use_crt=False)
+            for message in [0, 1, self.n + 7, self.n ** s - 1]:
+                ciphertext = scheme.encrypt(message, self.public_key)
+                self.assertLess(ciphertext, self.n ** (s + 1))
+                self.assertEqual(scheme.decrypt(ciphertext, self.key_pair), message)
+                self.assertEqual(generic.decrypt(ciphertext, self.key_pair), message)
+                self.assertEqual(scheme.decrypt(generic.encrypt(message, self.public_key), self.key_pair), message)
+            with self.assertRaises(ValueError):
+                scheme.encrypt(self.n ** s, self.public_key)
+
+    def test_homomorphic_operations(self):
+        """Addition, scalar multiplication and streaming aggregation should work mod n^(s+1)."""
+        scheme = DamgardJurikEncryption(2)
+        a, b = self.n + 5, 3 * self.n
+        ca, cb = scheme.encrypt(a, self.public_key), scheme.encrypt(b, self.public_key)
+        self.assertEqual(scheme.decrypt(scheme.add_ciphertexts(ca, cb, self.public_key), self.key_pair), a + b)
+        self.assertEqual(scheme.decrypt(scheme.multiply_ciphertext(ca, 4, self.public_key), self.key_pair), 4 * a)
+        encrypted = scheme.encrypt_many([a, b, 1, 2], self.public_key, parallel=True)
+        total = aggregate_ciphertexts(iter(encrypted), self.public_key, chunk_size=2, s=2)
+        self.assertEqual(scheme.decrypt(total, self.key_pair), a + b + 3)
+
+    def test_factory_and_key_context(self):
+        """s = 1 should stay plain Paillier; a degree-2 context should size its codec and checks to n^3."""
+        self.assertIs(type(get_encryption(1)), PaillierEncryption)
+        self.assertEqual(get_encryption(2).s, 2)
+        context = KeyContext(self.public_key, key_pair=self.key_pair, s=2)
+        ciphertext = context.encrypt(self.n + 1)
+        self.assertEqual(context.decrypt(ciphertext), self.n + 1)
+        self.assertEqual(context.codec.decode(context.codec.encode(ciphertext)), ciphertext)
+        self.assertEqual(context.codec.width, (3 * self.n.bit_length() + 7) // 8)
+        self.assertTrue(context.validator.all_valid([ciphertext, self.n ** 2 + 1]))
+        self.assertEqual(context.validator.invalid_indices([ciphertext, self.n ** 3]), [1])
+
+    def test_membership_proofs(self):
+        """Ballot proofs should verify for degree-2 ciphertexts and reject values outside the list."""
+        context = KeyContext(self.public_key, s=2)
+        allowed = [1, self.n, self.n ** 2 - 1]
+        verifier = context.membership_verifier(allowed)
+        ballots = []
+        for value in allowed:
+            ciphertext, proof = context.encrypt_with_proof(value, allowed, b'election:1')
+            ballots.append((ciphertext, proof, b'election:1'))
+        self.assertTrue(all(verifier.verify(*ballot) for ballot in ballots))
+        self.assertTrue(verifier.verify_batch(ballots))
+        ballots[1] = (context.encrypt(2), ballots[1][1], b'election:1')
+        self.assertEqual(verifier.find_invalid(ballots), [1])
+        items = [(c, proof.to_dict(), ctx) for c, proof, ctx in ballots]
+        self.assertEqual(verify_membership_proofs(items, self.public_key, allowed, chunk_size=2, s=2), [1])
+
+class EllipticCurveTest(TestCase):
+    def test_group_law_matches_across_backends(self):
+        """Fixed-base, windowed and repeated-addition multiples should agree on every backend."""
+        G = SECP256K1.generator
+        for name in available_backends():
+            curve = CurveArithmetic(SECP256K1, name)
+            table = generator_table(backend=name)
+            k = 0xC0FFEE * 2 ** 200 + 12345
+            point = curve.multiply(G, k)
+            self.assertTrue(curve.is_on_curve(point))
+            self.assertEqual(table.multiply(k), point)
+            self.assertEqual(curve.multiply(G, 3), curve.add(curve.add(G, G), G))
+            self.assertEqual(curve.sum([G, G, G]), curve.multiply(G, 3))
+            self.assertIsNone(curve.multiply(G, SECP256K1.order))
+            self.assertIsNone(curve.add(point, curve.negate(point)))
+
+    def test_point_encoding(self):
+        """Compressed points should round-trip and off-curve or malformed bytes should be rejected."""
+        curve = CurveArithmetic()
+        point = curve.multiply(SECP256K1.generator, 987654321)
+        encoded = curve.encode_point(point)
+        self.assertEqual(len(encoded), 33)
+        self.assertEqual(curve.decode_point(encoded), point)
+        self.assertIsNone(curve.decode_point(curve.encode_point(None)))
+        with self.assertRaises(ValueError):
+            curve.decode_point(b'\x04' + encoded[1:])
+        with self.assertRaises(ValueError):
+            curve.decode_point(encoded[:-1])
+        # x = 5 gives x^3 + 7 = 132, which is not a square mod p
+        with self.assertRaises(ValueError):
+            curve.decode_point(b'\x02' + (5).to_bytes(32, 'big'))
+
+    def test_discrete_log_bounds(self):
+        """Baby-step/giant-step should find every value up to its bound and nothing beyond."""
+        table = generator_table()
+        dlog = discrete_log_table(5000)
+        for value in [0, 1, 63, 64, 4095, 5000]:
+            self.assertEqual(dlog.solve(table.multiply(value)), value)
+        with self.assertRaises(ValueError):
+            dlog.solve(table.multiply(5001))
+
+class ECElGamalTest(TestCase):
+    def setUp(self):
+        """Set up a scheme whose decryption searches up to 10^4."""
+        self.scheme = ECElGamalEncryption(max_value=10 ** 4)
+        self.key_pair = self.scheme.generate_key_pair()
+        self.public_key = self.key_pair.public_key
+
+    def test_round_trip_and_homomorphism(self):
+        """Encrypted counts should add up under add_ciphertexts, aggregate and scalar multiplication."""
+        ciphertexts = self.scheme.encrypt_many([1, 0, 1, 1, 7], self.public_key)
+        self.assertNotEqual(ciphertexts[0], ciphertexts[2])
+        self.assertEqual(self.scheme.decrypt(ciphertexts[4], self.key_pair), 7)
+        self.assertEqual(self.scheme.decrypt(self.scheme.aggregate(ciphertexts, self.public_key), self.key_pair), 10)
+        total = self.scheme.add_ciphertexts(ciphertexts[0], ciphertexts[4], self.public_key)
+        self.assertEqual(self.scheme.decrypt(total, self.key_pair), 8)
+        tripled = self.scheme.multiply_ciphertext(ciphertexts[4], 3, self.public_key)
+        self.assertEqual(self.scheme.decrypt(tripled, self.key_pair), 21)
+        self.assertEqual(self.scheme.decrypt(self.scheme.aggregate([], self.public_key), self.key_pair), 0)
+        with self.assertRaises(ValueError):
+            self.scheme.decrypt(self.scheme.encrypt(10 ** 4 + 1, self.public_key), self.key_pair)
+
+    def test_serialization_and_validation(self):
+        """Records should round-trip, be bound to their key and reject malformed ciphertexts."""
+        ciphertext = self.scheme.encrypt(3, self.public_key)
+        record = self.scheme.encode_ciphertext(ciphertext, self.public_key)
+        self.assertEqual(len(record), HEADER_SIZE + 66)
+        self.assertEqual(self.scheme.decode_ciphertext(record, self.public_key), ciphertext)
+        other = self.scheme.generate_key_pair().public_key
+        with self.assertRaises(ValueError):
+            self.scheme.decode_ciphertext(record, other)
+        a, b = ciphertext
+        off_curve = (a[0], (a[1] + 1) % SECP256K1.p)
+        batch = [ciphertext, (None, b), (off_curve, b), 'junk']
+        self.assertEqual(self.scheme.invalid_ciphertexts(batch, self.public_key), [1, 2, 3])
+
+    def test_registry(self):
+        """The registry should build both schemes behind the common interface."""
+        paillier = get_cryptosystem('paillier', s=2)
+        self.assertIsInstance(paillier, DamgardJurikEncryption)
+        self.assertTrue(paillier.supports_ballot_proofs)
+        elgamal = get_cryptosystem('ec_elgamal', max_value=99)
+        self.assertEqual((elgamal.name, elgamal.max_value), ('ec_elgamal', 99))
+        self.assertFalse(elgamal.supports_packed_ballots)
+        self.assertEqual(elgamal.key_share_secret(self.key_pair), self.key_pair.private_key)
+        with self.assertRaises(ValueError):
+            get_cryptosystem('rsa')
+
+        key_pair = PaillierEncryption(key_size=256).generate_key_pair()
+        scheme = get_cryptosystem('paillier')
+        ciphertexts = scheme.encrypt_many([1, 2], key_pair.public_key)
+        record = scheme.encode_ciphertext(ciphertexts[0], key_pair.public_key)
+        self.assertEqual(scheme.decode_ciphertext(record, key_pair.public_key), ciphertexts[0])
+        self.assertEqual(int.from_bytes(scheme.ciphertext_bytes(ciphertexts[0], key_pair.public_key), 'big'),
+                         ciphertexts[0])
+        self.assertEqual(scheme.decrypt(scheme.aggregate(ciphertexts, key_pair.public_key), key_pair), 3)
+        self.assertEqual(scheme.invalid_ciphertexts([ciphertexts[0], 0], key_pair.public_key), [1])
+        self.assertEqual(scheme.key_share_secret(key_pair), key_pair.lambda_val)
+
+class BenchmarkSuiteTest(TestCase):
+    def setUp(self):
+        """Run a tiny suite once per test."""
+        self.report = run_suite([256], ['python'], iterations=3, keygen_iterations=1)
+
+    def test_report_layout(self):
+        """Every operation should report throughput and latency percentiles."""
+        results = self.report['results']['python']['256']
+        self.assertEqual(set(results), set(OPERATIONS))
+        for result in results.values():
+            self.assertGreater(result['ops_per_sec'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+        self.assertEqual(results['aggregate']['batch_size'], 256)
+
+    def test_baseline_comparison(self):
+        """Slowdowns past the threshold should be flagged, with keygen allowed more slack."""
+        path = os.path.join(tempfile.mkdtemp(), 'nested', 'baseline.json')
+        save_report(self.report, path)
+        baseline = load_report(path)
+        comparisons = compare_to_baseline(self.report, baseline, threshold=0.25)
+        self.assertEqual(len(comparisons), len(OPERATIONS))
+        self.assertFalse(any(c['regressed'] for c in comparisons))
+
+        for operation, factor in [('encrypt', 1.5), ('keygen', 1.5)]:
+            baseline['results']['python']['256'][operation]['p50_ms'] /= factor
+        comparisons = compare_to_baseline(self.report, baseline, threshold=0.25, noise_floor_ms=0)
+        regressed = {c['operation'] for c in comparisons if c['regressed']}
+        self.assertEqual(regressed, {'encrypt'})
+
+    def test_command_fails_on_regression(self):
+        """The command should store a baseline and fail when a later run is slower."""
+        from io import StringIO
+        from django.core.management import CommandError, call_command
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        args = ['run_crypto_benchmarks', '--size', '256', '--backend', 'python', '--iterations', '2',
+                '--keygen-iterations', '1', '--baseline', path]
+        call_command(*args, '--save-baseline', stdout=StringIO())
+        baseline = load_report(path)
+        for result in baseline['results']['python']['256'].values():
+            result['p50_ms'] /= 1000
+        save_report(baseline, path)
+        with self.assertRaises(CommandError):
+            call_command(*args, stdout=StringIO())
@@ -0,0 +1,6 @@
+try:
+    from .celery import app as celery_app
+except ImportError:  # Celery is optional (see requirements-minimal.txt)
+    celery_app = None
+
+__all__ = ('celery_app',)
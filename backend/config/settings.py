@@ -239,6 +239,83 @@ BLOCKCHAIN_PRIVATE_KEY = config('BLOCKCHAIN_PRIVATE_KEY', default='0x0ed17026394
 # Paillier Encryption Configuration
 PAILLIER_KEY_SIZE = 2048
 PAILLIER_THRESHOLD = 3  # Minimum trustees required for decryption
+PAILLIER_ARITHMETIC_BACKEND = config('PAILLIER_ARITHMETIC_BACKEND', default='gmpy2')  # 'gmpy2' or 'python'
+
+# Precomputed r^n mod n^2 pools used by encrypt (see apps.encryption.obfuscators)
+PAILLIER_OBFUSCATOR_POOL = {
+    'ENABLED': config('PAILLIER_OBFUSCATOR_POOL_ENABLED', default=False, cast=bool),
+    'SIZE': config('PAILLIER_OBFUSCATOR_POOL_SIZE', default=256, cast=int),
+    'LOW_WATER_MARK': config('PAILLIER_OBFUSCATOR_LOW_WATER_MARK', default=64, cast=int),
+    'SPILL_DIR': BASE_DIR / 'var' / 'obfuscators',
+}
+
+# Worker-pool fan-out for batch crypto operations (see apps.encryption.parallel)
+PAILLIER_PARALLELISM = {
+    'THRESHOLD': config('PAILLIER_PARALLEL_THRESHOLD', default=64, cast=int),  # Smallest batch worth fanning out
+    'CHUNK_SIZE': config('PAILLIER_PARALLEL_CHUNK_SIZE', default=32, cast=int),
+    'AGGREGATION_CHUNK_SIZE': config('PAILLIER_AGGREGATION_CHUNK_SIZE', default=2048, cast=int),  # Ciphertexts multiplied per worker task
+    'MAX_WORKERS': config('PAILLIER_MAX_WORKERS', default=0, cast=int) or None,  # None = one per CPU
+}
+
+# Pre-generated key pairs handed to new elections (see apps.encryption.keypool)
+PAILLIER_KEY_POOL = {
+    'SIZES': [PAILLIER_KEY_SIZE],
+    'TARGET': config('PAILLIER_KEY_POOL_TARGET', default=4, cast=int),  # Key pairs kept ready per size
+    'ENCRYPTION_KEY': config('PAILLIER_KEY_POOL_ENCRYPTION_KEY', default=''),  # Defaults to SECRET_KEY
+    'REFILL_INTERVAL': config('PAILLIER_KEY_POOL_REFILL_INTERVAL', default=60.0, cast=float),  # Seconds between background top-ups
+}
+
+# In-process cache of parsed election keys (see apps.encryption.keycache)
+PAILLIER_KEY_CACHE = {
+    'SIZE': config('PAILLIER_KEY_CACHE_SIZE', default=128, cast=int),  # Key contexts kept per process
+    'TTL': config('PAILLIER_KEY_CACHE_TTL', default=300, cast=int),  # Seconds before a context is rebuilt
+}
+
+# Exponential ElGamal elections (see apps.encryption.elgamal)
+EC_ELGAMAL = {
+    'CURVE': 'secp256k1',
+    'MAX_PLAINTEXT': config('EC_ELGAMAL_MAX_PLAINTEXT', default=2 ** 20, cast=int),  # Decryption search bound when an election sets no max_electorate
+}
+
+# Offline crypto benchmark suite (see apps.encryption.benchmark_suite)
+CRYPTO_BENCHMARKS = {
+    'KEY_SIZES': [512, 1024, 2048, 3072],
+    'BASELINE': BASE_DIR / 'benchmarks' / 'crypto_baseline.json',  # Written by run_crypto_benchmarks --save-baseline
+    'REGRESSION_THRESHOLD': 0.25,  # Fractional p50 slowdown that fails the comparison
+    'REGRESSION_THRESHOLDS': {'keygen': 1.0},  # Per-operation overrides; prime search time is noisy
+    'NOISE_FLOOR_MS': 0.05,  # Slowdowns smaller than this never count
+}
+
+# Running encrypted tally folded from accepted votes (see apps.elections.tally)
+ELECTION_TALLY = {
+    'SHARDS': config('ELECTION_TALLY_SHARDS', default=8, cast=int),  # Shard rows per election
+    'FOLD_BATCH_SIZE': config('ELECTION_TALLY_FOLD_BATCH_SIZE', default=500, cast=int),  # Votes folded per transaction
+}
+
+# Asynchronous chain submission of cast votes (see apps.elections.submission)
+VOTE_SUBMISSION = {
+    # 'celery', 'thread' (in-process pool), 'database' (process_vote_submissions polls) or 'inline'
+    'BACKEND': config('VOTE_SUBMISSION_BACKEND', default='thread'),
+    'MAX_ATTEMPTS': 5,  # Submission attempts before a vote is marked failed
+    'RETRY_DELAY': 2.0,  # Seconds before the first retry; doubles each attempt
+    'MAX_RETRY_DELAY': 300.0,
+    'POLL_INTERVAL': 2.0,  # Seconds between receipt polls of a submitted transaction
+    'CONFIRMATION_TIMEOUT': 600.0,  # Resend transactions still unmined after this long
+    'BATCH_SIZE': 100,  # Votes processed per worker pass
+    'THREAD_WORKERS': 4,
+    # Relayer mode: ballots are signed with the voter's key and sent in castVotesBatch
+    # transactions by the admin account. Only the polling worker sends batches, so run
+    # process_vote_submissions --watch with an interval below RELAY_MAX_AGE.
+    'RELAYER': config('VOTE_SUBMISSION_RELAYER', default=False, cast=bool),
+    'RELAY_BATCH_SIZE': 50,  # Ballots per castVotesBatch transaction
+    'RELAY_MAX_AGE': 5.0,  # Seconds the oldest queued ballot waits before a partial batch is sent
+}
+
+# Merkle-root anchoring for elections with chain_anchoring 'merkle_root'
+VOTE_ANCHORING = {
+    'INTERVAL': 60.0,  # Seconds between anchoring passes (one root per election per pass)
+    'MAX_LEAVES': 10000,  # Votes committed by one root; more wait for the next pass
+}
 
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -247,6 +324,22 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # Picks up queued votes whose task message was lost
+    'process-due-vote-submissions': {
+        'task': 'apps.elections.tasks.process_due_vote_submissions',
+        'schedule': 30.0,
+    },
+    'anchor-vote-roots': {
+        'task': 'apps.elections.tasks.anchor_vote_roots',
+        'schedule': VOTE_ANCHORING['INTERVAL'],
+    },
+    # Keeps the Paillier key pool stocked; the API never generates keys inline
+    'refill-key-pools': {
+        'task': 'apps.encryption.tasks.refill_key_pools',
+        'schedule': PAILLIER_KEY_POOL['REFILL_INTERVAL'],
+    },
+}
 
 # Logging Configuration
 LOGGING = {
@@ -298,6 +391,14 @@ BLOCKCHAIN = {
     'NETWORK_ID': '5777',  # Ganache network ID
     'GAS_LIMIT': 2000000,
     'GAS_PRICE': 20000000000,  # 20 Gwei
+    'CONTRACT_PATH': BASE_DIR.parent / 'truffle' / 'build' / 'contracts' / 'VotingContract.json',
+    'RELOAD_ON_CHANGE': True,  # Reload the shared client when the contract artifact changes
+    'POOL_SIZE': 10,  # Keep-alive connections to the node per process
+    'REQUEST_TIMEOUT': 30,  # Seconds per RPC request
+    'STUCK_TRANSACTION_TIMEOUT': 120,  # Seconds before an unmined transaction is re-sent at the same nonce
+    'REPLACEMENT_GAS_BUMP': 1.2,  # Gas price multiplier for replacements (nodes require at least 1.1)
+    'RELAY_BASE_GAS': 100000,  # castVotesBatch gas limit = base + per ballot * ballots
+    'RELAY_GAS_PER_BALLOT': 120000,
 }
 
 # These should be set in environment variables in production
@@ -23,21 +23,53 @@ contract VotingContract {
     struct Vote {
         string electionId;
         bytes encryptedVote;
+        bytes32 encryptedVoteHash;
         bytes32 voteHash;
         uint256 timestamp;
         address voter;
         bool isValid;
     }
     
+    // A ballot relayed by castVotesBatch; the voter signs ballotDigest(...)
+    // with an Ethereum signed message
+    struct BallotSubmission {
+        address voter;
+        bytes32 encryptedVoteHash;
+        bytes32 voteHash;
+        bytes signature;
+    }
+    
+    // Merkle root committing to a batch of off-chain votes (anchoring mode)
+    struct AnchoredRoot {
+        string electionId;
+        uint256 voteCount;
+        uint256 timestamp;
+        uint256 batchIndex;
+    }
+    
+    // Per-ballot outcomes of castVotesBatch
+    uint8 public constant BALLOT_ACCEPTED = 0;
+    uint8 public constant BALLOT_BAD_SIGNATURE = 1;
+    uint8 public constant BALLOT_ALREADY_VOTED = 2;
+    uint8 public constant BALLOT_DUPLICATE_HASH = 3;
+    uint8 public constant BALLOT_INVALID = 4;
+    
+    // Upper half of the secp256k1 order; signatures with s above it are malleable copies
+    uint256 private constant MAX_SIGNATURE_S = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF5D576E7357A4501DDFE92F46681B20A0;
+    
     // State variables
     mapping(string => Election) public elections;
     mapping(bytes32 => Vote) public votes;
     mapping(address => uint256) public voterVoteCount;
+    mapping(bytes32 => AnchoredRoot) public voteRoots;
+    mapping(string => uint256) public anchoredBatchCount;
     
     // Events
     event ElectionCreated(string indexed electionId, string title, address creator);
     event VoteCast(string indexed electionId, bytes32 indexed voteHash, address voter);
+    event VoteRejected(string indexed electionId, bytes32 indexed voteHash, address voter, uint8 reason);
     event VoteVerified(bytes32 indexed voteHash, bool isValid);
+    event VoteRootAnchored(string indexed electionId, bytes32 indexed root, uint256 voteCount, uint256 batchIndex);
     event ElectionEnded(string indexed electionId, uint256 totalVotes);
     event ResultsPublished(string indexed electionId);
     
@@ -123,6 +155,7 @@ contract VotingContract {
         Vote storage vote = votes[voteHash];
         vote.electionId = electionId;
         vote.encryptedVote = encryptedVote;
+        vote.encryptedVoteHash = keccak256(encryptedVote);
         vote.voteHash = voteHash;
         vote.timestamp = block.timestamp;
         vote.voter = msg.sender;
@@ -139,6 +172,160 @@ contract VotingContract {
         emit VoteCast(electionId, voteHash, msg.sender);
     }
     
+    /**
+     * @dev Digest a voter signs to authorize a relayed ballot
+     * @param electionId Election identifier
+     * @param encryptedVoteHash keccak256 of the encrypted vote, which stays off-chain
+     * @param voteHash Hash of the vote for verification
+     * @return Digest bound to this contract, the election and the ballot
+     */
+    function ballotDigest(
+        string memory electionId,
+        bytes32 encryptedVoteHash,
+        bytes32 voteHash
+    ) public view returns (bytes32) {
+        return keccak256(abi.encodePacked(address(this), electionId, encryptedVoteHash, voteHash));
+    }
+    
+    /**
+     * @dev Record many voter-signed ballots in one transaction (relayer mode).
+     * Only the hash of each encrypted vote is stored. A bad ballot is
+     * skipped with a VoteRejected event instead of reverting the batch.
+     * @param electionId Election identifier
+     * @param ballots Signed ballots
+     * @return results Outcome code per ballot (BALLOT_ACCEPTED or a rejection reason)
+     */
+    function castVotesBatch(
+        string memory electionId,
+        BallotSubmission[] calldata ballots
+    ) external electionExists(electionId) electionActive(electionId) returns (uint8[] memory results) {
+        Election storage election = elections[electionId];
+        results = new uint8[](ballots.length);
+        uint256 accepted = 0;
+        
+        for (uint256 i = 0; i < ballots.length; i++) {
+            BallotSubmission calldata ballot = ballots[i];
+            uint8 result = _checkBallot(election, electionId, ballot);
+            results[i] = result;
+            if (result != BALLOT_ACCEPTED) {
+                emit VoteRejected(electionId, ballot.voteHash, ballot.voter, result);
+                continue;
+            }
+            
+            Vote storage vote = votes[ballot.voteHash];
+            vote.electionId = electionId;
+            vote.encryptedVoteHash = ballot.encryptedVoteHash;
+            vote.voteHash = ballot.voteHash;
+            vote.timestamp = block.timestamp;
+            vote.voter = ballot.voter;
+            vote.isValid = true;
+            
+            election.hasVoted[ballot.voter] = true;
+            election.voteHashes[ballot.voteHash] = true;
+            voterVoteCount[ballot.voter]++;
+            accepted++;
+            
+            emit VoteCast(electionId, ballot.voteHash, ballot.voter);
+        }
+        
+        // One storage write for the whole batch
+        election.totalVotes += accepted;
+    }
+    
+    function _checkBallot(
+        Election storage election,
+        string memory electionId,
+        BallotSubmission calldata ballot
+    ) internal view returns (uint8) {
+        if (ballot.voter == address(0) || ballot.voteHash == bytes32(0) || ballot.encryptedVoteHash == bytes32(0)) {
+            return BALLOT_INVALID;
+        }
+        bytes32 digest = keccak256(abi.encodePacked(
+            "\x19Ethereum Signed Message:\n32",
+            ballotDigest(electionId, ballot.encryptedVoteHash, ballot.voteHash)
+        ));
+        if (_recoverSigner(digest, ballot.signature) != ballot.voter) {
+            return BALLOT_BAD_SIGNATURE;
+        }
+        if (election.hasVoted[ballot.voter]) {
+            return BALLOT_ALREADY_VOTED;
+        }
+        if (election.voteHashes[ballot.voteHash] || votes[ballot.voteHash].timestamp > 0) {
+            return BALLOT_DUPLICATE_HASH;
+        }
+        return BALLOT_ACCEPTED;
+    }
+    
+    function _recoverSigner(bytes32 digest, bytes memory signature) internal pure returns (address) {
+        if (signature.length != 65) {
+            return address(0);
+        }
+        bytes32 r;
+        bytes32 s;
+        uint8 v;
+        assembly {
+            r := mload(add(signature, 32))
+            s := mload(add(signature, 64))
+            v := byte(0, mload(add(signature, 96)))
+        }
+        if (v < 27) {
+            v += 27;
+        }
+        if (uint256(s) > MAX_SIGNATURE_S || (v != 27 && v != 28)) {
+            return address(0);
+        }
+        return ecrecover(digest, v, r, s);
+    }
+    
+    /**
+     * @dev Commit a batch of off-chain votes by the root of a Merkle tree over their hashes
+     * @param electionId Election identifier
+     * @param root Merkle root (see verifyVoteInclusion for the tree layout)
+     * @param voteCount Number of votes in the batch
+     */
+    function anchorVoteRoot(
+        string memory electionId,
+        bytes32 root,
+        uint256 voteCount
+    ) public electionExists(electionId) onlyElectionCreator(electionId) {
+        require(root != bytes32(0), "Root cannot be zero");
+        require(voteCount > 0, "Batch cannot be empty");
+        require(voteRoots[root].timestamp == 0, "Root already anchored");
+        
+        uint256 batchIndex = anchoredBatchCount[electionId];
+        anchoredBatchCount[electionId] = batchIndex + 1;
+        voteRoots[root] = AnchoredRoot(electionId, voteCount, block.timestamp, batchIndex);
+        elections[electionId].totalVotes += voteCount;
+        
+        emit VoteRootAnchored(electionId, root, voteCount, batchIndex);
+    }
+    
+    /**
+     * @dev Check a vote's inclusion proof against an anchored root. Leaves are
+     * keccak256(0x00, voteHash) and nodes keccak256(0x01, lower child, higher child).
+     * @param root Anchored Merkle root
+     * @param voteHash Hash of the vote
+     * @param proof Sibling hashes from the leaf level up
+     * @return True if the root is anchored and the proof leads to it
+     */
+    function verifyVoteInclusion(
+        bytes32 root,
+        bytes32 voteHash,
+        bytes32[] calldata proof
+    ) public view returns (bool) {
+        if (voteRoots[root].timestamp == 0) {
+            return false;
+        }
+        bytes32 node = keccak256(abi.encodePacked(bytes1(0x00), voteHash));
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            node = node <= sibling
+                ? keccak256(abi.encodePacked(bytes1(0x01), node, sibling))
+                : keccak256(abi.encodePacked(bytes1(0x01), sibling, node));
+        }
+        return node == root;
+    }
+    
     /**
      * @dev Verify a vote's integrity
      * @param voteHash Hash of the vote to verify